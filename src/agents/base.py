@@ -1,4 +1,7 @@
 from abc import ABC
+import time
+import torch
+from src.core import metrics
 from src.core.engine import ModelEngine
 
 class BaseAgent(ABC):
@@ -6,11 +9,100 @@ class BaseAgent(ABC):
         self.engine = engine
         self.role = role
 
-    def generate(self, prompt: str, **kwargs):
+    def build_prompt(self, system: str, user: str):
+        """Token IDs for a single system + user turn, via the shared chat-template cache."""
+        builder = self.engine.get_prompt_builder(self.role)
+        return builder.build(self.role, system, [{"role": "user", "content": user}])
+
+    def chat(self, system: str, user: str, **kwargs):
+        return self.generate(self.build_prompt(system, user), **kwargs)
+
+    def generate(self, prompt, **kwargs):
+        """`prompt` is either a raw prompt string or pre-tokenized input IDs."""
         asset = self.engine.load_model(self.role)
         model, tokenizer = asset['model'], asset['tokenizer']
-        inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
+        if isinstance(prompt, str):
+            input_ids = tokenizer(prompt, return_tensors="pt").input_ids
+        else:
+            input_ids = torch.tensor([list(prompt)], dtype=torch.long)
+        input_ids = input_ids.to(model.device)
+        outputs = self._generate(asset, input_ids, **kwargs)
+        return tokenizer.decode(outputs[0][input_ids.shape[1]:], skip_special_tokens=True).strip()
+
+    def chat_batch(self, turns, **kwargs):
+        """Answers several (system, user) turns in one batched generate. Returns (texts, stats)."""
+        return self.generate_batch([self.build_prompt(system, user) for system, user in turns], **kwargs)
+
+    def generate_batch(self, prompts, **kwargs):
+        """
+        One generate call for several pre-tokenized prompts, left-padded to the longest
+        (sort by length before batching to keep the padding small). Returns the decoded
+        replies and {"prompt_tokens", "new_tokens", "seconds"} for the batch.
+        """
+        asset = self.engine.load_model(self.role)
+        model, tokenizer = asset['model'], asset['tokenizer']
+        pad_id = tokenizer.eos_token_id
+        width = max(len(p) for p in prompts)
+        input_ids = torch.tensor([[pad_id] * (width - len(p)) + list(p) for p in prompts], dtype=torch.long)
+        attention_mask = torch.tensor([[0] * (width - len(p)) + [1] * len(p) for p in prompts], dtype=torch.long)
         gen_kwargs = self.engine.config.generation.copy()
         gen_kwargs.update(kwargs)
-        outputs = model.generate(**inputs, pad_token_id=tokenizer.eos_token_id, **gen_kwargs)
-        return tokenizer.decode(outputs[0][inputs.input_ids.shape[1]:], skip_special_tokens=True).strip()
\ No newline at end of file
+        queued = time.perf_counter()
+        with asset['lock']:
+            started = time.perf_counter()
+            with metrics.stage("llm.generate_batch", role=self.role, batch=len(prompts)) as info:
+                outputs = model.generate(input_ids=input_ids.to(model.device),
+                                         attention_mask=attention_mask.to(model.device),
+                                         pad_token_id=pad_id, **gen_kwargs)
+                seconds = time.perf_counter() - started
+        texts, new_tokens = [], 0
+        stops = set(tokenizer.all_special_ids)
+        for row in outputs.tolist():
+            generated = row[width:]
+            # A reply ends at its first special token (EOS); finished rows are padded after it
+            length = next((i + 1 for i, t in enumerate(generated) if t in stops), len(generated))
+            new_tokens += length
+            texts.append(tokenizer.decode(generated[:length], skip_special_tokens=True).strip())
+        prompt_tokens = sum(len(p) for p in prompts)
+        if metrics.registry.enabled:
+            self._record_generation(info, prompt_tokens, new_tokens, started - queued, seconds)
+        return texts, {"prompt_tokens": prompt_tokens, "new_tokens": new_tokens, "seconds": seconds}
+
+    def continue_generate(self, input_ids, cache, **kwargs):
+        """
+        Generates from the full conversation `input_ids` (token list), prefilling only
+        the part not already in `cache` (the KV cache of earlier turns, extended in
+        place). Returns the new token IDs.
+        """
+        asset = self.engine.load_model(self.role)
+        ids = torch.tensor([list(input_ids)], dtype=torch.long).to(asset['model'].device)
+        outputs = self._generate(asset, ids, past_key_values=cache, return_dict_in_generate=True, **kwargs)
+        return outputs.sequences[0][ids.shape[1]:].tolist()
+
+    def _generate(self, asset, input_ids, **kwargs):
+        model, tokenizer = asset['model'], asset['tokenizer']
+        gen_kwargs = self.engine.config.generation.copy()
+        gen_kwargs.update(kwargs)
+        cache = gen_kwargs.get("past_key_values")
+        cached = cache.get_seq_length() if cache is not None else 0
+        queued = time.perf_counter()
+        with asset['lock']:  # One generate at a time per shared model
+            started = time.perf_counter()
+            with metrics.stage("llm.generate", role=self.role) as info:
+                outputs = model.generate(input_ids=input_ids, attention_mask=torch.ones_like(input_ids),
+                                         pad_token_id=tokenizer.eos_token_id, **gen_kwargs)
+                if metrics.registry.enabled:
+                    sequences = outputs.sequences if hasattr(outputs, "sequences") else outputs
+                    self._record_generation(info, input_ids.shape[1] - cached,
+                                            sequences.shape[1] - input_ids.shape[1],
+                                            started - queued, time.perf_counter() - started)
+        return outputs
+
+    def _record_generation(self, info, prompt_tokens, new_tokens, queue_seconds, seconds):
+        rate = new_tokens / seconds if seconds > 0 else 0.0
+        metrics.LLM_PROMPT_TOKENS.inc(prompt_tokens, role=self.role)
+        metrics.LLM_GENERATED_TOKENS.inc(new_tokens, role=self.role)
+        metrics.LLM_TOKENS_PER_SECOND.observe(rate, role=self.role)
+        metrics.LLM_QUEUE_SECONDS.observe(queue_seconds, role=self.role)
+        info.update(prompt_tokens=prompt_tokens, new_tokens=new_tokens, tokens_per_s=round(rate, 1),
+                    queue_ms=round(queue_seconds * 1000, 3))
@@ -5,11 +5,9 @@ class CoderAgent(BaseAgent):
     def __init__(self, engine, memory):
         super().__init__(engine, "coder")
 
-    def write_code(self, task: str, plan: str, feedback: str = ""):
+    def code_prompt(self, task: str, plan: str, feedback: str = ""):
         # We explicitly mention Make.com in the user prompt to trigger the right mode
-        prompt = f'''{Prompts.CODER_SYSTEM}
-<|im_start|>user
-TASK: {task}
+        user = f'''TASK: {task}
 
 ARCHITECT PLAN:
 {plan}
@@ -18,9 +16,9 @@ INSTRUCTIONS:
 - If this is an automation, generate a Make.com Blueprint (JSON).
 - Ensure the "mapper" fields use the correct ID references from previous steps.
 
-{f"FEEDBACK FROM PREVIOUS ERROR: {feedback}" if feedback else ""}
-<|im_end|>
-<|im_start|>assistant
-'''
+{f"FEEDBACK FROM PREVIOUS ERROR: {feedback}" if feedback else ""}'''
+        return Prompts.CODER_SYSTEM, user
+
+    def write_code(self, task: str, plan: str, feedback: str = ""):
         # Low temp for precision
-        return self.generate(prompt, max_new_tokens=3000, temperature=0.1)
\ No newline at end of file
+        return self.chat(*self.code_prompt(task, plan, feedback), max_new_tokens=3000, temperature=0.1)
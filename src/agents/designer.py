@@ -0,0 +1,127 @@
+import re
+import torch
+from transformers import StoppingCriteria, StoppingCriteriaList
+from src.core.prompts import Prompts
+
+STEP_RE = re.compile(r"^\s*(?:\*\*)?(?:Bước\s*)?(\d+)\s*[.):]", re.MULTILINE | re.IGNORECASE)
+# Closing remarks that end a plan wherever they start a line: "Chúc bạn ...", "Tóm lại, ...", a "---" rule
+END_RE = re.compile(r"^(?:-{3,}|(?:\*\*)?(?:Chúc|Hy vọng|Tóm lại|Kết luận)\b)", re.MULTILINE | re.IGNORECASE)
+
+
+def trim_plan(text, max_steps):
+    """
+    Cuts a numbered plan once it is complete: at the header of a step past `max_steps`,
+    at an explicit closing remark (END_RE) after the first step, and, once step
+    `max_steps` is written, at a paragraph that follows it after a blank line
+    ("Lưu ý: ..."). Paragraphs inside earlier steps are kept, as is text without
+    numbered steps.
+    """
+    steps = list(STEP_RE.finditer(text))
+    if not steps:
+        return text.rstrip()
+    cut = next((m.start() for m in steps if int(m.group(1)) > max_steps), len(text))
+    end = END_RE.search(text, steps[0].end(), cut)
+    if end:
+        cut = end.start()
+    last = [m for m in steps if m.start() < cut][-1]
+    if int(last.group(1)) >= max_steps:
+        tail = text[last.start():cut]
+        blank = re.search(r"\n\s*\n(?=\S)", tail)
+        # The paragraph must be long enough to tell it apart from a step header still being generated
+        if blank and not re.match(r"(?:\d|[-*•]|bước)", tail[blank.end():], re.IGNORECASE) \
+                and len(tail[blank.end():].strip()) >= 6:
+            cut = last.start() + blank.start()
+    return text[:cut].rstrip()
+
+
+class StepLimit(StoppingCriteria):
+    """
+    Stops plan generation once the plan is complete by structure (see trim_plan), not by
+    token count. Only the tokens added since the last call are decoded; a token that ends
+    mid-character is decoded again together with the next one.
+    """
+    def __init__(self, tokenizer, prompt_length, max_steps):
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.max_steps = max_steps
+        self.text = ""
+        self._decoded = prompt_length  # Tokens already in self.text
+        self._done = False
+
+    def spec(self):
+        """JSON description, rebuilt next to the model when generation runs in the model server."""
+        return {"type": "step_limit", "prompt_length": self.prompt_length, "max_steps": self.max_steps}
+
+    def __call__(self, input_ids, scores=None, **kwargs):
+        ids = input_ids[0]
+        if len(ids) < self._decoded:  # Reused for a new generation
+            self.text, self._decoded, self._done = "", self.prompt_length, False
+        new = self.tokenizer.decode(ids[self._decoded:], skip_special_tokens=True)
+        if new and not new.endswith("\ufffd"):
+            self.text += new
+            self._decoded = len(ids)
+            self._done = trim_plan(self.text, self.max_steps) != self.text.rstrip()
+        return torch.full((input_ids.shape[0],), self._done, dtype=torch.bool, device=input_ids.device)
+
+
+class AutomationDesigner:
+    """
+    TECHNICAL path: architect plan, then Make.com blueprint.
+
+    Pipelined (default): one conversation on the shared model. The plan is generated
+    as numbered steps, stopped after `max_steps`, and the builder turn is appended to
+    the same token sequence, as a new system turn with the coder's prompt and the
+    build instruction, so its KV cache is reused instead of re-prefilling the task
+    and the whole plan. Sequential: `manager.plan` then `coder.write_code`,
+    also used when the two personas do not share a model.
+    """
+    def __init__(self, manager, coder, max_steps=8, pipelined=True):
+        self.manager = manager
+        self.coder = coder
+        self.max_steps = max_steps
+        self.pipelined = pipelined
+
+    def _shared_model(self):
+        """Both personas on one model whose runtime can carry a KV cache across turns."""
+        engine = self.manager.engine
+        asset = engine.load_model(self.manager.role)
+        return engine is self.coder.engine and asset is engine.load_model(self.coder.role) \
+            and asset["new_cache"] is not None
+
+    def design(self, task: str, history_str: str = "", db_context=None):
+        """Returns (plan, code)."""
+        if not (self.pipelined and self._shared_model()):
+            plan = self.manager.plan(task, history_str, db_context=db_context)
+            return plan, self.coder.write_code(task, plan)
+
+        engine = self.manager.engine
+        asset = engine.load_model(self.manager.role)
+        tokenizer, builder = asset["tokenizer"], asset["prompt_builder"]
+        system = (f"{self.manager.get_dynamic_context(db_context)}\n"
+                  f"{Prompts.PLAN_STEPS_INSTRUCTION.format(max_steps=self.max_steps)}")
+        user = f"CONTEXT FROM HISTORY: {history_str}\nUSER REQUEST: {task}"
+        prompt_ids = builder.build(self.manager.role, system, [{"role": "user", "content": user}])
+        cache = engine.new_cache(self.manager.role)
+        try:
+            return self._design(prompt_ids, cache, tokenizer, builder)
+        finally:
+            if hasattr(cache, "close"):  # Remote caches hold model-server memory until released
+                cache.close()
+
+    def _design(self, prompt_ids, cache, tokenizer, builder):
+        # 1. Plan, stopped by structure; the overshoot (next step header, closing remarks) is dropped
+        limit = StepLimit(tokenizer, len(prompt_ids), self.max_steps)
+        plan_ids = self.manager.continue_generate(prompt_ids, cache, max_new_tokens=1500,
+                                                  stopping_criteria=StoppingCriteriaList([limit]))
+        plan = trim_plan(tokenizer.decode(plan_ids, skip_special_tokens=True), self.max_steps)
+        while plan_ids and len(tokenizer.decode(plan_ids, skip_special_tokens=True).rstrip()) > len(plan):
+            plan_ids = plan_ids[:-1]
+        cache.crop(len(prompt_ids) + len(plan_ids))
+
+        # 2. Builder turn in the same conversation, under the coder's system prompt (ChatML templates render a
+        #    later system message as its own turn): only the turn itself is prefilled
+        turn_ids = builder.continuation([{"role": "system", "content": Prompts.CODER_SYSTEM},
+                                         {"role": "user", "content": Prompts.BUILD_TURN_INSTRUCTION}])
+        code_ids = self.coder.continue_generate(prompt_ids + plan_ids + turn_ids, cache,
+                                                max_new_tokens=3000, temperature=0.1)
+        return plan.strip(), tokenizer.decode(code_ids, skip_special_tokens=True).strip()
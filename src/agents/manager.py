@@ -4,6 +4,7 @@ from datetime import datetime
 import pytz
 from src.agents.base import BaseAgent
 from src.core.prompts import Prompts
+from src.core.tool_calling import parse_tool_calls
 
 class ManagerAgent(BaseAgent):
     def __init__(self, engine, memory):
@@ -14,8 +15,9 @@ class ManagerAgent(BaseAgent):
     def set_db_context(self, context_str):
         self.db_context = context_str
 
-    def get_dynamic_context(self):
-        return f"{Prompts.SYSTEM_CONTEXT}\n\n[DATA]\n{self.db_context}"
+    def get_dynamic_context(self, db_context=None):
+        """`db_context` (per-request, server) overrides the session-level one set via set_db_context (CLI)."""
+        return f"{Prompts.SYSTEM_CONTEXT}\n\n[DATA]\n{self.db_context if db_context is None else db_context}"
 
     def _extract_json(self, text):
         try:
@@ -63,50 +65,70 @@ class ManagerAgent(BaseAgent):
         # --- 4. GENERAL (Default) ---
         return {"category": "GENERAL"}
 
-    def consult(self, task: str, context_data: str = "", history_str: str = ""):
-        sys_prompt = self.get_dynamic_context()
-        
-        prompt = f'''<|im_start|>system
-{sys_prompt}
+    # *_prompt methods return the (system, user) turn so batch jobs can generate many at once
+
+    def consult_prompt(self, task: str, context_data: str = "", history_str: str = "", db_context=None):
+        # Static: persona + store context + instructions (token IDs cached per store).
+        # Dynamic: history, data and the question.
+        system = f"{self.get_dynamic_context(db_context)}\n\n{Prompts.CONSULT_INSTRUCTION}"
+        user = f"CHAT HISTORY:\n{history_str}\n\nDATA: {context_data}\n\n{task}"
+        return system, user
 
-CHAT HISTORY:
-{history_str}
+    def consult(self, task: str, context_data: str = "", history_str: str = "", db_context=None):
+        return self.chat(*self.consult_prompt(task, context_data, history_str, db_context), max_new_tokens=1024)
 
-DATA: {context_data}
+    def answer_with_tools(self, task: str, tools, store_id=None, history_str: str = "", db_context=None,
+                          max_rounds=3):
+        """
+        consult() with tool calling. The model emits every <tool_call> it needs in one
+        reply; the calls run concurrently and all results go back in a single follow-up
+        turn. The conversation stays one token sequence, so with a KV cache each round
+        only prefills the new turn. At most `max_rounds` LLM calls (the last answers).
+        Returns (text, {"llm_round_trips", "tool_calls"}).
+        """
+        if max_rounds < 1:
+            raise ValueError(f"max_rounds must be at least 1 (got {max_rounds})")
+        asset = self.engine.load_model(self.role)
+        tokenizer, builder = asset["tokenizer"], asset["prompt_builder"]
+        system = f"{self.get_dynamic_context(db_context)}\n\n{Prompts.CONSULT_INSTRUCTION}\n\n{tools.prompt()}"
+        user = f"CHAT HISTORY:\n{history_str}\n\n{task}"
+        ids = builder.build(self.role, system, [{"role": "user", "content": user}])
+        stops = set(tokenizer.all_special_ids)
+        info = {"llm_round_trips": 0, "tool_calls": []}
+        cache = self.engine.new_cache(self.role)
+        try:
+            for round_number in range(1, max_rounds + 1):
+                reply_ids = self.continue_generate(ids, cache, max_new_tokens=1024)
+                while reply_ids and reply_ids[-1] in stops:  # The follow-up turn closes the reply itself
+                    reply_ids.pop()
+                if cache is not None:
+                    cache.crop(len(ids) + len(reply_ids))
+                info["llm_round_trips"] += 1
+                text = tokenizer.decode(reply_ids, skip_special_tokens=True)
+                calls, answer = parse_tool_calls(text)
+                if not calls or round_number == max_rounds:
+                    break
+                results = tools.execute(calls, store_id)
+                info["tool_calls"] += [{k: v for k, v in r.items() if k != "result"} for r in results]
+                ids = ids + reply_ids + builder.continuation([{"role": "user", "content": tools.responses(results)}])
+        finally:
+            if hasattr(cache, "close"):  # Remote caches hold model-server memory until released
+                cache.close()
+        return answer or Prompts.TOOLS_EXHAUSTED, info
 
-INSTRUCTION: Answer helpfuly in Vietnamese.
-- If the user asks vaguely about "Automation" (e.g. "I want to automate"), DO NOT generate code. Instead, ask them SPECIFIC questions: "Bạn muốn tự động hóa quy trình nào? (Ví dụ: Chốt đơn, CSKH, hay Quản lý kho?)".
-- Be professional and friendly.
-<|im_end|>
-<|im_start|>user
-{task}
-<|im_end|>
-<|im_start|>assistant
-'''
-        return self.generate(prompt, max_new_tokens=1024)
+    def marketing_prompt(self, task: str):
+        return Prompts.COPYWRITER_SYSTEM, task
 
     def write_marketing(self, task: str):
-        return self.generate(f"<|im_start|>system\nCopywriter.\n<|im_end|>\n<|im_start|>user\n{task}<|im_end|>\n<|im_start|>assistant\n", max_new_tokens=1024)
-
-    def plan(self, task: str, history_str: str = ""):
-        sys_prompt = self.get_dynamic_context()
-        prompt = f'''<|im_start|>system
-{sys_prompt}
-TASK: Architect an Automation Workflow.
-CONTEXT FROM HISTORY: {history_str}
-USER REQUEST: {task}
-<|im_end|>
-<|im_start|>assistant
-'''
-        return self.generate(prompt, max_new_tokens=1500)
-    
+        return self.chat(*self.marketing_prompt(task), max_new_tokens=1024)
+
+    def plan_prompt(self, task: str, history_str: str = "", db_context=None):
+        system = f"{self.get_dynamic_context(db_context)}\n{Prompts.PLAN_INSTRUCTION}"
+        user = f"CONTEXT FROM HISTORY: {history_str}\nUSER REQUEST: {task}"
+        return system, user
+
+    def plan(self, task: str, history_str: str = "", db_context=None):
+        return self.chat(*self.plan_prompt(task, history_str, db_context), max_new_tokens=1500)
+
     def review(self, task: str, code: str):
-        prompt = f'''<|im_start|>system
-Reviewer. Analyze this JSON.
-<|im_end|>
-<|im_start|>user
-{code}
-<|im_end|>
-<|im_start|>assistant
-'''
-        return self.generate(prompt, max_new_tokens=512)
\ No newline at end of file
+        return self.chat(Prompts.REVIEWER_SYSTEM, code, max_new_tokens=512)
@@ -1,31 +1,45 @@
+import asyncio
+import concurrent.futures
 from src.agents.base import BaseAgent
-from ddgs import DDGS
+from src.core.config import get_config
+from src.core.prompts import Prompts
+from src.core.search import DDGSProvider, SearchCache, WebResearch
 
 class ResearcherAgent(BaseAgent):
-    def __init__(self, engine):
+    def __init__(self, engine, provider=None, cache=None):
         super().__init__(engine, "researcher") # Now uses Qwen-14B
+        # Provider is pluggable: DDGS in production, LocalSearchProvider offline/in benchmarks.
+        if provider is None:
+            provider = DDGSProvider()
+        if cache is None:
+            cache = SearchCache(get_config().DB_PATH)
+        self.web = WebResearch(provider, cache)
+
+    async def asearch(self, query: str):
+        """Parallel fan-out over query reformulations -> deduplicated, compact snippet block."""
+        return self.web.compact(await self.web.gather(query))
 
     def search(self, query: str):
         try:
-            with DDGS() as ddgs:
-                results = list(ddgs.text(query, max_results=4))
-                if not results: return "Search returned no results."
-                return str(results)
+            return self._run(self.asearch(query))
         except Exception as e:
             return f"Search failed: {e}"
 
+    async def aprocess(self, query: str):
+        raw_data = await self.asearch(query)
+        return await asyncio.to_thread(self.chat, Prompts.RESEARCHER_SYSTEM,
+                                       f"QUERY: {query}\nSEARCH RESULTS:\n{raw_data}", max_new_tokens=512)
+
     def process(self, query: str):
         raw_data = self.search(query)
-        
-        # Qwen prompt format
-        prompt = f'''<|im_start|>system
-You are a Research Assistant. Summarize the provided search data concisely in Vietnamese.
-Focus on facts relevant to Retail/Business.
-<|im_end|>
-<|im_start|>user
-QUERY: {query}
-RAW DATA: {raw_data}
-<|im_end|>
-<|im_start|>assistant
-'''
-        return self.generate(prompt, max_new_tokens=512)
\ No newline at end of file
+        return self.chat(Prompts.RESEARCHER_SYSTEM, f"QUERY: {query}\nSEARCH RESULTS:\n{raw_data}", max_new_tokens=512)
+
+    @staticmethod
+    def _run(coro):
+        """Runs a coroutine from sync code, even if the caller is already inside an event loop."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, coro).result()
@@ -1,80 +1,130 @@
 from transformers import AutoProcessor, AutoModelForCausalLM
 from PIL import Image
 import torch
+import io
 import os
 import logging
+from src.core.config import get_config
+from src.core.receipt_parser import ReceiptParser
+from src.core import metrics
+from src.core.metrics import log_status
+
+CAPTION_HINTS = ["marketing", "bài viết", "miêu tả", "quảng cáo", "describe", "caption"]
+RECEIPT_HINTS = ["hóa đơn", "hoá đơn", "biên lai", "phiếu", "nhập hàng", "receipt", "invoice", "bill"]
 
 class VisionAgent:
     def __init__(self):
-        print("👁️ [Vision] Initializing Florence-2 (The Eye)...")
-        self.model_id = 'microsoft/Florence-2-large'
+        log_status("👁️ [Vision] Initializing Florence-2 (The Eye)...")
+        self.settings = get_config().vision
+        self.model_id = self.settings["model_id"]
+        self.max_resolution = self.settings["max_resolution"]
+        self.receipt_parser = ReceiptParser()
         # Check GPU availability
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         # Use float16 for GPU to save memory, float32 for CPU
         self.dtype = torch.float16 if self.device == "cuda" else torch.float32
-        
+
         try:
             self.model = AutoModelForCausalLM.from_pretrained(
-                self.model_id, 
+                self.model_id,
                 trust_remote_code=True,
                 torch_dtype=self.dtype
             ).to(self.device)
-            
+
             self.processor = AutoProcessor.from_pretrained(self.model_id, trust_remote_code=True)
-            print("✅ Vision Agent Loaded.")
+            log_status("✅ Vision Agent Loaded.")
         except Exception as e:
-            print(f"❌ Vision Load Failed: {e}")
+            log_status(f"❌ Vision Load Failed: {e}")
             self.model = None
 
-    def analyze_image(self, image_path, task_hint="OCR"):
+    @staticmethod
+    def task_prompt_for(task_hint="OCR"):
+        """
+        CAPTION for marketing/describe intents, OCR_WITH_REGION for receipts/invoices
+        (parsed into compact JSON), OCR (read text) otherwise.
+        """
+        hint = task_hint.lower()
+        if any(x in hint for x in CAPTION_HINTS):
+            return "<DETAILED_CAPTION>"
+        if any(x in hint for x in RECEIPT_HINTS):
+            return "<OCR_WITH_REGION>"
+        return "<OCR>"
+
+    def prepare_image(self, source):
+        """
+        Accepts a path, raw bytes or a PIL image. Returns an RGB image whose longest
+        side is at most `max_resolution` (Florence resizes to 768px internally anyway,
+        so decoding/sending larger images is wasted work).
         """
-        Analyzes an image based on the context.
+        if isinstance(source, Image.Image):
+            image = source
+        else:
+            image = Image.open(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source)
+            # JPEG can decode directly at a reduced scale, which is much cheaper than resizing after.
+            image.draft("RGB", (self.max_resolution, self.max_resolution))
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        if max(image.size) > self.max_resolution:
+            image = image.copy()
+            image.thumbnail((self.max_resolution, self.max_resolution), Image.BICUBIC)
+        return image
+
+    def run_batch(self, images, task_prompt="<OCR>", mode="quality"):
+        """Runs one `generate` over a list of prepared RGB images. Returns parsed results."""
+        decode = self.settings["modes"][mode]
+        with metrics.stage("vision.preprocess", images=len(images)):
+            inputs = self.processor(text=[task_prompt] * len(images), images=images,
+                                    return_tensors="pt").to(self.device, self.dtype)
+
+        with torch.inference_mode(), metrics.stage("vision.generate", images=len(images), task=task_prompt):
+            generated_ids = self.model.generate(
+                input_ids=inputs["input_ids"],
+                pixel_values=inputs["pixel_values"],
+                max_new_tokens=decode["max_new_tokens"],
+                do_sample=False,
+                num_beams=decode["num_beams"]
+            )
+
+        texts = self.processor.batch_decode(generated_ids, skip_special_tokens=False)
+        results = []
+        for text, image in zip(texts, images):
+            parsed = self.processor.post_process_generation(
+                text, task=task_prompt, image_size=(image.width, image.height)
+            )
+            results.append(parsed.get(task_prompt, ""))
+        return results
+
+    def format_result(self, task_prompt, result):
+        if task_prompt == "<OCR_WITH_REGION>":
+            # Only the compact receipt JSON goes to the LLM, never the raw region dump.
+            compact, raw_text = self.receipt_parser.extract(result)
+            if compact:
+                return "[RECEIPT DATA]\n" + compact
+            task_prompt, result = "<OCR>", raw_text
+        # FIXED: Use concatenation to avoid f-string syntax errors on write
+        header = "[IMAGE ANALYSIS - Mode: " + task_prompt + "]"
+        return header + "\n" + str(result)
+
+    def analyze_image(self, image_path, task_hint="OCR", mode="quality"):
+        """
+        Analyzes a single image based on the context.
         - If task_hint implies 'marketing' or 'describe', use CAPTION.
+        - If it mentions a receipt/invoice, use OCR_WITH_REGION -> compact receipt JSON.
         - Otherwise, default to OCR (Read text).
+        For concurrent callers, go through VisionService (cache + micro-batching).
         """
         if not self.model:
             return "Vision model not loaded."
 
-        if not os.path.exists(image_path):
+        if isinstance(image_path, str) and not os.path.exists(image_path):
             return f"Error: Image file not found at {image_path}"
 
         try:
-            image = Image.open(image_path)
-            if image.mode != "RGB":
-                image = image.convert("RGB")
+            with metrics.stage("vision.decode"):
+                image = self.prepare_image(image_path)
         except Exception as e:
             return f"Error opening image: {e}"
 
-        # 1. Determine Prompt based on intent
-        task_prompt = "<OCR>"
-        if any(x in task_hint.lower() for x in ["marketing", "bài viết", "miêu tả", "quảng cáo", "describe", "caption"]):
-            task_prompt = "<DETAILED_CAPTION>"
-        
-        # 2. Prepare Inputs
-        inputs = self.processor(text=task_prompt, images=image, return_tensors="pt").to(self.device, self.dtype)
-
-        # 3. Generate
-        generated_ids = self.model.generate(
-            input_ids=inputs["input_ids"],
-            pixel_values=inputs["pixel_values"],
-            max_new_tokens=1024,
-            do_sample=False,
-            num_beams=3
-        )
-
-        # 4. Decode
-        generated_text = self.processor.batch_decode(generated_ids, skip_special_tokens=False)[0]
-        
-        # 5. Post-Process
-        parsed_answer = self.processor.post_process_generation(
-            generated_text, 
-            task=task_prompt, 
-            image_size=(image.width, image.height)
-        )
-        
-        # Return clean string result
-        result = parsed_answer.get(task_prompt, "")
-        
-        # FIXED: Use concatenation to avoid f-string syntax errors on write
-        header = "[IMAGE ANALYSIS - Mode: " + task_prompt + "]"
-        return header + "\n" + str(result)
\ No newline at end of file
+        task_prompt = self.task_prompt_for(task_hint)
+        result = self.run_batch([image], task_prompt, mode)[0]
+        return self.format_result(task_prompt, result)
@@ -0,0 +1,231 @@
+"""
+Offline batch mode for bulk generation jobs (nightly marketing posts, re-generating
+workflows, ...).
+
+    python src/batch.py jobs.jsonl --output results.jsonl [--batch-size N]
+
+Input, one request per line:
+    {"id": "post-17", "user_id": 1, "store_id": 1, "message": "...", "category": "MARKETING"}
+`id` defaults to the line number, `category` (TECHNICAL | MARKETING | DATA_INTERNAL |
+GENERAL) to the same router as /chat.
+
+Requests are grouped by persona and generation settings, sorted by prompt length
+(little padding) and generated --batch-size at a time. TECHNICAL requests take
+two passes: all plans, then all blueprints. Results are appended to --output every
+--checkpoint-every requests (flushed and fsynced), so the output file is the
+checkpoint: a rerun skips every id that already has a result. Failed requests are
+written with an "error" and retried on the next run, which first rewrites the file
+without them, so a finished output has exactly one line per id.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.core import metrics
+from src.core.config import get_config
+from src.core.metrics import log_status
+from src.core.memory import MemoryManager
+from src.core.context import StoreContextCache
+from src.core.saas_api import SaasAPI
+from src.agents.manager import ManagerAgent
+from src.agents.coder import CoderAgent
+
+CATEGORIES = ("TECHNICAL", "MARKETING", "DATA_INTERNAL", "GENERAL")
+
+
+def clean_output(text):
+    return re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL).replace("<think>", "").replace("</think>", "").strip()
+
+
+def load_requests(path):
+    requests = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError:
+                log_status(f"⚠️ [Batch] {path}:{number} is not valid JSON, skipped")
+                continue
+            if not request.get("message"):
+                log_status(f"⚠️ [Batch] {path}:{number} has no message, skipped")
+                continue
+            request["id"] = str(request.get("id", number))
+            requests.append(request)
+    return requests
+
+
+def load_done(path):
+    """
+    Ids already answered in `path`. The file is first compacted to one line per id:
+    failed results (retried by this run), older duplicates and a line cut off by an
+    interrupted run are dropped, and the file is replaced atomically if anything was.
+    """
+    if not os.path.exists(path):
+        return set()
+    latest, kept = {}, 0
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            kept += 1
+            latest.pop(str(result["id"]), None)  # A later line for the same id wins
+            if "error" not in result:
+                latest[str(result["id"])] = line
+    if len(latest) < kept or os.path.getsize(path) != sum(map(len, latest.values())):
+        with open(path + ".tmp", "wb") as f:
+            f.writelines(latest.values())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+    return set(latest)
+
+
+class BatchRunner:
+    def __init__(self, engine, memory, batch_size=8):
+        self.manager = ManagerAgent(engine, memory)
+        self.coder = CoderAgent(engine, memory)
+        self.store_contexts = StoreContextCache(memory, **memory.config.context_cache)
+        self.saas = SaasAPI()
+        self.batch_size = batch_size
+        self.stats = {"requests": 0, "errors": 0, "batches": 0, "prompt_tokens": 0, "new_tokens": 0,
+                      "generate_seconds": 0.0}
+
+    def _first_pass(self, job):
+        """(agent, (system, user), generation kwargs) of the job's first generation."""
+        request, ctx = job["request"], job["ctx"]
+        message = request["message"]
+        if job["category"] == "TECHNICAL":
+            return self.manager, self.manager.plan_prompt(message, db_context=ctx.db_context), {"max_new_tokens": 1500}
+        if job["category"] == "MARKETING":
+            return self.manager, self.manager.marketing_prompt(message), {"max_new_tokens": 1024}
+        context = ""
+        if job["category"] == "DATA_INTERNAL":
+            context = f"SALES: {self.saas.get_sales_report(ctx.store_id, 'today')}" if ctx.store_id \
+                else "SALES: unknown (no store selected; ask the user which store)"
+        return self.manager, self.manager.consult_prompt(message, context, "", db_context=ctx.db_context), \
+            {"max_new_tokens": 1024}
+
+    def _generate(self, items):
+        """
+        items: [(job, agent, (system, user), kwargs, key)] → writes job[key] (or job["error"]).
+        Batches share agent role and kwargs and are cut from prompts sorted by length.
+        """
+        groups = {}
+        for job, agent, turn, kwargs, key in items:
+            groups.setdefault((agent.role, json.dumps(kwargs, sort_keys=True)), []).append(
+                (agent.build_prompt(*turn), job, agent, kwargs, key))
+        for group in groups.values():
+            group.sort(key=lambda item: len(item[0]))
+            for start in range(0, len(group), self.batch_size):
+                batch = group[start:start + self.batch_size]
+                agent, kwargs = batch[0][2], batch[0][3]
+                try:
+                    texts, stats = agent.generate_batch([item[0] for item in batch], **kwargs)
+                except Exception as e:
+                    log_status(f"❌ [Batch] Batch of {len(batch)} failed: {e}")
+                    for _, job, _, _, _ in batch:
+                        job["error"] = f"{type(e).__name__}: {e}"
+                    continue
+                self.stats["batches"] += 1
+                self.stats["prompt_tokens"] += stats["prompt_tokens"]
+                self.stats["new_tokens"] += stats["new_tokens"]
+                self.stats["generate_seconds"] += stats["seconds"]
+                for (_, job, _, _, key), text in zip(batch, texts):
+                    job[key] = text
+
+    def run_chunk(self, requests):
+        """Answers `requests`; returns one result dict per request, in input order."""
+        jobs = []
+        for request in requests:
+            job = {"request": request}
+            job["ctx"] = self.store_contexts.get(request.get("user_id", 1), request.get("store_id"))
+            category = (request.get("category") or "").upper()
+            job["category"] = category if category in CATEGORIES else \
+                self.manager.analyze_task(request["message"]).get("category", "GENERAL")
+            if job["ctx"] is None:
+                job["error"] = "store not found for this user"
+            jobs.append(job)
+
+        pending = [job for job in jobs if "error" not in job]
+        self._generate([(job, *self._first_pass(job), "first") for job in pending])
+        technical = [job for job in pending if job["category"] == "TECHNICAL" and "error" not in job]
+        self._generate([(job, self.coder, self.coder.code_prompt(job["request"]["message"], job["first"]),
+                         {"max_new_tokens": 3000, "temperature": 0.1}, "code") for job in technical])
+
+        results = []
+        for job in jobs:
+            request = job["request"]
+            result = {"id": request["id"], "user_id": request.get("user_id", 1), "store_id": request.get("store_id"),
+                      "category": job["category"]}
+            if "error" in job:
+                result["error"] = job["error"]
+                self.stats["errors"] += 1
+            elif job["category"] == "TECHNICAL":
+                result.update(plan=clean_output(job["first"]), response=clean_output(job["code"]))
+            else:
+                result["response"] = clean_output(job["first"])
+            self.stats["requests"] += 1
+            results.append(result)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a JSONL of requests through batched generation.")
+    parser.add_argument("input")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--batch-size", type=int, default=0, help="0 = the hardware profile's batch size")
+    parser.add_argument("--checkpoint-every", type=int, default=64, help="requests per checkpoint")
+    args = parser.parse_args()
+
+    config = get_config()
+    metrics.configure(**config.observability)
+    args.batch_size = args.batch_size or config.batch["batch_size"]
+    requests = load_requests(args.input)
+    done = load_done(args.output)
+    todo = [r for r in requests if r["id"] not in done]
+    log_status(f"📦 [Batch] {len(requests)} requests, {len(requests) - len(todo)} already done, {len(todo)} to run")
+    if not todo:
+        return
+
+    socket_path = config.model_server["socket"]
+    if socket_path:  # Reuse a running model server instead of loading a second copy of the weights
+        from src.core.remote_engine import RemoteEngine
+        engine = RemoteEngine(socket_path, timeout=config.model_server["timeout_seconds"])
+    else:
+        from src.core.engine import ModelEngine
+        engine = ModelEngine()
+    runner = BatchRunner(engine, MemoryManager(), batch_size=args.batch_size)
+
+    start = time.perf_counter()
+    with open(args.output, "a", encoding="utf-8") as out:
+        for offset in range(0, len(todo), args.checkpoint_every):
+            results = runner.run_chunk(todo[offset:offset + args.checkpoint_every])
+            out.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in results))
+            out.flush()
+            os.fsync(out.fileno())
+            elapsed = time.perf_counter() - start
+            log_status(f"   [Batch] {offset + len(results)}/{len(todo)} done "
+                       f"({runner.stats['requests'] / elapsed * 60:.1f} req/min)")
+
+    elapsed = time.perf_counter() - start
+    stats = runner.stats
+    log_status(f"✅ [Batch] {stats['requests']} requests ({stats['errors']} failed) in {elapsed:.1f} s: "
+               f"{stats['requests'] / elapsed * 60:.1f} requests/min, "
+               f"{stats['new_tokens'] / elapsed:.1f} tokens/s "
+               f"({stats['new_tokens'] / max(stats['generate_seconds'], 1e-9):.1f} tokens/s while generating, "
+               f"{stats['batches']} batches)")
+
+
+if __name__ == "__main__":
+    main()
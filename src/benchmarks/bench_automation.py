@@ -0,0 +1,107 @@
+"""
+TECHNICAL path benchmark (architect plan → Make.com blueprint) with the fake LLM backend.
+
+Runs the same automation requests through AutomationDesigner in three modes:
+  sequential  - manager.plan, then coder.write_code re-prefilling task + plan (before)
+  pipelined   - one conversation, builder turn reuses the plan's KV cache, no step cap
+  capped      - pipelined with the plan stopped after --max-steps numbered steps (after)
+
+The scripted architect is talkative (10 steps, sub-bullets, closing note) so the
+step cap has something to cut. Reports p50/p95 end-to-end latency and the prefilled
+and generated tokens per request, taken from the llm.generate trace stages.
+
+Usage: python src/benchmarks/bench_automation.py [--requests 12] [--tokens-per-second 25] [--max-steps 8]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.benchmarks.common import Timer, summarize, save_report
+from src.agents.designer import STEP_RE
+
+TASKS = [
+    "Tạo workflow gửi email cho khách khi có đơn hàng mới",
+    "Tự động hóa: lưu đơn hàng vào Google Sheet và gửi Zalo cho khách",
+    "Kết nối website với sheet để ghi đơn",
+    "Tạo quy trình cảnh báo tồn kho thấp qua email",
+]
+HISTORY = "user: Chào bạn\nassistant: Chào anh/chị, mình có thể giúp gì cho cửa hàng?"
+DB_CONTEXT = "Cửa hàng: Mẹ và Bé An Nhiên | Ngành: Mẹ & Bé | Địa chỉ: Hà Nội"
+
+
+def run(designer, requests, metrics):
+    latencies, prefilled, generated = [], [], []
+    for i in range(requests):
+        with metrics.trace("design") as trace:
+            with Timer() as t:
+                plan, code = designer.design(TASKS[i % len(TASKS)], HISTORY, db_context=DB_CONTEXT)
+        assert "```json" in code and plan, "designer returned no blueprint"
+        latencies.append(t.ms)
+        calls = [s for s in trace.stages if s["stage"] == "llm.generate"]
+        prefilled.append(sum(s["prompt_tokens"] for s in calls))
+        generated.append(sum(s["new_tokens"] for s in calls))
+    return {"latency": summarize(latencies), "prefilled_tokens": round(sum(prefilled) / len(prefilled), 1),
+            "generated_tokens": round(sum(generated) / len(generated), 1), "plan_steps": len(STEP_RE.findall(plan))}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=12)
+    parser.add_argument("--max-steps", type=int, default=8)
+    parser.add_argument("--first-token-ms", type=float, default=50)
+    parser.add_argument("--tokens-per-second", type=float, default=25)
+    parser.add_argument("--prefill-tokens-per-second", type=float, default=4000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_automation_")
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_FIRST_TOKEN_MS": str(args.first_token_ms),
+        "FAKE_LLM_TOKENS_PER_SECOND": str(args.tokens_per_second),
+        "FAKE_LLM_PREFILL_TOKENS_PER_SECOND": str(args.prefill_tokens_per_second),
+        "PROJECT_A_DB_PATH": os.path.join(workdir, "project_a.db"),
+    })
+    try:
+        from src.core import metrics
+        from src.core.engine import ModelEngine
+        from src.core.memory import MemoryManager
+        from src.agents.manager import ManagerAgent
+        from src.agents.coder import CoderAgent
+        from src.agents.designer import AutomationDesigner
+
+        metrics.configure(enabled=True)
+        engine, memory = ModelEngine(), MemoryManager()
+        manager, coder = ManagerAgent(engine, memory), CoderAgent(engine, memory)
+        modes = {
+            "sequential": AutomationDesigner(manager, coder, pipelined=False),
+            "pipelined": AutomationDesigner(manager, coder, max_steps=99),
+            "capped": AutomationDesigner(manager, coder, max_steps=args.max_steps),
+        }
+        report = {"requests": args.requests, "max_steps": args.max_steps,
+                  "fake_llm": {"first_token_ms": args.first_token_ms, "tokens_per_second": args.tokens_per_second,
+                               "prefill_tokens_per_second": args.prefill_tokens_per_second}}
+        for name, designer in modes.items():
+            run(designer, len(TASKS), metrics)  # Warm-up: prompt-builder caches
+            report[name] = run(designer, args.requests, metrics)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    base = report["sequential"]["latency"]["p50_ms"]
+    print(f"\n🏗️  Automation design ({args.requests} requests, fake LLM {args.tokens_per_second:g} tok/s decode, "
+          f"{args.prefill_tokens_per_second:g} tok/s prefill)")
+    for name in modes:
+        r = report[name]
+        print(f"   {name:<11} p50 {r['latency']['p50_ms']:>8.1f} ms | p95 {r['latency']['p95_ms']:>8.1f} ms | "
+              f"prefilled {r['prefilled_tokens']:>6.0f} | generated {r['generated_tokens']:>5.0f} tok | "
+              f"{100 * (r['latency']['p50_ms'] - base) / base:+.1f}% vs sequential")
+    save_report("automation", report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Offline batch mode (src/batch.py) throughput with the fake LLM backend.
+
+The same nightly-style job list (marketing posts, revenue questions, workflow
+designs, general questions for several stores) is answered:
+  one-at-a-time  - each request through the agent methods /chat uses, one generate per call
+  batch=N        - BatchRunner, prompts grouped by persona and length, N per generate
+Reports requests/min and generated tokens/s for each. The fake model shares decode
+steps across a batch (each extra row adds --batch-decode-overhead to the step time),
+which is how small batches behave on a GPU.
+
+Usage: python src/benchmarks/bench_batch.py [--requests 48] [--batch-sizes 4,8,16] [--tokens-per-second 25]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.benchmarks.common import Timer, save_report
+
+MESSAGES = [
+    ("Viết bài quảng cáo sữa Meiji cho cuối tuần", "MARKETING"),
+    ("Doanh thu hôm nay thế nào?", "DATA_INTERNAL"),
+    ("Tạo workflow gửi email cho khách khi có đơn hàng mới", "TECHNICAL"),
+    ("Cửa hàng nên làm gì để giữ chân khách quen?", "GENERAL"),
+    ("Viết bài đăng Facebook giới thiệu bỉm Bobby size M", "MARKETING"),
+    ("Gợi ý cách trưng bày sản phẩm mùa hè", "GENERAL"),
+]
+
+
+def jobs(requests):
+    return [{"id": str(i), "user_id": 1, "store_id": 1 + i % 2, "message": MESSAGES[i % len(MESSAGES)][0],
+             "category": MESSAGES[i % len(MESSAGES)][1]} for i in range(requests)]
+
+
+def one_at_a_time(runner, requests, metrics):
+    """Baseline: what N sequential /chat-style calls cost."""
+    manager, coder = runner.manager, runner.coder
+    new_tokens = 0
+    with Timer() as t:
+        for request in requests:
+            with metrics.trace("batch-baseline") as trace:
+                ctx = runner.store_contexts.get(request["user_id"], request["store_id"])
+                if request["category"] == "TECHNICAL":
+                    plan = manager.plan(request["message"], db_context=ctx.db_context)
+                    coder.write_code(request["message"], plan)
+                elif request["category"] == "MARKETING":
+                    manager.write_marketing(request["message"])
+                else:
+                    manager.consult(request["message"], "", "", db_context=ctx.db_context)
+            new_tokens += sum(s["new_tokens"] for s in trace.stages if s["stage"] == "llm.generate")
+    return {"seconds": round(t.ms / 1000, 2), "requests_per_min": round(len(requests) / t.ms * 60000, 1),
+            "tokens_per_s": round(new_tokens / t.ms * 1000, 1), "new_tokens": new_tokens}
+
+
+def batched(runner, requests):
+    runner.stats.update(new_tokens=0, batches=0)
+    with Timer() as t:
+        results = runner.run_chunk(requests)
+    assert not any("error" in r for r in results), [r for r in results if "error" in r][:1]
+    return {"seconds": round(t.ms / 1000, 2), "requests_per_min": round(len(requests) / t.ms * 60000, 1),
+            "tokens_per_s": round(runner.stats["new_tokens"] / t.ms * 1000, 1),
+            "new_tokens": runner.stats["new_tokens"], "batches": runner.stats["batches"]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=48)
+    parser.add_argument("--batch-sizes", default="4,8,16")
+    parser.add_argument("--first-token-ms", type=float, default=50)
+    parser.add_argument("--tokens-per-second", type=float, default=25)
+    parser.add_argument("--batch-decode-overhead", type=float, default=0.05)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_batch_")
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_FIRST_TOKEN_MS": str(args.first_token_ms),
+        "FAKE_LLM_TOKENS_PER_SECOND": str(args.tokens_per_second),
+        "PROJECT_A_DB_PATH": os.path.join(workdir, "project_a.db"),
+    })
+    try:
+        from src.core import metrics
+        from src.core.engine import ModelEngine
+        from src.core.memory import MemoryManager
+        from src.batch import BatchRunner
+
+        metrics.configure(enabled=True)
+        engine, memory = ModelEngine(), MemoryManager()
+        engine.load_model("manager")["model"].batch_decode_overhead = args.batch_decode_overhead
+        memory.conn.execute('''INSERT INTO stores (user_id, name, industry, location, platform_version)
+                               VALUES (1, 'Shop Mẹ Bim', 'Mom & Baby', 'HCMC', 'Lite_v1')''')
+        memory.conn.commit()
+        requests = jobs(args.requests)
+        report = {"requests": args.requests, "fake_llm": {"first_token_ms": args.first_token_ms,
+                                                          "tokens_per_second": args.tokens_per_second,
+                                                          "batch_decode_overhead": args.batch_decode_overhead}}
+        report["one_at_a_time"] = one_at_a_time(BatchRunner(engine, memory), requests, metrics)
+        for size in [int(s) for s in args.batch_sizes.split(",")]:
+            report[f"batch={size}"] = batched(BatchRunner(engine, memory, batch_size=size), requests)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    base = report["one_at_a_time"]["requests_per_min"]
+    print(f"\n📦 Batch mode ({args.requests} mixed requests, fake LLM {args.tokens_per_second:g} tok/s per sequence)")
+    for name, r in report.items():
+        if not isinstance(r, dict) or "requests_per_min" not in r:
+            continue
+        print(f"   {name:<14} {r['requests_per_min']:>7.1f} req/min | {r['tokens_per_s']:>7.1f} tok/s | "
+              f"{r['seconds']:>6.1f} s | x{r['requests_per_min'] / base:.2f}")
+    save_report("batch", report)
+
+
+if __name__ == "__main__":
+    main()
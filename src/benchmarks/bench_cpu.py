@@ -0,0 +1,115 @@
+"""
+CPU backend tokens/sec (LLM_BACKEND=cpu), one variant per subprocess so load time
+and peak RSS are measured cleanly.
+
+Variants: int8 (torch dynamic int8 Linear), bf16 (native bf16 CPUs only), none
+(fp32), onnx (optimum export + ONNX Runtime, needs optimum[onnxruntime]).
+Each variant answers the same Vietnamese consult prompts with greedy decoding and
+reports load time, time to full answer, and decode tokens/s from the llm.generate
+trace stage.
+
+Usage: python src/benchmarks/bench_cpu.py [--variants int8,bf16,none,onnx] [--max-new-tokens 128]
+                                          [--model Qwen/Qwen2.5-Coder-1.5B-Instruct] [--threads 0]
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")  # CPU numbers are the point of this bench
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.benchmarks.common import summarize, save_report
+
+PROMPTS = [
+    "Cửa hàng mình nên làm gì để giữ chân khách quen?",
+    "Gợi ý cách trưng bày sản phẩm mẹ và bé mùa hè",
+    "Doanh thu tuần này giảm, mình nên kiểm tra những gì?",
+    "Viết ngắn gọn lời chào khách hàng mới trên Zalo",
+]
+
+
+def run_variant(variant, args):
+    """Runs in the child process: load, warm up, answer every prompt."""
+    workdir = tempfile.mkdtemp(prefix="bench_cpu_")
+    runtime, quantize = ("onnx", "none") if variant == "onnx" else ("torch", variant)
+    os.environ.update({"LLM_BACKEND": "cpu", "CPU_MODEL_ID": args.model, "CPU_RUNTIME": runtime,
+                       "CPU_QUANTIZE": quantize, "CPU_THREADS": str(args.threads),
+                       "PROJECT_A_DB_PATH": os.path.join(workdir, "project_a.db")})
+    try:
+        from src.core import metrics
+        from src.core.engine import ModelEngine
+        from src.core.memory import MemoryManager
+        from src.agents.manager import ManagerAgent
+
+        metrics.configure(enabled=True)
+        start = time.perf_counter()
+        engine = ModelEngine()
+        load_s = time.perf_counter() - start
+        manager = ManagerAgent(engine, MemoryManager())
+        manager.chat("Xin chào", "Chào", max_new_tokens=8)  # Warm-up (first-call allocations)
+
+        latencies, rates, new_tokens = [], [], 0
+        for prompt in PROMPTS * args.rounds:
+            with metrics.trace("cpu") as trace:
+                t0 = time.perf_counter()
+                manager.chat(manager.get_dynamic_context(), prompt, max_new_tokens=args.max_new_tokens,
+                             do_sample=False)
+                latencies.append((time.perf_counter() - t0) * 1000)
+            stage = next(s for s in trace.stages if s["stage"] == "llm.generate")
+            rates.append(stage["tokens_per_s"])
+            new_tokens += stage["new_tokens"]
+        return {"load_s": round(load_s, 2), "latency": summarize(latencies),
+                "tokens_per_s": round(sum(rates) / len(rates), 2), "new_tokens": new_tokens,
+                "threads": engine.config.cpu["threads"],
+                "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--variants", default="int8,bf16,none")
+    parser.add_argument("--model", default="Qwen/Qwen2.5-Coder-1.5B-Instruct")
+    parser.add_argument("--max-new-tokens", type=int, default=128)
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print("RESULT " + json.dumps(run_variant(args.child, args)))
+        return
+
+    report = {"model": args.model, "max_new_tokens": args.max_new_tokens, "cpus": os.cpu_count(), "variants": {}}
+    for variant in args.variants.split(","):
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", variant,
+                                "--model", args.model, "--max-new-tokens", str(args.max_new_tokens),
+                                "--rounds", str(args.rounds), "--threads", str(args.threads)],
+                               capture_output=True, text=True)
+        line = next((l for l in child.stdout.splitlines() if l.startswith("RESULT ")), None)
+        if line is None:
+            report["variants"][variant] = {"error": (child.stderr.strip().splitlines() or ["failed"])[-1]}
+        else:
+            report["variants"][variant] = json.loads(line[len("RESULT "):])
+
+    print(f"\n🖥️  CPU backend: {args.model} ({report['cpus']} CPUs, {args.max_new_tokens} new tokens)")
+    for variant, r in report["variants"].items():
+        if "error" in r:
+            print(f"   {variant:<5} skipped: {r['error']}")
+            continue
+        print(f"   {variant:<5} {r['tokens_per_s']:>6.1f} tok/s | p50 answer {r['latency']['p50_ms'] / 1000:>6.1f} s | "
+              f"load {r['load_s']:>5.1f} s | peak RSS {r['peak_rss_mb']:>7.0f} MB | {r['threads']} threads")
+    save_report("cpu", report)
+
+
+if __name__ == "__main__":
+    main()
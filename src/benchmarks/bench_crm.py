@@ -0,0 +1,147 @@
+"""
+CRM lookup benchmark at 1M customers on a scratch database.
+
+Measures:
+- legacy-style unindexed lookup (LIKE over raw phone/name) for reference,
+- indexed SQL lookups by phone (mixed formats), partial phone and name,
+- hot-store lookups (store held in memory) and its load time / footprint,
+- batch lookup of 1,000 phones in one call vs 1,000 single calls.
+
+Usage: python src/benchmarks/bench_crm.py [--customers 1000000] [--stores 200]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.core.crm import CustomerDirectory
+from src.core.text import normalize_query
+from src.benchmarks.common import Timer, summarize, save_report
+
+FAMILY = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Huỳnh", "Phan", "Vũ", "Võ", "Đặng", "Bùi", "Đỗ", "Hồ", "Ngô"]
+MIDDLE = ["Văn", "Thị", "Hữu", "Đức", "Minh", "Ngọc", "Thanh", "Quốc", "Thu", "Hoài"]
+GIVEN = ["Lan", "Hùng", "Mai", "Dũng", "Hương", "Tuấn", "Linh", "Nam", "Trang", "Phương", "Sơn", "Hà", "Quân", "Yến",
+         "Thảo", "Long", "Vy", "Khánh", "Ngân", "Bảo"]
+PREFIXES = ["090", "091", "093", "096", "097", "098", "086", "088", "070", "079", "081", "083"]
+
+
+def fmt_phone(phone, rng):
+    style = rng.random()
+    if style < 0.4:
+        return phone
+    if style < 0.7:
+        return f"{phone[:4]} {phone[4:7]} {phone[7:]}"
+    if style < 0.85:
+        return f"+84 {phone[1:4]}.{phone[4:7]}.{phone[7:]}"
+    return f"84{phone[1:]}"
+
+
+def seed(db_path, customers, stores, rng):
+    conn = sqlite3.connect(db_path)
+    conn.execute('''CREATE TABLE customers (id INTEGER PRIMARY KEY, store_id INTEGER, name TEXT, phone TEXT,
+                    phone_norm TEXT, name_norm TEXT, rank TEXT, last_purchase TEXT, total_spent REAL DEFAULT 0)''')
+    phones = rng.sample(range(10 ** 7), customers)
+    rows = []
+    for i, n in enumerate(phones):
+        phone = f"{PREFIXES[i % len(PREFIXES)]}{n:07d}"
+        name = f"{rng.choice(FAMILY)} {rng.choice(MIDDLE)} {rng.choice(GIVEN)}"
+        rows.append((1 + i % stores, name, fmt_phone(phone, rng), phone, normalize_query(name),
+                     rng.choice(["Member", "Silver", "Gold", "VIP"]), f"2025-{rng.randint(1, 12):02d}-15",
+                     rng.randint(1, 500) * 10000))
+    conn.executemany('''INSERT INTO customers (store_id, name, phone, phone_norm, name_norm, rank, last_purchase,
+                        total_spent) VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', rows)
+    conn.execute("CREATE INDEX idx_customers_store_phone ON customers (store_id, phone_norm)")
+    conn.execute("CREATE INDEX idx_customers_store_name ON customers (store_id, name_norm)")
+    conn.execute("CREATE INDEX idx_customers_phone ON customers (phone_norm)")
+    conn.commit()
+    return conn, rows
+
+
+def rate(fn, queries):
+    latencies = []
+    start = time.perf_counter()
+    for q in queries:
+        with Timer() as t:
+            fn(q)
+        latencies.append(t.ms)
+    return {"lookups_per_s": round(len(queries) / (time.perf_counter() - start), 1), "latency": summarize(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--customers", type=int, default=1000000)
+    parser.add_argument("--stores", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(21)
+    workdir = tempfile.mkdtemp(prefix="bench_crm_")
+    try:
+        db_path = os.path.join(workdir, "crm.db")
+        with Timer() as t:
+            conn, rows = seed(db_path, args.customers, args.stores, rng)
+        print(f"\n👥 Seeded {args.customers:,} customers in {t.ms / 1000:.1f} s")
+
+        picks = [rng.choice(rows) for _ in range(args.queries)]
+        store_id = 1
+        in_store = [r for r in rows if r[0] == store_id]
+        store_picks = [rng.choice(in_store) for _ in range(args.queries)]
+        directory = CustomerDirectory(db_path, hot_after=10 ** 9)  # SQL paths first: never promote
+
+        report = {"customers": args.customers, "stores": args.stores, "customers_per_store": len(in_store)}
+        report["legacy_like_scan"] = rate(
+            lambda r: conn.execute("SELECT * FROM customers WHERE phone LIKE ? LIMIT 1", (f"%{r[2]}%",)).fetchall(),
+            picks[:20])
+        report["sql_phone_any_format"] = rate(lambda r: directory.lookup(fmt_phone(r[3], rng)), picks)
+        report["sql_phone_in_store"] = rate(lambda r: directory.lookup(r[3], store_id=store_id), store_picks)
+        report["sql_partial_phone_in_store"] = rate(lambda r: directory.lookup(r[3][:7], store_id=store_id),
+                                                    store_picks)
+        report["sql_name_in_store"] = rate(lambda r: directory.lookup(r[4], store_id=store_id), store_picks)
+        report["sql_given_name_in_store"] = rate(lambda r: directory.lookup(r[4].split()[-1], store_id=store_id),
+                                                 store_picks[:200])
+
+        hot_dir = CustomerDirectory(db_path, hot_after=1)
+        tracemalloc.start()
+        with Timer() as t:
+            hot_dir.lookup("0900000000", store_id=store_id)
+        hot_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        report["hot_store_load"] = {"ms": round(t.ms, 1), "memory_mb": round(hot_bytes / 1e6, 2),
+                                    "rows": len(in_store)}
+        report["hot_phone"] = rate(lambda r: hot_dir.lookup(r[3], store_id=store_id), store_picks)
+        report["hot_given_name"] = rate(lambda r: hot_dir.lookup(r[4].split()[-1], store_id=store_id), store_picks)
+
+        batch = [fmt_phone(r[3], rng) for r in picks[:1000]]
+        with Timer() as single:
+            for q in batch:
+                directory.lookup(q, limit=1)
+        with Timer() as many:
+            found = directory.lookup_many(batch)
+        report["batch_1000_phones"] = {"single_calls_ms": round(single.ms, 1), "lookup_many_ms": round(many.ms, 1),
+                                       "unique": len(found), "found": sum(1 for v in found.values() if v)}
+
+        for label in ("legacy_like_scan", "sql_phone_any_format", "sql_phone_in_store", "sql_partial_phone_in_store",
+                      "sql_name_in_store", "sql_given_name_in_store", "hot_phone", "hot_given_name"):
+            print(f"   {label:<28} {report[label]['lookups_per_s']:>10,.0f} lookups/s | "
+                  f"p95 {report[label]['latency']['p95_ms']:.3f} ms")
+        print(f"   Hot store load: {report['hot_store_load']['ms']} ms, {report['hot_store_load']['memory_mb']} MB "
+              f"for {len(in_store):,} customers")
+        batch_report = report["batch_1000_phones"]
+        print(f"   1,000 phones: {batch_report['single_calls_ms']} ms single vs {batch_report['lookup_many_ms']} ms "
+              f"batched ({batch_report['found']}/{batch_report['unique']} unique found)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    save_report("crm_lookup", report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+End-to-end API benchmark with the fake LLM backend (no GPU, no model weights).
+
+Starts src/server.py in-process (LLM_BACKEND=fake, scratch DB/workflow/spool dirs)
+and replays a scripted Vietnamese workload through FastAPI's TestClient:
+chat, data lookups, automation design (TECHNICAL), marketing and /plan.
+
+Reports throughput, p50/p95/p99 latency per category, LLM token counts and queue
+wait, and per-stage times (DB, LLM, RAG when used) taken from the request traces.
+The report is saved to bench_results/e2e.json; p50 changes vs the previous report
+(usually the previous commit) are printed.
+
+Usage: python src/benchmarks/bench_e2e.py [--rounds 10] [--concurrency 4] [--tokens-per-second 400]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.benchmarks.common import RESULTS_DIR, summarize, save_report
+
+# (category, endpoint, message, expected action_taken)
+WORKLOAD = [
+    ("chat", "/chat", "Chào bạn, cửa hàng mình nên làm gì để giữ chân khách?", "chat"),
+    ("chat", "/chat", "Cho mình vài mẹo trưng bày sản phẩm mùa hè", "chat"),
+    ("chat", "/chat", "Mình nên nhập thêm hàng gì cho dịp Tết?", "chat"),
+    ("data", "/chat", "Doanh thu hôm nay bao nhiêu?", "data_lookup"),
+    ("data", "/chat", "Thống kê doanh thu giúp mình", "data_lookup"),
+    ("data", "/chat", "Hôm nay bán được bao nhiêu rồi?", "data_lookup"),
+    ("technical", "/chat", "Tạo workflow gửi email cho khách khi có đơn hàng mới", "automation_design"),
+    ("technical", "/chat", "Tự động hóa: lưu đơn hàng vào Google Sheet và gửi Zalo cho khách", "automation_design"),
+    ("technical", "/chat", "Kết nối website với sheet để ghi đơn", "automation_design"),
+    ("marketing", "/chat", "Viết bài quảng cáo cho sữa Meiji số 9", "marketing"),
+    ("marketing", "/chat", "Đăng bài facebook khuyến mãi cuối tuần", "marketing"),
+    ("marketing", "/chat", "Viết content giới thiệu bỉm Bobby size M", "marketing"),
+    ("plan", "/plan", "đọc đơn hàng từ Google Sheet và gửi email báo cáo doanh thu", None),
+    ("plan", "/plan", "khi có đơn hàng mới thì ghi vào Google Sheet", None),
+]
+
+
+def previous_report():
+    path = os.path.join(RESULTS_DIR, "e2e.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=10, help="Times the scripted workload is replayed")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--first-token-ms", type=float, default=20)
+    parser.add_argument("--tokens-per-second", type=float, default=400)
+    parser.add_argument("--prefill-tokens-per-second", type=float, default=20000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_e2e_")
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_FIRST_TOKEN_MS": str(args.first_token_ms),
+        "FAKE_LLM_TOKENS_PER_SECOND": str(args.tokens_per_second),
+        "FAKE_LLM_PREFILL_TOKENS_PER_SECOND": str(args.prefill_tokens_per_second),
+        "PROJECT_A_DB_PATH": os.path.join(workdir, "project_a.db"),
+        "PROJECT_A_WORKFLOW_DIR": os.path.join(workdir, "workflows"),
+        "PROJECT_A_SPOOL_DIR": os.path.join(workdir, "spool"),
+        "METRICS_ENABLED": "1",
+        "AI_SHARED_KEY": "",
+    })
+    try:
+        from fastapi.testclient import TestClient
+        import src.server as server
+        from src.core import metrics
+
+        client = TestClient(server.app)
+        jobs = [job for _ in range(args.rounds) for job in WORKLOAD]
+        random.Random(39).shuffle(jobs)
+        metrics.traces.max_traces = len(jobs) + len(WORKLOAD)
+
+        def send(job):
+            category, endpoint, message, expected = job
+            body = {"user_id": 1, "store_id": 1, "message": message} if endpoint == "/chat" else {"prompt": message}
+            start = time.perf_counter()
+            response = client.post(endpoint, json=body)
+            ms = (time.perf_counter() - start) * 1000
+            ok = response.status_code == 200 and (expected is None or response.json().get("action_taken") == expected)
+            return category, ms, ok, response.headers.get("x-trace-id")
+
+        for job in WORKLOAD:  # Warm-up: prompt-builder caches, first /plan generations
+            send(job)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(send, jobs))
+        wall = time.perf_counter() - start
+
+        by_category, stages, llm = defaultdict(list), defaultdict(list), defaultdict(float)
+        for category, ms, ok, trace_id in results:
+            by_category[category].append(ms)
+            trace = metrics.traces.get(trace_id) if trace_id else None
+            for s in (trace or {}).get("stages", []):
+                stages[s["stage"]].append(s["ms"])
+                if s["stage"] == "llm.generate":
+                    llm["calls"] += 1
+                    llm["prompt_tokens"] += s.get("prompt_tokens", 0)
+                    llm["new_tokens"] += s.get("new_tokens", 0)
+                    llm["queue_ms"] += s.get("queue_ms", 0)
+
+        report = {
+            "requests": len(results),
+            "concurrency": args.concurrency,
+            "fake_llm": {"first_token_ms": args.first_token_ms, "tokens_per_second": args.tokens_per_second,
+                         "prefill_tokens_per_second": args.prefill_tokens_per_second},
+            "throughput_rps": round(len(results) / wall, 2),
+            "errors": sum(1 for r in results if not r[2]),
+            "latency": {c: summarize(v) for c, v in sorted(by_category.items())},
+            "stages": {s: summarize(v) for s, v in sorted(stages.items())},
+            "llm": {"calls": int(llm["calls"]), "prompt_tokens": int(llm["prompt_tokens"]),
+                    "new_tokens": int(llm["new_tokens"]),
+                    "mean_queue_ms": round(llm["queue_ms"] / llm["calls"], 2) if llm["calls"] else 0.0},
+            "plan_cache": server.plan_cache.stats(),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = previous_report()
+    print(f"\n🧪 End-to-end ({report['requests']} requests, concurrency {args.concurrency}, fake LLM "
+          f"{args.tokens_per_second:g} tok/s): {report['throughput_rps']} req/s, {report['errors']} errors")
+    for category, lat in report["latency"].items():
+        delta = ""
+        old = (baseline or {}).get("results", {}).get("latency", {}).get(category)
+        if old and old.get("p50_ms"):
+            delta = f" | p50 {100 * (lat['p50_ms'] - old['p50_ms']) / old['p50_ms']:+.1f}% vs {baseline['commit']}"
+        print(f"   {category:<10} p50 {lat['p50_ms']:>8.1f} ms | p95 {lat['p95_ms']:>8.1f} ms | "
+              f"p99 {lat['p99_ms']:>8.1f} ms{delta}")
+    print("   Stages (p50 / p95 ms):")
+    for name, lat in report["stages"].items():
+        print(f"     {name:<24} {lat['p50_ms']:>9.3f} / {lat['p95_ms']:>9.3f}  ({lat['count']} calls)")
+    print(f"   LLM: {report['llm']['calls']} calls, {report['llm']['new_tokens']} tokens generated, "
+          f"mean queue wait {report['llm']['mean_queue_ms']} ms")
+    save_report("e2e", report)
+
+
+if __name__ == "__main__":
+    main()
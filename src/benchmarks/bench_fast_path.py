@@ -0,0 +1,116 @@
+"""
+/chat fast path: share of requests answered without the LLM, and their latency.
+
+A mix of shop-owner messages (simple metric questions: revenue today / yesterday /
+vs yesterday, orders, stock of a product, low stock; and open-ended ones) goes
+through the /chat routing twice, with the fake LLM backend:
+  llm        - analyze_task, then SaasAPI + manager.consult (the DATA_INTERNAL path)
+  fast path  - FastPathResponder first, the same LLM path for whatever it declines
+Reports the share served by the fast path, p50/p95 of served vs LLM-answered
+requests, and the mean latency of the whole mix.
+
+Usage: python src/benchmarks/bench_fast_path.py [--rounds 2] [--tokens-per-second 25]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.benchmarks.common import Timer, summarize, save_report
+
+MESSAGES = [
+    "Hôm nay doanh thu bao nhiêu?",
+    "Doanh thu hôm nay so với hôm qua thế nào?",
+    "Shop ơi hôm nay bán được bao nhiêu tiền rồi?",
+    "Doanh thu hôm qua là bao nhiêu?",
+    "Hôm nay có bao nhiêu đơn?",
+    "Còn bao nhiêu bỉm Bobby?",
+    "Tồn kho sữa Meiji",
+    "Hàng nào sắp hết?",
+    "Tại sao doanh thu hôm nay giảm?",
+    "Cửa hàng nên làm gì để giữ chân khách quen?",
+    "Doanh thu tháng này bao nhiêu?",
+    "Gợi ý cách trưng bày sản phẩm mùa hè",
+]
+
+
+def llm_path(manager, saas, message, store_id):
+    if manager.analyze_task(message)["category"] == "DATA_INTERNAL":
+        return manager.consult(message, f"SALES: {saas.get_sales_report(store_id, 'today')}", "")
+    return manager.consult(message, "", "")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=2, help="passes over the message mix")
+    parser.add_argument("--first-token-ms", type=float, default=50)
+    parser.add_argument("--tokens-per-second", type=float, default=25)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_fast_path_")
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_FIRST_TOKEN_MS": str(args.first_token_ms),
+        "FAKE_LLM_TOKENS_PER_SECOND": str(args.tokens_per_second),
+        "PROJECT_A_DB_PATH": os.path.join(workdir, "project_a.db"),
+    })
+    try:
+        from src.core.engine import ModelEngine
+        from src.core.memory import MemoryManager
+        from src.core.saas_api import SaasAPI
+        from src.core.fast_path import FastPathResponder
+        from src.agents.manager import ManagerAgent
+
+        engine, memory = ModelEngine(), MemoryManager()
+        memory.conn.execute("INSERT INTO sales (store_id, date, amount, category) "
+                            "VALUES (1, date('now', 'localtime', '-1 day'), 2000000, 'Diapers')")
+        memory.conn.commit()
+        manager, saas = ManagerAgent(engine, memory), SaasAPI()
+        fast_path = FastPathResponder(saas, max_words=memory.config.fast_path["max_words"])
+        messages = MESSAGES * args.rounds
+
+        baseline = []
+        for message in messages:
+            with Timer() as t:
+                llm_path(manager, saas, message, 1)
+            baseline.append(t.ms)
+
+        served, fallback, samples = [], [], {}
+        for message in messages:
+            with Timer() as t:
+                fast = fast_path.answer(message, 1, "Shop Mẹ Bim")
+                if fast is None:
+                    llm_path(manager, saas, message, 1)
+            (served if fast else fallback).append(t.ms)
+            fast_path.record(fast is not None, t.ms)
+            if fast:
+                samples.setdefault(fast["intent"], fast["text"])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    mix = served + fallback
+    report = {"messages": len(messages), "fast_path": fast_path.stats(),
+              "llm_only": {**summarize(baseline), "mean_ms": round(sum(baseline) / len(baseline), 1)},
+              "with_fast_path": {"served": summarize(served), "llm": summarize(fallback),
+                                 "mean_ms": round(sum(mix) / len(mix), 1)},
+              "samples": samples}
+    stats = report["fast_path"]
+    print(f"\n⚡ /chat fast path ({len(messages)} messages, fake LLM {args.tokens_per_second:g} tok/s)")
+    print(f"   served by fast path : {stats['served']}/{len(messages)} ({stats['share'] * 100:.0f}%) | "
+          f"p50 {report['with_fast_path']['served']['p50_ms']:.2f} ms | p95 {report['with_fast_path']['served']['p95_ms']:.2f} ms")
+    print(f"   LLM answers         : p50 {report['with_fast_path']['llm']['p50_ms']:.0f} ms | "
+          f"p95 {report['with_fast_path']['llm']['p95_ms']:.0f} ms")
+    print(f"   mean per message    : LLM only {report['llm_only']['mean_ms']:.0f} ms → "
+          f"with fast path {report['with_fast_path']['mean_ms']:.0f} ms")
+    for intent, text in samples.items():
+        print(f"   [{intent}] {text.splitlines()[0]}")
+    save_report("fast_path", report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Health-check scale benchmark on a scratch database.
+
+Seeds N stores with sales and inventory, then compares:
+- legacy: RetailTools.health_check per store (SaasAPI opens a connection per call),
+- HealthScheduler.run_once: batched SQL for all stores, first run and steady state,
+- alert reads per /chat (served from the alerts table instead of recomputed).
+
+Usage: python src/benchmarks/bench_health.py [--stores 5000] [--items 40]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.core.memory import MemoryManager
+from src.core.saas_api import SaasAPI
+from src.core.scheduler import HealthScheduler
+from src.core.tools import RetailTools
+from src.benchmarks.common import Timer, summarize, save_report
+
+
+def seed(memory, stores, items, rng):
+    today = datetime.now().strftime("%Y-%m-%d")
+    cur = memory.conn.cursor()
+    cur.executemany("INSERT INTO stores (user_id, name, industry, location, platform_version) VALUES (?, ?, ?, ?, ?)",
+                    [(i // 3 + 2, f"Store {i}", "Retail", "Hanoi", "Lite_v1") for i in range(stores)])
+    ids = [r[0] for r in cur.execute("SELECT id FROM stores")]
+    cur.executemany("INSERT INTO sales (store_id, date, amount, category) VALUES (?, ?, ?, 'Misc')",
+                    [(sid, today, rng.randint(1, 50) * 10000) for sid in ids if rng.random() < 0.8])
+    cur.executemany('''INSERT INTO inventory (store_id, sku, name, stock, low_stock_threshold, updated_at)
+                       VALUES (?, ?, ?, ?, 10, ?)''',
+                    [(sid, f"SKU-{sid}-{k}", f"Item {k}", rng.randint(0, 200), today)
+                     for sid in ids for k in range(items)])
+    memory.conn.commit()
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stores", type=int, default=5000)
+    parser.add_argument("--items", type=int, default=40)
+    parser.add_argument("--legacy-sample", type=int, default=500, help="Stores timed for the per-store path")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_health_")
+    try:
+        memory = MemoryManager(db_path=os.path.join(workdir, "health.db"))
+        ids = seed(memory, args.stores, args.items, random.Random(5))
+
+        saas = SaasAPI()
+        saas.config.DB_PATH = memory.db_path
+        sample = ids[:args.legacy_sample]
+        with Timer() as t:
+            for sid in sample:
+                RetailTools.health_check(saas, sid)
+        legacy_total_s = t.ms / 1000 * len(ids) / len(sample)
+
+        scheduler = HealthScheduler(memory)
+        first = scheduler.run_once()
+        steady_ms = [scheduler.run_once()["duration_ms"] for _ in range(5)]
+
+        read_ms = []
+        for sid in sample:
+            with Timer() as t:
+                memory.get_latest_alerts(sid)
+            read_ms.append(t.ms)
+
+        report = {
+            "stores": len(ids),
+            "items_per_store": args.items,
+            "legacy_per_store_ms": round(legacy_total_s * 1000 / len(ids), 3),
+            "legacy_all_stores_s_projected": round(legacy_total_s, 2),
+            "scheduler_first_run": first,
+            "scheduler_steady": summarize(steady_ms),
+            "alert_read": summarize(read_ms),
+            "recorded_runs": len(scheduler.recent_runs(limit=100)),
+        }
+        print(f"\n🩺 Health checks for {len(ids)} stores x {args.items} items")
+        print(f"   Legacy per-store loop : {report['legacy_all_stores_s_projected']:.2f} s (projected)")
+        print(f"   Scheduler first run   : {first['duration_ms'] / 1000:.2f} s ({first['changed_stores']} stores written)")
+        print(f"   Scheduler steady p50  : {report['scheduler_steady']['p50_ms'] / 1000:.2f} s")
+        print(f"   Alert read p50        : {report['alert_read']['p50_ms']:.3f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    save_report("health_scheduler", report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Inventory search benchmark at catalogue scale.
+
+Seeds a scratch DB with N synthetic Vietnamese SKUs, builds InventoryIndex and measures:
+- build time and memory footprint (tracemalloc),
+- lookups/sec for exact, diacritic-free prefix and typo (fuzzy) queries,
+- the legacy approach for comparison: SQL LIKE '%query%' over the table,
+- incremental refresh cost after a batch of stock updates.
+
+Usage: python src/benchmarks/bench_inventory.py [--skus 100000]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.core.inventory import InventoryIndex
+from src.core.text import strip_tones
+from src.benchmarks.common import Timer, summarize, save_report
+
+KINDS = ["Bỉm", "Sữa bột", "Sữa tắm", "Khăn ướt", "Bình sữa", "Áo khoác", "Quần chục", "Mì", "Dầu ăn", "Nước suối",
+         "Bánh quy", "Cà phê", "Trà", "Kem đánh răng", "Dầu gội", "Tã quần", "Váy", "Giày", "Mũ", "Đồ chơi"]
+BRANDS = ["Bobby", "Meiji", "Lactacyd", "Mamamy", "Comotomo", "Neptune", "Hảo Hảo", "Lavie", "Vinamilk", "TH True",
+          "Huggies", "Merries", "Pigeon", "Kun", "Cosy", "Trung Nguyên", "Lipton", "P/S", "Clear", "Biti's"]
+VARIANTS = ["Size S", "Size M", "Size L", "Số 9", "800g", "250ml", "1L", "500ml", "100 tờ", "bé trai", "bé gái",
+            "vị dâu", "vị cam", "cay", "gói lớn", "hộp 12"]
+
+
+def make_name(rng, i):
+    return f"{rng.choice(KINDS)} {rng.choice(BRANDS)} {rng.choice(VARIANTS)} {i % 997}"
+
+
+def typo(rng, text):
+    chars = list(text)
+    i = rng.randrange(len(chars))
+    chars[i] = rng.choice("aeiouy")
+    return "".join(chars)
+
+
+def seed(db_path, skus, rng):
+    conn = sqlite3.connect(db_path)
+    conn.execute('''CREATE TABLE inventory (id INTEGER PRIMARY KEY, store_id INTEGER, sku TEXT, name TEXT,
+                    stock INTEGER, low_stock_threshold INTEGER DEFAULT 10, updated_at TEXT)''')
+    conn.execute("CREATE INDEX idx_inventory_updated ON inventory (updated_at)")
+    stamp = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")
+    names = [make_name(rng, i) for i in range(skus)]
+    conn.executemany("INSERT INTO inventory (store_id, sku, name, stock, low_stock_threshold, updated_at) "
+                     "VALUES (?, ?, ?, ?, ?, ?)",
+                     [(1 + i % 50, f"SKU{i:07d}", n, rng.randint(0, 300), 10, stamp) for i, n in enumerate(names)])
+    conn.commit()
+    return conn, names
+
+
+def throughput(fn, queries):
+    latencies = []
+    start = time.perf_counter()
+    for q in queries:
+        with Timer() as t:
+            fn(q)
+        latencies.append(t.ms)
+    return round(len(queries) / (time.perf_counter() - start), 1), summarize(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--skus", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(9)
+    workdir = tempfile.mkdtemp(prefix="bench_inventory_")
+    try:
+        db_path = os.path.join(workdir, "inventory.db")
+        conn, names = seed(db_path, args.skus, rng)
+
+        tracemalloc.start()
+        with Timer() as build:
+            index = InventoryIndex(db_path)
+            index.refresh()
+        index_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        picks = [rng.choice(names) for _ in range(args.queries)]
+        exact = picks
+        prefix = [" ".join(w[:3] for w in strip_tones(n).split()[:2]) for n in picks]  # "sua mei"
+        typos = [typo(rng, strip_tones(n)) for n in picks]
+
+        report = {"skus": args.skus, "build_s": round(build.ms / 1000, 2),
+                  "index_memory_mb": round(index_bytes / 1e6, 1), "stats": index.stats()}
+        for label, queries in (("exact", exact), ("prefix_no_diacritics", prefix), ("typo_fuzzy", typos)):
+            qps, lat = throughput(lambda q: index.search(q, limit=5), queries)
+            report[label] = {"lookups_per_s": qps, "latency": lat}
+
+        hits = sum(1 for q, n in zip(typos, picks) if any(r["name"] == n for r in index.search(q, limit=5)))
+        report["typo_fuzzy"]["recall_at_5"] = round(hits / len(picks), 3)
+
+        legacy_queries = exact[:max(1, args.queries // 20)]
+        qps, lat = throughput(lambda q: conn.execute("SELECT name, stock FROM inventory WHERE name LIKE ? LIMIT 5",
+                                                     (f"%{q}%",)).fetchall(), legacy_queries)
+        report["legacy_sql_like"] = {"lookups_per_s": qps, "latency": lat,
+                                     "note": "diacritic-sensitive, no typo tolerance"}
+
+        stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        conn.executemany("UPDATE inventory SET stock = ?, updated_at = ? WHERE id = ?",
+                         [(rng.randint(0, 30), stamp, rng.randint(1, args.skus)) for _ in range(1000)])
+        conn.commit()
+        with Timer() as t:
+            applied = index.refresh()
+        report["incremental_refresh"] = {"rows": applied, "ms": round(t.ms, 2)}
+
+        print(f"\n📦 Inventory index: {args.skus} SKUs, built in {report['build_s']} s, "
+              f"{report['index_memory_mb']} MB")
+        for label in ("exact", "prefix_no_diacritics", "typo_fuzzy", "legacy_sql_like"):
+            print(f"   {label:<22} {report[label]['lookups_per_s']:>10,.0f} lookups/s | "
+                  f"p95 {report[label]['latency']['p95_ms']:.3f} ms")
+        print(f"   Typo recall@5: {report['typo_fuzzy']['recall_at_5']:.1%} | "
+              f"refresh of {applied} changed rows: {report['incremental_refresh']['ms']} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    save_report("inventory_search", report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+`/plan` semantic cache benchmark, fully offline.
+
+A stream of planning requests drawn (Zipf-like) from retail automation intents, each
+asked in several phrasings (wrappers, missing tones, synonyms). Near-duplicate intents
+("... gửi email" vs "... gửi Zalo") check that the cache does not reuse the wrong plan.
+The LLM is simulated: a fixed generation latency and a numbered-step answer that goes
+through `plan_to_graph` like the real one.
+
+Reports the hit rate, wrong-intent hits, and p50 latency for cache hits vs generation,
+plus a threshold sweep.
+
+Usage: python src/benchmarks/bench_plan_cache.py [--requests 2000] [--llm-ms 300] [--embedder auto]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.core.plan_cache import PlanCache, make_embedder
+from src.core.plan_graph import plan_to_graph
+from src.core.text import strip_tones
+from src.benchmarks.common import Timer, summarize, save_report
+
+# (request, steps the simulated planner answers with)
+INTENTS = [
+    ("đọc đơn hàng từ Google Sheet và gửi email báo cáo doanh thu",
+     ["Kích hoạt hàng ngày lúc 8h", "Đọc đơn hàng từ Google Sheet", "Phân tích doanh thu bằng AI", "Gửi email báo cáo"]),
+    ("đọc đơn hàng từ Google Sheet và gửi tin nhắn Zalo báo cáo doanh thu",
+     ["Kích hoạt hàng ngày lúc 8h", "Đọc đơn hàng từ Google Sheet", "Gửi tin nhắn Zalo báo cáo"]),
+    ("khi có đơn hàng mới trên website thì ghi vào Google Sheet",
+     ["Webhook nhận đơn hàng mới", "Ghi đơn vào Google Sheet"]),
+    ("tóm tắt phản hồi của khách hàng bằng AI rồi lưu vào Google Docs",
+     ["Đọc phản hồi từ Google Sheet", "Tóm tắt bằng AI", "Ghi báo cáo vào Google Docs"]),
+    ("đăng bài khuyến mãi lên fanpage Facebook mỗi sáng",
+     ["Lịch chạy mỗi sáng", "Tạo nội dung khuyến mãi bằng AI", "Đăng bài lên Facebook"]),
+    ("cảnh báo qua email khi tồn kho dưới mức tối thiểu",
+     ["Đọc tồn kho từ Google Sheet", "Lọc sản phẩm dưới mức tối thiểu", "Gửi email cảnh báo"]),
+    ("gửi lời chúc sinh nhật cho khách hàng VIP qua Zalo",
+     ["Lịch chạy hàng ngày", "Đọc danh sách khách VIP từ Google Sheet", "Lọc khách có sinh nhật hôm nay",
+      "Gửi tin nhắn Zalo"]),
+    ("tổng hợp doanh thu theo tuần vào Google Sheet",
+     ["Lịch chạy hàng tuần", "Gọi API bán hàng", "Ghi tổng doanh thu vào Google Sheet"]),
+    ("lọc các đơn hàng trên 2 triệu và gửi email cho quản lý",
+     ["Webhook nhận đơn hàng", "Lọc đơn trên 2 triệu", "Gửi email cho quản lý"]),
+    ("sao lưu danh sách khách hàng sang Google Sheet hàng ngày",
+     ["Lịch chạy hàng ngày", "Gọi API khách hàng", "Ghi vào Google Sheet"]),
+    ("tự động trả lời tin nhắn Messenger hỏi giá sản phẩm",
+     ["Webhook nhận tin nhắn Messenger", "Tra giá bằng AI", "Gửi tin nhắn trả lời"]),
+    ("xuất báo cáo tồn kho cuối tháng ra Google Docs",
+     ["Lịch chạy cuối tháng", "Đọc tồn kho từ Google Sheet", "Ghi báo cáo vào Google Docs"]),
+]
+WRAPPERS = ["{}", "Tạo quy trình {}", "Mình muốn {}", "Giúp tôi {} nhé", "Làm sao để {}?", "Tự động hóa: {}",
+            "{} giúp mình", "Cho mình một workflow {}"]
+SYNONYMS = [("Google Sheet", "Google Sheets"), ("Google Sheet", "bảng tính"), ("khách hàng", "khách"),
+            ("gửi", "gởi")]
+
+
+def phrase(rng, text):
+    for a, b in SYNONYMS:
+        if a in text and rng.random() < 0.2:
+            text = text.replace(a, b)
+    text = rng.choice(WRAPPERS).format(text)
+    if rng.random() < 0.3:
+        text = strip_tones(text)
+    return text
+
+
+def workload(rng, n):
+    weights = [1 / (rank + 1) for rank in range(len(INTENTS))]
+    stream = []
+    for _ in range(n):
+        intent = rng.choices(range(len(INTENTS)), weights)[0]
+        stream.append((intent, phrase(rng, INTENTS[intent][0])))
+    return stream
+
+
+class SimulatedPlanner:
+    def __init__(self, llm_ms):
+        self.delay = llm_ms / 1000
+        self.calls = 0
+
+    def plan(self, intent):
+        self.calls += 1
+        time.sleep(self.delay)
+        steps = INTENTS[intent][1]
+        return "Kế hoạch tự động hóa:\n" + "\n".join(f"{i}. {s}" for i, s in enumerate(steps, 1))
+
+
+def run(stream, cache, planner):
+    hit_ms, generation_ms, wrong = [], [], 0
+    for intent, prompt in stream:
+        with Timer() as t:
+            hit, vector = cache.match(prompt)
+            if hit is None:
+                nodes, edges = plan_to_graph(planner.plan(intent))
+                cache.put(prompt, {"nodes": nodes, "edges": edges, "intent": intent}, vector=vector)
+        cache.record(hit is not None, t.ms)
+        if hit is None:
+            generation_ms.append(t.ms)
+        else:
+            hit_ms.append(t.ms)
+            wrong += hit["plan"]["intent"] != intent
+    return {"requests": len(stream), "hit_rate": round(len(hit_ms) / len(stream), 4),
+            "wrong_intent_hits": wrong, "llm_calls": planner.calls,
+            "hit_latency": summarize(hit_ms), "generation_latency": summarize(generation_ms)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--llm-ms", type=float, default=300, help="Simulated plan generation latency")
+    parser.add_argument("--embedder", default="auto", choices=["auto", "minilm", "hashing"])
+    args = parser.parse_args()
+
+    rng = random.Random(37)
+    stream = workload(rng, args.requests)
+    embedder = make_embedder(args.embedder)
+    cache = PlanCache(embedder=embedder)
+    report = {"embedder": embedder.name, "threshold": cache.threshold, "llm_ms": args.llm_ms,
+              "intents": len(INTENTS), "distinct_prompts": len({p for _, p in stream})}
+    report["cached"] = run(stream, cache, SimulatedPlanner(args.llm_ms))
+    report["cache_stats"] = cache.stats()
+
+    # Threshold sweep without the simulated latency: hit rate vs wrong-intent reuse.
+    report["threshold_sweep"] = {}
+    for threshold in (0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95):
+        result = run(stream, PlanCache(embedder=embedder, threshold=threshold), SimulatedPlanner(0))
+        report["threshold_sweep"][threshold] = {k: result[k] for k in ("hit_rate", "wrong_intent_hits", "llm_calls")}
+
+    r = report["cached"]
+    print(f"\n🗺️  Plan cache ({args.requests} requests, {len(INTENTS)} intents, {report['distinct_prompts']} distinct "
+          f"prompts, {embedder.name} @ {cache.threshold})")
+    print(f"   Hit rate {r['hit_rate']:.1%} | LLM calls {r['llm_calls']} | wrong-intent hits {r['wrong_intent_hits']}")
+    print(f"   p50 hit {r['hit_latency']['p50_ms']:.3f} ms vs generation {r['generation_latency']['p50_ms']:.1f} ms")
+    for threshold, s in report["threshold_sweep"].items():
+        print(f"   threshold {threshold:<5} hit rate {s['hit_rate']:.1%} | wrong-intent hits {s['wrong_intent_hits']}")
+    save_report("plan_cache", report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmarks under simulated hardware profiles (HARDWARE_PROFILE, src/core/hardware.py).
+
+For each profile: the settings Config picks there (backend, model, quantization, KV
+budget, max_new_tokens, batch size, vision / reranker), then the chosen benchmarks
+in subprocesses with HARDWARE_PROFILE set and the fake LLM running at the profile's
+simulated speed. bench_batch compares one-at-a-time with the profile's batch size.
+Each child still writes its own bench_results/<name>.json (overwritten per profile);
+the combined report is bench_results/profiles.json.
+
+Usage: python src/benchmarks/bench_profiles.py [--profiles a100-80gb,l4-24gb,...] [--benches batch,fast_path,tools]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.benchmarks.common import RESULTS_DIR, save_report
+from src.core.hardware import PROFILES
+
+# bench name -> extra args (kept small: every profile runs every bench). {batch} = the profile's batch size.
+BENCHES = {
+    "batch": ["--requests", "16", "--batch-sizes", "{batch}"],
+    "fast_path": ["--rounds", "1"],
+    "tools": ["--rounds", "1"],
+}
+RESOLVE = ("import json; from src.core.config import Config; c = Config(); "
+           "print('RESULT ' + json.dumps({'summary': c.describe(), 'backend': c.profile['backend'], "
+           "'profile': c.profile, 'max_new_tokens': c.generation['max_new_tokens'], "
+           "'batch_size': c.batch['batch_size'], 'vision': c.vision['enabled'], 'reranker': c.knowledge['reranker']}))")
+
+
+def resolve(profile):
+    """The settings Config picks under `profile` (in a child: the probe is cached per process)."""
+    env = {**os.environ, "HARDWARE_PROFILE": profile}
+    for name in ("LLM_BACKEND", "LLM_MODEL_ID", "LLM_QUANTIZATION", "MAX_NEW_TOKENS", "BATCH_SIZE", "ENABLE_VISION"):
+        env.pop(name, None)
+    child = subprocess.run([sys.executable, "-c", RESOLVE], cwd=project_root, env=env, capture_output=True, text=True)
+    line = next((l for l in child.stdout.splitlines() if l.startswith("RESULT ")), None)
+    if line is None:
+        raise RuntimeError((child.stderr.strip().splitlines() or ["failed"])[-1])
+    return json.loads(line[len("RESULT "):])
+
+
+def run_bench(name, profile, settings):
+    speed = PROFILES[profile]["fake_llm"]
+    args = [a.format(batch=settings["batch_size"]) for a in BENCHES[name]]
+    child = subprocess.run([sys.executable, os.path.join(current_dir, f"bench_{name}.py"), *args,
+                            "--first-token-ms", str(speed["first_token_ms"]),
+                            "--tokens-per-second", str(speed["tokens_per_second"])],
+                           cwd=project_root, env={**os.environ, "HARDWARE_PROFILE": profile},
+                           capture_output=True, text=True)
+    if child.returncode != 0:
+        return {"error": (child.stderr.strip().splitlines() or ["failed"])[-1]}
+    with open(os.path.join(RESULTS_DIR, f"{name}.json"), "r", encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def headline(name, result):
+    """One number per bench for the summary table."""
+    if "error" in result:
+        return f"error: {result['error']}"
+    if name == "batch":
+        batched = next(v for k, v in result.items() if k.startswith("batch="))
+        return f"{result['one_at_a_time']['requests_per_min']:.0f} → {batched['requests_per_min']:.0f} req/min"
+    if name == "fast_path":
+        return f"mean {result['llm_only']['mean_ms']:.0f} → {result['with_fast_path']['mean_ms']:.0f} ms"
+    if name == "tools":
+        return f"p50 {result['parallel']['p50_ms']:.0f} ms, {result['parallel']['llm_calls_per_answered']} calls/answer"
+    return "ok"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", default=",".join(PROFILES))
+    parser.add_argument("--benches", default=",".join(BENCHES))
+    args = parser.parse_args()
+
+    report = {}
+    for profile in args.profiles.split(","):
+        settings = resolve(profile)
+        print(f"\n{settings['summary']}")
+        report[profile] = {"settings": settings, "benches": {}}
+        for name in args.benches.split(","):
+            result = run_bench(name, profile, settings)
+            report[profile]["benches"][name] = result
+            print(f"   {name:<10} {headline(name, result)}")
+
+    print("\n🖥️  Profiles")
+    for profile, entry in report.items():
+        s = entry["settings"]
+        quantization = s["profile"]["quantization"] if s["backend"] == "hf" else "cpu"
+        print(f"   {profile:<13} {s['profile']['model_id'].split('/')[-1]:<28} {quantization:<5} "
+              f"KV {s['profile']['kv_cache_tokens'] // 1000:>4}k | batch {s['batch_size']:>2} | "
+              + " | ".join(headline(name, result) for name, result in entry["benches"].items()))
+    save_report("profiles", report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Microbenchmark: prompt assembly + tokenization per request.
+
+Compares the old path (hand-built ChatML f-string, full re-tokenization every call)
+with PromptBuilder (chat template, cached static segments).
+
+Usage: python src/benchmarks/bench_prompt.py [--requests 2000]
+"""
+import argparse
+import os
+import random
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from transformers import AutoTokenizer
+from src.core.config import get_config
+from src.core.context import ContextResolver
+from src.core.prompt_builder import PromptBuilder
+from src.core.prompts import Prompts
+from src.benchmarks.common import Timer, summarize, save_report
+
+STORES = [
+    {"id": 1, "name": "BabyWorld Cầu Giấy", "industry": "Mom & Baby", "location": "Hanoi - Cau Giay"},
+    {"id": 2, "name": "Cafe Sáng", "industry": "F&B", "location": "Da Nang"},
+    {"id": 3, "name": "Tạp Hóa Minh Anh", "industry": "Grocery", "location": "HCMC - Quan 7"},
+]
+QUESTIONS = [
+    "Hôm nay doanh thu thế nào?",
+    "Tôi nên chạy khuyến mãi gì cho dịp Rằm tháng 7?",
+    "Tự động gửi email cảm ơn khi có đơn hàng mới.",
+    "Sữa Meiji còn bao nhiêu hộp trong kho?",
+]
+
+
+def make_workload(n, seed=7):
+    rng = random.Random(seed)
+    work = []
+    for i in range(n):
+        store = rng.choice(STORES)
+        history = "\n".join(f"User: {rng.choice(QUESTIONS)}\nAssistant: Đã ghi nhận (#{i}-{t})." for t in range(3))
+        work.append((store, history, f"SALES: {{'revenue': {rng.randint(0, 9) * 250000}}}", rng.choice(QUESTIONS)))
+    return work
+
+
+def legacy_prompt(db_context, history_str, context_data, task):
+    # Verbatim shape of the pre-PromptBuilder ManagerAgent.consult f-string.
+    sys_prompt = f"{Prompts.SYSTEM_CONTEXT}\n\n[DATA]\n{db_context}"
+    return f'''<|im_start|>system
+{sys_prompt}
+
+CHAT HISTORY:
+{history_str}
+
+DATA: {context_data}
+
+{Prompts.CONSULT_INSTRUCTION}
+<|im_end|>
+<|im_start|>user
+{task}
+<|im_end|>
+<|im_start|>assistant
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    model_id = get_config().models["manager"]
+    print(f"🔤 Loading tokenizer only: {model_id}")
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    builder = PromptBuilder(tokenizer)
+    resolver = ContextResolver(memory=None)
+    workload = make_workload(args.requests)
+
+    legacy_ms, builder_ms, legacy_tokens, builder_tokens = [], [], [], []
+    for store, history, data, task in workload:
+        db_context = resolver._build_context_string(store)
+
+        with Timer() as t:
+            ids = tokenizer(legacy_prompt(db_context, history, data, task))["input_ids"]
+        legacy_ms.append(t.ms)
+        legacy_tokens.append(len(ids))
+
+        with Timer() as t:
+            system = f"{Prompts.SYSTEM_CONTEXT}\n\n[DATA]\n{db_context}\n\n{Prompts.CONSULT_INSTRUCTION}"
+            user = f"CHAT HISTORY:\n{history}\n\nDATA: {data}\n\n{task}"
+            ids = builder.build("manager", system, [{"role": "user", "content": user}])
+        builder_ms.append(t.ms)
+        builder_tokens.append(len(ids))
+
+    report = {
+        "requests": args.requests,
+        "model": model_id,
+        "legacy": summarize(legacy_ms),
+        "prompt_builder": summarize(builder_ms),
+        "speedup_mean": round(sum(legacy_ms) / max(sum(builder_ms), 1e-9), 2),
+        "avg_prompt_tokens": {"legacy": round(sum(legacy_tokens) / len(legacy_tokens), 1),
+                              "prompt_builder": round(sum(builder_tokens) / len(builder_tokens), 1)},
+        "static_cache": builder.stats(),
+    }
+
+    print(f"\n📊 Prompt assembly + tokenization ({args.requests} requests)")
+    print(f"   Legacy f-string : p50 {report['legacy']['p50_ms']:.3f} ms | p95 {report['legacy']['p95_ms']:.3f} ms")
+    print(f"   PromptBuilder   : p50 {report['prompt_builder']['p50_ms']:.3f} ms | p95 {report['prompt_builder']['p95_ms']:.3f} ms")
+    print(f"   Speedup (mean)  : x{report['speedup_mean']}")
+    print(f"   Cache           : {report['static_cache']}")
+    save_report("prompt_assembly", report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Receipt extraction benchmark for ReceiptParser.
+
+Two sets of Vietnamese receipts as Florence-2 `<OCR_WITH_REGION>` outputs (quad boxes +
+labels):
+- held-out: hand-labelled receipts in src/data/receipts/heldout_ocr.json, written
+  independently of the parser (skewed photos with misaligned rows, OCR confusions in
+  prices, space-grouped thousands, ĐVT/VAT columns, k prices). The accuracy figures
+  come from this set.
+- synthetic: generated below (layout jitter, split cells, wrapped names, mixed number
+  formats). The generator was written alongside the parser, so its score is a
+  regression check, not an accuracy claim.
+Measures extraction accuracy (items exactly right, totals right) and prompt tokens
+(raw OCR text block vs compact receipt JSON).
+
+No vision model needed. Token counts use the configured LLM tokenizer when it can be
+loaded, otherwise they are reported as UTF-8 bytes / 3 estimates.
+
+Usage: python src/benchmarks/bench_receipts.py [--receipts 500] [--heldout src/data/receipts/heldout_ocr.json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.core.receipt_parser import ReceiptParser
+from src.benchmarks.common import Timer, summarize, save_report, load_token_counter
+
+PRODUCTS = [
+    ("Bỉm Bobby Size M 76 miếng", 289000), ("Sữa Meiji Số 9 800g", 520000), ("Sữa tắm Lactacyd BB 250ml", 95000),
+    ("Khăn ướt Mamamy 100 tờ", 32000), ("Bình sữa Comotomo 250ml", 415000), ("Quần chục Cotton", 120000),
+    ("Áo khoác gió bé trai", 175000), ("Cà phê sữa đá", 29000), ("Bạc xỉu", 32000), ("Bánh mì trứng", 20000),
+    ("Nước suối Lavie 500ml", 6000), ("Mì Hảo Hảo tôm chua cay", 4500), ("Dầu ăn Neptune 1L", 58000),
+]
+STORES = ["BABYWORLD CẦU GIẤY", "CAFE SÁNG", "TẠP HÓA MINH ANH", "SIÊU THỊ MẸ VÀ BÉ KIDS PLAZA"]
+NOISE = ["Địa chỉ: 123 Trần Duy Hưng, Cầu Giấy, Hà Nội", "Hotline: 0912.345.678", "Thu ngân: Nguyễn Thị B",
+         "Wifi: cafesang / matkhau123", "Cảm ơn quý khách! Hẹn gặp lại", "MST: 0109876543"]
+
+
+def fmt_money(value, rng):
+    style = rng.choice(["dot", "comma", "dot_d", "plain_vnd"])
+    if style == "dot":
+        return f"{value:,.0f}".replace(",", ".")
+    if style == "comma":
+        return f"{value:,.0f}"
+    if style == "dot_d":
+        return f"{value:,.0f}đ".replace(",", ".")
+    return f"{value:,.0f} VND".replace(",", ".")
+
+
+def make_receipt(rng):
+    """Returns (regions, truth) for one synthetic receipt."""
+    lines, y = [], 40.0
+    height = rng.uniform(18, 26)
+
+    def add(cells):
+        nonlocal y
+        x = 30.0
+        for text, width in cells:
+            jy = y + rng.uniform(-height * 0.15, height * 0.15)
+            lines.append(([x, jy, x + width, jy, x + width, jy + height, x, jy + height], text))
+            x += width + rng.uniform(15, 40)
+        y += height * rng.uniform(1.4, 1.9)
+
+    store = rng.choice(STORES)
+    add([(store, 400)])
+    add([(rng.choice(NOISE[:2]), 500)])
+    day, month = rng.randint(1, 28), rng.randint(1, 12)
+    add([(f"Ngày: {day:02d}/{month:02d}/2025 {rng.randint(7, 21)}:{rng.randint(0, 59):02d}", 300)])
+    add([("Tên hàng", 200), ("SL", 40), ("Đơn giá", 100), ("Thành tiền", 120)])
+
+    items = []
+    for name, price in rng.sample(PRODUCTS, rng.randint(2, 7)):
+        qty = rng.choice([1, 1, 1, 2, 2, 3, 5, 10])
+        amount = qty * price
+        items.append([name, qty, price, amount])
+        layout = rng.random()
+        if layout < 0.5:
+            add([(name, 260), (str(qty), 30), (fmt_money(price, rng), 100), (fmt_money(amount, rng), 120)])
+        elif layout < 0.75:
+            add([(f"{name} {qty} x {fmt_money(price, rng)}", 420), (fmt_money(amount, rng), 120)])
+        else:  # Long name wrapped onto its own row
+            add([(name, 420)])
+            add([(str(qty), 30), (fmt_money(price, rng), 100), (fmt_money(amount, rng), 120)])
+
+    total = sum(i[3] for i in items)
+    discount = rng.choice([0, 0, 0, 10000, 20000])
+    if discount:
+        add([("Giảm giá:", 150), (fmt_money(discount, rng), 120)])
+    add([(rng.choice(["Tổng cộng:", "TỔNG TIỀN:", "Thanh toán:"]), 150), (fmt_money(total - discount, rng), 140)])
+    add([("Tiền khách đưa:", 150), (fmt_money(((total - discount) // 100000 + 1) * 100000, rng), 140)])
+    for noise in rng.sample(NOISE[2:], 2):
+        add([(noise, 420)])
+
+    rng.shuffle(lines)  # Florence does not return regions in reading order
+    regions = {"quad_boxes": [q for q, _ in lines], "labels": [f"</s>{t}" for _, t in lines]}
+    return regions, {"items": items, "total": total - discount}
+
+
+def score(receipt_parser, samples, count_tokens):
+    """samples: [(id, regions, truth)] -> accuracy, token and latency figures, ids of the misses."""
+    exact_receipts = item_hits = item_total = total_hits = 0
+    raw_tokens = compact_tokens = 0
+    parse_ms, misses = [], []
+    for sample_id, regions, truth in samples:
+        with Timer() as t:
+            compact, raw_text = receipt_parser.extract(regions)
+        parse_ms.append(t.ms)
+
+        got = json.loads(compact) if compact else {"items": [], "total": None}
+        got_items = [[n, q, p, a] for n, q, p, a in got["items"]]
+        hits = sum(1 for item in truth["items"] if item in got_items)
+        item_hits += hits
+        item_total += len(truth["items"])
+        total_ok = got.get("total") == truth["total"]
+        total_hits += total_ok
+        exact = total_ok and hits == len(truth["items"]) == len(got_items)
+        exact_receipts += exact
+        if not exact:
+            misses.append(sample_id)
+
+        raw_tokens += count_tokens("[IMAGE ANALYSIS - Mode: <OCR>]\n" + raw_text)
+        compact_tokens += count_tokens("[RECEIPT DATA]\n" + (compact or raw_text))
+
+    return {
+        "receipts": len(samples),
+        "item_recall": round(item_hits / item_total, 4),
+        "total_accuracy": round(total_hits / len(samples), 4),
+        "exact_receipt_accuracy": round(exact_receipts / len(samples), 4),
+        "avg_prompt_tokens_raw_ocr": round(raw_tokens / len(samples), 1),
+        "avg_prompt_tokens_compact": round(compact_tokens / len(samples), 1),
+        "tokens_saved_pct": round(100 * (1 - compact_tokens / raw_tokens), 1),
+        "parse_latency": summarize(parse_ms),
+        "misses": misses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--receipts", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--heldout", default=os.path.join(project_root, "src", "data", "receipts", "heldout_ocr.json"))
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    receipt_parser = ReceiptParser()
+    count_tokens, token_source = load_token_counter()
+
+    with open(args.heldout, "r", encoding="utf-8") as f:
+        heldout = [(s["id"], s["regions"], s["truth"]) for s in json.load(f)]
+    synthetic = [(f"synthetic-{n}", *make_receipt(rng)) for n in range(args.receipts)]
+    report = {"token_source": token_source,
+              "heldout": score(receipt_parser, heldout, count_tokens),
+              "synthetic": score(receipt_parser, synthetic, count_tokens)}
+    report["synthetic"]["misses"] = len(report["synthetic"]["misses"])
+
+    for name, label in (("heldout", "held-out (hand-labelled)"), ("synthetic", "synthetic (regression check only)")):
+        r = report[name]
+        print(f"\n🧾 Receipts, {label}: {r['receipts']}")
+        print(f"   Item recall        : {r['item_recall']:.2%}")
+        print(f"   Total accuracy     : {r['total_accuracy']:.2%}")
+        print(f"   Exact receipts     : {r['exact_receipt_accuracy']:.2%}")
+        print(f"   Prompt tokens      : {r['avg_prompt_tokens_raw_ocr']} raw -> "
+              f"{r['avg_prompt_tokens_compact']} compact ({r['tokens_saved_pct']}% saved, {token_source})")
+        print(f"   Parse p50          : {r['parse_latency']['p50_ms']:.3f} ms")
+    print(f"   Held-out misses    : {', '.join(report['heldout']['misses']) or 'none'}")
+    save_report("receipt_extraction", report)
+
+
+if __name__ == "__main__":
+    main()
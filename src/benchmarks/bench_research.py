@@ -0,0 +1,115 @@
+"""
+Research latency and prompt-token benchmark, fully offline.
+
+Uses LocalSearchProvider (simulated per-call network latency) over the store
+policy docs plus a synthetic "web" corpus containing mirror/duplicate pages.
+
+Compares per query:
+- legacy: one sequential search, `str(results)` pasted into the prompt,
+- fan-out (cold cache): parallel reformulations, dedup, compact snippets,
+- fan-out (warm cache): same, served from the persistent TTL cache.
+
+Usage: python src/benchmarks/bench_research.py [--latency-ms 300]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.core.search import LocalSearchProvider, SearchCache, WebResearch
+from src.core.prompts import Prompts
+from src.benchmarks.common import Timer, summarize, save_report, load_token_counter
+
+QUERIES = [
+    "xu hướng bán lẻ mẹ và bé 2025", "giá sữa bột tăng", "chính sách đổi trả hàng điện tử",
+    "thuế hộ kinh doanh bán lẻ", "khuyến mãi Tết cho cửa hàng tạp hóa", "bỉm trẻ em bán chạy",
+    "quản lý tồn kho cửa hàng nhỏ", "thanh toán QR tại cửa hàng", "cà phê mang đi xu hướng",
+    "chương trình khách hàng thân thiết",
+]
+TOPICS = ["bán lẻ", "mẹ và bé", "sữa bột", "tồn kho", "khuyến mãi", "thuế", "thanh toán", "Tết", "cà phê", "bỉm"]
+
+
+def synthetic_web(rng, pages=400):
+    docs = []
+    for i in range(pages):
+        words = rng.sample(TOPICS, 3)
+        body = (f"Bài viết về {', '.join(words)} tại Việt Nam. " * 6).strip()
+        url = f"https://news{i % 23}.vn/{'-'.join(w.replace(' ', '-') for w in words)}-{i}"
+        docs.append({"title": f"{words[0].title()}: phân tích {words[1]} và {words[2]} #{i}", "url": url,
+                     "snippet": body})
+        if i % 5 == 0:  # Mirror copies: same article on www./utm URLs, as search engines return them
+            docs.append(dict(docs[-1], url=url.replace("https://", "https://www.") + "?utm_source=fb"))
+    return docs
+
+
+def legacy_prompt(query, results):
+    return f"{Prompts.RESEARCHER_SYSTEM}\nQUERY: {query}\nRAW DATA: {str(results) if results else 'Search returned no results.'}"
+
+
+async def run(args):
+    rng = random.Random(3)
+    policy = LocalSearchProvider.from_directory(os.path.join(project_root, "src", "data", "docs"))
+    provider = LocalSearchProvider(policy.documents + synthetic_web(rng), latency=args.latency_ms / 1000)
+
+    cache = SearchCache(os.path.join(tempfile.mkdtemp(prefix="bench_research_"), "cache.db"))
+    web = WebResearch(provider, cache)
+    count_tokens, token_source = load_token_counter()
+
+    legacy_ms, cold_ms, warm_ms = [], [], []
+    legacy_tokens = new_tokens = legacy_results = new_results = 0
+    for query in QUERIES:
+        with Timer() as t:
+            results = await provider.search(query, 4)
+            prompt = legacy_prompt(query, results)
+        legacy_ms.append(t.ms)
+        legacy_tokens += count_tokens(prompt)
+        legacy_results += len(results)
+
+        with Timer() as t:
+            merged = await web.gather(query)
+            prompt = f"{Prompts.RESEARCHER_SYSTEM}\nQUERY: {query}\nSEARCH RESULTS:\n{web.compact(merged)}"
+        cold_ms.append(t.ms)
+        new_tokens += count_tokens(prompt)
+        new_results += len(merged)
+
+        with Timer() as t:
+            web.compact(await web.gather(query))
+        warm_ms.append(t.ms)
+
+    n = len(QUERIES)
+    return {
+        "queries": n,
+        "simulated_latency_ms": args.latency_ms,
+        "legacy": summarize(legacy_ms),
+        "fanout_cold": summarize(cold_ms),
+        "fanout_warm_cache": summarize(warm_ms),
+        "token_source": token_source,
+        "avg_prompt_tokens": {"legacy": round(legacy_tokens / n, 1), "fanout": round(new_tokens / n, 1)},
+        "avg_unique_results": {"legacy": round(legacy_results / n, 2), "fanout": round(new_results / n, 2)},
+        "cache": {"hits": cache.hits, "misses": cache.misses},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=300)
+    args = parser.parse_args()
+    report = asyncio.run(run(args))
+
+    print(f"\n🔎 Research ({report['queries']} queries, {args.latency_ms:.0f} ms simulated search latency)")
+    print(f"   Legacy        p50 {report['legacy']['p50_ms']:.1f} ms | {report['avg_prompt_tokens']['legacy']} tokens"
+          f" | {report['avg_unique_results']['legacy']} results")
+    print(f"   Fan-out cold  p50 {report['fanout_cold']['p50_ms']:.1f} ms | {report['avg_prompt_tokens']['fanout']} tokens"
+          f" | {report['avg_unique_results']['fanout']} results")
+    print(f"   Fan-out warm  p50 {report['fanout_warm_cache']['p50_ms']:.1f} ms ({report['token_source']} tokens)")
+    save_report("research_latency", report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+History retention soak: months of synthetic chat traffic on scratch databases.
+
+Two databases receive the same traffic (--tenants tenants, --turns user+assistant
+pairs per tenant per day, over --days simulated days):
+- baseline: history grows forever (the old behaviour);
+- retention: HistoryRetention.run_once after every simulated day (default policy).
+Every --sample-every days both report the DB file size, hot history rows, and the
+p50/p95 of the per-request history read (get_context_string) over random tenants.
+Retention run durations and the archive size are reported at the end.
+
+Usage: python src/benchmarks/bench_retention.py [--days 180] [--tenants 50] [--turns 20]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.core.memory import MemoryManager
+from src.core.retention import HistoryRetention
+from src.benchmarks.common import Timer, summarize, save_report
+
+QUESTIONS = ["Doanh thu hôm nay thế nào?", "Còn bao nhiêu bỉm Bobby size M?", "Tạo quy trình báo cáo tồn kho hàng tuần",
+             "Viết bài đăng khuyến mãi cuối tuần", "Khách VIP nào lâu chưa quay lại?", "So sánh giá sữa Meiji tuần này"]
+
+
+def traffic(day, tenants, turns, rng):
+    rows = []
+    for user_id, store_id in tenants:
+        for t in range(turns):
+            ts = (day + timedelta(seconds=rng.randint(8 * 3600, 22 * 3600) + t)).isoformat()
+            rows.append(("user", f"{rng.choice(QUESTIONS)} (#{rng.randint(1, 99999)})", ts, user_id, store_id))
+            rows.append(("assistant", "Dạ, " + " ".join(rng.choice(QUESTIONS) for _ in range(rng.randint(5, 25))),
+                         ts, user_id, store_id))
+    rows.sort(key=lambda r: r[2])  # Insert in time order, like live traffic
+    return rows
+
+
+def db_size_mb(path):
+    return round(sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p)) / 1024 ** 2, 2)
+
+
+def dir_size_mb(path):
+    if not os.path.isdir(path):
+        return 0.0
+    return round(sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 1024 ** 2, 2)
+
+
+def read_latency(memory, tenants, rng, reads=300):
+    latencies = []
+    for _ in range(reads):
+        user_id, store_id = rng.choice(tenants)
+        with Timer() as t:
+            memory.get_context_string(limit=6, user_id=user_id, store_id=store_id)
+        latencies.append(t.ms)
+    return summarize(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--tenants", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=20, help="user+assistant pairs per tenant per day")
+    parser.add_argument("--sample-every", type=int, default=30)
+    args = parser.parse_args()
+
+    rng = random.Random(45)
+    tenants = [(1 + i // 2, 1 + i) for i in range(args.tenants)]
+    workdir = tempfile.mkdtemp(prefix="bench_retention_")
+    try:
+        baseline = MemoryManager(db_path=os.path.join(workdir, "baseline.db"))
+        kept = MemoryManager(db_path=os.path.join(workdir, "retention.db"))
+        archive_dir = os.path.join(workdir, "archive")
+        retention = HistoryRetention(kept.db_path, archive_dir)
+        start = datetime(2025, 1, 1)
+        samples, runs = [], []
+        for n in range(args.days):
+            day = start + timedelta(days=n)
+            rows = traffic(day, tenants, args.turns, rng)
+            for memory in (baseline, kept):
+                memory.conn.executemany('''INSERT INTO history (role, content, timestamp, user_id, store_id)
+                                           VALUES (?, ?, ?, ?, ?)''', rows)
+                memory.conn.commit()
+            runs.append(retention.run_once(now=day + timedelta(days=1)))
+            if (n + 1) % args.sample_every == 0 or n + 1 == args.days:
+                sample = {"day": n + 1}
+                for name, memory in (("baseline", baseline), ("retention", kept)):
+                    sample[name] = {"db_mb": db_size_mb(memory.db_path),
+                                    "hot_rows": memory.conn.execute("SELECT count(*) FROM history").fetchone()[0],
+                                    "read": read_latency(memory, tenants, rng)}
+                sample["archive_mb"] = dir_size_mb(archive_dir)
+                samples.append(sample)
+                print(f"   day {n + 1:>4}: baseline {sample['baseline']['db_mb']:>8.2f} MB "
+                      f"{sample['baseline']['hot_rows']:>8} rows p50 {sample['baseline']['read']['p50_ms']:.3f} ms | "
+                      f"retention {sample['retention']['db_mb']:>7.2f} MB {sample['retention']['hot_rows']:>6} rows "
+                      f"p50 {sample['retention']['read']['p50_ms']:.3f} ms | archive {sample['archive_mb']:.2f} MB")
+        summaries = kept.conn.execute("SELECT count(*) FROM history_summaries").fetchone()[0]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    steady = [r["duration_ms"] for r in runs[len(runs) // 2:]]
+    last = samples[-1]
+    report = {"days": args.days, "tenants": args.tenants, "turns_per_day": args.turns, "samples": samples,
+              "retention_run": summarize(steady), "summaries": summaries}
+    print(f"\n🗄️  History retention soak ({args.days} days, {args.tenants} tenants, "
+          f"{args.turns * 2} messages/tenant/day)")
+    print(f"   DB size   : baseline {last['baseline']['db_mb']:.1f} MB → retention {last['retention']['db_mb']:.1f} MB "
+          f"(+ {last['archive_mb']:.1f} MB gzip archive)")
+    print(f"   Hot rows  : baseline {last['baseline']['hot_rows']} → retention {last['retention']['hot_rows']}")
+    print(f"   Read p95  : baseline {last['baseline']['read']['p95_ms']:.3f} ms → "
+          f"retention {last['retention']['read']['p95_ms']:.3f} ms")
+    print(f"   Daily run : p50 {report['retention_run']['p50_ms']:.1f} ms, p95 {report['retention_run']['p95_ms']:.1f} ms "
+          f"(steady state) | {summaries} monthly summaries")
+    save_report("retention", report)
+
+
+if __name__ == "__main__":
+    main()
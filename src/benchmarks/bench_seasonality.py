@@ -0,0 +1,154 @@
+"""
+Lunar seasonality analytics: per-row Python vs the precomputed calendar + NumPy index.
+
+Seeds a scratch DB with --years of daily sales for --stores stores x --categories
+categories (a weekly cycle, noise, and a x3 week before every Tết), then answers the
+same questions both ways:
+  naive     - SELECT the store's rows, LunarDate.fromSolarDate per row, sum in Python
+  index     - SeasonalityIndex (calendar offsets, bincount series, cumulative sums)
+Questions per store/category: revenue of the last 7 days vs the same lunar days last
+year, and the pre-Tết uplift over the last 3 years. Reports cold load time, per-query
+p50/p95, and the recovered Tết uplift (should be ~3.0).
+
+Usage: python src/benchmarks/bench_seasonality.py [--stores 20] [--categories 5] [--years 5] [--queries 50]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+from datetime import date, timedelta
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from lunardate import LunarDate
+
+from src.core.lunar_calendar import default_calendar
+from src.core.seasonality import SeasonalityIndex
+from src.benchmarks.common import Timer, summarize, save_report
+
+CATEGORIES = ["Diapers", "Milk", "Snacks", "Toys", "Clothes", "Cosmetics", "Drinks", "Gifts"]
+
+
+def seed(db_path, stores, categories, years, today, rng):
+    calendar = default_calendar()
+    tets = calendar.occurrences("tet")
+    conn = sqlite3.connect(db_path)
+    conn.execute('''CREATE TABLE sales (id INTEGER PRIMARY KEY AUTOINCREMENT, store_id INTEGER, date TEXT,
+                                        amount REAL, category TEXT)''')
+    day, rows = today.replace(year=today.year - years), 0
+    while day <= today:
+        offset = calendar.offset(day)
+        boost = 3.0 if any(0 <= tet - offset < 7 for tet in tets) else 1.0
+        weekly = 1.3 if day.weekday() >= 5 else 1.0
+        batch = [(store, day.isoformat(), round(100000 * boost * weekly * rng.uniform(0.9, 1.1)), category)
+                 for store in range(1, stores + 1) for category in CATEGORIES[:categories]]
+        conn.executemany("INSERT INTO sales (store_id, date, amount, category) VALUES (?, ?, ?, ?)", batch)
+        rows += len(batch)
+        day += timedelta(days=1)
+    conn.commit()
+    conn.close()
+    return rows
+
+
+class Naive:
+    """What a direct implementation does: fetch rows, convert each date with LunarDate."""
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path)
+
+    def _rows(self, store_id, category):
+        return self.conn.execute("SELECT date, amount FROM sales WHERE store_id = ? AND category = ?",
+                                 (store_id, category)).fetchall()
+
+    def lunar_yoy(self, store_id, category, today, window=7):
+        lunar_today = LunarDate.fromSolarDate(today.year, today.month, today.day)
+        aligned = LunarDate(lunar_today.year - 1, lunar_today.month, min(lunar_today.day, 29)).toSolarDate()
+        current = previous = 0.0
+        for d, amount in self._rows(store_id, category):
+            d = date.fromisoformat(d)
+            if 0 <= (today - d).days < window:
+                current += amount
+            elif 0 <= (aligned - d).days < window:
+                previous += amount
+        return current, previous
+
+    def tet_uplift(self, store_id, category, today, years=3, lead_days=7, base_days=28):
+        by_day = {}
+        for d, amount in self._rows(store_id, category):
+            d = date.fromisoformat(d)
+            lunar = LunarDate.fromSolarDate(d.year, d.month, d.day)  # Per-row conversion, as a naive report would
+            by_day[d] = (amount, lunar)
+        uplifts = []
+        for year in range(today.year - years, today.year):
+            tet = LunarDate(year, 1, 1).toSolarDate()
+            window = [by_day.get(tet - timedelta(days=i), (0, None))[0] for i in range(lead_days)]
+            base = [by_day.get(tet - timedelta(days=lead_days + i), (0, None))[0] for i in range(base_days)]
+            if sum(base):
+                uplifts.append((sum(window) / lead_days) / (sum(base) / base_days))
+        return sum(uplifts) / len(uplifts) if uplifts else None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stores", type=int, default=20)
+    parser.add_argument("--categories", type=int, default=5)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(47)
+    today = date(2026, 12, 20)  # Fixed so Tết 2027 is inside the 60-day horizon
+    workdir = tempfile.mkdtemp(prefix="bench_seasonality_")
+    try:
+        db_path = os.path.join(workdir, "sales.db")
+        with Timer() as t:
+            rows = seed(db_path, args.stores, min(args.categories, len(CATEGORIES)), args.years, today, rng)
+        print(f"   seeded {rows} sales rows in {t.ms / 1000:.1f} s")
+        targets = [(rng.randint(1, args.stores), rng.choice(CATEGORIES[:args.categories])) for _ in range(args.queries)]
+
+        naive = Naive(db_path)
+        naive_ms, naive_uplifts = [], []
+        for store_id, category in targets:
+            with Timer() as t:
+                naive.lunar_yoy(store_id, category, today)
+                naive_uplifts.append(naive.tet_uplift(store_id, category, today))
+            naive_ms.append(t.ms)
+
+        with Timer() as cold:
+            index = SeasonalityIndex(db_path)
+            index.refresh(force=True)
+        index_ms, index_uplifts = [], []
+        for store_id, category in targets:
+            index._series.clear()  # Measure the uncached path; repeated store/category pairs would hit the LRU
+            with Timer() as t:
+                index.lunar_yoy(store_id, category, today)
+                tet = [e for e in index.upcoming_events(store_id, category, today) if e["event"] == "tet"]
+            index_ms.append(t.ms)
+            index_uplifts.append(tet[0]["uplift"] if tet else None)
+        with Timer() as cached:
+            for store_id, category in targets:
+                index.lunar_yoy(store_id, category, today)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    mean = lambda values: round(sum(v for v in values if v) / max(1, sum(1 for v in values if v)), 2)
+    report = {"rows": rows, "stores": args.stores, "categories": args.categories, "years": args.years,
+              "naive": {**summarize(naive_ms), "tet_uplift": mean(naive_uplifts)},
+              "index": {**summarize(index_ms), "cold_load_ms": round(cold.ms, 1), "tet_uplift": mean(index_uplifts),
+                        "cached_query_ms": round(cached.ms / len(targets), 3)}}
+    print(f"\n🏮 Lunar seasonality ({rows} sales rows, {args.queries} store/category queries)")
+    print(f"   naive  : p50 {report['naive']['p50_ms']:>8.2f} ms | p95 {report['naive']['p95_ms']:>8.2f} ms | "
+          f"Tết uplift {report['naive']['tet_uplift']}")
+    print(f"   index  : p50 {report['index']['p50_ms']:>8.2f} ms | p95 {report['index']['p95_ms']:>8.2f} ms | "
+          f"Tết uplift {report['index']['tet_uplift']} | cold load {report['index']['cold_load_ms']:.0f} ms | "
+          f"cached {report['index']['cached_query_ms']:.3f} ms")
+    print(f"   speedup: x{report['naive']['p50_ms'] / max(report['index']['p50_ms'], 1e-9):.0f} (p50)")
+    save_report("seasonality", report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Tool calling: LLM round-trips per answered question, with the fake LLM backend.
+
+The same questions (0-3 lookups each: sales, stock, low stock, customers, lunar date,
+arithmetic) are answered three ways:
+  routed      - the old hard-coded routing: DATA_INTERNAL gets today's sales in the
+                prompt, everything else nothing (1 LLM call, other lookups missing)
+  one-by-one  - tool calling with a model that emits one call per reply (ReAct style)
+  parallel    - ManagerAgent.answer_with_tools: every call in one reply, executed
+                concurrently, results in a single follow-up turn
+A question counts as answered when every lookup it needs reached the model.
+Headline: LLM calls per answered question; also p50/p95 latency and prefilled tokens.
+
+Usage: python src/benchmarks/bench_tools.py [--rounds 2] [--tokens-per-second 25]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.benchmarks.common import Timer, summarize, save_report
+
+QUESTIONS = [
+    "Doanh thu hôm nay thế nào?",
+    "Doanh thu hôm nay ra sao và còn bao nhiêu bỉm Bobby?",
+    "Còn bao nhiêu sữa Meiji, hàng nào sắp hết?",
+    "Khách 0912 345 678 hạng gì, mua gần nhất khi nào?",
+    "Doanh thu hôm nay, hàng nào sắp hết, và khách Chị Lan mua gần nhất lúc nào?",
+    "Hôm nay âm lịch là ngày mấy, tồn kho Áo Khoác Gió còn bao nhiêu?",
+    "Cửa hàng nên làm gì để giữ chân khách quen?",
+    "Nhập 1500 cái, giá 12000 một cái: tính 1500*12000 giúp mình",
+]
+
+
+def run(mode, manager, tools, questions, metrics, max_rounds):
+    from src.core.fake_llm import tool_calls_for
+
+    latencies, llm_calls, answered, prompt_tokens = [], 0, 0, 0
+    for question in questions:
+        needed = {c["name"] for c in tool_calls_for(question)}
+        with metrics.trace(f"tools-{mode}") as trace:
+            with Timer() as t:
+                if mode == "routed":
+                    category = manager.analyze_task(question)["category"]
+                    context = f"SALES: {tools.tools['get_sales_report']['fn'](1, 'today')}" \
+                        if category == "DATA_INTERNAL" else ""
+                    manager.consult(question, context, "")
+                    calls, fetched = 1, {"get_sales_report"} if context else set()
+                else:
+                    _, info = manager.answer_with_tools(question, tools, 1, "", max_rounds=max_rounds)
+                    calls, fetched = info["llm_round_trips"], {c["name"] for c in info["tool_calls"] if "error" not in c}
+        latencies.append(t.ms)
+        llm_calls += calls
+        answered += needed <= fetched
+        prompt_tokens += sum(s.get("prompt_tokens", 0) for s in trace.stages if s["stage"] == "llm.generate")
+    return {**summarize(latencies), "questions": len(questions), "answered": answered,
+            "llm_calls": llm_calls, "llm_calls_per_answered": round(llm_calls / answered, 2) if answered else None,
+            "prompt_tokens_per_question": round(prompt_tokens / len(questions), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=2, help="passes over the question set")
+    parser.add_argument("--first-token-ms", type=float, default=50)
+    parser.add_argument("--tokens-per-second", type=float, default=25)
+    parser.add_argument("--max-rounds", type=int, default=4, help="LLM calls allowed per answer")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_tools_")
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_FIRST_TOKEN_MS": str(args.first_token_ms),
+        "FAKE_LLM_TOKENS_PER_SECOND": str(args.tokens_per_second),
+        "PROJECT_A_DB_PATH": os.path.join(workdir, "project_a.db"),
+    })
+    try:
+        from src.core import metrics
+        from src.core.engine import ModelEngine
+        from src.core.memory import MemoryManager
+        from src.core.saas_api import SaasAPI
+        from src.core.tool_calling import retail_registry
+        from src.agents.manager import ManagerAgent
+
+        metrics.configure(enabled=True)
+        engine, memory = ModelEngine(), MemoryManager()
+        manager, tools = ManagerAgent(engine, memory), retail_registry(SaasAPI())
+        model = engine.load_model("manager")["model"]
+        questions = QUESTIONS * args.rounds
+        report = {"questions": len(questions), "fake_llm": {"first_token_ms": args.first_token_ms,
+                                                            "tokens_per_second": args.tokens_per_second}}
+        report["routed"] = run("routed", manager, tools, questions, metrics, args.max_rounds)
+        model.parallel_tool_calls = False
+        report["one-by-one"] = run("one-by-one", manager, tools, questions, metrics, args.max_rounds)
+        model.parallel_tool_calls = True
+        report["parallel"] = run("parallel", manager, tools, questions, metrics, args.max_rounds)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n🧰 Tool calling ({len(questions)} questions, fake LLM {args.tokens_per_second:g} tok/s)")
+    for name in ("routed", "one-by-one", "parallel"):
+        r = report[name]
+        print(f"   {name:<11} answered {r['answered']:>3}/{r['questions']} | "
+              f"{r['llm_calls_per_answered'] or float('nan'):>5.2f} LLM calls/answered | p50 {r['p50_ms']:>7.1f} ms | "
+              f"p95 {r['p95_ms']:>7.1f} ms | {r['prompt_tokens_per_question']:>6.0f} prefill tok/q")
+    save_report("tools", report)
+
+
+if __name__ == "__main__":
+    main()
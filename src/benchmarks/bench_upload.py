@@ -0,0 +1,138 @@
+"""
+Upload load test: peak memory per upload and concurrency limits.
+
+Drives UploadSpool.receive with many concurrent fake UploadFiles (which produce
+their bytes lazily, so the test harness itself holds no payloads) and compares
+against the legacy `file.read()` handling. Peak Python heap is measured with
+tracemalloc.
+
+Usage: python src/benchmarks/bench_upload.py [--uploads 64] [--size-mb 6] [--max-concurrent 8]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.core.upload_spool import UploadSpool, UploadError
+from src.benchmarks.common import summarize, save_report
+
+
+class FakeUpload:
+    """Async UploadFile stand-in that synthesizes a JPEG-looking payload chunk by chunk."""
+    def __init__(self, size, seed, delay=0.0):
+        self.size, self.sent, self.seed, self.delay = size, 0, seed, delay
+        self.filename = f"../../etc/upload_{seed}.jpg"  # Hostile name: must never become a path
+
+    async def read(self, n=-1):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        remaining = self.size - self.sent
+        n = remaining if n < 0 else min(n, remaining)
+        if n <= 0:
+            return b""
+        block = (self.seed.to_bytes(4, "little") * (n // 4 + 1))[:n]
+        if self.sent == 0:
+            block = b"\xff\xd8\xff" + block[3:]
+        self.sent += n
+        return block
+
+
+async def legacy_read(upload, out_dir):
+    data = await upload.read()
+    with open(os.path.join(out_dir, f"legacy_{upload.seed}.jpg"), "wb") as f:
+        f.write(data)
+    await asyncio.sleep(0.01)  # The old handler kept the buffer alive until analysis finished
+    return len(data)
+
+
+async def run_spool(uploads, spool):
+    latencies, rejected = [], {}
+
+    async def one(u):
+        start = time.perf_counter()
+        try:
+            await spool.receive(u)
+            latencies.append((time.perf_counter() - start) * 1000)
+        except UploadError as e:
+            rejected[e.status_code] = rejected.get(e.status_code, 0) + 1
+
+    await asyncio.gather(*(one(u) for u in uploads))
+    return latencies, rejected
+
+
+def measure(label, coro_factory, concurrency):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = asyncio.run(coro_factory())
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"   {label:<22} peak heap {peak / 1e6:8.2f} MB | {peak / 1e6 / concurrency:6.2f} MB per in-flight upload "
+          f"| wall {wall:.2f}s")
+    return result, peak, wall
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=64)
+    parser.add_argument("--size-mb", type=float, default=6)
+    parser.add_argument("--max-concurrent", type=int, default=8)
+    parser.add_argument("--acquire-timeout", type=float, default=0.05)
+    args = parser.parse_args()
+
+    size = int(args.size_mb * 1024 * 1024)
+    workdir = tempfile.mkdtemp(prefix="bench_upload_")
+    report = {"uploads": args.uploads, "size_mb": args.size_mb, "max_concurrent": args.max_concurrent}
+    try:
+        print(f"\n📤 {args.uploads} uploads x {args.size_mb} MB")
+
+        async def legacy():
+            uploads = [FakeUpload(size, i) for i in range(args.max_concurrent)]
+            return await asyncio.gather(*(legacy_read(u, workdir) for u in uploads))
+        _, peak, _ = measure("legacy file.read()", legacy, args.max_concurrent)
+        report["legacy_peak_mb_per_upload"] = round(peak / 1e6 / args.max_concurrent, 3)
+
+        # Same in-flight count, spooled: memory bounded by chunk size.
+        spool = UploadSpool(os.path.join(workdir, "spool"), max_bytes=size + 1,
+                            max_concurrent=args.max_concurrent, acquire_timeout=60)
+        (latencies, _), peak, wall = measure(
+            "spooled (chunked)",
+            lambda: run_spool([FakeUpload(size, i, delay=0.0005) for i in range(args.uploads)], spool),
+            args.max_concurrent)
+        report["spool_peak_mb_per_upload"] = round(peak / 1e6 / args.max_concurrent, 3)
+        report["spool_latency"] = summarize(latencies)
+        report["spool_throughput_mb_s"] = round(args.uploads * args.size_mb / wall, 1)
+
+        # Duplicate uploads are stored once.
+        dup_spool = UploadSpool(os.path.join(workdir, "dup"), max_bytes=size + 1, acquire_timeout=60)
+        asyncio.run(run_spool([FakeUpload(size, 1) for _ in range(8)], dup_spool))
+        report["dedup_stats"] = dict(dup_spool.stats)
+
+        # Concurrency limit: a burst larger than the limit with a short acquire timeout gets 429s.
+        busy = UploadSpool(os.path.join(workdir, "busy"), max_bytes=size + 1,
+                           max_concurrent=args.max_concurrent, acquire_timeout=args.acquire_timeout)
+        _, rejected = asyncio.run(run_spool([FakeUpload(size, i, delay=0.002) for i in range(args.uploads)], busy))
+        report["burst_rejections"] = rejected
+
+        # Size limit
+        small = UploadSpool(os.path.join(workdir, "small"), max_bytes=size // 2)
+        _, rejected = asyncio.run(run_spool([FakeUpload(size, 0)], small))
+        report["oversize_rejections"] = rejected
+
+        print(f"   Burst of {args.uploads} at limit {args.max_concurrent}: rejected {report['burst_rejections']}")
+        print(f"   Oversize rejected: {report['oversize_rejections']} | dedup: {report['dedup_stats']['deduplicated']}/8")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    save_report("upload_load", report)
+
+
+if __name__ == "__main__":
+    main()
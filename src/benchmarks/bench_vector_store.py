@@ -0,0 +1,144 @@
+"""
+Knowledge-base vector store: memmap (float16 file + SQLite) vs Chroma.
+
+A synthetic corpus of clustered 384-d embeddings (MiniLM size) with chunk text is
+written once per backend; then a fresh subprocess per backend measures what a
+server start pays: open time (until the first query is answered), query latency
+over --queries random queries (top-10) and RSS. For memmap the IVF index is also
+measured (recall@10 against exact search). Chroma is skipped when not installed.
+
+Usage: python src/benchmarks/bench_vector_store.py [--chunks 5000] [--queries 300] [--backends memmap,ivf,chroma]
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+import numpy as np
+
+from src.core.vector_store import make_vector_store
+from src.benchmarks.common import Timer, summarize, save_report
+
+DIM = 384
+
+
+def corpus(chunks, seed=43):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(8, chunks // 100), DIM)).astype(np.float32)
+    labels = rng.integers(0, len(centers), chunks)
+    vectors = centers[labels] + 0.6 * rng.normal(size=(chunks, DIM)).astype(np.float32)
+    queries = centers[rng.integers(0, len(centers), 1000)] + 0.6 * rng.normal(size=(1000, DIM)).astype(np.float32)
+    return vectors, queries
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return round(int(line.split()[1]) / 1024, 1)
+    return 0.0
+
+
+def open_store(backend, workdir):
+    kind = "chroma" if backend == "chroma" else "memmap"
+    settings = {} if kind == "chroma" else {"ivf_min_rows": 0 if backend == "ivf" else 10 ** 12}
+    return make_vector_store(kind, os.path.join(workdir, backend), os.path.join(workdir, f"{backend}.db"), **settings)
+
+
+def build(backend, workdir, chunks):
+    vectors, _ = corpus(chunks)
+    store = open_store(backend, workdir)
+    with Timer() as t:
+        for start in range(0, chunks, 500):
+            batch = vectors[start:start + 500]
+            ids = [f"doc{start // 500}_{i}" for i in range(len(batch))]
+            docs = [f"Chính sách số {start + i}: đổi trả trong 7 ngày, bảo hành 12 tháng." for i in range(len(batch))]
+            store.add(ids, batch, docs, [{"source": f"doc{start // 500}.txt"} for _ in batch])
+    return t.ms
+
+
+def measure(backend, workdir, chunks, queries):
+    """Child process: cold open + queries."""
+    _, query_vectors = corpus(chunks)
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    store = open_store(backend, workdir)
+    store.query(query_vectors[0], top_k=10)
+    open_ms = (time.perf_counter() - start) * 1000
+    latencies = []
+    for q in query_vectors[1:queries + 1]:
+        with Timer() as t:
+            store.query(q, top_k=10)
+        latencies.append(t.ms)
+    recall = None
+    if backend == "ivf":
+        exact = open_store("memmap", workdir)
+        found = [len({d for d, _, _ in store.query(q, 10)} & {d for d, _, _ in exact.query(q, 10)}) / 10
+                 for q in query_vectors[:100]]
+        recall = round(sum(found) / len(found), 4)
+    return {"open_ms": round(open_ms, 2), "query": summarize(latencies), "rss_delta_mb": round(rss_mb() - rss_before, 1),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1), "recall_at_10": recall}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--backends", default="memmap,ivf,chroma")
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)  # backend, workdir
+    args = parser.parse_args()
+
+    if args.child:
+        print("RESULT " + json.dumps(measure(args.child[0], args.child[1], args.chunks, args.queries)))
+        return
+
+    workdir = tempfile.mkdtemp(prefix="bench_vectors_")
+    report = {"chunks": args.chunks, "dim": DIM, "queries": args.queries, "backends": {}}
+    try:
+        for backend in args.backends.split(","):
+            if backend == "ivf" and os.path.isdir(os.path.join(workdir, "memmap")):
+                shutil.copytree(os.path.join(workdir, "memmap"), os.path.join(workdir, "ivf"))
+                shutil.copy(os.path.join(workdir, "memmap.db"), os.path.join(workdir, "ivf.db"))
+                with Timer() as t:
+                    open_store("ivf", workdir).build_index()
+                build_ms = t.ms
+            else:
+                try:
+                    build_ms = build(backend, workdir, args.chunks)
+                except ImportError as e:
+                    report["backends"][backend] = {"error": str(e)}
+                    continue
+            child = subprocess.run([sys.executable, os.path.abspath(__file__), "--chunks", str(args.chunks),
+                                    "--queries", str(args.queries), "--child", backend, workdir],
+                                   capture_output=True, text=True)
+            line = next((l for l in child.stdout.splitlines() if l.startswith("RESULT ")), None)
+            if line is None:
+                report["backends"][backend] = {"error": (child.stderr.strip().splitlines() or ["failed"])[-1]}
+                continue
+            report["backends"][backend] = dict(json.loads(line[len("RESULT "):]), build_ms=round(build_ms, 1))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n🧭 Vector store ({args.chunks} chunks x {DIM}d, {args.queries} queries, top-10)")
+    for backend, r in report["backends"].items():
+        if "error" in r:
+            print(f"   {backend:<7} skipped: {r['error']}")
+            continue
+        recall = f" | recall@10 {r['recall_at_10']:.3f}" if r["recall_at_10"] is not None else ""
+        print(f"   {backend:<7} open {r['open_ms']:>8.1f} ms | query p50 {r['query']['p50_ms']:>7.3f} ms "
+              f"p95 {r['query']['p95_ms']:>7.3f} ms | RSS +{r['rss_delta_mb']:>6.1f} MB | "
+              f"build {r['build_ms'] / 1000:>6.2f} s{recall}")
+    save_report("vector_store", report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Vision latency per mode on CPU.
+
+Measures for each mode (fast / quality):
+- single image latency (one generate per image),
+- micro-batched throughput through VisionService with concurrent submits,
+- cache-hit latency for a repeated image.
+
+Usage: python src/benchmarks/bench_vision.py [--images 8] [--max-resolution 768]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")  # CPU numbers are the point of this bench
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from PIL import Image, ImageDraw
+from src.agents.vision import VisionAgent
+from src.core.vision_service import VisionService
+from src.benchmarks.common import Timer, summarize, save_report
+
+
+def synthetic_receipt(i, size=(1600, 2000)):
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    lines = ["CUA HANG BABYWORLD", f"HOA DON #{1000 + i}", "Bim Bobby M   2 x 185.000", "Sua Meiji 9   1 x 520.000",
+             f"TONG CONG: {890000 + i * 1000:,}"]
+    for row, text in enumerate(lines):
+        draw.text((80, 120 + row * 90), text, fill="black")
+    buf = io.BytesIO()
+    image.save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=8)
+    parser.add_argument("--max-resolution", type=int, default=None)
+    args = parser.parse_args()
+
+    agent = VisionAgent()
+    if not agent.model:
+        print("❌ Vision model unavailable; nothing to benchmark.")
+        return
+    if args.max_resolution:
+        agent.max_resolution = args.max_resolution
+
+    images = [synthetic_receipt(i) for i in range(args.images)]
+    report = {"device": agent.device, "max_resolution": agent.max_resolution, "images": args.images, "modes": {}}
+
+    for mode in agent.settings["modes"]:
+        single = []
+        for data in images:
+            with Timer() as t:
+                agent.analyze_image(data, task_hint="OCR", mode=mode)
+            single.append(t.ms)
+
+        service = VisionService(agent)
+        start = time.perf_counter()
+        futures = [service.submit(data, "OCR", mode) for data in images]
+        for f in futures:
+            f.result()
+        batched_s = time.perf_counter() - start
+
+        hits = []
+        for data in images:
+            with Timer() as t:
+                service.analyze(data, "OCR", mode)
+            hits.append(t.ms)
+
+        report["modes"][mode] = {
+            "single": summarize(single),
+            "batched_images_per_s": round(args.images / batched_s, 3),
+            "batched_wall_ms": round(batched_s * 1000, 1),
+            "cache_hit": summarize(hits),
+            "service_stats": dict(service.stats),
+        }
+        print(f"\n👁️ Mode '{mode}': single p50 {report['modes'][mode]['single']['p50_ms']:.0f} ms | "
+              f"batched {report['modes'][mode]['batched_images_per_s']} img/s | "
+              f"cache hit p50 {report['modes'][mode]['cache_hit']['p50_ms']:.3f} ms")
+
+    save_report("vision_latency", report)
+
+
+if __name__ == "__main__":
+    main()
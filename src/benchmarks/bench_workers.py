@@ -0,0 +1,163 @@
+"""
+API throughput vs front-end workers, with the models in a separate model server.
+
+Starts src/model_server.py (LLM_BACKEND=fake) on a scratch Unix socket, then for
+each worker count runs `uvicorn src.server:app --workers N` against it and drives
+the bench_e2e workload (chat, data lookups, automation design, marketing, /plan)
+over HTTP from --concurrency client threads for --seconds.
+"in-process" is the old layout: one worker that loads the (fake) model itself.
+
+Reports requests/s, p50/p95 latency and errors per layout.
+
+Usage: python src/benchmarks/bench_workers.py [--workers 1,2,4] [--concurrency 16] [--seconds 20]
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.benchmarks.common import summarize, save_report
+from src.benchmarks.bench_e2e import WORKLOAD
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until(check, timeout, what):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if check():
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"timed out waiting for {what}")
+
+
+def healthy(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+    conn.request("GET", "/health")
+    return conn.getresponse().status == 200
+
+
+def drive(port, concurrency, seconds, seed):
+    results, lock = [], threading.Lock()
+    stop_at = time.perf_counter() + seconds
+
+    def client(i):
+        rng = random.Random(seed + i)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+        while time.perf_counter() < stop_at:
+            category, endpoint, message, expected = rng.choice(WORKLOAD)
+            body = {"user_id": 1, "store_id": 1, "message": message} if endpoint == "/chat" else {"prompt": message}
+            start = time.perf_counter()
+            try:
+                conn.request("POST", endpoint, json.dumps(body), {"Content-Type": "application/json"})
+                response = conn.getresponse()
+                payload = json.loads(response.read() or b"{}")
+                ok = response.status == 200 and (expected is None or payload.get("action_taken") == expected)
+            except (OSError, http.client.HTTPException, ValueError):
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+                ok = False
+            with lock:
+                results.append(((time.perf_counter() - start) * 1000, ok))
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    return {"requests": len(results), "throughput_rps": round(len(results) / wall, 2),
+            "errors": sum(1 for _, ok in results if not ok), "latency": summarize([ms for ms, _ in results])}
+
+
+def run_layout(workers, socket_path, env, args):
+    port = free_port()
+    layout_env = dict(env, MODEL_SERVER_SOCKET=socket_path or "")
+    api = subprocess.Popen([sys.executable, "-m", "uvicorn", "src.server:app", "--host", "127.0.0.1",
+                            "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+                           cwd=project_root, env=layout_env, stdout=subprocess.DEVNULL)
+    try:
+        wait_until(lambda: healthy(port), 120, f"API on port {port}")
+        drive(port, args.concurrency, 2, seed=0)  # Warm-up
+        return drive(port, args.concurrency, args.seconds, seed=41)
+    finally:
+        api.terminate()
+        api.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4", help="Front-end worker counts to compare")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--first-token-ms", type=float, default=5)
+    parser.add_argument("--tokens-per-second", type=float, default=5000)
+    parser.add_argument("--prefill-tokens-per-second", type=float, default=200000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_workers_")
+    socket_path = os.path.join(workdir, "models.sock")
+    env = dict(os.environ, **{
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_FIRST_TOKEN_MS": str(args.first_token_ms),
+        "FAKE_LLM_TOKENS_PER_SECOND": str(args.tokens_per_second),
+        "FAKE_LLM_PREFILL_TOKENS_PER_SECOND": str(args.prefill_tokens_per_second),
+        "PROJECT_A_DB_PATH": os.path.join(workdir, "project_a.db"),
+        "PROJECT_A_WORKFLOW_DIR": os.path.join(workdir, "workflows"),
+        "PROJECT_A_SPOOL_DIR": os.path.join(workdir, "spool"),
+        "AI_SHARED_KEY": "",
+        "LOG_FORMAT": "text",
+    })
+    # Create and seed the DB once, before several workers open it at the same time
+    subprocess.run([sys.executable, "-c", "from src.core.memory import MemoryManager; MemoryManager()"],
+                   cwd=project_root, env=env, check=True, stdout=subprocess.DEVNULL)
+
+    model_server = subprocess.Popen([sys.executable, os.path.join(project_root, "src", "model_server.py")],
+                                    cwd=project_root, env=dict(env, MODEL_SERVER_SOCKET=socket_path),
+                                    stdout=subprocess.DEVNULL)
+    report = {"concurrency": args.concurrency, "seconds": args.seconds, "cpus": os.cpu_count(),
+              "fake_llm": {"first_token_ms": args.first_token_ms, "tokens_per_second": args.tokens_per_second,
+                           "prefill_tokens_per_second": args.prefill_tokens_per_second},
+              "layouts": {}}
+    try:
+        wait_until(lambda: os.path.exists(socket_path), 120, "model server socket")
+        report["layouts"]["in-process"] = run_layout(1, None, env, args)
+        for workers in (int(w) for w in args.workers.split(",")):
+            report["layouts"][f"{workers} worker(s)"] = run_layout(workers, socket_path, env, args)
+    finally:
+        model_server.terminate()
+        model_server.wait(timeout=30)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    base = report["layouts"]["in-process"]["throughput_rps"]
+    print(f"\n👷 API workers ({args.concurrency} clients, {args.seconds:g}s each, fake LLM "
+          f"{args.tokens_per_second:g} tok/s, {report['cpus']} CPUs)")
+    for name, r in report["layouts"].items():
+        print(f"   {name:<12} {r['throughput_rps']:>7.1f} req/s ({r['throughput_rps'] / base:.2f}x) | "
+              f"p50 {r['latency']['p50_ms']:>7.1f} ms | p95 {r['latency']['p95_ms']:>7.1f} ms | "
+              f"{r['errors']} errors")
+    save_report("workers", report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Workflow persistence benchmark: DB size and save latency, legacy vs WorkflowStore.
+
+Blueprints are built from the bundled Make.com examples (src/data/blueprints), grown
+towards ~1 MB by repeating modules (which flatters compression ratios; the examples
+alone compress ~4-25x), with a share of re-saved identical blueprints
+(users saving the same generated flow twice, templates deployed to many stores).
+
+- legacy: json.dumps into workflows.json_structure + synchronous indent=4 file write
+- store:  compressed, content-hash deduplicated blob + write-behind export
+
+Usage: python src/benchmarks/bench_workflows.py [--saves 200] [--target-kb 900] [--duplicate-ratio 0.3]
+"""
+import argparse
+import copy
+import glob
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.core.memory import MemoryManager
+from src.core.workflow_store import WorkflowStore
+from src.benchmarks.common import Timer, summarize, save_report
+
+
+def load_examples():
+    examples = []
+    for path in sorted(glob.glob(os.path.join(project_root, "src", "data", "blueprints", "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            examples.append(json.load(f))
+    return examples
+
+
+def grow(blueprint, target_bytes, rng):
+    """Repeats flow modules (with fresh ids) until the blueprint reaches ~target_bytes."""
+    grown = copy.deepcopy(blueprint)
+    modules = blueprint.get("flow") or [{}]
+    size = len(json.dumps(grown, ensure_ascii=False))
+    next_id = 1000
+    while size < target_bytes:
+        module = copy.deepcopy(rng.choice(modules))
+        module["id"] = next_id
+        next_id += 1
+        grown["flow"].append(module)
+        size += len(json.dumps(module, ensure_ascii=False))
+    grown["name"] = f"{blueprint.get('name', 'Flow')} #{rng.randint(0, 10 ** 6)}"
+    return grown
+
+
+def db_size(path):
+    return sum(os.path.getsize(p) for p in glob.glob(path + "*"))  # Includes -wal/-journal files
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--saves", type=int, default=200)
+    parser.add_argument("--target-kb", type=int, default=900)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.3)
+    args = parser.parse_args()
+
+    rng = random.Random(13)
+    examples = load_examples()
+    payloads = []
+    for _ in range(args.saves):
+        if payloads and rng.random() < args.duplicate_ratio:
+            payloads.append(rng.choice(payloads))
+        else:
+            payloads.append(grow(rng.choice(examples), args.target_kb * 1024, rng))
+
+    workdir = tempfile.mkdtemp(prefix="bench_workflows_")
+    try:
+        # Legacy path
+        legacy_db = os.path.join(workdir, "legacy.db")
+        legacy_dir = os.path.join(workdir, "legacy_files")
+        os.makedirs(legacy_dir)
+        memory = MemoryManager(db_path=legacy_db)
+        base_size = db_size(legacy_db)
+        legacy_ms = []
+        for i, payload in enumerate(payloads):
+            with Timer() as t:
+                wf_id = memory.save_workflow(1, f"Flow {i}", payload)
+                with open(os.path.join(legacy_dir, f"WF_{wf_id}.json"), "w", encoding="utf-8") as f:
+                    json.dump(payload, f, indent=4, ensure_ascii=False)
+            legacy_ms.append(t.ms)
+        legacy_size = db_size(legacy_db) - base_size
+
+        # WorkflowStore path
+        store_db = os.path.join(workdir, "store.db")
+        MemoryManager(db_path=store_db)  # Creates the schema
+        store = WorkflowStore(store_db, os.path.join(workdir, "store_files"))
+        base_size = db_size(store_db)
+        store_ms = []
+        with Timer() as wall:
+            for i, payload in enumerate(payloads):
+                with Timer() as t:
+                    store.save(1, f"Flow {i}", payload)
+                store_ms.append(t.ms)
+            store.flush()
+        store_size = db_size(store_db) - base_size
+
+        with Timer() as t:
+            listed = store.list(1, limit=args.saves)
+        list_ms = t.ms
+        with Timer() as t:
+            store.get(listed[0]["id"])
+        get_ms = t.ms
+
+        raw_mb = sum(len(json.dumps(p, ensure_ascii=False).encode("utf-8")) for p in payloads) / 1e6
+        report = {
+            "saves": args.saves, "avg_payload_kb": round(raw_mb * 1000 / args.saves, 1),
+            "duplicate_ratio": args.duplicate_ratio, "codec": store.codec.name,
+            "legacy": {"db_mb": round(legacy_size / 1e6, 2), "save": summarize(legacy_ms)},
+            "store": {"db_mb": round(store_size / 1e6, 2), "save": summarize(store_ms),
+                      "wall_including_exports_s": round(wall.ms / 1000, 2), "stats": dict(store.stats)},
+            "list_ms": round(list_ms, 3), "get_decompressed_ms": round(get_ms, 2),
+        }
+        print(f"\n🗂️  {args.saves} saves, ~{report['avg_payload_kb']} KB each ({args.duplicate_ratio:.0%} re-saves)")
+        print(f"   Legacy : DB +{report['legacy']['db_mb']} MB | save p50 {report['legacy']['save']['p50_ms']:.1f} ms")
+        print(f"   Store  : DB +{report['store']['db_mb']} MB ({store.codec.name}) | "
+              f"save p50 {report['store']['save']['p50_ms']:.1f} ms | {store.stats['deduplicated']} deduplicated")
+        print(f"   List {args.saves} workflows: {list_ms:.2f} ms | fetch one: {get_ms:.2f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    save_report("workflow_store", report)
+
+
+if __name__ == "__main__":
+    main()
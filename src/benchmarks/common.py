@@ -0,0 +1,75 @@
+import json
+import os
+import subprocess
+import time
+from datetime import datetime
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "bench_results")
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile (pct in 0..100). Returns 0.0 for empty input."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies_ms):
+    if not latencies_ms:
+        return {"count": 0}
+    return {
+        "count": len(latencies_ms),
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 3),
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "p99_ms": round(percentile(latencies_ms, 99), 3),
+        "max_ms": round(max(latencies_ms), 3),
+    }
+
+
+class Timer:
+    """`with Timer() as t: ...` then read `t.ms`."""
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.ms = (time.perf_counter() - self._start) * 1000
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def save_report(name, report):
+    """Writes bench_results/<name>.json (tagged with commit + timestamp) and returns the path."""
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    payload = {"benchmark": name, "commit": _git_commit(),
+               "timestamp": datetime.now().isoformat(timespec="seconds"), "results": report}
+    path = os.path.join(RESULTS_DIR, f"{name}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+    print(f"💾 Report saved: {path}")
+    return path
+
+
+def load_token_counter():
+    """
+    Returns (count_fn, source). Uses the configured LLM tokenizer when it can be loaded,
+    otherwise falls back to a UTF-8 bytes / 3 estimate (reported as "estimate").
+    """
+    try:
+        from transformers import AutoTokenizer
+        from src.core.config import get_config
+        tokenizer = AutoTokenizer.from_pretrained(get_config().models["manager"])
+        return (lambda text: len(tokenizer.encode(text, add_special_tokens=False))), "tokenizer"
+    except Exception as e:
+        print(f"⚠️ Tokenizer unavailable ({e}); using bytes/3 estimate.")
+        return (lambda text: len(text.encode("utf-8")) / 3.0), "estimate"
@@ -1,24 +1,56 @@
-import torch
+import functools
 import os
 
+from src.core.hardware import PROFILES, choose, probe
+
+DEFAULT_MODEL_ID = "Qwen/Qwen2.5-Coder-14B-Instruct"
+DEFAULT_CPU_MODEL_ID = "Qwen/Qwen2.5-Coder-1.5B-Instruct"
+
+
+def _flag(name, default):
+    """Boolean env override; `default` when unset."""
+    value = os.environ.get(name)
+    return default if value in (None, "") else value in ["1", "true", "True"]
+
+
 class Config:
+    """
+    Settings for every component. Defaults that depend on the machine (backend, model,
+    quantization, KV/batch sizes, threads, optional models) come from the hardware
+    profile (src/core/hardware.py); env vars override them. Use get_config() to share
+    one instance per process.
+    """
     def __init__(self):
         # Resolve paths relative to THIS file (src/core/config.py) -> Go up 2 levels to Root
         self.PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         
         # Data now lives inside SRC for portability
         self.SRC_DATA_DIR = os.path.join(self.PROJECT_ROOT, 'src', 'data')
-        self.DB_PATH = os.path.join(self.SRC_DATA_DIR, 'project_a.db')
+        self.DB_PATH = os.environ.get("PROJECT_A_DB_PATH") or os.path.join(self.SRC_DATA_DIR, 'project_a.db')
         
         # RAG Docs remain in root data for easy upload, or move to src if preferred
         self.DOCS_DIR = os.path.join(self.PROJECT_ROOT, 'data', 'docs') 
         
+        # Human-readable workflow exports (written in the background by WorkflowStore)
+        self.WORKFLOW_DIR = os.environ.get("PROJECT_A_WORKFLOW_DIR") or os.path.join(self.PROJECT_ROOT, 'my_workflows')
+
+        # Uploaded images are spooled here, away from the DB directory
+        self.SPOOL_DIR = os.environ.get("PROJECT_A_SPOOL_DIR") or os.path.join(self.PROJECT_ROOT, 'spool', 'uploads')
+
         os.makedirs(self.SRC_DATA_DIR, exist_ok=True)
         os.makedirs(self.DOCS_DIR, exist_ok=True)
         
         self.SYSTEM_CONTEXT = "You are Project A, a Retail Assistant."
 
-        MODEL_ID = "Qwen/Qwen2.5-Coder-14B-Instruct"
+        # Probed once per process (HARDWARE_PROFILE=<name> simulates a machine, see hardware.PROFILES)
+        self.hardware = probe(os.environ.get("HARDWARE_PROFILE") or None)
+        self.profile = choose(self.hardware)
+        profile = self.profile
+
+        # "hf" loads the models below on the GPU; "cpu" a smaller model without one (see self.cpu);
+        # "fake" is a scripted model with simulated latency (benchmarks). Default: what the profile picked.
+        self.llm_backend = os.environ.get("LLM_BACKEND") or profile["backend"]
+        MODEL_ID = os.environ.get("LLM_MODEL_ID") or (profile["model_id"] if profile["backend"] == "hf" else DEFAULT_MODEL_ID)
 
         self.models = {
             "manager": MODEL_ID,
@@ -26,14 +58,187 @@ class Config:
             "researcher": MODEL_ID
         }
         
-        self.quantization = {
-            "load_in_8bit": True,
+        cpu_quantize = os.environ.get("CPU_QUANTIZE", "auto")
+        self.cpu = {
+            "model_id": os.environ.get("CPU_MODEL_ID") or (profile["model_id"] if profile["backend"] == "cpu" else DEFAULT_CPU_MODEL_ID),
+            "runtime": os.environ.get("CPU_RUNTIME", "torch"),    # torch | onnx (needs optimum[onnxruntime])
+            # int8 | bf16 | none; auto = bf16 where the CPU has native bf16, int8 otherwise
+            "quantize": ("bf16" if self.hardware["cpu_bf16"] else "int8") if cpu_quantize == "auto" else cpu_quantize,
+            "threads": int(os.environ.get("CPU_THREADS", "0")) or profile["cpu_threads"],  # default: ~physical cores
+            "onnx_dir": os.path.join(self.PROJECT_ROOT, 'models', 'onnx'),
         }
+        # Simulated profiles also set the simulated decode speed (FAKE_LLM_* still win)
+        fake_speed = PROFILES.get(self.hardware["profile"], {}).get("fake_llm", {})
+        self.fake_llm = {
+            "first_token_ms": float(os.environ.get("FAKE_LLM_FIRST_TOKEN_MS") or fake_speed.get("first_token_ms", 50)),
+            "tokens_per_second": float(os.environ.get("FAKE_LLM_TOKENS_PER_SECOND") or fake_speed.get("tokens_per_second", 25)),
+            "prefill_tokens_per_second": float(os.environ.get("FAKE_LLM_PREFILL_TOKENS_PER_SECOND", "4000")),
+            "batch_decode_overhead": 0.05,  # Extra decode step time per additional row in a batch
+        }
+
+        # bitsandbytes settings for the hf backend; None = unquantized (checkpoint dtype)
+        quantization = os.environ.get("LLM_QUANTIZATION") or profile["quantization"]   # none | 8bit | 4bit
+        self.quantization = {
+            "none": None,
+            "8bit": {"load_in_8bit": True},
+            "4bit": {"load_in_4bit": True, "bnb_4bit_quant_type": "nf4", "bnb_4bit_use_double_quant": True,
+                     "bnb_4bit_compute_dtype": profile["compute_dtype"] if profile["backend"] == "hf" else "float16"},
+        }[quantization]
+        # Tokens of KV cache the model memory leaves room for (all concurrent generations together)
+        self.kv_cache_tokens = profile["kv_cache_tokens"]
         
-        # OPTIMIZATION: Utilization of extra VRAM
-        # We increase max_new_tokens to allow for MASSIVE blueprints.
+        # max_new_tokens: up to 4096 (MASSIVE blueprints) where the KV budget allows it
         self.generation = {
-            "max_new_tokens": 4096, # Doubled from 2048
+            "max_new_tokens": int(os.environ.get("MAX_NEW_TOKENS", "0")) or profile["max_new_tokens"],
             "temperature": 0.2,
             "do_sample": True
-        }
\ No newline at end of file
+        }
+
+        # Vision (Florence-2). "fast" = greedy decoding for OCR, "quality" = beam search.
+        # Loaded when the GPU has room next to the LLM (hf backend only); ENABLE_VISION=0/1 overrides.
+        self.vision = {
+            "enabled": _flag("ENABLE_VISION", profile["vision"] and self.llm_backend == "hf"),
+            "model_id": "microsoft/Florence-2-large",
+            "max_resolution": int(os.environ.get("VISION_MAX_RESOLUTION", "1024")), # Longest side, px
+            "modes": {
+                "fast": {"num_beams": 1, "max_new_tokens": 512},
+                "quality": {"num_beams": 3, "max_new_tokens": 1024},
+            },
+            "batch_window_ms": 20,   # How long the batcher waits to fill a batch
+            "max_batch_size": profile["vision_batch"],
+            "cache_size": 512,       # Results cached by image content hash
+        }
+
+        # Upload spool: streamed in chunks, content-addressed, garbage-collected.
+        self.uploads = {
+            "max_bytes": int(os.environ.get("UPLOAD_MAX_MB", "10")) * 1024 * 1024,
+            "chunk_size": 64 * 1024,
+            "max_concurrent": int(os.environ.get("UPLOAD_MAX_CONCURRENT", "8")),
+            "ttl_seconds": 6 * 3600,
+            "max_total_bytes": 2 * 1024 ** 3,
+            "gc_interval_seconds": 600,
+        }
+
+        # Per-(user, store) resolved context cache used by the API server
+        self.context_cache = {"max_entries": 1024, "ttl_seconds": 300}
+
+        # Background store health checks (zero revenue, low stock)
+        self.health = {
+            "interval_seconds": int(os.environ.get("HEALTH_INTERVAL_SECONDS", "300")),
+            "window_seconds": 30,   # A run slower than this is logged as overrunning
+            "max_items": 5,         # Low-stock names listed per alert
+        }
+
+        # In-memory product search over the inventory table
+        self.inventory = {
+            "refresh_seconds": 5,     # Max staleness before pulling changed rows
+            "fuzzy_min_score": 0.3,   # Trigram similarity cut-off for typo matches
+            "reconcile_seconds": 60,  # Full re-read: drops deleted rows, catches out-of-order updated_at
+        }
+
+        # CRM lookups: frequently queried stores are held in memory (sorted phone/name keys)
+        self.crm = {
+            "max_hot_stores": 32,
+            "max_hot_rows": 200000,   # Larger stores are served from the SQL indexes only
+            "hot_after": 3,           # Lookups before a store is loaded
+            "refresh_seconds": 5,     # Max staleness before checking a hot store for new/deleted rows
+            "reload_seconds": 300,    # Full re-read: catches renames and phone changes
+        }
+
+        # Metrics (/metrics), per-request traces (/traces/{id}) and log format ("text" prints, "json" records)
+        self.observability = {
+            "enabled": os.environ.get("METRICS_ENABLED", "1") in ["1", "true", "True"],
+            "log_format": os.environ.get("LOG_FORMAT", "text"),
+            "trace_buffer": 256,      # Recent traces kept for /traces/{id}
+        }
+
+        # Model server (src/model_server.py): one process owns the models, API workers call it over
+        # this Unix socket. Empty = the API process loads the models itself (single worker).
+        self.model_server = {
+            "socket": os.environ.get("MODEL_SERVER_SOCKET", ""),
+            "timeout_seconds": 600,
+            "max_caches": profile["max_caches"],  # KV caches of in-progress multi-turn generations
+        }
+
+        # TECHNICAL path: plan + blueprint in one conversation (KV cache reused), plan capped by step count
+        self.automation = {
+            "pipelined": os.environ.get("AUTOMATION_PIPELINED", "1") in ["1", "true", "True"],
+            "max_plan_steps": int(os.environ.get("AUTOMATION_MAX_PLAN_STEPS", "8")),
+        }
+
+        # Knowledge base (RAG) vectors: "memmap" = float16 file under data/vector_db + chunk table in the
+        # main DB (no server, instant start); "chroma" = the chromadb persistent collection
+        self.knowledge = {
+            "vector_store": os.environ.get("VECTOR_STORE", "memmap"),
+            "ivf_min_rows": 50000,    # Exact search below this many chunks, IVF lists above
+            "ivf_lists": 0,           # 0 = sqrt(chunks)
+            "nprobe": 8,              # IVF lists scanned per query
+            "reranker": _flag("ENABLE_RERANKER", profile["reranker"]),  # Cross-encoder re-ranking of hits
+        }
+
+        # Chat history retention (per tenant): turns older than hot_days or beyond keep_turns are folded
+        # into monthly summaries, archived to <archive_dir>/<YYYY-MM>.jsonl.gz and deleted from the DB.
+        # Per-tenant overrides: HistoryRetention.set_policy (table retention_policies).
+        self.retention = {
+            "interval_seconds": int(os.environ.get("HISTORY_RETENTION_INTERVAL_SECONDS", "3600")),
+            "hot_days": int(os.environ.get("HISTORY_HOT_DAYS", "30")),
+            "keep_turns": int(os.environ.get("HISTORY_KEEP_TURNS", "200")),
+            "archive": os.environ.get("HISTORY_ARCHIVE", "1") in ["1", "true", "True"],
+            "archive_dir": os.environ.get("HISTORY_ARCHIVE_DIR") or os.path.join(self.PROJECT_ROOT, 'archive', 'history'),
+            "archive_months": 0,      # Monthly archive files kept; 0 = forever
+            "batch_rows": 5000,       # Rows per transaction (bounds how long the write lock is held)
+            "vacuum_pages": 2000,     # Free pages released per run (4 KB each)
+        }
+
+        # /chat (DATA_INTERNAL, GENERAL): the manager may call RetailTools / SaasAPI functions (src/core/tool_calling.py)
+        self.tools = {
+            "enabled": os.environ.get("TOOL_CALLING", "1") in ["1", "true", "True"],
+            "max_rounds": max(1, int(os.environ.get("TOOL_MAX_ROUNDS", "3"))),  # LLM calls per answer, incl. the final one
+            "max_workers": profile["tool_workers"],  # Tool calls of one reply run concurrently
+            "timeout_seconds": 10.0,
+        }
+
+        # /chat: simple metric questions (revenue, orders, stock, low stock) answered from templates, no LLM
+        self.fast_path = {
+            "enabled": os.environ.get("FAST_PATH", "1") in ["1", "true", "True"],
+            "max_words": 14,          # Longer messages always go to the LLM
+        }
+
+        # /plan: generated graphs are reused for semantically similar prompts
+        self.plan_cache = {
+            "embedder": os.environ.get("PLAN_CACHE_EMBEDDER", "auto"),  # auto | minilm | hashing
+            "threshold": None,        # Cosine cut-off; None = the embedder's default (0.90)
+            "max_entries": 2000,
+        }
+
+        # Offline batch mode (src/batch.py): requests generated together
+        self.batch = {
+            "batch_size": int(os.environ.get("BATCH_SIZE", "0")) or self.profile["batch_size"],
+        }
+
+    def describe(self):
+        """One line: the machine and what was picked for it."""
+        hw = self.hardware
+        gpus = ", ".join(f"{g['name']} {g['vram_gb']:g} GB" for g in hw["gpus"]) or "no GPU"
+        source = f"profile {hw['profile']}" if hw["simulated"] else "detected"
+        if self.llm_backend == "cpu":
+            model = f"{self.cpu['model_id']} ({self.cpu['threads']} threads)"
+        elif self.llm_backend == "hf":
+            quantization = "unquantized" if self.quantization is None else \
+                "8bit" if self.quantization.get("load_in_8bit") else "4bit"
+            model = f"{self.models['manager']} ({quantization})"
+        else:
+            model = self.llm_backend
+        return (f"🖥️ [Config] {source}: {hw['cpu_count']} CPUs, {hw['ram_gb']:g} GB RAM, {gpus} -> {model}, "
+                f"KV {self.kv_cache_tokens // 1000}k tokens, max_new_tokens {self.generation['max_new_tokens']}, "
+                f"batch {self.batch['batch_size']}, vision {'on' if self.vision['enabled'] else 'off'}, "
+                f"reranker {'on' if self.knowledge['reranker'] else 'off'}")
+
+
+@functools.lru_cache(maxsize=None)
+def get_config():
+    """The process-wide Config (env read, hardware probed and directories created once); logs the profile."""
+    from src.core.metrics import log_status
+    config = Config()
+    log_status(config.describe())
+    return config
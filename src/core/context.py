@@ -1,3 +1,8 @@
+import threading
+import time
+from collections import OrderedDict
+
+
 class ContextResolver:
     def __init__(self, memory):
         self.memory = memory
@@ -35,4 +40,99 @@ class ContextResolver:
         - Industry: {store['industry']}
         - Location: {store['location']}
         - ID: {store['id']}
-        '''
\ No newline at end of file
+        '''
+
+class RequestContext:
+    """Per-request tenant context. Passed explicitly to agents instead of mutating shared state."""
+    def __init__(self, user_id, store=None, profile=None, alerts=None, db_context=""):
+        self.user_id = user_id
+        self.store = store
+        self.profile = profile or {}
+        self.alerts = alerts or []
+        self.db_context = db_context
+
+    @property
+    def store_id(self):
+        return self.store["id"] if self.store else None
+
+
+class StoreContextCache:
+    """
+    LRU + TTL cache of resolved store contexts keyed by (user_id, store_id).
+    One DB round-trip per store per TTL instead of per message; entries are
+    invalidated by MemoryManager write notifications. A write that lands while a
+    context is being resolved bumps `_generation`, and the (possibly stale) result
+    is returned but not cached.
+    """
+    def __init__(self, memory, max_entries=1024, ttl_seconds=300):
+        self.memory = memory
+        self.resolver = ContextResolver(memory)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        memory.add_write_listener(self.on_write)
+
+    def get(self, user_id, store_id=None):
+        """
+        Returns a RequestContext, or None if store_id is given but not owned by the user.
+        Without store_id, a user with exactly one store gets that store.
+        """
+        key = (user_id, store_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        ctx = self._resolve(user_id, store_id)
+        if ctx is None:
+            return None
+        with self._lock:
+            if generation != self._generation:
+                return ctx  # Invalidated while resolving
+            self._entries[key] = (now, ctx)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return ctx
+
+    def _resolve(self, user_id, store_id):
+        if store_id is not None:
+            store = self.memory.get_store(user_id, store_id)
+            if store is None:
+                return None
+        else:
+            stores = self.memory.get_user_stores(user_id)
+            if len(stores) != 1:
+                return RequestContext(user_id)  # No store, or ambiguous: no store context
+            store = stores[0]
+
+        profile = self.memory.get_profile()
+        alerts = self.memory.get_latest_alerts(store["id"])
+        parts = [self.resolver._build_context_string(store)]
+        if profile:
+            parts.append("OWNER PROFILE: " + "; ".join(f"{k}: {v}" for k, v in profile.items()))
+        if alerts:
+            parts.append("HEALTH ALERTS: " + " | ".join(alerts))
+        return RequestContext(user_id, store, profile, alerts, "\n".join(parts))
+
+    def on_write(self, table, store_id=None):
+        with self._lock:
+            self._generation += 1
+            if store_id is None:
+                self._entries.clear()  # Global data (e.g. profile) changed
+                return
+            # Storeless contexts (users with zero or several stores) may resolve differently now too
+            for key in [k for k, (_, ctx) in self._entries.items() if ctx.store_id in (store_id, None)]:
+                del self._entries[key]
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
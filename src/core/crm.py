@@ -0,0 +1,249 @@
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import date, datetime
+
+from src.core.text import normalize_query
+
+PHONE_CHARS = re.compile(r"[\s.\-()]")
+
+
+def normalize_phone(raw):
+    """'+84 912.345.678' / '84912345678' / '0912 345 678' -> '0912345678'. None if not a phone."""
+    digits = PHONE_CHARS.sub("", str(raw or ""))
+    if digits.startswith("+"):
+        digits = digits[1:]
+    if not digits.isdigit():
+        return None
+    if digits.startswith("84") and len(digits) >= 11:
+        digits = "0" + digits[2:]
+    return digits
+
+
+class HotStore:
+    """
+    Compact per-store lookup: phones and tone-stripped names in sorted lists with a
+    parallel array of row ids, so exact and prefix lookups are one bisect each.
+    Names are indexed once per word, so "lan" finds "Nguyễn Thị Lan".
+    """
+    def __init__(self, rows):
+        phones = sorted((r[1], r[0]) for r in rows if r[1])
+        self.phones = [p for p, _ in phones]
+        self.phone_ids = array("q", (i for _, i in phones))
+        words = sorted((w, r[0]) for r in rows for w in set((r[2] or "").split()))
+        self.words = [w for w, _ in words]
+        self.word_ids = array("q", (i for _, i in words))
+
+    @staticmethod
+    def _range(keys, prefix):
+        return bisect_left(keys, prefix), bisect_left(keys, prefix + "\uffff")
+
+    def by_phone(self, phone, prefix=False):
+        lo, hi = self._range(self.phones, phone)
+        if not prefix:
+            hi = lo + sum(1 for p in self.phones[lo:hi] if p == phone)
+        return list(self.phone_ids[lo:hi])
+
+    def by_name(self, words):
+        """Ids whose name has a word starting with every query word."""
+        result = None
+        for word in sorted(words, key=len, reverse=True):
+            lo, hi = self._range(self.words, word)
+            ids = set(self.word_ids[lo:hi])
+            result = ids if result is None else result & ids
+            if not result:
+                return []
+        return sorted(result or [])
+
+
+class CustomerDirectory:
+    """
+    Customer lookup over the `customers` table (phone or name, per store).
+
+    - Phone lookups use the (store_id, phone_norm) index; names the (store_id, name_norm)
+      index for full-name prefixes.
+    - Stores that are looked up repeatedly are loaded into a HotStore (LRU of
+      `max_hot_stores`, only stores up to `max_hot_rows` customers), which also
+      supports word-prefix name search. Rows written by other processes show up
+      within `refresh_seconds` (row count / max id watermark) and renames or phone
+      changes within `reload_seconds` (full re-read).
+    - `lookup_many` resolves a batch of phones/names with one query per chunk.
+    """
+    COLUMNS = "id, store_id, name, phone, rank, last_purchase, total_spent"
+
+    def __init__(self, db_path, max_hot_stores=32, max_hot_rows=200000, hot_after=3, refresh_seconds=5,
+                 reload_seconds=300, max_tracked=4096):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.max_hot_stores = max_hot_stores
+        self.max_hot_rows = max_hot_rows
+        self.hot_after = hot_after                  # Lookups before a store is loaded into memory
+        self.refresh_seconds = refresh_seconds
+        self.reload_seconds = reload_seconds
+        self.max_tracked = max_tracked              # Cold stores whose lookups are counted (LRU)
+        self._hot = OrderedDict()                   # store_id -> HotStore
+        self._lookups = OrderedDict()               # store_id -> lookups while cold
+        self._too_large = set()                     # Stores served from SQL only
+        self._lock = threading.Lock()
+
+    # --- Writes ---
+    def upsert(self, store_id, name, phone, rank="Member", last_purchase=None, total_spent=0):
+        phone_norm = normalize_phone(phone)
+        with self._lock:
+            with self.conn:
+                row = self.conn.execute("SELECT id FROM customers WHERE store_id = ? AND phone_norm = ?",
+                                        (store_id, phone_norm)).fetchone() if phone_norm else None
+                values = (store_id, name, phone, phone_norm, normalize_query(name), rank, last_purchase, total_spent)
+                if row:
+                    self.conn.execute('''UPDATE customers SET store_id = ?, name = ?, phone = ?, phone_norm = ?,
+                                         name_norm = ?, rank = ?, last_purchase = ?, total_spent = ? WHERE id = ?''',
+                                      values + (row[0],))
+                    customer_id = row[0]
+                else:
+                    customer_id = self.conn.execute('''INSERT INTO customers (store_id, name, phone, phone_norm,
+                                                       name_norm, rank, last_purchase, total_spent)
+                                                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', values).lastrowid
+            self._hot.pop(store_id, None)
+        return customer_id
+
+    def invalidate(self, store_id=None):
+        with self._lock:
+            if store_id is None:
+                self._hot.clear()
+                self._too_large.clear()
+            else:
+                self._hot.pop(store_id, None)
+                self._too_large.discard(store_id)
+
+    # --- Reads ---
+    def _watermark(self, store_id):
+        # Covered by the (store_id, phone_norm) index; catches inserts and deletes from any writer
+        return tuple(self.conn.execute("SELECT count(*), max(id) FROM customers WHERE store_id = ?",
+                                       (store_id,)).fetchone())
+
+    def _load(self, store_id, now):
+        rows = self.conn.execute('''SELECT id, phone_norm, name_norm FROM customers WHERE store_id = ?
+                                    LIMIT ?''', (store_id, self.max_hot_rows + 1)).fetchall()
+        if len(rows) > self.max_hot_rows:
+            self._hot.pop(store_id, None)
+            self._too_large.add(store_id)
+            return None
+        hot = self._hot[store_id] = HotStore(rows)
+        hot.watermark = (len(rows), max((r[0] for r in rows), default=None))
+        hot.loaded_at = hot.checked_at = now
+        while len(self._hot) > self.max_hot_stores:
+            self._hot.popitem(last=False)
+        return hot
+
+    def _hot_store(self, store_id):
+        """
+        Returns the store's HotStore, loading it once the store has been looked up often
+        enough and reloading it when its watermark moved or it is older than `reload_seconds`.
+        """
+        if store_id is None or store_id in self._too_large:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            hot = self._hot.get(store_id)
+            if hot is not None:
+                self._hot.move_to_end(store_id)
+                if now - hot.loaded_at >= self.reload_seconds:
+                    return self._load(store_id, now)
+                if now - hot.checked_at >= self.refresh_seconds:
+                    hot.checked_at = now
+                    if self._watermark(store_id) != hot.watermark:
+                        return self._load(store_id, now)
+                return hot
+            lookups = self._lookups.pop(store_id, 0) + 1
+            if lookups < self.hot_after:
+                self._lookups[store_id] = lookups
+                while len(self._lookups) > self.max_tracked:
+                    self._lookups.popitem(last=False)
+                return None
+            return self._load(store_id, now)
+
+    def _fetch(self, ids):
+        rows = []
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            rows += self.conn.execute(f"SELECT {self.COLUMNS} FROM customers WHERE id IN "
+                                      f"({','.join('?' * len(chunk))})", chunk).fetchall()
+        order = {cid: n for n, cid in enumerate(ids)}
+        return [self._to_dict(r) for r in sorted(rows, key=lambda r: order[r[0]])]
+
+    @staticmethod
+    def _to_dict(row):
+        customer = {"id": row[0], "store_id": row[1], "name": row[2], "phone": row[3], "rank": row[4],
+                    "last_purchase": row[5], "total_spent": row[6]}
+        if row[5]:
+            try:
+                days = (date.today() - datetime.strptime(row[5][:10], "%Y-%m-%d").date()).days
+                customer["days_since_purchase"] = days
+            except ValueError:
+                pass
+        return customer
+
+    def lookup(self, query, store_id=None, limit=5):
+        """Finds customers by phone (exact, or prefix for partial numbers) or by name."""
+        phone = normalize_phone(query)
+        hot = self._hot_store(store_id)
+        scope, params = ("store_id = ? AND ", (store_id,)) if store_id is not None else ("", ())
+
+        if phone:
+            partial = len(phone) < 10
+            if hot is not None:
+                return self._fetch(hot.by_phone(phone, prefix=partial)[:limit])
+            if partial:
+                sql = f"SELECT {self.COLUMNS} FROM customers WHERE {scope}phone_norm >= ? AND phone_norm < ? LIMIT ?"
+                rows = self.conn.execute(sql, params + (phone, phone + "\uffff", limit)).fetchall()
+            else:
+                sql = f"SELECT {self.COLUMNS} FROM customers WHERE {scope}phone_norm = ? LIMIT ?"
+                rows = self.conn.execute(sql, params + (phone, limit)).fetchall()
+            return [self._to_dict(r) for r in rows]
+
+        words = normalize_query(query).split()
+        if not words:
+            return []
+        if hot is not None:
+            return self._fetch(hot.by_name(words)[:limit])
+        name = " ".join(words)
+        sql = f"SELECT {self.COLUMNS} FROM customers WHERE {scope}name_norm >= ? AND name_norm < ? LIMIT ?"
+        rows = self.conn.execute(sql, params + (name, name + "\uffff", limit)).fetchall()
+        if not rows:  # Given name only ("lan"): slower word match
+            sql = f"SELECT {self.COLUMNS} FROM customers WHERE {scope}(' ' || name_norm) LIKE ? LIMIT ?"
+            rows = self.conn.execute(sql, params + (f"% {name}%", limit)).fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def lookup_many(self, queries, store_id=None):
+        """
+        Batch lookup: {query: customer or None}. Phones are resolved with one IN query
+        per 500; names fall back to individual lookups.
+        """
+        results = {q: None for q in queries}
+        phones = {}
+        for q in queries:
+            phone = normalize_phone(q)
+            if phone and len(phone) >= 10:
+                phones.setdefault(phone, []).append(q)
+            else:
+                found = self.lookup(q, store_id, limit=1)
+                results[q] = found[0] if found else None
+
+        keys = list(phones)
+        scope, params = ("store_id = ? AND ", (store_id,)) if store_id is not None else ("", ())
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            sql = (f"SELECT {self.COLUMNS}, phone_norm FROM customers "
+                   f"WHERE {scope}phone_norm IN ({','.join('?' * len(chunk))})")
+            for row in self.conn.execute(sql, params + tuple(chunk)):
+                for q in phones[row[-1]]:
+                    if results[q] is None:
+                        results[q] = self._to_dict(row[:-1])
+        return results
+
+    def stats(self):
+        return {"hot_stores": len(self._hot), "hot_rows": sum(len(h.phones) for h in self._hot.values()),
+                "tracked_stores": len(self._lookups)}
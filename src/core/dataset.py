@@ -0,0 +1,245 @@
+import glob
+import json
+import os
+import re
+
+import numpy as np
+
+from src.core.metrics import log_status
+
+
+def _normalize_text(text):
+    """Lowercase, numbers → 0, whitespace collapsed: ids, prices and spacing don't make samples distinct."""
+    return re.sub(r"\s+", " ", re.sub(r"\d+", "0", text.lower())).strip()
+
+
+class NearDuplicateFilter:
+    """
+    Streaming near-duplicate detection with MinHash + LSH banding.
+
+    Each sample is reduced to `num_perm` min-hashes of its word 3-grams; samples
+    sharing a band are compared and dropped when the estimated Jaccard similarity
+    reaches `threshold`. Memory is one small signature per kept sample.
+    """
+    def __init__(self, threshold=0.85, num_perm=64, bands=16, seed=44):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+        self._buckets = {}
+        self._signatures = np.empty((1024, num_perm), dtype=np.uint64)
+        self._count = 0
+
+    def signature(self, text):
+        words = _normalize_text(text).split()
+        shingles = {" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+        # str hash is salted per process, which is fine: signatures never outlive one build
+        hashes = np.array([hash(s) for s in shingles], dtype=np.int64).view(np.uint64)
+        # Universal hashing mod 2^64 (uint64 arithmetic wraps), one row per permutation
+        return (hashes[None, :] * self._a[:, None] + self._b[:, None]).min(axis=1)
+
+    def is_duplicate(self, text):
+        """True if `text` is near-identical to an earlier sample; otherwise records it and returns False."""
+        signature = self.signature(text)
+        keys = [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+        candidates = list({i for key in keys for i in self._buckets.get(key, ())})
+        if candidates and (self._signatures[candidates] == signature).mean(axis=1).max() >= self.threshold:
+            return True
+        if self._count == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+        index = self._count
+        self._signatures[index] = signature
+        self._count += 1
+        for key in keys:
+            self._buckets.setdefault(key, []).append(index)
+        return False
+
+
+def read_jsonl(path):
+    """Chat samples ({"messages": [...]}) from a JSONL file, one at a time."""
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                sample = json.loads(line)
+            except json.JSONDecodeError:
+                log_status(f"⚠️ [Dataset] {os.path.basename(path)}:{number} is not valid JSON, skipped")
+                continue
+            if sample.get("messages"):
+                yield sample["messages"]
+
+
+def read_blueprints(folder):
+    """
+    Make.com blueprints as chat samples: the scenario name is the request, the flow
+    (modules, parameters, mappers; no editor metadata) is the JSON answer.
+    """
+    for path in sorted(glob.glob(os.path.join(folder, "*.json"))):
+        try:
+            with open(path, encoding="utf-8") as f:
+                blueprint = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            log_status(f"⚠️ [Dataset] {os.path.basename(path)}: {e}, skipped")
+            continue
+        if "flow" not in blueprint:
+            continue
+        name = blueprint.get("name") or os.path.basename(path).split(".")[0]
+        flow = [{key: node[key] for key in ("id", "module", "version", "parameters", "mapper") if key in node}
+                for node in blueprint["flow"]]
+        answer = json.dumps({"name": name, "flow": flow}, ensure_ascii=False, indent=2)
+        yield [{"role": "user", "content": f"Tạo blueprint Make.com cho quy trình: {name}"},
+               {"role": "assistant", "content": f"```json\n{answer}\n```"}]
+
+
+class DatasetBuilder:
+    """
+    Tokenizes chat samples with the model's chat template and packs them into
+    fixed-length sequences, written straight to disk:
+
+    - tokens.u32     uint32 token IDs, `num_packs * seq_len` (reshape to (num_packs, seq_len))
+    - loss_mask.u8   1 on assistant tokens (the part the model should learn), same shape
+    - samples.npy    int64 (num_samples, 2): start offset into tokens.u32 and length; the
+                     offset index loaders use to reset positions / attention per sample
+    - meta.json      seq_len, pad id, tokenizer, counts, packing efficiency
+
+    Samples are packed in windows of `window` with first-fit decreasing, so memory
+    stays bounded however large the corpus is. Samples longer than `seq_len` are truncated.
+    """
+    def __init__(self, tokenizer, out_dir, seq_len=4096, window=2048, batch_size=256, dedupe_threshold=0.85):
+        self.tokenizer = tokenizer
+        self.out_dir = out_dir
+        self.seq_len = seq_len
+        self.window = window
+        self.batch_size = batch_size
+        self.dedupe = NearDuplicateFilter(dedupe_threshold) if dedupe_threshold else None
+        self.pad_id = tokenizer.pad_token_id if getattr(tokenizer, "pad_token_id", None) is not None \
+            else tokenizer.eos_token_id
+        self.stats = {"read": 0, "duplicates": 0, "empty": 0, "truncated": 0, "samples": 0, "packs": 0,
+                      "tokens": 0, "loss_tokens": 0}
+        self._batch = []    # Rendered (prompt_text, completion_text) waiting for tokenization
+        self._pending = []  # Tokenized (ids, mask) waiting for packing
+        self._offsets = []
+
+    def _encode_batch(self, texts):
+        if not texts:
+            return []
+        if hasattr(self.tokenizer, "batch_encode_plus"):  # HF fast tokenizers encode a batch in Rust threads
+            return self.tokenizer(texts, add_special_tokens=False)["input_ids"]
+        return [self.tokenizer.encode(t, add_special_tokens=False) for t in texts]
+
+    def add(self, messages):
+        """Queues one conversation; the last assistant turn is the training target."""
+        self.stats["read"] += 1
+        last = max((i for i, m in enumerate(messages) if m.get("role") == "assistant"), default=None)
+        if last is None or not messages[last].get("content", "").strip():
+            self.stats["empty"] += 1
+            return
+        if self.dedupe is not None and self.dedupe.is_duplicate(
+                "\n".join(m.get("content", "") for m in messages[:last + 1])):
+            self.stats["duplicates"] += 1
+            return
+        prompt = self.tokenizer.apply_chat_template(messages[:last], tokenize=False, add_generation_prompt=True)
+        full = self.tokenizer.apply_chat_template(messages[:last + 1], tokenize=False)
+        # The ChatML assistant header ends in a newline after a special token, so splitting the
+        # text there is also a token boundary: prompt IDs + completion IDs == full IDs.
+        self._batch.append((prompt, full[len(prompt):] if full.startswith(prompt) else full))
+        if len(self._batch) >= self.batch_size:
+            self._tokenize()
+
+    def _tokenize(self):
+        prompts = self._encode_batch([p for p, _ in self._batch])
+        completions = self._encode_batch([c for _, c in self._batch])
+        for prompt_ids, completion_ids in zip(prompts, completions):
+            ids = np.asarray(list(prompt_ids) + list(completion_ids), dtype=np.uint32)
+            mask = np.zeros(len(ids), dtype=np.uint8)
+            mask[len(prompt_ids):] = 1
+            if len(ids) > self.seq_len:
+                ids, mask = ids[:self.seq_len], mask[:self.seq_len]
+                self.stats["truncated"] += 1
+            self._pending.append((ids, mask))
+        self._batch = []
+        if len(self._pending) >= self.window:
+            self._pack()
+
+    def _pack(self):
+        """First-fit decreasing over the pending window; every bin becomes one padded sequence."""
+        bins = []  # [free, [sample indices]]
+        for i in sorted(range(len(self._pending)), key=lambda i: -len(self._pending[i][0])):
+            size = len(self._pending[i][0])
+            target = next((b for b in bins if b[0] >= size), None)
+            if target is None:
+                target = [self.seq_len, []]
+                bins.append(target)
+            target[0] -= size
+            target[1].append(i)
+        for free, members in bins:
+            base = self.stats["packs"] * self.seq_len
+            ids = np.full(self.seq_len, self.pad_id, dtype=np.uint32)
+            mask = np.zeros(self.seq_len, dtype=np.uint8)
+            cursor = 0
+            for i in members:
+                sample_ids, sample_mask = self._pending[i]
+                ids[cursor:cursor + len(sample_ids)] = sample_ids
+                mask[cursor:cursor + len(sample_ids)] = sample_mask
+                self._offsets.append((base + cursor, len(sample_ids)))
+                cursor += len(sample_ids)
+            self._tokens.write(ids.tobytes())
+            self._mask.write(mask.tobytes())
+            self.stats["packs"] += 1
+            self.stats["samples"] += len(members)
+            self.stats["tokens"] += cursor
+            self.stats["loss_tokens"] += int(mask.sum())
+        self._pending = []
+
+    def build(self, sources):
+        """Consumes every sample of `sources` (iterables of message lists) and writes the dataset."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        with open(os.path.join(self.out_dir, "tokens.u32"), "wb") as self._tokens, \
+                open(os.path.join(self.out_dir, "loss_mask.u8"), "wb") as self._mask:
+            for source in sources:
+                for messages in source:
+                    self.add(messages)
+            self._tokenize()
+            if self._pending:
+                self._pack()
+        np.save(os.path.join(self.out_dir, "samples.npy"), np.asarray(self._offsets, dtype=np.int64).reshape(-1, 2))
+        capacity = self.stats["packs"] * self.seq_len
+        meta = dict(self.stats, seq_len=self.seq_len, pad_id=int(self.pad_id), dtype="uint32",
+                    tokenizer=getattr(self.tokenizer, "name_or_path", type(self.tokenizer).__name__),
+                    packing_efficiency=round(self.stats["tokens"] / capacity, 4) if capacity else 0.0)
+        with open(os.path.join(self.out_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+        return meta
+
+
+class PackedDataset:
+    """
+    Read side for training loaders: memory-maps a DatasetBuilder output. `ds[i]` is
+    pack i as numpy arrays (input_ids, labels with -100 outside assistant tokens,
+    position_ids restarting at every sample) — no tokenization, no Python lists.
+    """
+    def __init__(self, path):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.seq_len = self.meta["seq_len"]
+        self.tokens = np.memmap(os.path.join(path, "tokens.u32"), dtype=np.uint32, mode="r").reshape(-1, self.seq_len)
+        self.loss_mask = np.memmap(os.path.join(path, "loss_mask.u8"), dtype=np.uint8, mode="r").reshape(-1, self.seq_len)
+        self.samples = np.load(os.path.join(path, "samples.npy"), mmap_mode="r")
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __getitem__(self, i):
+        ids = self.tokens[i].astype(np.int64)
+        labels = np.where(self.loss_mask[i] == 1, ids, -100)
+        base = i * self.seq_len
+        lo, hi = np.searchsorted(self.samples[:, 0], [base, base + self.seq_len])
+        positions = np.zeros(self.seq_len, dtype=np.int64)
+        for start, length in self.samples[lo:hi]:
+            start -= base
+            positions[start:start + length] = np.arange(length)
+        return {"input_ids": ids, "labels": labels, "position_ids": positions}
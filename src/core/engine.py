@@ -1,14 +1,19 @@
 import torch
 import gc
+import os
 import logging
-from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
-from src.core.config import Config
+import threading
+from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig, DynamicCache
+from src.core.config import get_config
+from src.core.prompt_builder import PromptBuilder
+from src.core.fake_llm import FakeTokenizer, FakeCausalLM, FakeCache
+from src.core.metrics import log_status
 
 logger = logging.getLogger("System")
 
 class ModelEngine:
     def __init__(self):
-        self.config = Config()
+        self.config = get_config()
         self.loaded_models = {}
         # Clear VRAM before loading to prevent fragmentation
         if torch.cuda.is_available():
@@ -18,7 +23,11 @@ class ModelEngine:
         self._load_all_models()
 
     def _load_all_models(self):
-        print("⚡ [Engine] Initializing Unified Architecture...")
+        if self.config.llm_backend == "fake":
+            return self._load_fake_models()
+        if self.config.llm_backend == "cpu":
+            return self._load_cpu_models()
+        log_status("⚡ [Engine] Initializing Unified Architecture...")
         
         # 1. GROUP ROLES BY MODEL NAME
         # This ensures we only load 'Qwen-14B' ONCE, even if used by 3 agents.
@@ -31,38 +40,104 @@ class ModelEngine:
         # 2. LOAD EACH UNIQUE MODEL ONCE
         for model_name, roles in unique_models.items():
             role_list = ", ".join(roles).upper()
-            print(f"   -> Loading Shared Model: {model_name}")
-            print(f"      (Assigned to: {role_list})...")
+            log_status(f"   -> Loading Shared Model: {model_name}")
+            log_status(f"      (Assigned to: {role_list})...")
             
             try:
                 tokenizer = AutoTokenizer.from_pretrained(model_name)
                 tokenizer.padding_side = "left"
                 if tokenizer.pad_token is None: tokenizer.pad_token = tokenizer.eos_token
 
-                # 4-bit Quantization is MANDATORY for 14B on L4 GPU
+                # Quantization follows the hardware profile (8-bit for 14B on an L4, 4-bit on a T4,
+                # none on an 80 GB card); unquantized weights load in the checkpoint dtype.
+                quantization = self.config.quantization
+                weights = {"quantization_config": BitsAndBytesConfig(**quantization)} if quantization else {"torch_dtype": "auto"}
                 model = AutoModelForCausalLM.from_pretrained(
                     model_name,
-                    quantization_config=BitsAndBytesConfig(**self.config.quantization),
+                    **weights,
                     device_map="auto",
                     trust_remote_code=True
                 )
                 
-                # Shared Asset
-                asset = {"model": model, "tokenizer": tokenizer}
+                # Shared Asset (the prompt builder caches tokenized system blocks per tokenizer;
+                # the lock serializes generate calls on the shared weights)
+                asset = {"model": model, "tokenizer": tokenizer, "prompt_builder": PromptBuilder(tokenizer),
+                         "lock": threading.Lock(), "new_cache": DynamicCache}
                 
                 # Assign to all roles
                 for role in roles:
                     self.loaded_models[role] = asset
                     
             except Exception as e:
-                print(f"❌ Failed to load {model_name}: {e}")
+                log_status(f"❌ Failed to load {model_name}: {e}")
                 raise e
         
         if torch.cuda.is_available():
             free, total = torch.cuda.mem_get_info()
-            print(f"✅ VRAM Status: {(total-free)/1e9:.2f}GB / {total/1e9:.2f}GB Used.")
+            log_status(f"✅ VRAM Status: {(total-free)/1e9:.2f}GB / {total/1e9:.2f}GB Used.")
+
+    def _load_cpu_models(self):
+        """
+        LLM_BACKEND=cpu: one smaller Qwen model shared by every role, for dev boxes and
+        low-traffic stores without a GPU. torch runtime: bf16 weights where the CPU has
+        native bf16, dynamic int8 Linear layers otherwise. onnx runtime: optimum export
+        (cached on disk), run by ONNX Runtime.
+        """
+        settings = self.config.cpu
+        threads = settings["threads"]
+        torch.set_num_threads(threads)
+        model_id = settings["model_id"]
+        quantize = settings["quantize"]
+        log_status(f"⚡ [Engine] CPU backend: {model_id} ({settings['runtime']}, "
+                   f"{quantize if settings['runtime'] == 'torch' else 'fp32'}, {threads} threads)")
+
+        tokenizer = AutoTokenizer.from_pretrained(model_id)
+        tokenizer.padding_side = "left"
+        if tokenizer.pad_token is None: tokenizer.pad_token = tokenizer.eos_token
+
+        new_cache = DynamicCache
+        if settings["runtime"] == "onnx":
+            from optimum.onnxruntime import ORTModelForCausalLM
+            export_dir = os.path.join(settings["onnx_dir"], model_id.replace("/", "--"))
+            if os.path.isdir(export_dir):
+                model = ORTModelForCausalLM.from_pretrained(export_dir)
+            else:
+                log_status(f"   -> Exporting {model_id} to ONNX (first run only)...")
+                model = ORTModelForCausalLM.from_pretrained(model_id, export=True)
+                model.save_pretrained(export_dir)
+            new_cache = None  # ORT keeps its own past tensors: no cross-turn cache reuse
+        else:
+            dtype = torch.bfloat16 if quantize == "bf16" else torch.float32
+            model = AutoModelForCausalLM.from_pretrained(model_id, torch_dtype=dtype, low_cpu_mem_usage=True)
+            if quantize == "int8":
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            model.eval()
+
+        asset = {"model": model, "tokenizer": tokenizer, "prompt_builder": PromptBuilder(tokenizer),
+                 "lock": threading.Lock(), "new_cache": new_cache}
+        for role in self.config.models:
+            self.loaded_models[role] = asset
+
+    def _load_fake_models(self):
+        """LLM_BACKEND=fake: scripted model with simulated latency (benchmarks, no GPU/weights needed)."""
+        settings = self.config.fake_llm
+        log_status(f"⚡ [Engine] Fake LLM backend ({settings['tokens_per_second']} tok/s, "
+                   f"{settings['first_token_ms']} ms first token)")
+        tokenizer = FakeTokenizer()
+        asset = {"model": FakeCausalLM(tokenizer, **settings), "tokenizer": tokenizer,
+                 "prompt_builder": PromptBuilder(tokenizer), "lock": threading.Lock(), "new_cache": FakeCache}
+        for role in self.config.models:
+            self.loaded_models[role] = asset
 
     def load_model(self, role: str):
         if role not in self.loaded_models:
             raise ValueError(f"Role {role} not loaded! Available: {list(self.loaded_models.keys())}")
-        return self.loaded_models[role]
\ No newline at end of file
+        return self.loaded_models[role]
+
+    def get_prompt_builder(self, role: str):
+        return self.load_model(role)["prompt_builder"]
+
+    def new_cache(self, role: str):
+        """Empty KV cache for a multi-turn generation on the role's model (None if the runtime has none)."""
+        new_cache = self.load_model(role)["new_cache"]
+        return new_cache() if new_cache is not None else None
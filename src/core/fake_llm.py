@@ -0,0 +1,212 @@
+import json
+import re
+import threading
+import time
+
+import torch
+
+from src.core.prompts import Prompts
+
+TOKEN_RE = re.compile(r"<\|im_start\|>|<\|im_end\|>|<\|endoftext\|>|\w+|[^\w\s]|\s+")
+SPECIAL_TOKENS = ["<|endoftext|>", "<|im_start|>", "<|im_end|>"]
+
+
+# A talkative architect: sub-bullets, more steps than needed and a closing note.
+PLAN_REPLY = ("Kế hoạch tự động hóa:\n"
+              "1. Webhook nhận đơn hàng mới từ website\n   - Dữ liệu: mã đơn, khách hàng, email, tổng tiền\n"
+              "2. Đọc thông tin khách hàng từ Google Sheet\n   - Tìm theo số điện thoại hoặc email\n"
+              "3. Lọc đơn hàng có giá trị trên 500.000đ\n"
+              "4. Gửi email xác nhận cho khách hàng\n   - Tiêu đề: Xác nhận đơn hàng kèm mã đơn\n"
+              "5. Ghi đơn hàng vào Google Sheet báo cáo\n"
+              "6. Cập nhật tồn kho cho các sản phẩm trong đơn\n"
+              "7. Gửi tin nhắn Zalo cho quản lý khi đơn trên 2.000.000đ\n"
+              "8. Tổng hợp doanh thu cuối ngày vào Google Docs\n"
+              "9. Gửi email cảm ơn sau 3 ngày để xin đánh giá\n"
+              "10. Lưu nhật ký chạy quy trình để kiểm tra lỗi\n\n"
+              "Lưu ý: bạn nên chạy thử quy trình với một vài đơn hàng mẫu trước khi bật chính thức, "
+              "và kiểm tra quyền truy cập Google Sheet của tài khoản kết nối. Chúc cửa hàng buôn bán đắt hàng!")
+
+
+# (pattern on the question, tool, arguments from the match): how the scripted model picks its tool calls
+TOOL_RULES = [
+    (r"doanh thu|bán được", "get_sales_report", lambda m: {"period": "today"}),
+    (r"(?:còn bao nhiêu|tồn kho(?: của)?)\s+([^?,.]+?)(?=\s+(?:và|còn)\b|[?,.]|$)", "check_inventory",
+     lambda m: {"product_name": m.group(1).strip()}),
+    (r"[Kk]hách(?: hàng)?\s+((?:0|\+84)[\d .]{8,13}\d|[A-ZÀ-Ỹ][\wÀ-ỹ]*(?:\s+[A-ZÀ-Ỹ][\wÀ-ỹ]*)*)", "get_customer_info",
+     lambda m: {"phone_or_name": m.group(1).strip()}),
+    (r"sắp hết", "get_low_stock", lambda m: {"limit": 5}),
+    (r"âm lịch", "get_lunar_date", lambda m: {}),
+    (r"tính\s+([\d\s.+\-*/()%]+\d\)?)", "calculate", lambda m: {"expression": m.group(1).strip()}),
+]
+
+
+def tool_calls_for(question):
+    calls = []
+    for pattern, name, arguments in TOOL_RULES:
+        for match in re.finditer(pattern, question, re.IGNORECASE if name != "get_customer_info" else 0):
+            calls.append({"name": name, "arguments": arguments(match)})
+    return calls
+
+
+class Encoding:
+    def __init__(self, input_ids):
+        self.input_ids = input_ids
+
+
+class FakeTokenizer:
+    """
+    Deterministic stand-in for the HF tokenizer: words, punctuation and whitespace
+    runs are tokens (vocabulary grows on first sight). Renders ChatML like Qwen, so
+    PromptBuilder's cached system blocks line up the same way.
+    """
+    padding_side = "left"
+
+    def __init__(self):
+        self._ids = {tok: i for i, tok in enumerate(SPECIAL_TOKENS)}
+        self._tokens = list(SPECIAL_TOKENS)
+        self._lock = threading.Lock()
+        self.eos_token_id = 0
+        self.eos_token = self.pad_token = SPECIAL_TOKENS[0]
+        self.all_special_ids = list(range(len(SPECIAL_TOKENS)))
+
+    def encode(self, text, add_special_tokens=False):
+        ids = []
+        for token in TOKEN_RE.findall(text):
+            token_id = self._ids.get(token)
+            if token_id is None:
+                with self._lock:
+                    token_id = self._ids.setdefault(token, len(self._tokens))
+                    if token_id == len(self._tokens):
+                        self._tokens.append(token)
+            ids.append(token_id)
+        return ids
+
+    def __call__(self, text, return_tensors=None):
+        ids = self.encode(text)
+        return Encoding(torch.tensor([ids], dtype=torch.long) if return_tensors == "pt" else ids)
+
+    def decode(self, ids, skip_special_tokens=False):
+        ids = ids.tolist() if hasattr(ids, "tolist") else ids
+        tokens = (self._tokens[i] for i in ids)
+        if skip_special_tokens:
+            tokens = (t for t in tokens if t not in SPECIAL_TOKENS)
+        return "".join(tokens)
+
+    def apply_chat_template(self, messages, tokenize=False, add_generation_prompt=False):
+        text = "".join(f"<|im_start|>{m['role']}\n{m['content']}<|im_end|>\n" for m in messages)
+        if add_generation_prompt:
+            text += "<|im_start|>assistant\n"
+        return self.encode(text) if tokenize else text
+
+
+class FakeCache:
+    """Length-only stand-in for DynamicCache: how many leading tokens are already prefilled."""
+    def __init__(self):
+        self.length = 0
+
+    def get_seq_length(self):
+        return self.length
+
+    def crop(self, max_length):
+        self.length = min(self.length, max_length)
+
+
+class GenerateOutput:
+    def __init__(self, sequences, past_key_values):
+        self.sequences = sequences
+        self.past_key_values = past_key_values
+
+
+class FakeCausalLM:
+    """
+    Scripted model for benchmarks: answers per persona (plan, blueprint, marketing,
+    research, consult) with fixed text and sleeps like a real GPU would:
+    first_token_ms + prompt_tokens / prefill rate + new_tokens / decode rate.
+    With `past_key_values` only the uncached prompt tokens count as prefill.
+    """
+    device = "cpu"
+
+    def __init__(self, tokenizer, first_token_ms=50, tokens_per_second=25, prefill_tokens_per_second=4000,
+                 batch_decode_overhead=0.05, parallel_tool_calls=True):
+        self.tokenizer = tokenizer
+        self.parallel_tool_calls = parallel_tool_calls  # False: one tool call per reply (a ReAct-style model)
+        self.batch_decode_overhead = batch_decode_overhead
+        self.first_token_ms = first_token_ms
+        self.tokens_per_second = tokens_per_second
+        self.prefill_tokens_per_second = prefill_tokens_per_second
+        self.calls = 0
+
+    def respond(self, prompt):
+        turns = prompt.split("<|im_start|>user\n")
+        user = turns[-1].split("<|im_end|>")[0] if len(turns) > 1 else prompt
+        if "<tools>" in prompt and len(turns) > 1:
+            return self._tool_reply(turns[1].split("<|im_end|>")[0], prompt.split("<tool_response>\n")[1:])
+        if "Lead Engineer" in prompt:
+            return ('```json\n{"name": "Đơn hàng mới", "flow": [\n'
+                    '  {"id": 1, "module": "gateway:CustomWebHook", "mapper": {}},\n'
+                    '  {"id": 2, "module": "google-sheets:addRow", "mapper": {"values": {"0": "{{1.order_id}}", '
+                    '"1": "{{1.customer}}", "2": "{{1.total}}"}}},\n'
+                    '  {"id": 3, "module": "google-email:ActionSendEmail", "mapper": {"to": "{{1.email}}", '
+                    '"subject": "Xác nhận đơn hàng {{1.order_id}}"}}\n]}\n```')
+        if Prompts.PLAN_INSTRUCTION in prompt:
+            return PLAN_REPLY
+        if Prompts.COPYWRITER_SYSTEM in prompt:
+            return ("🎉 SIÊU SALE CUỐI TUẦN 🎉\nGiảm đến 30% cho toàn bộ sản phẩm mẹ và bé. "
+                    "Miễn phí giao hàng nội thành cho đơn từ 300.000đ. Nhanh tay đặt hàng ngay hôm nay! "
+                    "#khuyenmai #mevabe")
+        if "Research Assistant" in prompt:
+            return "Tóm tắt: thị trường bán lẻ mẹ và bé tăng trưởng ổn định, người mua ưu tiên hàng chính hãng."
+        data = re.search(r"DATA: (.+)", user)
+        prefix = f"Theo số liệu ({data.group(1).strip()}), " if data and data.group(1).strip() else ""
+        return prefix + ("cửa hàng đang hoạt động tốt. Bạn có thể tăng doanh thu bằng chương trình "
+                         "khách hàng thân thiết và nhắc khách mua lại qua Zalo.")
+
+    def _tool_reply(self, question, responses):
+        """Tool calls for the question (all at once, or the next unanswered one), then an answer from the results."""
+        calls = tool_calls_for(question.rsplit("\n\n", 1)[-1])
+        if len(responses) < len(calls):
+            todo = calls[len(responses):] if self.parallel_tool_calls else calls[len(responses):len(responses) + 1]
+            return "\n".join(f"<tool_call>\n{json.dumps(c, ensure_ascii=False)}\n</tool_call>" for c in todo)
+        facts = "; ".join(r.split("\n</tool_response>")[0] for r in responses)
+        return (f"Theo số liệu ({facts}), " if facts else "") + "cửa hàng đang hoạt động tốt."
+
+    def generate(self, input_ids, attention_mask=None, max_new_tokens=256, pad_token_id=None,
+                 past_key_values=None, stopping_criteria=None, return_dict_in_generate=False, **kwargs):
+        self.calls += 1
+        if input_ids.shape[0] > 1:
+            return self._generate_batch(input_ids, attention_mask, max_new_tokens, pad_token_id)
+        prompt_ids = input_ids[0].tolist()
+        reply = self._reply(prompt_ids, max_new_tokens)
+        if stopping_criteria:
+            for n in range(1, len(reply)):
+                ids = torch.tensor([prompt_ids + reply[:n]], dtype=input_ids.dtype, device=input_ids.device)
+                if any(bool(c(ids, None)[0]) for c in stopping_criteria):
+                    reply = reply[:n]
+                    break
+        cached = past_key_values.get_seq_length() if past_key_values is not None else 0
+        time.sleep(self.first_token_ms / 1000 + (len(prompt_ids) - cached) / self.prefill_tokens_per_second
+                   + len(reply) / self.tokens_per_second)
+        if past_key_values is not None:  # The last generated token is never fed back, as with HF caches
+            past_key_values.length = len(prompt_ids) + len(reply) - 1
+        sequences = torch.tensor([prompt_ids + reply], dtype=input_ids.dtype, device=input_ids.device)
+        return GenerateOutput(sequences, past_key_values) if return_dict_in_generate else sequences
+
+    def _reply(self, prompt_ids, max_new_tokens):
+        reply = self.tokenizer.encode(self.respond(self.tokenizer.decode(prompt_ids)))[:max_new_tokens]
+        return reply + [self.tokenizer.eos_token_id]
+
+    def _generate_batch(self, input_ids, attention_mask, max_new_tokens, pad_token_id):
+        """
+        Left-padded batch, HF style (finished rows padded after EOS). Decoding steps are
+        shared by the batch, each row adding `batch_decode_overhead` to the step time
+        (small batches are memory-bound on a GPU, so extra rows are nearly free).
+        """
+        mask = attention_mask.tolist() if attention_mask is not None else [[1] * input_ids.shape[1]] * len(input_ids)
+        rows = [[t for t, m in zip(row, row_mask) if m] for row, row_mask in zip(input_ids.tolist(), mask)]
+        replies = [self._reply(prompt_ids, max_new_tokens) for prompt_ids in rows]
+        steps = max(len(r) for r in replies)
+        time.sleep(self.first_token_ms / 1000 + sum(len(r) for r in rows) / self.prefill_tokens_per_second
+                   + steps / self.tokens_per_second * (1 + self.batch_decode_overhead * (len(rows) - 1)))
+        pad = self.tokenizer.eos_token_id if pad_token_id is None else pad_token_id
+        return torch.tensor([row + reply + [pad] * (steps - len(reply)) for row, reply in zip(input_ids.tolist(), replies)],
+                            dtype=input_ids.dtype, device=input_ids.device)
@@ -0,0 +1,143 @@
+import re
+import statistics
+import threading
+from collections import deque
+
+from src.core.text import format_vnd, normalize_query
+
+# Matched on normalize_query() text (tone-stripped, no punctuation). Order matters: first match wins.
+INTENTS = [
+    ("low_stock", re.compile(r"\b(?:hang|san pham|mat hang|mon) (?:gi|nao) (?:sap|gan|da) het(?: hang)?\b")),
+    ("revenue_compare", re.compile(r"\b(?:doanh thu|doanh so)\b.*\b(?:so voi|so sanh|hon|tang hay giam|giam hay tang)"
+                                   r"\b.*\bhom qua\b|\bso sanh doanh (?:thu|so) hom nay (?:va|voi) hom qua\b")),
+    ("revenue_yesterday", re.compile(r"\b(?:doanh thu|doanh so|ban duoc)\b.*\bhom qua\b|\bhom qua\b.*\b(?:doanh thu|doanh so|ban duoc)\b")),
+    ("orders_today", re.compile(r"\b(?:bao nhieu|may|so) don(?: hang)?\b")),
+    ("revenue_today", re.compile(r"\b(?:doanh thu|doanh so)\b|\bban duoc bao nhieu(?: tien)?\b")),
+    ("stock", re.compile(r"^(?:(?:trong kho|kho) )?(?:con bao nhieu|ton kho(?: cua)?|so luong(?: ton)?(?: cua)?) "
+                         r"(?P<product>.+?)(?: (?:trong kho|vay|a|nhi|the))*$"
+                         r"|^(?P<product2>.+?) con bao nhieu(?: (?:cai|goi|hop|thung|chai|lon|bich|san pham))?"
+                         r"(?: (?:trong kho|vay|a|nhi|the))*$")),
+]
+# Words that may surround a metric question without changing it
+FILLER = set("""hom nay toi nay bay gio hien tai luc nay cua hang shop minh em anh chi oi a vay the nao ra sao
+la bao nhieu duoc roi chua cho xem giup voi nhe nha nhi ha kiem tra check tong ca ngay tinh den hang co dang
+nhung cac gi nao sao thu so ban tien""".split())
+# Anything asking for advice, reasons or analysis goes to the LLM
+OPEN_ENDED = re.compile(r"\b(?:tai sao|vi sao|lam sao|lam the nao|nen|goi y|cach|tu van|phan tich|chien luoc|y tuong|"
+                        r"du bao|ke hoach|viet|tao|thang|tuan|nam|quy)\b")
+METRIC_WORDS = re.compile(r"\b(?:doanh thu|doanh so|don hang|hom nay|hom qua)\b")
+
+
+def _change(today, yesterday, unit):
+    if not yesterday:
+        return "Hôm qua chưa có số liệu để so sánh." if unit == "revenue" else "Hôm qua không có đơn nào."
+    label = format_vnd(yesterday) if unit == "revenue" else f"{yesterday} đơn"
+    if today == yesterday:
+        return f"Bằng hôm qua ({label})."
+    pct = (today - yesterday) / yesterday * 100
+    pct_text = f"{abs(pct):.1f}".replace(".", ",") if abs(pct) < 10 else f"{abs(pct):.0f}"
+    return f"{'Tăng' if pct > 0 else 'Giảm'} {pct_text}% so với hôm qua ({label})."
+
+
+class FastPathResponder:
+    """
+    Answers simple metric questions ("Hôm nay doanh thu bao nhiêu?", "Còn bao nhiêu
+    bỉm Bobby?", "Hàng nào sắp hết?") from SaasAPI with Vietnamese templates,
+    without the LLM.
+
+    Only high-confidence matches are served: one known intent, no open-ended
+    wording (why / how / should / plans), a short message, and nothing left over
+    besides filler words once the intent is removed. Everything else returns None
+    and goes through the normal consult / tool-calling path. Unmatched products
+    (no prefix match in the inventory index) also fall back.
+    """
+    def __init__(self, saas, max_words=14):
+        self.saas = saas
+        self.max_words = max_words
+        self._lock = threading.Lock()
+        self.served = 0
+        self.fallbacks = 0
+        self._served_ms = deque(maxlen=1000)
+        self._fallback_ms = deque(maxlen=1000)
+
+    def match(self, message):
+        """(intent, params) for a high-confidence simple question, else None."""
+        text = normalize_query(message)
+        words = text.split()
+        if not words or len(words) > self.max_words or OPEN_ENDED.search(text):
+            return None
+        for intent, pattern in INTENTS:
+            found = pattern.search(text)
+            if not found:
+                continue
+            if intent == "stock":
+                product = found.group("product") or found.group("product2")
+                # Product names are short and never contain metric words
+                if len(product.split()) > 6 or METRIC_WORDS.search(product) or set(product.split()) <= FILLER:
+                    return None
+                return intent, {"product": product}
+            rest = (text[:found.start()] + " " + text[found.end():]).split()
+            if all(w in FILLER for w in rest):
+                return intent, {}
+            return None
+        return None
+
+    def answer(self, message, store_id, store_name=None):
+        """Reply text and data for a simple question, or None when the LLM should answer."""
+        if store_id is None:
+            return None
+        matched = self.match(message)
+        if matched is None:
+            return None
+        intent, params = matched
+        where = f" của {store_name}" if store_name else ""
+        subject = f" {store_name}" if store_name else ""
+        if intent == "stock":
+            item = self.saas.check_inventory(params["product"], store_id=store_id)
+            if "error" in item or item.get("match") != "prefix":
+                return None
+            status = {"Critical": " Sắp hết hàng, nên nhập thêm ngay.", "Low": " Đang dưới ngưỡng tồn kho."}
+            text = f"{item['name']} còn {item['stock']} sản phẩm trong kho.{status.get(item['status'], '')}"
+            return {"intent": intent, "text": text, "data": item}
+        if intent == "low_stock":
+            items = self.saas.get_low_stock(store_id, limit=10)
+            if not items:
+                return {"intent": intent, "text": f"Hiện chưa có mặt hàng nào sắp hết{where}.", "data": {"items": []}}
+            listing = "\n".join(f"- {i['name']}: còn {i['stock']} (ngưỡng {i['threshold']})" for i in items)
+            return {"intent": intent, "text": f"Các mặt hàng sắp hết{where}:\n{listing}", "data": {"items": items}}
+
+        today = self.saas.get_sales_report(store_id, "today")
+        yesterday = self.saas.get_sales_report(store_id, "yesterday")
+        data = {"today": today, "yesterday": yesterday}
+        if intent == "revenue_yesterday":
+            text = f"Doanh thu hôm qua{where}: {format_vnd(yesterday['revenue'])} từ {yesterday['orders']} đơn." \
+                if yesterday["revenue"] else f"Hôm qua{subject} chưa có doanh thu."
+        elif intent == "orders_today":
+            text = f"Hôm nay{subject} có {today['orders']} đơn, doanh thu {format_vnd(today['revenue'])}. " \
+                   + _change(today["orders"], yesterday["orders"], "orders")
+        else:  # revenue_today, revenue_compare
+            text = f"Doanh thu hôm nay{where}: {format_vnd(today['revenue'])} từ {today['orders']} đơn. " \
+                if today["revenue"] else f"Hôm nay{subject} chưa có doanh thu. "
+            text += _change(today["revenue"], yesterday["revenue"], "revenue")
+        return {"intent": intent, "text": text, "data": data}
+
+    def record(self, served, ms):
+        """Request outcome: served here, or answered by the LLM path (`ms` = its full latency)."""
+        with self._lock:
+            if served:
+                self.served += 1
+                self._served_ms.append(ms)
+            else:
+                self.fallbacks += 1
+                self._fallback_ms.append(ms)
+
+    def stats(self):
+        with self._lock:
+            total = self.served + self.fallbacks
+            return {
+                "served": self.served,
+                "fallbacks": self.fallbacks,
+                "share": round(self.served / total, 4) if total else 0.0,
+                "p50_served_ms": round(statistics.median(self._served_ms), 2) if self._served_ms else None,
+                "p50_llm_ms": round(statistics.median(self._fallback_ms), 2) if self._fallback_ms else None,
+            }
@@ -0,0 +1,175 @@
+import functools
+import importlib.util
+import os
+
+# Backends that change what can be loaded (module name -> key in probe()["backends"])
+BACKENDS = {
+    "torch": "torch",
+    "bitsandbytes": "bitsandbytes",
+    "optimum": "onnxruntime",
+    "sentence_transformers": "sentence_transformers",
+    "chromadb": "chromadb",
+}
+
+# Simulated machines (HARDWARE_PROFILE=<name>), for benchmarks and capacity planning. `fake_llm` is the
+# decode speed the fake backend simulates there (roughly what the chosen model does on that machine).
+PROFILES = {
+    "a100-80gb": {"cpu_count": 32, "ram_gb": 128, "cpu_bf16": True,
+                  "gpus": [{"name": "NVIDIA A100 80GB", "vram_gb": 80, "bf16": True}],
+                  "fake_llm": {"first_token_ms": 20, "tokens_per_second": 40}},
+    "l4-24gb": {"cpu_count": 8, "ram_gb": 32, "cpu_bf16": False,
+                "gpus": [{"name": "NVIDIA L4", "vram_gb": 24, "bf16": True}],
+                "fake_llm": {"first_token_ms": 50, "tokens_per_second": 25}},
+    "t4-16gb": {"cpu_count": 4, "ram_gb": 16, "cpu_bf16": False,
+                "gpus": [{"name": "Tesla T4", "vram_gb": 16, "bf16": False}],
+                "fake_llm": {"first_token_ms": 80, "tokens_per_second": 12}},
+    "cpu-16c-32gb": {"cpu_count": 16, "ram_gb": 32, "cpu_bf16": True, "gpus": [],
+                     "fake_llm": {"first_token_ms": 150, "tokens_per_second": 10}},
+    "cpu-4c-8gb": {"cpu_count": 4, "ram_gb": 8, "cpu_bf16": False, "gpus": [],
+                   "fake_llm": {"first_token_ms": 300, "tokens_per_second": 6}},
+}
+
+# Qwen2.5 sizes: parameters, and KV cache bytes per token in fp16 (2 x layers x kv_heads x head_dim x 2 bytes)
+MODELS = {
+    "Qwen/Qwen2.5-Coder-14B-Instruct": {"params_b": 14.8, "kv_bytes_per_token": 2 * 48 * 8 * 128 * 2},
+    "Qwen/Qwen2.5-Coder-7B-Instruct": {"params_b": 7.6, "kv_bytes_per_token": 2 * 28 * 4 * 128 * 2},
+    "Qwen/Qwen2.5-Coder-3B-Instruct": {"params_b": 3.1, "kv_bytes_per_token": 2 * 36 * 2 * 128 * 2},
+    "Qwen/Qwen2.5-Coder-1.5B-Instruct": {"params_b": 1.5, "kv_bytes_per_token": 2 * 28 * 2 * 128 * 2},
+    "Qwen/Qwen2.5-Coder-0.5B-Instruct": {"params_b": 0.5, "kv_bytes_per_token": 2 * 24 * 2 * 64 * 2},
+}
+# Bytes per parameter of the loaded weights (bitsandbytes keeps some layers in fp16)
+WEIGHT_BYTES = {"none": 2.0, "8bit": 1.05, "4bit": 0.55}
+# GPU choices, best first: the first whose weights + overhead + MIN_KV_TOKENS fit is used
+GPU_CANDIDATES = [
+    ("Qwen/Qwen2.5-Coder-14B-Instruct", "none"),
+    ("Qwen/Qwen2.5-Coder-14B-Instruct", "8bit"),
+    ("Qwen/Qwen2.5-Coder-14B-Instruct", "4bit"),
+    ("Qwen/Qwen2.5-Coder-7B-Instruct", "8bit"),
+    ("Qwen/Qwen2.5-Coder-7B-Instruct", "4bit"),
+]
+GPU_OVERHEAD_GB = 1.5     # CUDA context, activations, allocator slack
+VISION_VRAM_GB = 1.5      # Florence-2-large in fp16
+MIN_KV_TOKENS = 8192
+MAX_NEW_TOKENS = 4096
+GB = 1024 ** 3
+
+
+def _meminfo():
+    """(total, available) RAM in GB from /proc/meminfo; falls back to sysconf."""
+    fields = {}
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                key, value = line.split(":", 1)
+                fields[key] = int(value.split()[0]) * 1024
+    except (OSError, ValueError):
+        pass
+    total = fields.get("MemTotal") or os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    return round(total / GB, 1), round(fields.get("MemAvailable", total) / GB, 1)
+
+
+def _cpu_bf16():
+    """bf16 matmuls are only fast with AVX512-BF16 / AMX; elsewhere they are emulated (slower than fp32)."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+def _gpus():
+    """CUDA devices via torch, if torch is installed (not imported otherwise)."""
+    if importlib.util.find_spec("torch") is None:
+        return []
+    try:
+        import torch
+        if not torch.cuda.is_available():
+            return []
+        gpus = []
+        for i in range(torch.cuda.device_count()):
+            props = torch.cuda.get_device_properties(i)
+            gpus.append({"name": props.name, "vram_gb": round(props.total_memory / GB, 1), "bf16": props.major >= 8})
+        return gpus
+    except Exception:
+        return []
+
+
+@functools.lru_cache(maxsize=None)
+def probe(profile=None):
+    """
+    What this process can use: CPU cores (affinity, so container limits count), RAM,
+    native CPU bf16, CUDA GPUs and the installed optional backends. `profile` (a
+    PROFILES name) simulates a machine instead; installed backends are still probed,
+    with the GPU stack (torch, bitsandbytes) assumed present on GPU profiles.
+    """
+    backends = {key: importlib.util.find_spec(module) is not None for module, key in BACKENDS.items()}
+    if profile:
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown HARDWARE_PROFILE '{profile}' (known: {', '.join(PROFILES)})")
+        preset = PROFILES[profile]
+        if preset["gpus"]:
+            backends.update(torch=True, bitsandbytes=True)
+        return {"profile": profile, "simulated": True, "cpu_count": preset["cpu_count"], "ram_gb": preset["ram_gb"],
+                "ram_available_gb": preset["ram_gb"], "cpu_bf16": preset["cpu_bf16"],
+                "gpus": [dict(gpu) for gpu in preset["gpus"]], "backends": backends}
+    try:
+        cpu_count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpu_count = os.cpu_count() or 1
+    ram_gb, ram_available_gb = _meminfo()
+    return {"profile": "auto", "simulated": False, "cpu_count": cpu_count, "ram_gb": ram_gb,
+            "ram_available_gb": ram_available_gb, "cpu_bf16": _cpu_bf16(), "gpus": _gpus(), "backends": backends}
+
+
+def _weights_gb(model_id, quantization):
+    return MODELS[model_id]["params_b"] * 1e9 * WEIGHT_BYTES[quantization] / GB
+
+
+def choose(hardware):
+    """
+    Settings for `hardware` (from probe()): backend, model and quantization, KV cache
+    budget, generation length, batch sizes, threads and which optional models to load.
+    Config applies env overrides on top.
+    """
+    cores = hardware["cpu_count"]
+    backends = hardware["backends"]
+    reranker = hardware["ram_gb"] >= 8 and backends["sentence_transformers"]
+    common = {"cpu_threads": max(1, cores // 2),  # ~physical cores
+              "tool_workers": min(8, max(2, cores)), "reranker": reranker}
+
+    gpu = max(hardware["gpus"], key=lambda g: g["vram_gb"], default=None)
+    if gpu is not None and backends["torch"]:
+        usable = gpu["vram_gb"] * 0.92
+        for model_id, quantization in GPU_CANDIDATES:
+            if quantization != "none" and not backends["bitsandbytes"]:
+                continue
+            kv_per_token = MODELS[model_id]["kv_bytes_per_token"]
+            free = usable - _weights_gb(model_id, quantization) - GPU_OVERHEAD_GB
+            if free * GB < MIN_KV_TOKENS * kv_per_token:
+                continue
+            vision = free - VISION_VRAM_GB >= 2.0
+            kv_tokens = int((free - (VISION_VRAM_GB if vision else 0)) * GB // kv_per_token)
+            return {**common, "backend": "hf", "model_id": model_id, "quantization": quantization,
+                    "compute_dtype": "bfloat16" if gpu["bf16"] else "float16",
+                    "kv_cache_tokens": kv_tokens,
+                    "max_new_tokens": min(MAX_NEW_TOKENS, kv_tokens // 2),
+                    "batch_size": min(32, max(1, kv_tokens // 2048)),
+                    "max_caches": min(64, max(8, kv_tokens // 2048)),
+                    "vision": vision, "vision_batch": 8 if gpu["vram_gb"] >= 40 else 4}
+
+    # No usable GPU: a smaller model on the CPU backend, sized by RAM and cores
+    ram = hardware["ram_gb"]
+    if ram >= 32 and cores >= 16:
+        model_id = "Qwen/Qwen2.5-Coder-3B-Instruct"
+    elif ram >= 8:
+        model_id = "Qwen/Qwen2.5-Coder-1.5B-Instruct"
+    else:
+        model_id = "Qwen/Qwen2.5-Coder-0.5B-Instruct"
+    # fp32 working set is ~2x the bf16 weights; the KV budget is a quarter of what is left
+    spare_gb = max(0.5, ram - 2 * _weights_gb(model_id, "none") - 2)
+    kv_tokens = int(spare_gb / 4 * GB // MODELS[model_id]["kv_bytes_per_token"])
+    return {**common, "backend": "cpu", "model_id": model_id, "quantization": "none", "compute_dtype": "float32",
+            "kv_cache_tokens": kv_tokens, "max_new_tokens": min(2048, kv_tokens // 2),
+            "batch_size": max(1, min(4, cores // 4)), "max_caches": min(64, max(8, kv_tokens // 2048)),
+            "vision": False, "vision_batch": 2}
@@ -2,6 +2,8 @@ import json
 import time
 import os
 import re
+from src.core.workflow_store import WorkflowStore
+from src.core.metrics import log_status
 
 class IntegrationManager:
     """
@@ -10,9 +12,9 @@ class IntegrationManager:
     """
     def __init__(self, memory_manager):
         self.memory = memory_manager
-        # Create a visible folder for users to find their files
-        self.save_dir = "my_workflows"
-        os.makedirs(self.save_dir, exist_ok=True)
+        # Visible folder for users to find their files (absolute: independent of the CWD)
+        self.save_dir = memory_manager.config.WORKFLOW_DIR
+        self.workflows = WorkflowStore(memory_manager.db_path, self.save_dir)
 
     def _sanitize_filename(self, name):
         # Turn "Auto-Gen: Email Flow" into "Auto-Gen_Email_Flow"
@@ -23,7 +25,7 @@ class IntegrationManager:
         1. Saves to DB.
         2. Exports to .json file.
         """
-        print(f"    [Internal] Saving workflow '{name}'...")
+        log_status(f"    [Internal] Saving workflow '{name}'...")
         
         # VALIDATION
         try:
@@ -34,25 +36,21 @@ class IntegrationManager:
         except:
             return {"status": "error", "message": "Invalid JSON format"}
 
-        # 1. SAVE TO DB (System Record)
-        wf_id = self.memory.save_workflow(store_id, name, payload)
-        
-        # 2. SAVE TO FILE (User Access)
+        # 1. SAVE TO DB (compressed, deduplicated by content hash)
+        # 2. SAVE TO FILE (User Access) - queued, written in the background
         safe_name = self._sanitize_filename(name)
-        filename = f"{self.save_dir}/WF_{wf_id}_{safe_name}.json"
-        
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(payload, f, indent=4, ensure_ascii=False)
+        saved = self.workflows.save(store_id, name, payload, filename=f"WF_{{id}}_{safe_name}.json")
 
         # RETURN SUCCESS
         return {
             "status": "success",
-            "workflow_id": wf_id,
-            "file_path": filename,
-            "message": "Workflow saved to Database and File System."
+            "workflow_id": saved["id"],
+            "file_path": saved["file_path"],
+            "deduplicated": saved["deduplicated"],
+            "message": "Workflow saved to Database; file export queued."
         }
 
     def post_to_social(self, platform, content):
-        print(f"    [Network] Posting to {platform}...")
+        log_status(f"    [Network] Posting to {platform}...")
         time.sleep(1)
         return {"status": "published", "link": "http://fb.com/post/123"}
\ No newline at end of file
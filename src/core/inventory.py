@@ -0,0 +1,228 @@
+import heapq
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from src.core.text import normalize_query
+
+
+def stock_status(stock, threshold):
+    if stock <= threshold // 2:
+        return "Critical"
+    if stock <= threshold:
+        return "Low"
+    return "High"
+
+
+class InventoryIndex:
+    """
+    In-memory product search over the `inventory` table.
+
+    - Prefix: tone-stripped words in a sorted list (bisect) -> posting arrays of row
+      positions. Every query word must prefix-match a word of the name ("sua mei").
+    - Fuzzy: character trigrams of the whole name, used when prefix search finds
+      nothing (typos, missing words). Scored by trigram overlap (Dice).
+    - Rows are stored column-wise in compact arrays; `refresh()` pulls only rows whose
+      `updated_at` moved since the last refresh. Every `reconcile_seconds` it reads the
+      whole table instead: deleted rows are dropped and rows written with an older
+      `updated_at` (imports, clock skew) are picked up.
+    """
+    def __init__(self, db_path, fuzzy_min_score=0.3, fuzzy_budget=20000, reconcile_seconds=60):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.fuzzy_min_score = fuzzy_min_score
+        self.fuzzy_budget = fuzzy_budget            # Max postings scanned per fuzzy query
+        self.reconcile_seconds = reconcile_seconds
+        self._lock = threading.Lock()
+        self._pos = {}                              # inventory.id -> position
+        self.ids, self.store_ids = array("q"), array("q")
+        self.stocks, self.thresholds = array("l"), array("l")
+        self.skus, self.names, self._norm = [], [], []
+        self._words = []                            # Sorted distinct words
+        self._postings = {}                         # word -> array of positions
+        self._trigrams = {}                         # trigram -> array of positions
+        self._tri_count = array("H")                # Trigrams per name (for scoring)
+        self._dead = set()                          # Positions of deleted rows (unindexed, skipped)
+        self._words_dirty = False
+        self._watermark = ""
+        self.refreshed_at = 0.0
+        self.reconciled_at = 0.0
+
+    # --- Building ---
+    @staticmethod
+    def _trigrams_of(norm):
+        padded = f"  {norm} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def _index_name(self, pos, norm, tris):
+        for word in set(norm.split()):
+            posting = self._postings.get(word)
+            if posting is None:
+                posting = self._postings[word] = array("l")
+                self._words_dirty = True
+            posting.append(pos)
+        for tri in tris:
+            self._trigrams.setdefault(tri, array("l")).append(pos)
+
+    def _unindex_name(self, pos, norm):
+        for word in set(norm.split()):
+            self._postings[word].remove(pos)
+        for tri in self._trigrams_of(norm):
+            self._trigrams[tri].remove(pos)
+
+    def _upsert(self, row_id, store_id, sku, name, stock, threshold):
+        norm = normalize_query(name)
+        pos = self._pos.get(row_id)
+        if pos is None:
+            tris = self._trigrams_of(norm)
+            pos = self._pos[row_id] = len(self.ids)
+            self.ids.append(row_id)
+            self.store_ids.append(store_id)
+            self.stocks.append(stock)
+            self.thresholds.append(threshold)
+            self.skus.append(sku)
+            self.names.append(name)
+            self._norm.append(norm)
+            self._tri_count.append(len(tris))
+            self._index_name(pos, norm, tris)
+            return
+        self.store_ids[pos], self.stocks[pos], self.thresholds[pos] = store_id, stock, threshold
+        self.skus[pos] = sku
+        if norm != self._norm[pos]:  # Renames are rare; stock updates never touch the postings
+            tris = self._trigrams_of(norm)
+            self._unindex_name(pos, self._norm[pos])
+            self.names[pos], self._norm[pos] = name, norm
+            self._tri_count[pos] = len(tris)
+            self._index_name(pos, norm, tris)
+
+    def _remove(self, row_id):
+        pos = self._pos.pop(row_id)
+        self._unindex_name(pos, self._norm[pos])
+        self._norm[pos] = ""
+        self._dead.add(pos)
+
+    def refresh(self, full=None):
+        """
+        Loads rows changed since the last refresh, or reconciles the whole table when
+        `full` (default: every `reconcile_seconds`). Returns the number of rows applied.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if full is None:
+                full = now - self.reconciled_at >= self.reconcile_seconds
+            # Rows stamped in the current second may still be joined by more writes with the same
+            # stamp, so the watermark only advances to stamps strictly before now; those rows get
+            # re-applied on the next refresh, which is harmless.
+            current_second = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            watermark = "" if full else self._watermark
+            rows = self.conn.execute('''SELECT id, store_id, sku, name, stock, low_stock_threshold, updated_at
+                                        FROM inventory WHERE ? = '' OR updated_at > ?''',
+                                     (watermark, watermark)).fetchall()
+            for row_id, store_id, sku, name, stock, threshold, updated_at in rows:
+                self._upsert(row_id, store_id, sku or "", name or "", stock or 0,
+                             10 if threshold is None else threshold)
+                if updated_at and self._watermark < updated_at < current_second:
+                    self._watermark = updated_at
+            applied = len(rows)
+            if full:
+                gone = set(self._pos).difference(row[0] for row in rows)
+                for row_id in gone:
+                    self._remove(row_id)
+                applied += len(gone)
+                self.reconciled_at = now
+            if self._words_dirty:
+                self._words = sorted(self._postings)
+                self._words_dirty = False
+            self.refreshed_at = now
+            return applied
+
+    # --- Queries ---
+    def _row(self, pos, match, score=1.0):
+        stock, threshold = self.stocks[pos], self.thresholds[pos]
+        return {"sku": self.skus[pos], "name": self.names[pos], "store_id": self.store_ids[pos], "stock": stock,
+                "threshold": threshold, "status": stock_status(stock, threshold), "match": match,
+                "score": round(score, 3)}
+
+    def _word_range(self, word):
+        return bisect_left(self._words, word), bisect_left(self._words, word + "\uffff")
+
+    def _prefix(self, words, store_id):
+        """Positions whose name has a word starting with each query word."""
+        ranges = []
+        for word in set(words):
+            lo, hi = self._word_range(word)
+            if lo == hi:
+                return []
+            ranges.append((sum(len(self._postings[self._words[i]]) for i in range(lo, hi)), word, lo, hi))
+        # Most selective word first. Large candidate sets are intersected as sets (C speed);
+        # once few candidates remain, the other words are checked on their names directly.
+        ranges.sort()
+        candidates = None
+        for n, (_, word, lo, hi) in enumerate(ranges):
+            if candidates is not None and len(candidates) <= 64:
+                rest = [w for _, w, _, _ in ranges[n:]]
+                candidates = {p for p in candidates
+                              if all(any(t.startswith(w) for t in self._norm[p].split()) for w in rest)}
+                break
+            positions = set()
+            for i in range(lo, hi):
+                positions.update(self._postings[self._words[i]])
+            candidates = positions if candidates is None else candidates & positions
+            if not candidates:
+                return []
+        if store_id is not None:
+            return [p for p in candidates if self.store_ids[p] == store_id]
+        return candidates
+
+    def _fuzzy(self, norm, store_id, limit):
+        query_tris = self._trigrams_of(norm)
+        # Count shared trigrams, rarest first, within a postings budget: common trigrams
+        # ("  s", "ua ") add cost but hardly any signal.
+        hits, scanned = Counter(), 0
+        for tri in sorted(query_tris, key=lambda t: len(self._trigrams.get(t, ()))):
+            posting = self._trigrams.get(tri)
+            if not posting:
+                continue
+            if scanned and scanned + len(posting) > self.fuzzy_budget:
+                break
+            hits.update(posting)
+            scanned += len(posting)
+        if store_id is not None:
+            hits = Counter({p: c for p, c in hits.items() if self.store_ids[p] == store_id})
+
+        # Exact Dice score on the shortlist only.
+        scored = []
+        for pos, _ in hits.most_common(limit * 20):
+            common = len(query_tris & self._trigrams_of(self._norm[pos]))
+            score = 2 * common / (len(query_tris) + self._tri_count[pos])
+            if score >= self.fuzzy_min_score:
+                scored.append((score, pos))
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        return scored[:limit]
+
+    def search(self, query, store_id=None, limit=5):
+        """Best matches for a product name, prefix matches first, fuzzy as fallback."""
+        norm = normalize_query(query)
+        if not norm:
+            return []
+        with self._lock:
+            positions = self._prefix(norm.split(), store_id)
+            if positions:
+                # Shorter names first: "sua meiji" should rank "Sữa Meiji Số 9" above long variants.
+                ranked = heapq.nsmallest(limit, positions, key=lambda p: (len(self._norm[p]), p))
+                return [self._row(p, "prefix") for p in ranked]
+            return [self._row(p, "fuzzy", score) for score, p in self._fuzzy(norm, store_id, limit)]
+
+    def low_stock(self, store_id=None, limit=20):
+        with self._lock:
+            rows = [p for p in range(len(self.ids)) if self.stocks[p] <= self.thresholds[p]
+                    and (store_id is None or self.store_ids[p] == store_id) and p not in self._dead]
+            rows.sort(key=lambda p: (self.stocks[p], p))
+            return [self._row(p, "low_stock") for p in rows[:limit]]
+
+    def stats(self):
+        return {"rows": len(self.ids) - len(self._dead), "words": len(self._words), "trigrams": len(self._trigrams),
+                "watermark": self._watermark}
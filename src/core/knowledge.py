@@ -1,4 +1,3 @@
-import chromadb
 from sentence_transformers import SentenceTransformer, CrossEncoder
 import os
 import glob
@@ -6,23 +5,30 @@ import logging
 import uuid
 from pypdf import PdfReader
 import docx
+from src.core import metrics
+from src.core.config import get_config
+from src.core.metrics import log_status
+from src.core.vector_store import make_vector_store
 
 class KnowledgeBase:
-    def __init__(self, persist_dir="./data/vector_db", doc_dir="./src/data/docs"):
-        print("📚 [RAG] Initializing Knowledge Base 2.5 (Verbose Mode)...")
+    def __init__(self, persist_dir="./data/vector_db", doc_dir="./src/data/docs", vector_store=None):
+        log_status("📚 [RAG] Initializing Knowledge Base 2.5 (Verbose Mode)...")
         
         self.doc_dir = doc_dir
         
         # Models
+        config = get_config()
+        settings = dict(config.knowledge)
         self.embedder = SentenceTransformer('all-MiniLM-L6-v2', device='cpu')
-        self.reranker = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2', device='cpu')
+        # Re-ranker only where the hardware profile has RAM for it; otherwise hits keep vector order
+        self.reranker = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2', device='cpu') \
+            if settings.pop("reranker") else None
         
-        # DB Setup
-        os.makedirs(persist_dir, exist_ok=True)
+        # DB Setup ("memmap" or "chroma"; get_config().knowledge picks the default)
         os.makedirs(doc_dir, exist_ok=True)
-        
-        self.client = chromadb.PersistentClient(path=persist_dir)
-        self.collection = self.client.get_or_create_collection(name="project_a_docs")
+        kind = settings.pop("vector_store")
+        self.store = make_vector_store(vector_store or kind, persist_dir, config.DB_PATH, **settings)
+        log_status(f"   🗄️  [RAG] Vector store: {self.store.name} ({self.store.count()} chunks)")
         
         # Run Ingestion
         self.ingest_folder()
@@ -31,15 +37,14 @@ class KnowledgeBase:
         """Scans folder and ingests files with detailed logging."""
         files = glob.glob(os.path.join(self.doc_dir, "*.*"))
         
-        print(f"📂 [RAG] Scanning {self.doc_dir}... Found {len(files)} files.")
+        log_status(f"📂 [RAG] Scanning {self.doc_dir}... Found {len(files)} files.")
         
         for file_path in files:
             filename = os.path.basename(file_path)
             
             # 1. Check DB for duplicates
-            existing = self.collection.get(where={"source": filename})
-            if existing['ids']:
-                print(f"   ℹ️  [Cache] Already in DB: {filename}")
+            if self.store.has_source(filename):
+                log_status(f"   ℹ️  [Cache] Already in DB: {filename}")
                 continue 
 
             # 2. Extract Text based on Extension (Case Insensitive)
@@ -60,18 +65,18 @@ class KnowledgeBase:
                         text = f.read()
                 
                 else:
-                    print(f"   ⚠️  Unsupported Format: {filename} ({ext})")
+                    log_status(f"   ⚠️  Unsupported Format: {filename} ({ext})")
                     continue
                 
                 # 3. Save if text found
                 if text.strip():
                     self.add_document(text, source=filename)
-                    print(f"   ✅ Learned: {filename}")
+                    log_status(f"   ✅ Learned: {filename}")
                 else:
-                    print(f"   ⚠️  Empty File (No selectable text): {filename}")
+                    log_status(f"   ⚠️  Empty File (No selectable text): {filename}")
                     
             except Exception as e:
-                print(f"   ❌ Error reading {filename}: {e}")
+                log_status(f"   ❌ Error reading {filename}: {e}")
 
     def add_document(self, text: str, source: str = "manual_entry"):
         chunk_size = 800 # Increased chunk size for better context
@@ -87,26 +92,27 @@ class KnowledgeBase:
         if not raw_chunks: return
 
         ids = [f"{source}_{i}" for i in range(len(raw_chunks))]
-        embeddings = self.embedder.encode(raw_chunks).tolist()
+        embeddings = self.embedder.encode(raw_chunks)
         metadatas = [{"source": source} for _ in raw_chunks]
         
-        self.collection.add(
-            documents=raw_chunks,
-            embeddings=embeddings,
-            metadatas=metadatas,
-            ids=ids
-        )
+        self.store.add(ids, embeddings, raw_chunks, metadatas)
 
     def search(self, query: str, top_k=3):
-        query_vec = self.embedder.encode([query]).tolist()
-        results = self.collection.query(query_embeddings=query_vec, n_results=10)
+        with metrics.stage("rag.embed"):
+            query_vec = self.embedder.encode([query])[0]
+        with metrics.stage("rag.query", store=self.store.name):
+            results = self.store.query(query_vec, top_k=10)
         
-        candidates = results['documents'][0]
+        candidates = [doc for doc, _, _ in results]
         if not candidates: return None
         
+        if self.reranker is None:
+            return "\n---\n".join(candidates[:top_k])
+
         # Re-Ranking
         pairs = [[query, doc] for doc in candidates]
-        scores = self.reranker.predict(pairs)
+        with metrics.stage("rag.rerank", candidates=len(candidates)):
+            scores = self.reranker.predict(pairs)
         scored_docs = sorted(list(zip(candidates, scores)), key=lambda x: x[1], reverse=True)
         
         # Return top K with Score > 0
@@ -0,0 +1,147 @@
+import datetime
+import functools
+
+import numpy as np
+from lunardate import LunarDate
+
+# (key, label, lunar month, lunar day). Retail demand in Vietnam follows these more than the solar calendar.
+LUNAR_EVENTS = [
+    ("tet", "Tết Nguyên Đán", 1, 1),
+    ("ram_thang_gieng", "Rằm tháng Giêng", 1, 15),
+    ("gio_to", "Giỗ Tổ Hùng Vương", 3, 10),
+    ("doan_ngo", "Tết Đoan Ngọ", 5, 5),
+    ("vu_lan", "Lễ Vu Lan", 7, 15),
+    ("trung_thu", "Tết Trung Thu", 8, 15),
+    ("ong_tao", "Ông Công Ông Táo", 12, 23),
+]
+# (key, label, month, day) on the solar calendar
+SOLAR_EVENTS = [
+    ("valentine", "Lễ Tình nhân", 2, 14),
+    ("womens_day", "Quốc tế Phụ nữ 8/3", 3, 8),
+    ("reunification", "Lễ 30/4 - 1/5", 4, 30),
+    ("childrens_day", "Quốc tế Thiếu nhi 1/6", 6, 1),
+    ("national_day", "Quốc khánh 2/9", 9, 2),
+    ("vn_womens_day", "Phụ nữ Việt Nam 20/10", 10, 20),
+    ("singles_day", "Sale 11/11", 11, 11),
+    ("christmas", "Giáng sinh", 12, 24),
+]
+
+
+class LunarCalendar:
+    """
+    Solar ↔ lunar calendar and holiday table for [start_year, end_year], precomputed
+    as NumPy arrays indexed by day offset from `self.start` (one entry per solar day).
+
+    Built from the lunar month starts only (~13 LunarDate conversions per year), so
+    decades take milliseconds. `ensure_table` mirrors it into SQLite
+    (`lunar_calendar`, `lunar_events`) so queries can join it on `sales.date`:
+
+        SELECT lc.lunar_month, SUM(s.amount) FROM sales s
+        JOIN lunar_calendar lc ON lc.solar_date = s.date GROUP BY lc.lunar_month
+
+    Note: lunardate computes the Chinese calendar (UTC+8). Vietnam's (UTC+7) starts a
+    month one day earlier in a few months per century (e.g. Tết 1985 and 2007).
+    """
+    def __init__(self, start_year=1990, end_year=2060):
+        self.start = datetime.date(start_year, 1, 1)
+        self.end = datetime.date(end_year, 12, 31)
+        days = (self.end - self.start).days + 1
+
+        # Every lunar month overlapping the range, in order: (year, month, leap, first solar day offset)
+        months = []
+        for year in range(start_year - 1, end_year + 1):
+            leap_month = LunarDate.leapMonthForYear(year)
+            for month in range(1, 13):
+                for leap in ((False, True) if month == leap_month else (False,)):
+                    first = LunarDate(year, month, 1, leap).toSolarDate()
+                    months.append((year, month, leap, (first - self.start).days))
+        firsts = np.array([m[3] for m in months])
+
+        offsets = np.arange(days)
+        month_index = np.searchsorted(firsts, offsets, side="right") - 1
+        self.lunar_year = np.array([m[0] for m in months], dtype=np.int16)[month_index]
+        self.lunar_month = np.array([m[1] for m in months], dtype=np.int8)[month_index]
+        self.leap = np.array([m[2] for m in months], dtype=bool)[month_index]
+        self.lunar_day = (offsets - firsts[month_index] + 1).astype(np.int8)
+        self._month_first = {(y, m, leap): first for y, m, leap, first in months}
+        self._month_length = {key: nxt[3] - first for key, first, nxt in
+                              zip(((y, m, leap) for y, m, leap, _ in months), firsts, months[1:])}
+
+        # Holiday occurrences: (key, label, kind, year, offset), sorted by date
+        events = []
+        for year in range(start_year, end_year + 1):
+            for key, label, month, day in LUNAR_EVENTS:
+                offset = self.solar_offset(year, month, day)
+                if offset is not None:
+                    events.append((key, label, "lunar", year, offset))
+            for key, label, month, day in SOLAR_EVENTS:
+                events.append((key, label, "solar", year, (datetime.date(year, month, day) - self.start).days))
+        events = [e for e in events if 0 <= e[4] < days]
+        events.sort(key=lambda e: e[4])
+        self.events = events
+        self.event_at = {}
+        for key, label, _, _, offset in events:
+            self.event_at.setdefault(offset, label)
+
+    def __len__(self):
+        return len(self.lunar_day)
+
+    def offset(self, date):
+        """Day offset of a date / 'YYYY-MM-DD' string, or None outside the table."""
+        if isinstance(date, str):
+            date = datetime.date.fromisoformat(date[:10])
+        offset = (date - self.start).days
+        return offset if 0 <= offset < len(self) else None
+
+    def date(self, offset):
+        return self.start + datetime.timedelta(days=int(offset))
+
+    def lunar(self, date):
+        """(lunar_year, lunar_month, lunar_day, leap) of a solar date."""
+        i = self.offset(date)
+        if i is None:
+            lunar = LunarDate.fromSolarDate(date.year, date.month, date.day)
+            return lunar.year, lunar.month, lunar.day, bool(lunar.isLeapMonth)
+        return int(self.lunar_year[i]), int(self.lunar_month[i]), int(self.lunar_day[i]), bool(self.leap[i])
+
+    def solar_offset(self, year, month, day, leap=False):
+        """Offset of a lunar date; day 30 of a 29-day month maps to day 29. None outside the table."""
+        first = self._month_first.get((year, month, leap))
+        length = self._month_length.get((year, month, leap))
+        if first is None or length is None:
+            return None
+        offset = first + min(day, length) - 1
+        return offset if 0 <= offset < len(self) else None
+
+    def occurrences(self, key):
+        """Offsets of every occurrence of an event, oldest first."""
+        return [e[4] for e in self.events if e[0] == key]
+
+    def ensure_table(self, conn):
+        """Creates / refreshes the SQL mirror (`lunar_calendar`, `lunar_events`) when its range differs."""
+        conn.execute('''CREATE TABLE IF NOT EXISTS lunar_calendar
+                        (solar_date TEXT PRIMARY KEY, lunar_year INTEGER, lunar_month INTEGER,
+                         lunar_day INTEGER, leap INTEGER, event TEXT) WITHOUT ROWID''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS lunar_events
+                        (event TEXT, label TEXT, kind TEXT, year INTEGER, solar_date TEXT,
+                         PRIMARY KEY (event, year))''')
+        span = conn.execute("SELECT MIN(solar_date), MAX(solar_date), COUNT(*) FROM lunar_calendar").fetchone()
+        if span == (self.start.isoformat(), self.end.isoformat(), len(self)):
+            return False
+        with conn:
+            conn.execute("DELETE FROM lunar_calendar")
+            conn.execute("DELETE FROM lunar_events")
+            conn.executemany("INSERT INTO lunar_calendar VALUES (?, ?, ?, ?, ?, ?)",
+                             [(self.date(i).isoformat(), int(self.lunar_year[i]), int(self.lunar_month[i]),
+                               int(self.lunar_day[i]), int(self.leap[i]), self.event_at.get(i))
+                              for i in range(len(self))])
+            conn.executemany("INSERT OR REPLACE INTO lunar_events VALUES (?, ?, ?, ?, ?)",
+                             [(key, label, kind, year, self.date(offset).isoformat())
+                              for key, label, kind, year, offset in self.events])
+        return True
+
+
+@functools.lru_cache(maxsize=None)
+def default_calendar():
+    """Shared calendar for the process (1990-2060)."""
+    return LunarCalendar()
@@ -1,21 +1,42 @@
 import sqlite3
 import json
 import os
-from datetime import datetime
-from src.core.config import Config
+from datetime import datetime, timedelta
+from src.core.config import get_config
+from src.core.metrics import timed
 
 class MemoryManager:
-    def __init__(self):
-        self.config = Config()
-        os.makedirs(os.path.dirname(self.config.DB_PATH), exist_ok=True)
-        self.conn = sqlite3.connect(self.config.DB_PATH, check_same_thread=False)
+    def __init__(self, db_path=None):
+        self.config = get_config()
+        # db_path overrides the configured DB (benchmarks / scratch databases)
+        self.db_path = db_path or self.config.DB_PATH
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._write_listeners = []
         self._init_db()
         self._seed_saas_data()
 
     def _init_db(self):
         cursor = self.conn.cursor()
+        # Lets HistoryRetention return freed pages to the OS in small steps (no effect on existing DBs,
+        # which the retention job converts once)
+        cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
         cursor.execute('''CREATE TABLE IF NOT EXISTS history
                           (id INTEGER PRIMARY KEY, role TEXT, content TEXT, timestamp TEXT)''')
+        # Chat history is per tenant (user, store; 0 = none); old turns are compacted into
+        # history_summaries and archived by HistoryRetention
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(history)")}
+        for column in ("user_id", "store_id"):
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE history ADD COLUMN {column} INTEGER DEFAULT 0")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_history_tenant ON history (user_id, store_id, id)")
+        cursor.execute('''CREATE TABLE IF NOT EXISTS history_summaries
+                          (id INTEGER PRIMARY KEY, user_id INTEGER, store_id INTEGER, month TEXT,
+                           turns INTEGER, first_at TEXT, last_at TEXT, topics TEXT, summary TEXT,
+                           UNIQUE (user_id, store_id, month))''')
+        cursor.execute('''CREATE TABLE IF NOT EXISTS retention_policies
+                          (user_id INTEGER, store_id INTEGER, hot_days INTEGER, keep_turns INTEGER,
+                           archive INTEGER, PRIMARY KEY (user_id, store_id))''')
         cursor.execute('''CREATE TABLE IF NOT EXISTS users
                           (id INTEGER PRIMARY KEY, name TEXT, email TEXT)''')
         cursor.execute('''CREATE TABLE IF NOT EXISTS stores
@@ -35,6 +56,50 @@ class MemoryManager:
                            status TEXT, 
                            json_structure TEXT, 
                            created_at TEXT)''')
+
+        # Compressed blueprint payloads, shared by every workflow with identical content
+        cursor.execute('''CREATE TABLE IF NOT EXISTS workflow_blobs
+                          (hash TEXT PRIMARY KEY, codec TEXT, raw_size INTEGER, data BLOB)''')
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(workflows)")}
+        for column, ddl in (("blob_hash", "TEXT"), ("size", "INTEGER"), ("node_count", "INTEGER")):
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE workflows ADD COLUMN {column} {ddl}")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_workflows_store ON workflows (store_id)")
+
+        # Current health-check alerts per store (replaced on every scheduler run)
+        cursor.execute('''CREATE TABLE IF NOT EXISTS alerts
+                          (id INTEGER PRIMARY KEY, store_id INTEGER, kind TEXT,
+                           message TEXT, created_at TEXT)''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_store ON alerts (store_id)")
+
+        # Stock levels per store (replaces the hard-coded mock inventory)
+        cursor.execute('''CREATE TABLE IF NOT EXISTS inventory
+                          (id INTEGER PRIMARY KEY, store_id INTEGER, sku TEXT, name TEXT,
+                           stock INTEGER, low_stock_threshold INTEGER DEFAULT 10, updated_at TEXT)''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_inventory_store ON inventory (store_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_inventory_updated ON inventory (updated_at)")
+
+        # One row per health-check scheduler run (timing + volume)
+        cursor.execute('''CREATE TABLE IF NOT EXISTS health_runs
+                          (id INTEGER PRIMARY KEY, started_at TEXT, duration_ms REAL,
+                           stores INTEGER, alerts INTEGER, changed_stores INTEGER)''')
+
+        # CRM: phone/name are stored normalized too, so lookups stay on the indexes
+        cursor.execute('''CREATE TABLE IF NOT EXISTS customers
+                          (id INTEGER PRIMARY KEY, store_id INTEGER, name TEXT, phone TEXT,
+                           phone_norm TEXT, name_norm TEXT, rank TEXT, last_purchase TEXT,
+                           total_spent REAL DEFAULT 0)''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_customers_store_phone ON customers (store_id, phone_norm)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_customers_store_name ON customers (store_id, name_norm)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_customers_phone ON customers (phone_norm)")
+
+        # Semantic /plan cache: prompt embedding + generated graph, per embedder
+        cursor.execute('''CREATE TABLE IF NOT EXISTS plan_cache
+                          (id INTEGER PRIMARY KEY, embedder TEXT, scope INTEGER, prompt TEXT,
+                           vector BLOB, plan TEXT, created_at TEXT)''')
+
+        # The scheduler aggregates today's sales for every store in one query
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sales_date_store ON sales (date, store_id)")
         self.conn.commit()
 
     def _seed_saas_data(self):
@@ -51,6 +116,27 @@ class MemoryManager:
             cursor.execute("INSERT INTO sales (store_id, date, amount, category) VALUES (1, ?, 2500000, 'Diapers')", (today,))
             self.conn.commit()
 
+        cursor.execute("SELECT count(*) FROM inventory")
+        if cursor.fetchone()[0] == 0:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            cursor.executemany('''INSERT INTO inventory (store_id, sku, name, stock, low_stock_threshold, updated_at)
+                                  VALUES (1, ?, ?, ?, ?, ?)''', [
+                ("BIM-BOBBY-M", "Bỉm Bobby Size M", 45, 20, now),
+                ("SUA-MEIJI-9", "Sữa Meiji Số 9", 12, 15, now),
+                ("QUAN-CHUC-COTTON", "Quần Chục Cotton", 100, 20, now),
+                ("AO-KHOAC-GIO", "Áo Khoác Gió", 5, 10, now),
+            ])
+            self.conn.commit()
+
+        cursor.execute("SELECT count(*) FROM customers")
+        if cursor.fetchone()[0] == 0:
+            two_days_ago = (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d")
+            cursor.execute('''INSERT INTO customers (store_id, name, phone, phone_norm, name_norm, rank,
+                              last_purchase, total_spent) VALUES (1, 'Chị Lan', '0912 345 678', '0912345678',
+                              'chi lan', 'VIP', ?, 12500000)''', (two_days_ago,))
+            self.conn.commit()
+
+    @timed("db.save_workflow")
     def save_workflow(self, store_id, name, json_data):
         """Saves the AI-generated design to your platform's DB."""
         cursor = self.conn.cursor()
@@ -60,11 +146,46 @@ class MemoryManager:
         self.conn.commit()
         return cursor.lastrowid
 
+    def add_write_listener(self, callback):
+        """callback(table, store_id) is called after writes that affect cached store context."""
+        self._write_listeners.append(callback)
+
+    def notify_write(self, table, store_id=None):
+        for callback in self._write_listeners:
+            callback(table, store_id)
+
+    @timed("db.get_user_stores")
     def get_user_stores(self, user_id):
         cursor = self.conn.cursor()
         cursor.execute("SELECT id, name, industry, location FROM stores WHERE user_id = ?", (user_id,))
         return [{"id": r[0], "name": r[1], "industry": r[2], "location": r[3]} for r in cursor.fetchall()]
 
+    @timed("db.get_store")
+    def get_store(self, user_id, store_id):
+        """Returns the store only if it belongs to the user."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id, name, industry, location FROM stores WHERE id = ? AND user_id = ?", (store_id, user_id))
+        r = cursor.fetchone()
+        return {"id": r[0], "name": r[1], "industry": r[2], "location": r[3]} if r else None
+
+    @timed("db.update_stock")
+    def update_stock(self, store_id, sku, stock):
+        """Sets an item's stock; bumping updated_at lets InventoryIndex.refresh pick it up."""
+        cursor = self.conn.cursor()
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor.execute("UPDATE inventory SET stock = ?, updated_at = ? WHERE store_id = ? AND sku = ?",
+                       (stock, now, store_id, sku))
+        self.conn.commit()
+        self.notify_write("inventory", store_id)
+        return cursor.rowcount
+
+    @timed("db.get_latest_alerts")
+    def get_latest_alerts(self, store_id):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT message FROM alerts WHERE store_id = ? ORDER BY id", (store_id,))
+        return [r[0] for r in cursor.fetchall()]
+
+    @timed("db.get_sales_data")
     def get_sales_data(self, store_id, metric="revenue_today"):
         cursor = self.conn.cursor()
         today = datetime.now().strftime("%Y-%m-%d")
@@ -74,25 +195,39 @@ class MemoryManager:
             return f"{res:,.0f} VND" if res else "0 VND"
         return "No Data"
 
+    @timed("db.update_profile")
     def update_profile(self, key, value):
         cursor = self.conn.cursor()
         cursor.execute("INSERT OR REPLACE INTO profile (key, value) VALUES (?, ?)", (key, value))
         self.conn.commit()
+        self.notify_write("profile")
 
+    @timed("db.get_profile")
     def get_profile(self):
         cursor = self.conn.cursor()
         cursor.execute("SELECT key, value FROM profile")
         return {row[0]: row[1] for row in cursor.fetchall()}
 
-    def add_message(self, role, content):
+    @timed("db.add_message")
+    def add_message(self, role, content, user_id=0, store_id=0):
         cursor = self.conn.cursor()
-        cursor.execute("INSERT INTO history (role, content, timestamp) VALUES (?, ?, ?)",
-                       (role, str(content), datetime.now().isoformat()))
+        cursor.execute("INSERT INTO history (role, content, timestamp, user_id, store_id) VALUES (?, ?, ?, ?, ?)",
+                       (role, str(content), datetime.now().isoformat(), user_id or 0, store_id or 0))
         self.conn.commit()
 
-    def get_context_string(self, limit=6):
+    @timed("db.get_summaries")
+    def get_summaries(self, user_id=0, store_id=0, limit=3):
+        """Compacted summaries of the tenant's older conversations, newest month first."""
+        cursor = self.conn.cursor()
+        cursor.execute('''SELECT month, turns, summary FROM history_summaries WHERE user_id = ? AND store_id = ?
+                          ORDER BY month DESC LIMIT ?''', (user_id or 0, store_id or 0, limit))
+        return [{"month": r[0], "turns": r[1], "summary": r[2]} for r in cursor.fetchall()]
+
+    @timed("db.get_context_string")
+    def get_context_string(self, limit=6, user_id=0, store_id=0):
         cursor = self.conn.cursor()
-        cursor.execute("SELECT role, content FROM history ORDER BY id DESC LIMIT ?", (limit,))
+        cursor.execute('''SELECT role, content FROM history WHERE user_id = ? AND store_id = ?
+                          ORDER BY id DESC LIMIT ?''', (user_id or 0, store_id or 0, limit))
         rows = cursor.fetchall()
         history = reversed(rows)
         formatted = []
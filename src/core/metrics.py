@@ -0,0 +1,324 @@
+import contextvars
+import functools
+import json
+import logging
+import sys
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+RATE_BUCKETS = (1, 2, 5, 10, 15, 20, 30, 50, 100, 200)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """One metric family. Samples are keyed by the label values, in `labelnames` order."""
+    kind = "untyped"
+
+    def __init__(self, registry, name, help, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Set directly, or computed at scrape time when built with `fn` (no labels)."""
+    kind = "gauge"
+
+    def __init__(self, registry, name, help, labelnames=(), fn=None):
+        super().__init__(registry, name, help, labelnames)
+        self.fn = fn
+
+    def set(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def render(self):
+        if self.fn is not None:
+            with self._lock:
+                self._values[()] = self.fn()
+        return super().render()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, n in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += n
+                    le = 'le="%s"' % bound
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [le])} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {round(total, 6)}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    """Metric families rendered in the Prometheus text format. Disabled: every update is a no-op."""
+    def __init__(self):
+        self.enabled = False
+        self._metrics = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(self, name, *args, **kwargs)
+            return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name, help, labelnames=(), fn=None):
+        return self._get(Gauge, name, help, labelnames, fn=fn)
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram("project_a_stage_seconds", "Time spent per pipeline stage.", ("stage",))
+REQUESTS = registry.counter("project_a_requests_total", "HTTP requests by route and status.", ("path", "status"))
+REQUEST_SECONDS = registry.histogram("project_a_request_seconds", "HTTP request latency by route.", ("path",))
+LLM_PROMPT_TOKENS = registry.counter("project_a_llm_prompt_tokens_total", "Prompt tokens prefilled by the LLM (KV-cache hits excluded).",
+                                     ("role",))
+LLM_GENERATED_TOKENS = registry.counter("project_a_llm_generated_tokens_total", "Tokens generated by the LLM.",
+                                        ("role",))
+LLM_TOKENS_PER_SECOND = registry.histogram("project_a_llm_tokens_per_second", "Decode throughput per generate call.",
+                                           ("role",), buckets=RATE_BUCKETS)
+LLM_QUEUE_SECONDS = registry.histogram("project_a_llm_queue_wait_seconds",
+                                       "Time a generate call waited for the shared model.", ("role",))
+
+
+# --- Tracing ---
+_current_trace = contextvars.ContextVar("project_a_trace", default=None)
+
+
+class Trace:
+    """Per-request trace: an id plus the ordered stages (name, duration, details) recorded under it."""
+    def __init__(self, name, trace_id=None):
+        self.id = trace_id or uuid.uuid4().hex[:16]
+        self.name = name
+        self.started = time.perf_counter()
+        self.started_at = datetime.now().isoformat(timespec="milliseconds")
+        self.stages = []
+        self.total_ms = None
+
+    def add(self, stage, seconds, info=None):
+        self.stages.append({"stage": stage, "ms": round(seconds * 1000, 3), **(info or {})})
+
+    def to_dict(self):
+        return {"trace_id": self.id, "name": self.name, "started_at": self.started_at, "total_ms": self.total_ms,
+                "stages": list(self.stages)}
+
+
+class TraceLog:
+    """The most recent finished traces, by id."""
+    def __init__(self, max_traces=256):
+        self.max_traces = max_traces
+        self._traces = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, trace):
+        with self._lock:
+            self._traces[trace.id] = trace
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+
+    def get(self, trace_id):
+        with self._lock:
+            trace = self._traces.get(trace_id)
+        return trace.to_dict() if trace else None
+
+
+traces = TraceLog()
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+class _Stage:
+    """Times a block into project_a_stage_seconds and the current trace. `info` can be filled in the block."""
+    __slots__ = ("name", "info", "_start")
+
+    def __init__(self, name, info):
+        self.name = name
+        self.info = info
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self.info
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self._start
+        STAGE_SECONDS.observe(seconds, stage=self.name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(self.name, seconds, self.info)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name, **info):
+    """`with stage("rag.rerank", docs=10) as info: ...`. Returns a shared no-op when metrics are disabled."""
+    if not registry.enabled:
+        return _NULL_STAGE
+    return _Stage(name, info)
+
+
+def timed(name):
+    """Decorator form of `stage` for whole functions."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return fn(*args, **kwargs)
+            with _Stage(name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def trace(name, trace_id=None):
+    """
+    `with trace("/chat") as t:` starts a trace for the current context (asyncio tasks
+    and `asyncio.to_thread` calls started inside inherit it). Yields None when disabled.
+    """
+    if not registry.enabled:
+        yield None
+        return
+    current = Trace(name, trace_id)
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+        current.total_ms = round((time.perf_counter() - current.started) * 1000, 3)
+        traces.add(current)
+        if _structured:
+            _emit("info", "trace", current.to_dict())
+
+
+# --- Status lines / structured logging ---
+_structured = False
+_logger = logging.getLogger("project_a")
+LEVEL_HINTS = (("❌", "error"), ("CRITICAL", "error"), ("⚠️", "warning"))
+
+
+def _emit(level, message, fields):
+    record = {"ts": datetime.now().isoformat(timespec="milliseconds"), "level": level, "msg": message}
+    current = _current_trace.get()
+    if current is not None:
+        record["trace_id"] = current.id
+    record.update(fields)
+    _logger.log(getattr(logging, level.upper(), logging.INFO), json.dumps(record, ensure_ascii=False, default=str))
+
+
+def log_status(message, level=None, **fields):
+    """
+    The console status line ("    [Architect] Designing Logic..."). Printed as-is by
+    default; with LOG_FORMAT=json it becomes one JSON log record carrying the trace id.
+    """
+    if not _structured:
+        print(message)
+        return
+    if level is None:
+        level = next((lvl for hint, lvl in LEVEL_HINTS if hint in message), "info")
+    _emit(level, message.strip(), fields)
+
+
+def configure(enabled=True, log_format="text", trace_buffer=256):
+    """Applies Config().observability; call once at process start."""
+    global _structured
+    registry.enabled = enabled
+    traces.max_traces = trace_buffer
+    _structured = log_format == "json"
+    if _structured and not _logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _logger.addHandler(handler)
+        _logger.setLevel(logging.INFO)
+        _logger.propagate = False
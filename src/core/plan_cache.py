@@ -0,0 +1,229 @@
+import hashlib
+import json
+import re
+import sqlite3
+import statistics
+import threading
+import zlib
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+from src.core.text import normalize_query
+from src.core.metrics import log_status
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # Hashing embedder keeps the cache usable without it
+    SentenceTransformer = None
+
+
+# Details that change the plan but barely move a sentence embedding ("8 giờ sáng" vs "8 giờ tối",
+# "website" vs "Shopee"): numbers, times of day, periods and apps, on tone-stripped words.
+NUMBER = re.compile(r"\d+(?:[.,:h]\d+)*")
+KEY_WORDS = frozenset("""
+    sang trua chieu toi dem khuya am pm ngay tuan thang nam quy
+    facebook fb messenger instagram tiktok youtube zalo telegram slack discord sms email gmail
+    shopee lazada tiki sendo website web shopify woocommerce haravan sapo kiotviet pancake
+    sheet sheets excel drive docs notion airtable
+""".split())
+
+
+def key_terms(text):
+    """The numbers and key words of a prompt; a semantic hit must have the same set."""
+    norm = normalize_query(text)
+    return frozenset(NUMBER.findall(norm)) | KEY_WORDS.intersection(norm.split())
+
+
+class HashingEmbedder:
+    """
+    Dependency-free embedding: tone-stripped words, word bigrams and character
+    trigrams hashed into `dim` signed buckets, L2-normalized.
+    """
+    threshold = 0.90
+
+    def __init__(self, dim=512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    @staticmethod
+    def _features(text):
+        norm = normalize_query(text)
+        words = norm.split()
+        padded = f" {norm} "
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])] + \
+            [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+    def encode(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceEmbedder:
+    """MiniLM sentence embeddings (same model as the knowledge base)."""
+    threshold = 0.90
+
+    def __init__(self, model_name="all-MiniLM-L6-v2", device="cpu"):
+        self.name = model_name
+        self.model = SentenceTransformer(model_name, device=device)
+
+    def encode(self, texts):
+        return np.asarray(self.model.encode(list(texts), normalize_embeddings=True), dtype=np.float32)
+
+
+def make_embedder(kind="auto"):
+    """"auto" uses MiniLM when sentence-transformers is installed, the hashing embedder otherwise."""
+    if kind in ("auto", "minilm") and SentenceTransformer is not None:
+        return SentenceEmbedder()
+    if kind == "minilm":
+        raise RuntimeError("PLAN_CACHE_EMBEDDER=minilm needs `sentence-transformers`.")
+    return HashingEmbedder()
+
+
+def scope_key(context):
+    """Plans are only reused between requests with the same `/plan` context."""
+    if not context:
+        return 0
+    raw = json.dumps(context, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return int.from_bytes(hashlib.sha1(raw).digest()[:8], "little", signed=True)
+
+
+class PlanCache:
+    """
+    Semantic cache of generated `/plan` graphs.
+
+    - An exact repeat (same normalized prompt and context) is a dict hit, no embedding.
+    - Otherwise the prompt embedding is compared with every cached prompt of the same
+      context in one matrix product; the best match at or above `threshold` (cosine)
+      whose `key_terms` (numbers, times, apps) are the same as the prompt's is reused.
+    - Holds up to `max_entries` plans (least recently used evicted). With a `db_path`,
+      entries are persisted in `plan_cache` and reloaded on start.
+    """
+    def __init__(self, db_path=None, embedder="auto", threshold=None, max_entries=2000):
+        self.embedder = make_embedder(embedder) if isinstance(embedder, str) else embedder
+        self.threshold = threshold or self.embedder.threshold
+        self.max_entries = max_entries
+        self._vectors = None                                    # (max_entries, dim), allocated on first put
+        self._scopes = np.zeros(max_entries, dtype=np.int64)
+        self._entries = []                                      # row -> {"id", "prompt", "norm", "terms", "plan", "used"}
+        self._exact = {}                                        # (scope, normalized prompt) -> row
+        self._clock = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._hit_ms = deque(maxlen=1000)
+        self._generation_ms = deque(maxlen=1000)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False) if db_path else None
+        if self.conn is not None:
+            self._load()
+
+    def _load(self):
+        rows = self.conn.execute('''SELECT id, scope, prompt, vector, plan FROM plan_cache WHERE embedder = ?
+                                    ORDER BY id DESC LIMIT ?''', (self.embedder.name, self.max_entries)).fetchall()
+        for row_id, scope, prompt, vector, plan in reversed(rows):
+            self._insert(scope, prompt, np.frombuffer(vector, dtype=np.float32), json.loads(plan), row_id)
+        if rows:
+            log_status(f"🗂️ [PlanCache] Loaded {len(rows)} cached plans ({self.embedder.name})")
+
+    def _insert(self, scope, prompt, vector, plan, row_id=None):
+        """Adds an entry (caller holds the lock or is __init__). Returns the evicted DB id, if any."""
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+        evicted = None
+        if len(self._entries) < self.max_entries:
+            row = len(self._entries)
+            self._entries.append(None)
+        else:
+            row = min(range(len(self._entries)), key=lambda r: self._entries[r]["used"])
+            old = self._entries[row]
+            self._exact.pop((int(self._scopes[row]), old["norm"]), None)
+            evicted = old["id"]
+        self._clock += 1
+        norm = normalize_query(prompt)
+        self._vectors[row] = vector
+        self._scopes[row] = scope
+        self._entries[row] = {"id": row_id, "prompt": prompt, "norm": norm, "terms": key_terms(prompt), "plan": plan,
+                              "used": self._clock}
+        self._exact[(scope, norm)] = row
+        return evicted
+
+    def _hit(self, row, similarity):
+        self._clock += 1
+        entry = self._entries[row]
+        entry["used"] = self._clock
+        return {"plan": entry["plan"], "prompt": entry["prompt"], "similarity": round(float(similarity), 4)}
+
+    def match(self, prompt, context=None):
+        """
+        Returns (hit, vector): hit is {"plan", "prompt", "similarity"} or None; pass
+        `vector` back to `put` on a miss so the prompt is embedded only once.
+        """
+        scope = scope_key(context)
+        with self._lock:
+            row = self._exact.get((scope, normalize_query(prompt)))
+            if row is not None:
+                return self._hit(row, 1.0), None
+
+        vector = self.embedder.encode([prompt])[0]
+        terms = key_terms(prompt)
+        with self._lock:
+            n = len(self._entries)
+            if n == 0:
+                return None, vector
+            scores = self._vectors[:n] @ vector
+            scores[self._scopes[:n] != scope] = -1.0
+            candidates = np.flatnonzero(scores >= self.threshold)
+            for row in candidates[np.argsort(-scores[candidates], kind="stable")]:
+                if self._entries[row]["terms"] == terms:
+                    return self._hit(int(row), scores[row]), vector
+        return None, vector
+
+    def put(self, prompt, plan, context=None, vector=None):
+        if vector is None:
+            vector = self.embedder.encode([prompt])[0]
+        scope = scope_key(context)
+        with self._lock:
+            row_id = None
+            if self.conn is not None:
+                with self.conn:
+                    row_id = self.conn.execute('''INSERT INTO plan_cache (embedder, scope, prompt, vector, plan,
+                                                  created_at) VALUES (?, ?, ?, ?, ?, ?)''',
+                                               (self.embedder.name, scope, prompt,
+                                                np.asarray(vector, dtype=np.float32).tobytes(),
+                                                json.dumps(plan, ensure_ascii=False),
+                                                datetime.now().strftime("%Y-%m-%d %H:%M:%S"))).lastrowid
+            evicted = self._insert(scope, prompt, vector, plan, row_id)
+            if evicted is not None and self.conn is not None:
+                with self.conn:
+                    self.conn.execute("DELETE FROM plan_cache WHERE id = ?", (evicted,))
+
+    def record(self, hit, ms):
+        """Request outcome, for the hit rate and the hit vs generation latency split."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self._hit_ms.append(ms)
+            else:
+                self.misses += 1
+                self._generation_ms.append(ms)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "embedder": self.embedder.name,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "p50_hit_ms": round(statistics.median(self._hit_ms), 2) if self._hit_ms else None,
+                "p50_generation_ms": round(statistics.median(self._generation_ms), 2)
+                if self._generation_ms else None,
+            }
@@ -0,0 +1,118 @@
+import json
+import re
+
+from src.core.text import normalize_query
+from src.core.workflow_engine import Workflow
+
+JSON_BLOCK_RE = re.compile(r"```(?:json)?\s*\n(.*?)\n```", re.DOTALL)
+NUMBERED_RE = re.compile(r"^\s*(?:\*\*)?(?:(?:step|bước)\s*)?(\d{1,2})\s*[.):\-]\s*(?:\*\*)?\s*(.+)$", re.IGNORECASE)
+BULLET_RE = re.compile(r"^\s*[-*•+]\s+(.+)$")
+MARKDOWN_RE = re.compile(r"[*_`#]+")
+
+# First matching rule wins. Every keyword group must match (any keyword of the group);
+# keywords are tone-stripped, so "bảng tính" is written "bang tinh".
+NODE_RULES = [
+    ("google_sheet_write", (("sheet", "sheets", "bang tinh", "spreadsheet"),
+                            ("ghi", "them", "cap nhat", "luu", "write", "add", "append", "update", "save"))),
+    ("google_sheet_read", (("sheet", "sheets", "bang tinh", "spreadsheet"),)),
+    ("google_doc_write", (("doc", "docs", "tai lieu", "bao cao", "report", "van ban"),)),
+    ("email_send", (("email", "gmail", "mail"),)),
+    ("send_message", (("zalo", "sms", "tin nhan", "telegram", "messenger", "message"),)),
+    ("facebook_post", (("facebook", "fanpage", "dang bai", "post"),)),
+    ("ai_completion", (("ai", "gemini", "gpt", "llm", "phan tich", "tom tat", "analyze", "summarize", "summary"),)),
+    ("filter", (("loc", "filter", "dieu kien", "neu", "if", "condition"),)),
+    ("http_request", (("http", "api", "request"),)),
+    ("webhook", (("webhook", "trigger", "kich hoat", "khi co", "khi nhan", "when"),)),
+    ("schedule", (("hang ngay", "moi ngay", "moi sang", "hang tuan", "schedule", "daily", "weekly", "lich"),)),
+]
+
+DEFAULT_CONFIG = {
+    "google_sheet_read": {"sheetId": "SHEET_ID", "range": "A1:Z100"},
+    "google_sheet_write": {"sheetId": "SHEET_ID", "values": {}},
+    "google_doc_write": {"docId": "DOC_ID"},
+    "email_send": {"to": "EMAIL"},
+    "http_request": {"url": "URL"},
+}
+
+
+def classify_step(text):
+    """Node type for one plan step ("Đọc dữ liệu từ Google Sheet" -> google_sheet_read)."""
+    padded = f" {normalize_query(text)} "
+    for node_type, groups in NODE_RULES:
+        if all(any(f" {kw} " in padded for kw in group) for group in groups):
+            return node_type
+    return "custom_step"
+
+
+def extract_steps(text, max_steps=12):
+    """
+    Numbered steps ("1. ...", "Bước 2: ...") when the plan has any, otherwise top-level
+    bullets. Indented sub-bullets under a numbered step are folded into that step.
+    """
+    numbered, bullets = [], []
+    for line in text.splitlines():
+        match = NUMBERED_RE.match(line)
+        if match:
+            numbered.append(match.group(2))
+            continue
+        match = BULLET_RE.match(line)
+        if match:
+            if numbered and line[:1].isspace():
+                numbered[-1] += " " + match.group(1)
+            elif not line[:1].isspace():
+                bullets.append(match.group(1))
+    steps = [MARKDOWN_RE.sub("", s).strip(" :") for s in (numbered or bullets)]
+    return [s for s in steps if s][:max_steps]
+
+
+def _graph_from_json(payload):
+    """nodes/edges from a JSON plan ({"nodes", "edges"} or a Make-style {"flow"}), validated as a DAG."""
+    workflow = Workflow.from_blueprint(payload)  # Raises ValueError on unknown parents / cycles
+    nodes, edges = [], []
+    for node in workflow.order():
+        nodes.append({"id": node.id, "type": node.module or "custom_step", "config": dict(node.mapper)})
+        edges += [{"from": parent, "to": node.id} for parent in node.parents]
+    return nodes, edges
+
+
+def _find_json(text):
+    for candidate in JSON_BLOCK_RE.findall(text) + [text[text.find("{"):text.rfind("}") + 1]]:
+        try:
+            payload = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(payload, dict) and ("nodes" in payload or "flow" in payload):
+            return payload
+    return None
+
+
+def plan_to_graph(text, max_steps=12):
+    """
+    Converts the manager's plan text into the `/plan` schema: ([nodes], [edges]).
+
+    Deterministic: an embedded JSON graph is used as-is when it is a valid DAG;
+    otherwise each step becomes one node (type from keyword rules) chained in order.
+    Raises ValueError when the text contains no usable steps.
+    """
+    payload = _find_json(text)
+    if payload is not None:
+        try:
+            nodes, edges = _graph_from_json(payload)
+            if nodes:
+                return nodes, edges
+        except (ValueError, KeyError, TypeError):
+            pass  # Malformed graph: fall back to the step list
+
+    steps = extract_steps(text, max_steps)
+    if not steps:
+        raise ValueError("Plan contains no steps")
+    nodes, edges = [], []
+    for i, step in enumerate(steps, 1):
+        node_type = classify_step(step)
+        config = dict(DEFAULT_CONFIG.get(node_type, {}), description=step)
+        if node_type == "google_doc_write" and nodes:
+            config["template"] = f"Summary: {{{{{nodes[-1]['id']}.data}}}}"
+        nodes.append({"id": f"n{i}", "type": node_type, "config": config})
+        if i > 1:
+            edges.append({"from": f"n{i - 1}", "to": f"n{i}"})
+    return nodes, edges
@@ -0,0 +1,99 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class PromptBuilder:
+    """
+    Builds chat prompts as token IDs using the tokenizer's own chat template.
+
+    The static system block of each persona (persona rules + store context) is
+    rendered and tokenized once, then cached. Per request, only the dynamic
+    turns (history, data, user message) are tokenized and appended.
+    """
+    def __init__(self, tokenizer, max_entries=256):
+        self.tokenizer = tokenizer
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _render(self, messages, add_generation_prompt=False):
+        return self.tokenizer.apply_chat_template(
+            messages, tokenize=False, add_generation_prompt=add_generation_prompt
+        )
+
+    def _encode(self, text):
+        return self.tokenizer.encode(text, add_special_tokens=False)
+
+    def _static_segment(self, persona, system_text):
+        """Returns (rendered_text, token_ids) of the system block, cached per persona + content."""
+        digest = hashlib.sha1(system_text.encode("utf-8")).hexdigest()
+        key = (persona, digest)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        rendered = self._render([{"role": "system", "content": system_text}])
+        segment = (rendered, tuple(self._encode(rendered)))
+
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = segment
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return segment
+
+    def build(self, persona, system_text, messages, add_generation_prompt=True):
+        """
+        Returns the token IDs for [system] + messages.
+        `messages` is a list of {"role": ..., "content": ...} dicts (user/assistant turns).
+        """
+        static_text, static_ids = self._static_segment(persona, system_text)
+        full_text = self._render(
+            [{"role": "system", "content": system_text}] + list(messages),
+            add_generation_prompt=add_generation_prompt,
+        )
+
+        # ChatML turns start with a special token, so the boundary after the system
+        # block is also a token boundary and the cached IDs can be reused verbatim.
+        if full_text.startswith(static_text):
+            return list(static_ids) + self._encode(full_text[len(static_text):])
+
+        # Template did something unexpected (e.g. rewrote the system turn): be exact.
+        return self._encode(full_text)
+
+    def continuation(self, messages, add_generation_prompt=True):
+        """
+        Token IDs that close the current assistant turn and append `messages`, for
+        continuing a conversation whose earlier tokens (and KV cache) are kept as-is.
+        """
+        marker = "\u2063CONTINUE\u2063"
+        text = self._render([{"role": "system", "content": ""}, {"role": "assistant", "content": marker}]
+                            + list(messages), add_generation_prompt=add_generation_prompt)
+        return self._encode(text[text.index(marker) + len(marker):])
+
+    def build_text(self, system_text, messages, add_generation_prompt=True):
+        """Rendered prompt string, for logging/debugging only."""
+        return self._render(
+            [{"role": "system", "content": system_text}] + list(messages),
+            add_generation_prompt=add_generation_prompt,
+        )
+
+    def count_tokens(self, persona, system_text, messages):
+        return len(self.build(persona, system_text, messages))
+
+    def invalidate(self, persona=None):
+        with self._lock:
+            if persona is None:
+                self._cache.clear()
+                return
+            for key in [k for k in self._cache if k[0] == persona]:
+                del self._cache[key]
+
+    def stats(self):
+        return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
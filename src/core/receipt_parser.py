@@ -0,0 +1,206 @@
+import json
+import re
+from src.core.text import strip_tones
+
+# Keyword tables are matched against tone-stripped, lower-cased text.
+TOTAL_KEYS = ["tong cong", "tong tien", "tong thanh toan", "tong so tien", "tong hoa don", "thanh toan",
+              "tien thanh toan", "can thanh toan", "total"]
+SUBTOTAL_KEYS = ["tam tinh", "cong tien hang", "subtotal"]
+DISCOUNT_KEYS = ["giam gia", "chiet khau", "khuyen mai", "discount"]
+SKIP_KEYS = ["tien khach dua", "khach dua", "tien mat", "tien thua", "tra lai", "cash", "change",
+             "hotline", "dien thoai", "dt:", "sdt", "dia chi", "cam on", "hen gap lai", "mst", "wifi"]
+HEADER_RE = re.compile(r"\b(ten hang|mat hang|san pham|don gia|thanh tien|sl|so luong|dvt)\b")
+DATE_RE = re.compile(r"(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})")
+NUMBER_RE = re.compile(r"(?<![\w])(\d{1,3}(?:[.,]\d{3})+|\d+(?:[.,]\d{1,2})?)\s*(k|đ|d|vnd|vnđ)?(?![\w])", re.IGNORECASE)
+QTY_X_RE = re.compile(r"(?<![\w.,])(\d{1,4})\s*[xX×*]\s*")
+
+
+def parse_vnd(token, suffix=None):
+    """
+    Parses Vietnamese money/quantity tokens: '185.000', '185,000', '1.250.000', '185k', '2'.
+    Thousand separators are '.' or ','; a trailing 1-2 digit group is treated as decimals.
+    """
+    token = token.strip()
+    if re.fullmatch(r"\d{1,3}(?:[.,]\d{3})+", token):
+        value = float(re.sub(r"[.,]", "", token))
+    else:
+        value = float(token.replace(",", "."))
+    if suffix and suffix.lower() == "k":
+        value *= 1000
+    return value
+
+
+class ReceiptParser:
+    """
+    Deterministic layout parser for Florence-2 `<OCR_WITH_REGION>` output.
+
+    Regions are grouped into visual rows by their vertical centre, then each row is
+    classified (header / item / total / noise) and item rows are decoded into
+    name, quantity, unit price and line amount. The result is a compact dict that
+    is cheap to put in an LLM prompt, instead of the raw OCR dump.
+    """
+    def __init__(self, row_tolerance=0.6):
+        self.row_tolerance = row_tolerance
+
+    # --- Layout ---
+    def group_rows(self, regions):
+        """regions: {'quad_boxes': [[x1,y1,...,x4,y4], ...], 'labels': [...]} -> list of rows (list of texts)."""
+        boxes = []
+        for quad, label in zip(regions.get("quad_boxes", []), regions.get("labels", [])):
+            text = label.replace("</s>", "").replace("<s>", "").strip()
+            if not text:
+                continue
+            ys, xs = quad[1::2], quad[0::2]
+            boxes.append((sum(ys) / len(ys), max(ys) - min(ys), min(xs), text))
+        if not boxes:
+            return []
+
+        heights = sorted(b[1] for b in boxes)
+        tolerance = max(heights[len(heights) // 2], 1.0) * self.row_tolerance
+        boxes.sort(key=lambda b: b[0])
+
+        rows, current, anchor = [], [], None
+        for y, _, x, text in boxes:
+            if anchor is not None and abs(y - anchor) > tolerance:
+                rows.append([t for _, t in sorted(current)])
+                current = []
+            if not current:
+                anchor = y
+            current.append((x, text))
+        rows.append([t for _, t in sorted(current)])
+        return rows
+
+    # --- Row decoding ---
+    @staticmethod
+    def _numbers(text):
+        return [(m.start(), m.end(), parse_vnd(m.group(1), m.group(2))) for m in NUMBER_RE.finditer(text)]
+
+    @staticmethod
+    def _split_columns(numbers):
+        """Trailing numeric columns -> (qty, unit_price, amount, start_of_first_column)."""
+        values = [v for _, _, v in numbers]
+        if len(values) >= 3:
+            qty, unit, amount = values[-3:]
+            if qty.is_integer() and 0 < qty < 1000 and abs(qty * unit - amount) < 1:
+                return qty, unit, amount, numbers[-3][0]
+        if len(values) >= 2:
+            first, amount = values[-2:]
+            if first >= 100 and abs(first - amount) < 1:
+                return 1, first, amount, numbers[-2][0]
+            if first.is_integer() and 0 < first < 1000 and amount % first == 0 and (amount / first) % 100 == 0:
+                return first, amount / first, amount, numbers[-2][0]
+            if first >= 100 and amount % first == 0 and amount / first < 1000:
+                return amount / first, first, amount, numbers[-2][0]
+        amount = values[-1]
+        return 1, amount, amount, numbers[-1][0]
+
+    def _decode_item(self, text):
+        numbers = self._numbers(text)
+        # The amount column closes the row; "Khăn ướt 100 tờ" is a name, not a price.
+        if not numbers or text[numbers[-1][1]:].strip(" |:"):
+            return None
+
+        qty_match = QTY_X_RE.search(text)
+        if qty_match:
+            qty = float(qty_match.group(1))
+            after = [v for pos, _, v in numbers if pos > qty_match.start(1)]
+            if not after:
+                return None
+            unit = after[0]
+            amount = after[1] if len(after) > 1 else qty * unit
+            cut = qty_match.start()
+        else:
+            qty, unit, amount, cut = self._split_columns(numbers)
+
+        if amount < 100:  # money on VN receipts is never < 100đ; this is noise
+            return None
+        name = re.sub(r"\s{2,}", " ", text[:cut]).strip(" :-|.\t")
+        return {"name": name, "qty": qty, "unit_price": unit, "amount": amount}
+
+    def parse(self, regions):
+        return self.parse_rows([" ".join(cells) for cells in self.group_rows(regions)])
+
+    def parse_rows(self, rows):
+        result = {"store": None, "date": None, "items": [], "subtotal": None, "discount": None, "total": None}
+        pending_name = None
+
+        for index, text in enumerate(rows):
+            plain = strip_tones(text)
+            numbers = self._numbers(text)
+
+            if result["date"] is None:
+                date = DATE_RE.search(text)
+                if date:
+                    day, month, year = date.groups()
+                    year = year if len(year) == 4 else f"20{year}"
+                    result["date"] = f"{year}-{int(month):02d}-{int(day):02d}"
+                    continue
+
+            if any(k in plain for k in SUBTOTAL_KEYS) and numbers:
+                result["subtotal"] = numbers[-1][2]
+                continue
+            if any(k in plain for k in DISCOUNT_KEYS) and numbers:
+                result["discount"] = numbers[-1][2]
+                continue
+            if any(plain.startswith(k) for k in TOTAL_KEYS) and numbers:
+                if result["total"] is None:
+                    result["total"] = numbers[-1][2]
+                continue
+            if any(k in plain for k in SKIP_KEYS):
+                continue
+            if len(set(HEADER_RE.findall(plain))) >= 2:
+                continue
+
+            if not numbers:
+                # Store name is the first text-only row; later ones are wrapped item names.
+                if result["store"] is None and not result["items"] and index < 3:
+                    result["store"] = text.strip()
+                else:
+                    pending_name = text.strip()
+                continue
+
+            item = self._decode_item(text)
+            if item is None:
+                pending_name = text.strip()
+                continue
+            if not item["name"]:
+                item["name"] = pending_name  # Name wrapped onto the previous row
+            pending_name = None
+            if item["name"]:
+                result["items"].append(item)
+
+        if result["total"] is None and result["items"]:
+            result["total"] = sum(i["amount"] for i in result["items"])
+        return result
+
+    # --- Output ---
+    @staticmethod
+    def _num(value):
+        return int(value) if value is not None and float(value).is_integer() else value
+
+    def to_compact(self, parsed):
+        """Minimal JSON for the LLM context: items as [name, qty, unit_price, amount]."""
+        items_sum = sum(i["amount"] for i in parsed["items"])
+        expected = (parsed["total"] or 0) + (parsed["discount"] or 0)
+        compact = {
+            "store": parsed["store"],
+            "date": parsed["date"],
+            "cols": ["ten", "sl", "don_gia", "thanh_tien"],
+            "items": [[i["name"], self._num(i["qty"]), self._num(i["unit_price"]), self._num(i["amount"])]
+                      for i in parsed["items"]],
+            "total": self._num(parsed["total"]),
+            "check": "ok" if parsed["items"] and abs(items_sum - expected) < 1 else "mismatch",
+        }
+        if parsed["discount"]:
+            compact["discount"] = self._num(parsed["discount"])
+        compact = {k: v for k, v in compact.items() if v is not None}
+        return json.dumps(compact, ensure_ascii=False, separators=(",", ":"))
+
+    def extract(self, regions):
+        """OCR_WITH_REGION result -> (compact_json or None, raw_text)."""
+        rows = [" ".join(cells) for cells in self.group_rows(regions)]
+        raw_text = "\n".join(rows)
+        parsed = self.parse_rows(rows)
+        if not parsed["items"]:
+            return None, raw_text
+        return self.to_compact(parsed), raw_text
@@ -0,0 +1,276 @@
+import asyncio
+import json
+import socket
+import struct
+import threading
+import uuid
+
+import numpy as np
+import torch
+from transformers import AutoTokenizer
+
+from src.core import metrics
+from src.core.config import get_config
+from src.core.prompt_builder import PromptBuilder
+
+HEADER = struct.Struct("!I")  # Frame = 4-byte big-endian length + UTF-8 JSON
+
+
+def send_message(sock, payload):
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock, n):
+    chunks = []
+    while n:
+        chunk = sock.recv(min(n, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock):
+    """Next frame from `sock`, or None when the peer closed the connection."""
+    header = _recv_exact(sock, HEADER.size)
+    if header is None:
+        return None
+    data = _recv_exact(sock, HEADER.unpack(header)[0])
+    return None if data is None else json.loads(data)
+
+
+class RemoteError(RuntimeError):
+    pass
+
+
+class ModelClient:
+    """Calls the model server (src/model_server.py) over its Unix socket. One connection per thread."""
+    def __init__(self, socket_path, timeout=600):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self._local.sock = sock
+        return sock
+
+    def _drop(self, sock):
+        sock.close()
+        self._local.sock = None
+
+    def call(self, method, **params):
+        for attempt in (1, 2):  # Reconnect once: the server may have restarted since the last call
+            sock = getattr(self._local, "sock", None) or self._connect()
+            try:
+                send_message(sock, {"method": method, "params": params})
+                reply = recv_message(sock)
+            except (BrokenPipeError, ConnectionResetError):
+                self._drop(sock)
+                if attempt == 2:
+                    raise
+                continue
+            except BaseException:
+                # Timeout, bad frame, interrupt or cancellation: this call's reply may still arrive on the
+                # socket and would be read as the next call's, so the connection is never reused
+                self._drop(sock)
+                raise
+            if reply is not None:
+                break
+            self._drop(sock)
+        else:
+            raise RemoteError(f"model server closed the connection during '{method}'")
+        if "error" in reply:
+            raise RemoteError(f"model server '{method}': {reply['error']}")
+        return reply["result"]
+
+
+# Rendered and encoded on both sides to check a locally loaded tokenizer against the server's
+TOKENIZER_PROBE = [{"role": "system", "content": "Kiểm tra tokenizer."},
+                   {"role": "user", "content": "Doanh thu hôm nay là bao nhiêu? 1.250.000đ"}]
+
+
+class Encoding:
+    def __init__(self, input_ids):
+        self.input_ids = input_ids
+
+
+class RemoteTokenizer:
+    """
+    The server's tokenizer for `role`, one round-trip per call. Only used when the
+    tokenizer cannot be loaded in the worker (fake backend, offline HF cache).
+    """
+    def __init__(self, client, role, info):
+        self.client = client
+        self.role = role
+        self.eos_token_id = info["eos_token_id"]
+        self.eos_token = info["eos_token"]
+        self.pad_token = info["pad_token"]
+        self.all_special_ids = info["all_special_ids"]
+        self.padding_side = "left"
+
+    def encode(self, text, add_special_tokens=False):
+        return self.client.call("encode", role=self.role, text=text, add_special_tokens=add_special_tokens)
+
+    def __call__(self, text, return_tensors=None):
+        ids = self.encode(text)
+        return Encoding(torch.tensor([ids], dtype=torch.long) if return_tensors == "pt" else ids)
+
+    def decode(self, ids, skip_special_tokens=False):
+        ids = ids.tolist() if hasattr(ids, "tolist") else list(ids)
+        return self.client.call("decode", role=self.role, ids=ids, skip_special_tokens=skip_special_tokens)
+
+    def apply_chat_template(self, messages, tokenize=False, add_generation_prompt=False):
+        return self.client.call("chat_template", role=self.role, messages=list(messages), tokenize=tokenize,
+                                add_generation_prompt=add_generation_prompt)
+
+
+class RemoteCache:
+    """Handle to a KV cache held by the model server; mirrors its length locally."""
+    def __init__(self, client, role):
+        self.client = client
+        self.role = role
+        self.id = uuid.uuid4().hex
+        self.length = 0
+
+    def get_seq_length(self):
+        return self.length
+
+    def crop(self, max_length):
+        if max_length < self.length:
+            self.length = self.client.call("cache_crop", cache_id=self.id, max_length=max_length)
+
+    def close(self):
+        """Frees the server-side cache (GPU memory) once the conversation is done."""
+        self.client.call("cache_release", cache_id=self.id)
+
+
+class RemoteOutput:
+    def __init__(self, sequences, past_key_values):
+        self.sequences = sequences
+        self.past_key_values = past_key_values
+
+
+class RemoteModel:
+    """`generate` with the HF signature BaseAgent uses, executed by the model server."""
+    device = "cpu"
+
+    def __init__(self, client, role):
+        self.client = client
+        self.role = role
+
+    def generate(self, input_ids, attention_mask=None, past_key_values=None, stopping_criteria=None,
+                 return_dict_in_generate=False, **kwargs):
+        # Stopping criteria run next to the model; only those that can describe themselves are sent
+        stopping = [c.spec() for c in stopping_criteria or [] if hasattr(c, "spec")]
+        if input_ids.shape[0] > 1:  # Left-padded batch (BaseAgent.generate_batch)
+            result = self.client.call("generate", role=self.role, input_ids=input_ids.tolist(),
+                                      attention_mask=attention_mask.tolist(), stopping=stopping, kwargs=kwargs)
+            return torch.tensor(result["sequences"], dtype=torch.long)
+        result = self.client.call("generate", role=self.role, input_ids=input_ids[0].tolist(),
+                                  cache_id=past_key_values.id if past_key_values is not None else None,
+                                  stopping=stopping, kwargs=kwargs)
+        if past_key_values is not None:
+            past_key_values.length = result["cache_length"]
+        sequences = torch.tensor([result["sequences"]], dtype=torch.long)
+        return RemoteOutput(sequences, past_key_values) if return_dict_in_generate else sequences
+
+
+class RemoteEngine:
+    """
+    Drop-in for ModelEngine in API workers: the models live in the model server
+    process, so any number of workers can share one copy of the weights.
+    """
+    def __init__(self, socket_path, timeout=600):
+        self.config = get_config()
+        self.client = ModelClient(socket_path, timeout)
+        self.info = self.client.call("info")
+        # Roles served by the same model share one asset, as with ModelEngine
+        self.loaded_models, by_model = {}, {}
+        for role, role_info in self.info["roles"].items():
+            if role_info["model"] not in by_model:
+                by_model[role_info["model"]] = self._asset(role, role_info)
+            self.loaded_models[role] = by_model[role_info["model"]]
+        metrics.log_status(f"🔌 [Engine] Using model server at {socket_path} "
+                           f"(backend {self.info['backend']}, roles: {', '.join(self.loaded_models)})")
+
+    def _tokenizer(self, role, role_info):
+        """
+        The model's tokenizer loaded in this worker, so encode/decode/chat templates cost
+        no round-trip; checked against the server's on a probe string. Falls back to
+        RemoteTokenizer when it cannot be loaded or does not match.
+        """
+        name = role_info.get("tokenizer")
+        if name:
+            try:
+                tokenizer = AutoTokenizer.from_pretrained(name)
+                tokenizer.padding_side = "left"
+                if tokenizer.pad_token is None: tokenizer.pad_token = tokenizer.eos_token
+                probe = tokenizer.apply_chat_template(TOKENIZER_PROBE, tokenize=False, add_generation_prompt=True)
+                if tokenizer.encode(probe, add_special_tokens=False) == \
+                        self.client.call("encode", role=role, text=probe, add_special_tokens=False):
+                    return tokenizer
+                metrics.log_status(f"⚠️ [Engine] Local tokenizer {name} differs from the model server's; using the server's")
+            except Exception as e:
+                metrics.log_status(f"⚠️ [Engine] Cannot load tokenizer {name} locally ({e}); using the server's")
+        return RemoteTokenizer(self.client, role, role_info)
+
+    def _asset(self, role, role_info):
+        tokenizer = self._tokenizer(role, role_info)
+        # Same keys as ModelEngine assets. The lock only orders this worker's calls; the server serializes
+        # generate on the shared weights.
+        return {"model": RemoteModel(self.client, role), "tokenizer": tokenizer,
+                "prompt_builder": PromptBuilder(tokenizer), "lock": threading.Lock(),
+                "new_cache": (lambda: RemoteCache(self.client, role)) if role_info["kv_cache"] else None}
+
+    def load_model(self, role: str):
+        if role not in self.loaded_models:
+            raise ValueError(f"Role {role} not defined.")
+        return self.loaded_models[role]
+
+    def get_prompt_builder(self, role: str):
+        return self.load_model(role)["prompt_builder"]
+
+    def new_cache(self, role: str):
+        new_cache = self.load_model(role)["new_cache"]
+        return new_cache() if new_cache is not None else None
+
+    def rerank(self, query, documents):
+        """Cross-encoder scores for (query, document) pairs."""
+        return self.client.call("rerank", query=query, documents=list(documents))
+
+
+class RemoteEmbedder:
+    """Plan-cache embedder backed by the model server (same interface as SentenceEmbedder)."""
+    def __init__(self, client, kind="auto"):
+        self.client = client
+        self.kind = kind
+        info = client.call("embedder", kind=kind)
+        self.name = info["name"]
+        self.threshold = info["threshold"]
+
+    def encode(self, texts):
+        vectors = self.client.call("embed", kind=self.kind, texts=list(texts))
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class RemoteVision:
+    """
+    VisionService stand-in: the model server runs the batcher and result cache for
+    all workers. Images are passed by path (the upload spool is on the same host).
+    """
+    def __init__(self, client, settings):
+        self.client = client
+        self.settings = settings
+        self.model = True
+
+    def analyze(self, source, task_hint="OCR", mode="quality", digest=None):
+        return self.client.call("vision", path=source, task_hint=task_hint, mode=mode, digest=digest)
+
+    async def analyze_async(self, source, task_hint="OCR", mode="quality", digest=None):
+        with metrics.stage("vision.request", mode=mode):
+            return await asyncio.to_thread(self.analyze, source, task_hint, mode, digest)
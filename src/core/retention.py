@@ -0,0 +1,195 @@
+import asyncio
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from src.core.metrics import log_status
+
+
+def summarize_turns(rows, topics=(), max_topics=8):
+    """
+    Extractive summary of (role, content, timestamp) rows: turn count, date range and
+    the distinct user questions (first seen first). `topics` are those of an earlier
+    summary of the same month, so repeated compactions merge instead of overwrite.
+    """
+    topics = list(topics)
+    for role, content, _ in rows:
+        topic = " ".join(str(content).split())[:80]
+        if role == "user" and topic and topic not in topics and len(topics) < max_topics:
+            topics.append(topic)
+    return topics
+
+
+class HistoryRetention:
+    """
+    Keeps the `history` table small: per tenant (user_id, store_id) only the turns
+    inside the policy (last `hot_days` days and at most `keep_turns` rows) stay hot.
+
+    Each run, per tenant with cold rows:
+    1. cold rows are folded into `history_summaries` (one row per tenant and month);
+    2. if the policy archives, they are appended to `<archive_dir>/<YYYY-MM>.jsonl.gz`
+       (one gzip member per batch; rows carry their id, so a batch re-archived after
+       a crash is recognisable);
+    3. they are deleted in the same transaction as the summary update.
+    Then up to `vacuum_pages` free pages are released with incremental VACUUM, so the
+    file shrinks in bounded steps instead of one long full VACUUM.
+
+    Policies: defaults from Config().retention, per-tenant overrides in
+    `retention_policies` (see set_policy).
+    """
+    def __init__(self, db_path, archive_dir, hot_days=30, keep_turns=200, archive=True, archive_months=0,
+                 batch_rows=5000, vacuum_pages=2000, interval_seconds=3600):
+        self.archive_dir = archive_dir
+        self.defaults = {"hot_days": hot_days, "keep_turns": keep_turns, "archive": archive}
+        self.archive_months = archive_months
+        self.batch_rows = batch_rows
+        self.vacuum_pages = vacuum_pages
+        self.interval_seconds = interval_seconds
+        # Own connection (runs on a worker thread); BEGIN IMMEDIATE below keeps concurrent runs from
+        # several API workers from archiving the same rows twice
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.Lock()
+        self.last_run = None
+
+    def policy(self, user_id, store_id):
+        row = self.conn.execute('''SELECT hot_days, keep_turns, archive FROM retention_policies
+                                   WHERE user_id = ? AND store_id = ?''', (user_id, store_id)).fetchone()
+        policy = dict(self.defaults)
+        if row is not None:
+            policy.update({key: value for key, value in zip(("hot_days", "keep_turns", "archive"), row)
+                           if value is not None})
+        policy["archive"] = bool(policy["archive"])
+        return policy
+
+    def set_policy(self, user_id, store_id=0, hot_days=None, keep_turns=None, archive=None):
+        """Per-tenant override; None keeps the default for that field."""
+        self.conn.execute('''INSERT OR REPLACE INTO retention_policies (user_id, store_id, hot_days, keep_turns, archive)
+                             VALUES (?, ?, ?, ?, ?)''',
+                          (user_id, store_id, hot_days, keep_turns, None if archive is None else int(archive)))
+
+    def _cold_rows(self, user_id, store_id, policy, now):
+        """Oldest rows of the tenant outside the policy, at most batch_rows."""
+        cutoff = (now - timedelta(days=policy["hot_days"])).isoformat()
+        # id of the oldest row still inside keep_turns (rows below it are cold regardless of age)
+        keep_from = self.conn.execute('''SELECT id FROM history WHERE user_id = ? AND store_id = ?
+                                         ORDER BY id DESC LIMIT 1 OFFSET ?''',
+                                      (user_id, store_id, max(0, policy["keep_turns"] - 1))).fetchone()
+        return self.conn.execute('''SELECT id, role, content, timestamp FROM history
+                                    WHERE user_id = ? AND store_id = ? AND (timestamp < ? OR id < ?)
+                                    ORDER BY id LIMIT ?''',
+                                 (user_id, store_id, cutoff, keep_from[0] if keep_from else 0,
+                                  self.batch_rows)).fetchall()
+
+    def _archive(self, user_id, store_id, rows):
+        by_month = {}
+        for row_id, role, content, timestamp in rows:
+            by_month.setdefault(timestamp[:7], []).append({"id": row_id, "user_id": user_id, "store_id": store_id,
+                                                           "role": role, "content": content, "timestamp": timestamp})
+        os.makedirs(self.archive_dir, exist_ok=True)
+        for month, records in by_month.items():
+            data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+            with open(os.path.join(self.archive_dir, f"{month}.jsonl.gz"), "ab") as f:
+                f.write(gzip.compress(data))
+                f.flush()
+                os.fsync(f.fileno())  # On disk before the rows are deleted
+
+    def _compact(self, user_id, store_id, rows):
+        by_month = {}
+        for _, role, content, timestamp in rows:
+            by_month.setdefault(timestamp[:7], []).append((role, content, timestamp))
+        for month, turns in by_month.items():
+            existing = self.conn.execute('''SELECT turns, first_at, last_at, topics FROM history_summaries
+                                            WHERE user_id = ? AND store_id = ? AND month = ?''',
+                                         (user_id, store_id, month)).fetchone()
+            count, first_at, last_at, topics = existing or (0, turns[0][2], turns[-1][2], "[]")
+            topics = summarize_turns(turns, json.loads(topics))
+            count += len(turns)
+            first_at, last_at = min(first_at, turns[0][2]), max(last_at, turns[-1][2])
+            summary = f"{count} lượt trò chuyện ({first_at[:10]} → {last_at[:10]}). Khách đã hỏi: " + "; ".join(topics)
+            self.conn.execute('''INSERT OR REPLACE INTO history_summaries
+                                 (user_id, store_id, month, turns, first_at, last_at, topics, summary)
+                                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                              (user_id, store_id, month, count, first_at, last_at,
+                               json.dumps(topics, ensure_ascii=False), summary))
+
+    def _expire_archives(self, now):
+        if not self.archive_months or not os.path.isdir(self.archive_dir):
+            return 0
+        oldest = (now.year * 12 + now.month - 1) - self.archive_months
+        removed = 0
+        for name in os.listdir(self.archive_dir):
+            try:
+                month = datetime.strptime(name[:7], "%Y-%m")
+            except ValueError:
+                continue
+            if month.year * 12 + month.month - 1 < oldest:
+                os.remove(os.path.join(self.archive_dir, name))
+                removed += 1
+        return removed
+
+    def _vacuum(self):
+        """Releases up to vacuum_pages free pages. Converts a pre-existing DB to incremental auto-vacuum once."""
+        if self.conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            try:
+                log_status("🧹 [Retention] Enabling incremental auto-vacuum (one-time full VACUUM)...")
+                self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                self.conn.execute("VACUUM")
+            except sqlite3.OperationalError as e:  # Busy: retried next run
+                log_status(f"⚠️ [Retention] VACUUM skipped: {e}")
+                return 0
+        free = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if free:
+            self.conn.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})").fetchall()
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return min(free, self.vacuum_pages)
+
+    def run_once(self, now=None):
+        """One retention pass over every tenant. Returns the run summary dict."""
+        now = now or datetime.now()
+        with self._lock:
+            t0 = time.perf_counter()
+            tenants = self.conn.execute("SELECT DISTINCT user_id, store_id FROM history").fetchall()
+            compacted = archived = 0
+            for user_id, store_id in tenants:
+                policy = self.policy(user_id, store_id)
+                while True:
+                    self.conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        rows = self._cold_rows(user_id, store_id, policy, now)
+                        if rows:
+                            if policy["archive"]:
+                                self._archive(user_id, store_id, rows)
+                                archived += len(rows)
+                            self._compact(user_id, store_id, rows)
+                            self.conn.executemany("DELETE FROM history WHERE id = ?", [(r[0],) for r in rows])
+                        self.conn.execute("COMMIT")
+                    except Exception:
+                        self.conn.execute("ROLLBACK")
+                        raise
+                    compacted += len(rows)
+                    if len(rows) < self.batch_rows:
+                        break
+            expired = self._expire_archives(now)
+            vacuumed = self._vacuum()
+            hot = self.conn.execute("SELECT count(*) FROM history").fetchone()[0]
+            self.last_run = {"started_at": now.isoformat(timespec="seconds"), "tenants": len(tenants),
+                             "compacted": compacted, "archived": archived, "hot_rows": hot,
+                             "expired_archives": expired, "vacuumed_pages": vacuumed,
+                             "duration_ms": round((time.perf_counter() - t0) * 1000, 2)}
+            if compacted:
+                log_status(f"🗄️  [Retention] Compacted {compacted} turns ({archived} archived) across "
+                           f"{len(tenants)} tenants; {hot} hot rows left")
+            return self.last_run
+
+    async def run_forever(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                log_status(f"⚠️ [Retention] Run failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
@@ -1,6 +1,10 @@
 import sqlite3
 import random
-from src.core.config import Config
+import threading
+import time
+from src.core.config import get_config
+from src.core.inventory import InventoryIndex
+from src.core.crm import CustomerDirectory
 
 class SaasAPI:
     """
@@ -8,7 +12,10 @@ class SaasAPI:
     The Agent calls this to get 'Real' business data.
     """
     def __init__(self):
-        self.config = Config()
+        self.config = get_config()
+        self._inventory = None
+        self._customers = None
+        self._lock = threading.Lock()  # Tool calls may hit the lazily built indexes concurrently
         
     def _get_conn(self):
         return sqlite3.connect(self.config.DB_PATH, check_same_thread=False)
@@ -22,8 +29,10 @@ class SaasAPI:
         # Mock logic for different periods
         if period == "today":
             date_str = "date('now', 'localtime')" # SQLite syntax
+        elif period == "yesterday":
+            date_str = "date('now', 'localtime', '-1 day')"
         else:
-            return {"error": "Only 'today' is supported in this prototype."}
+            return {"error": "Only 'today' and 'yesterday' are supported in this prototype."}
             
         cursor.execute(f"SELECT SUM(amount), COUNT(*) FROM sales WHERE store_id = ? AND date = {date_str}", (store_id,))
         res = cursor.fetchone()
@@ -33,25 +42,57 @@ class SaasAPI:
             return {"revenue": res[0], "orders": res[1], "period": period}
         return {"revenue": 0, "orders": 0, "period": period}
 
-    def check_inventory(self, product_name):
-        """Fuzzy searches for a product and returns stock level."""
-        # Mocking inventory data since we didn't create a table for it yet
-        mock_inventory = {
-            "bỉm": {"name": "Bỉm Bobby Size M", "stock": 45, "status": "High"},
-            "sữa": {"name": "Sữa Meiji Số 9", "stock": 12, "status": "Low"},
-            "quần": {"name": "Quần Chục Cotton", "stock": 100, "status": "High"},
-            "áo":  {"name": "Áo Khoác Gió", "stock": 5, "status": "Critical"}
-        }
-        
-        for key, data in mock_inventory.items():
-            if key in product_name.lower():
-                return data
-        
-        return {"error": "Product not found in inventory."}
+    def get_low_stock(self, store_id, limit=20):
+        """Items at or below their low-stock threshold, lowest stock first."""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute("""SELECT name, stock, low_stock_threshold FROM inventory
+                          WHERE store_id = ? AND stock <= low_stock_threshold ORDER BY stock LIMIT ?""",
+                       (store_id, limit))
+        rows = cursor.fetchall()
+        conn.close()
+        return [{"name": r[0], "stock": r[1], "threshold": r[2]} for r in rows]
+
+    def _inventory_index(self):
+        """Shared search index, refreshed incrementally at most every `refresh_seconds`."""
+        settings = self.config.inventory
+        with self._lock:
+            if self._inventory is None:
+                self._inventory = InventoryIndex(self.config.DB_PATH, fuzzy_min_score=settings["fuzzy_min_score"],
+                                                 reconcile_seconds=settings["reconcile_seconds"])
+        if time.monotonic() - self._inventory.refreshed_at > settings["refresh_seconds"]:
+            self._inventory.refresh()
+        return self._inventory
+
+    def check_inventory(self, product_name, store_id):
+        """Fuzzy searches one store's products (diacritics optional) and returns the stock level."""
+        if store_id is None:
+            raise ValueError("store_id is required")  # Never search across tenants
+        matches = self._inventory_index().search(product_name, store_id=store_id, limit=3)
+        if not matches:
+            return {"error": "Product not found in inventory."}
+        best = matches[0]
+        result = {"name": best["name"], "sku": best["sku"], "stock": best["stock"], "status": best["status"],
+                  "match": best["match"]}
+        if len(matches) > 1:
+            result["other_matches"] = [m["name"] for m in matches[1:]]
+        return result
 
-    def get_customer_info(self, phone_or_name):
-        """Simulates a CRM lookup."""
-        # Mock CRM
-        if "09" in phone_or_name:
-            return {"name": "Chị Lan", "rank": "VIP", "last_purchase": "2 days ago"}
-        return {"error": "Customer not found."}
\ No newline at end of file
+    def get_customer_info(self, phone_or_name, store_id):
+        """CRM lookup in one store by phone (any format, or a partial number) or customer name."""
+        if store_id is None:
+            raise ValueError("store_id is required")  # Never search across tenants
+        with self._lock:
+            if self._customers is None:
+                self._customers = CustomerDirectory(self.config.DB_PATH, **self.config.crm)
+        matches = self._customers.lookup(phone_or_name, store_id=store_id, limit=3)
+        if not matches:
+            return {"error": "Customer not found."}
+        best = matches[0]
+        result = {"name": best["name"], "phone": best["phone"], "rank": best["rank"],
+                  "last_purchase": best["last_purchase"], "total_spent": best["total_spent"]}
+        if "days_since_purchase" in best:
+            result["last_purchase"] = f"{best['days_since_purchase']} days ago"
+        if len(matches) > 1:
+            result["other_matches"] = [f"{m['name']} ({m['phone']})" for m in matches[1:]]
+        return result
@@ -0,0 +1,107 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from src.core.metrics import log_status
+
+
+class HealthScheduler:
+    """
+    Proactive health checks for every store, computed in batched SQL.
+
+    Each run issues one aggregate query per check (not one per store), diffs the
+    result against the stored alerts, rewrites only stores whose alerts changed
+    and notifies MemoryManager listeners for those stores (e.g. StoreContextCache).
+    Timing per run is recorded in `health_runs`.
+    """
+    NO_REVENUE = "⚠️ Chưa có doanh thu hôm nay."
+    LOW_STOCK = "📦 Sắp hết hàng: {items}"
+
+    def __init__(self, memory, interval_seconds=300, window_seconds=30, max_items=5):
+        self.memory = memory
+        self.interval_seconds = interval_seconds
+        self.window_seconds = window_seconds
+        self.max_items = max_items
+        # Own connection: runs happen on a worker thread alongside request handlers.
+        self.conn = sqlite3.connect(memory.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.Lock()
+        self.last_run = None
+
+    def compute(self, today=None):
+        """Returns {store_id: [alert, ...]} for every store with at least one alert."""
+        today = today or datetime.now().strftime("%Y-%m-%d")
+        alerts = {}
+
+        # 1. Zero revenue today: all stores minus those with sales, in one pass over the date index.
+        rows = self.conn.execute('''SELECT s.id FROM stores s
+                                    LEFT JOIN (SELECT store_id, SUM(amount) AS revenue FROM sales
+                                               WHERE date = ? GROUP BY store_id) t ON t.store_id = s.id
+                                    WHERE COALESCE(t.revenue, 0) = 0''', (today,))
+        for (store_id,) in rows:
+            alerts.setdefault(store_id, []).append(self.NO_REVENUE)
+
+        # 2. Low stock, lowest first within each store.
+        low = {}
+        rows = self.conn.execute('''SELECT store_id, name FROM inventory
+                                    WHERE stock <= low_stock_threshold ORDER BY store_id, stock''')
+        for store_id, name in rows:
+            low.setdefault(store_id, []).append(name)
+        for store_id, names in low.items():
+            shown = ", ".join(names[:self.max_items])
+            if len(names) > self.max_items:
+                shown += f" (+{len(names) - self.max_items})"
+            alerts.setdefault(store_id, []).append(self.LOW_STOCK.format(items=shown))
+        return alerts
+
+    def _stored(self):
+        stored = {}
+        for store_id, message in self.conn.execute("SELECT store_id, message FROM alerts ORDER BY store_id, id"):
+            stored.setdefault(store_id, []).append(message)
+        return stored
+
+    def run_once(self, today=None):
+        """Computes and stores alerts for all stores. Returns the run summary dict."""
+        with self._lock:
+            started = datetime.now()
+            t0 = time.perf_counter()
+            alerts = self.compute(today)
+            stored = self._stored()
+            changed = [sid for sid in set(alerts) | set(stored) if alerts.get(sid) != stored.get(sid)]
+
+            now = started.strftime("%Y-%m-%d %H:%M:%S")
+            with self.conn:
+                self.conn.executemany("DELETE FROM alerts WHERE store_id = ?", [(sid,) for sid in changed])
+                self.conn.executemany("INSERT INTO alerts (store_id, kind, message, created_at) VALUES (?, ?, ?, ?)",
+                                      [(sid, "health", msg, now) for sid in changed for msg in alerts.get(sid, [])])
+                store_count = self.conn.execute("SELECT count(*) FROM stores").fetchone()[0]
+                duration_ms = (time.perf_counter() - t0) * 1000
+                self.conn.execute('''INSERT INTO health_runs (started_at, duration_ms, stores, alerts, changed_stores)
+                                     VALUES (?, ?, ?, ?, ?)''',
+                                  (now, duration_ms, store_count, sum(len(a) for a in alerts.values()), len(changed)))
+
+            for store_id in changed:
+                self.memory.notify_write("alerts", store_id)
+
+            self.last_run = {"started_at": now, "duration_ms": round(duration_ms, 2), "stores": store_count,
+                             "stores_with_alerts": len(alerts), "changed_stores": len(changed)}
+            if duration_ms > self.window_seconds * 1000:
+                log_status(f"⚠️ [Health] Run took {duration_ms / 1000:.1f}s (window {self.window_seconds}s)")
+            return self.last_run
+
+    def recent_runs(self, limit=10):
+        with self._lock:
+            rows = self.conn.execute('''SELECT started_at, duration_ms, stores, alerts, changed_stores
+                                        FROM health_runs ORDER BY id DESC LIMIT ?''', (limit,)).fetchall()
+        return [{"started_at": r[0], "duration_ms": round(r[1], 2), "stores": r[2], "alerts": r[3],
+                 "changed_stores": r[4]} for r in rows]
+
+    async def run_forever(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                log_status(f"⚠️ [Health] Run failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
@@ -0,0 +1,202 @@
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from urllib.parse import urlsplit
+
+from src.core.text import normalize_query
+from src.core.metrics import log_status
+
+
+class SearchProvider(ABC):
+    """Async web-search backend. Results are dicts: {"title", "url", "snippet"}."""
+    name = "base"
+
+    @abstractmethod
+    async def search(self, query: str, max_results: int = 4):
+        raise NotImplementedError
+
+
+class DDGSProvider(SearchProvider):
+    """
+    DuckDuckGo via `ddgs`. Blocking calls run in worker threads; each thread keeps and
+    reuses its own client (HTTP session) instead of opening a new one per query.
+    """
+    name = "ddgs"
+
+    def __init__(self, region="vn-vi", timeout=10):
+        from ddgs import DDGS
+        self._factory = lambda: DDGS(timeout=timeout)
+        self.region = region
+        self._local = threading.local()
+
+    def _search_sync(self, query, max_results):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self._factory()
+        rows = client.text(query, region=self.region, max_results=max_results) or []
+        return [{"title": r.get("title", ""), "url": r.get("href", ""), "snippet": r.get("body", "")} for r in rows]
+
+    async def search(self, query, max_results=4):
+        return await asyncio.to_thread(self._search_sync, query, max_results)
+
+
+class LocalSearchProvider(SearchProvider):
+    """
+    Offline stand-in: keyword-overlap search over an in-memory corpus. Lets the research
+    path run (and be benchmarked) with no network. `latency` simulates a remote API.
+    """
+    name = "local"
+
+    def __init__(self, documents, latency=0.0):
+        self.latency = latency
+        self.documents = list(documents)
+        self._terms = [set(normalize_query(d["title"] + " " + d["snippet"]).split()) for d in self.documents]
+
+    @classmethod
+    def from_directory(cls, doc_dir, latency=0.0, chunk_chars=600):
+        documents = []
+        for path in sorted(glob.glob(os.path.join(doc_dir, "*.txt"))):
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                text = f.read()
+            name = os.path.basename(path)
+            for i in range(0, len(text), chunk_chars):
+                documents.append({"title": f"{name} #{i // chunk_chars + 1}",
+                                  "url": f"file://{name}#{i // chunk_chars + 1}",
+                                  "snippet": text[i:i + chunk_chars]})
+        return cls(documents, latency)
+
+    async def search(self, query, max_results=4):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        terms = set(normalize_query(query).split())
+        scored = [(len(terms & doc_terms), i) for i, doc_terms in enumerate(self._terms)]
+        scored = sorted((s for s in scored if s[0] > 0), key=lambda s: (-s[0], s[1]))[:max_results]
+        return [self.documents[i] for _, i in scored]
+
+
+class SearchCache:
+    """Persistent search-result cache (SQLite table in the main DB) with a TTL."""
+    def __init__(self, db_path, ttl_seconds=24 * 3600):
+        self.ttl_seconds = ttl_seconds
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS search_cache
+                                 (key TEXT PRIMARY KEY, provider TEXT, query TEXT,
+                                  results TEXT, created_at REAL)''')
+            self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(provider, query, max_results):
+        raw = f"{provider}|{' '.join(query.lower().split())}|{max_results}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self.conn.execute("SELECT results, created_at FROM search_cache WHERE key = ?", (key,)).fetchone()
+        if row and time.time() - row[1] < self.ttl_seconds:
+            self.hits += 1
+            return json.loads(row[0])
+        self.misses += 1
+        return None
+
+    def put(self, key, provider, query, results):
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?)",
+                              (key, provider, query, json.dumps(results, ensure_ascii=False), time.time()))
+            self.conn.commit()
+
+    def purge_expired(self):
+        with self._lock:
+            cur = self.conn.execute("DELETE FROM search_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            self.conn.commit()
+        return cur.rowcount
+
+
+class WebResearch:
+    """
+    Query fan-out + cache + dedup + compaction in front of a SearchProvider.
+    `gather(query)` returns deduplicated results; `compact(results)` renders them
+    as a short numbered snippet list for the summarization prompt.
+    """
+    def __init__(self, provider, cache=None, per_query=4, max_snippets=6, snippet_chars=240):
+        self.provider = provider
+        self.cache = cache
+        self.per_query = per_query
+        self.max_snippets = max_snippets
+        self.snippet_chars = snippet_chars
+
+    @staticmethod
+    def reformulate(query):
+        """Deterministic variants: as typed, tone-stripped, and scoped to the VN retail market."""
+        variants = [query.strip()]
+        plain = normalize_query(query)
+        if plain and plain != query.strip().lower():
+            variants.append(plain)
+        if "việt nam" not in query.lower() and "viet nam" not in plain:
+            variants.append(f"{query.strip()} bán lẻ Việt Nam")
+        return variants
+
+    async def _search_one(self, query):
+        key = self.cache.key(self.provider.name, query, self.per_query) if self.cache else None
+        if self.cache:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return cached
+        try:
+            results = await self.provider.search(query, self.per_query)
+        except Exception as e:
+            log_status(f"⚠️ [Research] Search failed for '{query}': {e}")
+            return []
+        if self.cache and results:
+            await asyncio.to_thread(self.cache.put, key, self.provider.name, query, results)
+        return results
+
+    @staticmethod
+    def _url_key(url):
+        parts = urlsplit(url)
+        host = parts.netloc.lower().removeprefix("www.")
+        key = f"{host}{parts.path.rstrip('/')}"
+        return f"{key}#{parts.fragment}" if parts.fragment else (key or url)
+
+    def dedupe(self, result_lists):
+        # Round-robin across variants so every reformulation contributes its best hits.
+        seen_urls, seen_titles, merged = set(), set(), []
+        for rank in range(max((len(r) for r in result_lists), default=0)):
+            for results in result_lists:
+                if rank >= len(results):
+                    continue
+                item = results[rank]
+                url_key = self._url_key(item.get("url", ""))
+                title_key = normalize_query(item.get("title", ""))
+                if url_key in seen_urls or (title_key and title_key in seen_titles):
+                    continue
+                seen_urls.add(url_key)
+                seen_titles.add(title_key)
+                merged.append(item)
+        return merged
+
+    async def gather(self, query):
+        result_lists = await asyncio.gather(*(self._search_one(q) for q in self.reformulate(query)))
+        return self.dedupe(result_lists)[:self.max_snippets]
+
+    def compact(self, results):
+        if not results:
+            return "Search returned no results."
+        lines = []
+        for i, item in enumerate(results, 1):
+            snippet = re.sub(r"\s+", " ", item.get("snippet", "")).strip()
+            if len(snippet) > self.snippet_chars:
+                snippet = snippet[:self.snippet_chars].rsplit(" ", 1)[0] + "…"
+            host = urlsplit(item.get("url", "")).netloc.removeprefix("www.")
+            lines.append(f"[{i}] {item.get('title', '').strip()} ({host})\n{snippet}")
+        return "\n".join(lines)
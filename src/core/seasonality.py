@@ -0,0 +1,155 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+
+from src.core.lunar_calendar import default_calendar
+
+
+class SeasonalityIndex:
+    """
+    Lunar-aware seasonality over the `sales` table, in NumPy.
+
+    Sales are held column-wise (store, category code, calendar day offset, amount),
+    sorted by store, so one store is a slice and its daily series is a single
+    bincount over the calendar span. `refresh()` pulls only rows with a higher id
+    (sales are append-only). Comparisons use the LunarCalendar tables: last year's
+    window is aligned on the lunar date (Tết to Tết), not the solar one.
+    """
+    def __init__(self, db_path, calendar=None, refresh_seconds=60, max_series=256):
+        self.calendar = calendar or default_calendar()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.calendar.ensure_table(self.conn)
+        self.refresh_seconds = refresh_seconds
+        self.max_series = max_series
+        self._lock = threading.Lock()
+        self.store_ids = np.empty(0, dtype=np.int64)
+        self.categories = np.empty(0, dtype=np.int32)
+        self.days = np.empty(0, dtype=np.int32)
+        self.amounts = np.empty(0, dtype=np.float64)
+        self._codes = {}
+        self._last_id = 0
+        self._series = OrderedDict()   # (store_id, category) -> daily revenue over the calendar
+        self.refreshed_at = 0.0
+
+    # --- Loading ---
+    def refresh(self, force=False):
+        with self._lock:
+            if not force and time.monotonic() - self.refreshed_at < self.refresh_seconds:
+                return 0
+            rows = self.conn.execute('''SELECT id, store_id, category, date, amount FROM sales WHERE id > ?
+                                        ORDER BY id''', (self._last_id,)).fetchall()
+            self.refreshed_at = time.monotonic()
+            if not rows:
+                return 0
+            self._last_id = rows[-1][0]
+            start = np.datetime64(self.calendar.start.isoformat())
+            days = (np.array([r[3][:10] for r in rows], dtype="datetime64[D]") - start).astype(np.int64)
+            keep = (days >= 0) & (days < len(self.calendar))
+            codes = np.array([self._codes.setdefault(r[2] or "", len(self._codes)) for r in rows], dtype=np.int32)
+            self.store_ids = np.concatenate([self.store_ids, np.array([r[1] for r in rows], dtype=np.int64)[keep]])
+            self.categories = np.concatenate([self.categories, codes[keep]])
+            self.days = np.concatenate([self.days, days[keep].astype(np.int32)])
+            self.amounts = np.concatenate([self.amounts, np.array([r[4] or 0 for r in rows], dtype=np.float64)[keep]])
+            order = np.argsort(self.store_ids, kind="stable")
+            self.store_ids, self.categories = self.store_ids[order], self.categories[order]
+            self.days, self.amounts = self.days[order], self.amounts[order]
+            self._series.clear()
+            return int(keep.sum())
+
+    def daily(self, store_id, category=None):
+        """Revenue per calendar day (index = LunarCalendar offset) for a store, optionally one category."""
+        self.refresh()
+        key = (store_id, category)
+        with self._lock:
+            series = self._series.get(key)
+            if series is not None:
+                self._series.move_to_end(key)
+                return series
+            lo, hi = np.searchsorted(self.store_ids, [store_id, store_id + 1])
+            days, amounts = self.days[lo:hi], self.amounts[lo:hi]
+            if category is not None:
+                mask = self.categories[lo:hi] == self._codes.get(category, -1)
+                days, amounts = days[mask], amounts[mask]
+            series = np.bincount(days, weights=amounts, minlength=len(self.calendar))
+            self._series[key] = series
+            while len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+            return series
+
+    def store_categories(self, store_id):
+        self.refresh()
+        with self._lock:
+            lo, hi = np.searchsorted(self.store_ids, [store_id, store_id + 1])
+            names = {code: name for name, code in self._codes.items()}
+            return sorted(names[c] for c in np.unique(self.categories[lo:hi]))
+
+    # --- Analytics ---
+    @staticmethod
+    def _change(current, previous):
+        return round((current - previous) / previous * 100, 1) if previous else None
+
+    def _today(self, today):
+        today = today or date.today()
+        offset = self.calendar.offset(today)
+        if offset is None:
+            raise ValueError(f"{today} is outside the lunar calendar table")
+        return today, offset
+
+    def lunar_yoy(self, store_id, category=None, today=None, window=7):
+        """
+        Revenue of the last `window` days vs the same window a lunar year earlier
+        (and vs the solar year, for contrast).
+        """
+        today, t = self._today(today)
+        cum = np.concatenate([[0.0], np.cumsum(self.daily(store_id, category))])
+        total = lambda end: float(cum[end + 1] - cum[max(0, end - window + 1)]) if end is not None else 0.0
+        year, month, day, leap = self.calendar.lunar(today)
+        lunar_end = self.calendar.solar_offset(year - 1, month, day, leap)
+        if lunar_end is None and leap:  # Last year had no such leap month: align on the regular one
+            lunar_end = self.calendar.solar_offset(year - 1, month, day)
+        last_year = today.replace(year=today.year - 1, day=28) if (today.month, today.day) == (2, 29) \
+            else today.replace(year=today.year - 1)
+        solar_end = self.calendar.offset(last_year)
+        current, lunar_prev, solar_prev = total(t), total(lunar_end), total(solar_end)
+        return {"store_id": store_id, "category": category, "window_days": window, "today": today.isoformat(),
+                "lunar_date": f"{day}/{month}/{year}" + (" (nhuận)" if leap else ""),
+                "current": current,
+                "lunar_last_year": lunar_prev,
+                "lunar_aligned_date": self.calendar.date(lunar_end).isoformat() if lunar_end is not None else None,
+                "lunar_change_pct": self._change(current, lunar_prev),
+                "solar_last_year": solar_prev, "solar_change_pct": self._change(current, solar_prev)}
+
+    def upcoming_events(self, store_id, category=None, today=None, days_ahead=60, lead_days=7, years=3,
+                        base_days=28):
+        """
+        Holidays in the next `days_ahead` days with a demand baseline each: the average
+        uplift of the `lead_days` up to the event over the preceding `base_days`, across the
+        last `years` occurrences, applied to the store's current daily level.
+        """
+        today, t = self._today(today)
+        series = self.daily(store_id, category)
+        cum = np.concatenate([[0.0], np.cumsum(series)])
+        mean = lambda lo, hi: (cum[hi] - cum[lo]) / (hi - lo) if 0 <= lo < hi <= len(series) else 0.0
+        current_level = mean(t - base_days + 1, t + 1)
+        results = []
+        for key, label, kind, year, offset in self.calendar.events:
+            if not t < offset <= t + days_ahead:
+                continue
+            past = [o for o in self.calendar.occurrences(key) if o < t - lead_days][-years:]
+            uplifts, last_year = [], None
+            for o in past:
+                base = mean(o - lead_days - base_days + 1, o - lead_days + 1)
+                window = mean(o - lead_days + 1, o + 1)
+                if base > 0 and window > 0:
+                    uplifts.append(window / base)
+                last_year = float(cum[o + 1] - cum[max(0, o - lead_days + 1)])  # Most recent occurrence
+            uplift = float(np.mean(uplifts)) if uplifts else None
+            results.append({"event": key, "label": label, "kind": kind, "date": self.calendar.date(offset).isoformat(),
+                            "days_until": offset - t, "uplift": round(uplift, 2) if uplift else None,
+                            "expected_revenue": round(current_level * uplift * lead_days) if uplift else None,
+                            "last_year_revenue": last_year, "years_used": len(uplifts)})
+        return results
@@ -0,0 +1,18 @@
+import re
+import unicodedata
+
+
+def strip_tones(text):
+    """'Tổng cộng' -> 'tong cong'. Lower-cases, maps đ -> d and drops combining marks."""
+    text = text.lower().replace("đ", "d")
+    return "".join(c for c in unicodedata.normalize("NFD", text) if unicodedata.category(c) != "Mn")
+
+
+def normalize_query(text):
+    """Tone-stripped, punctuation-free, single-spaced form used for matching and cache keys."""
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", strip_tones(text))).strip()
+
+
+def format_vnd(amount):
+    """2500000 -> '2.500.000đ' (Vietnamese thousands separator)."""
+    return f"{round(amount or 0):,}".replace(",", ".") + "đ"
@@ -0,0 +1,164 @@
+import contextvars
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from src.core import metrics
+from src.core.prompts import Prompts
+from src.core.tools import RetailTools
+
+TOOL_CALL_RE = re.compile(r"<tool_call>\s*(.*?)\s*(?:</tool_call>|$)", re.DOTALL)
+JSON_TYPES = {"string": str, "integer": int, "number": (int, float), "boolean": bool, "object": dict, "array": list}
+
+
+def parse_tool_calls(text):
+    """
+    Every `<tool_call>{"name": ..., "arguments": {...}}</tool_call>` in a reply (Qwen
+    format), in one pass. Returns (calls, text outside the calls). A block cut off
+    by max_new_tokens or with broken JSON is dropped.
+    """
+    calls = []
+    for match in TOOL_CALL_RE.finditer(text):
+        try:
+            call = json.loads(match.group(1))
+        except json.JSONDecodeError:
+            continue
+        if isinstance(call, dict) and isinstance(call.get("name"), str):
+            arguments = call.get("arguments") or {}
+            if isinstance(arguments, str):  # Some models double-encode the arguments
+                try:
+                    arguments = json.loads(arguments)
+                except json.JSONDecodeError:
+                    arguments = {}
+            calls.append({"name": call["name"], "arguments": arguments if isinstance(arguments, dict) else {}})
+    return calls, TOOL_CALL_RE.sub("", text).strip()
+
+
+class ToolRegistry:
+    """
+    Functions the model may call, with JSON schemas for the prompt.
+
+    `scoped` tools get the caller's `store_id` injected; it is never taken from the
+    model, so a tool call cannot read another tenant's store. `execute` runs the
+    calls of one reply concurrently (identical calls once) with a per-call timeout;
+    failures come back as {"error": ...} for the model to read, not as exceptions.
+    """
+    def __init__(self, max_workers=8, timeout_seconds=10.0):
+        self.tools = {}
+        self.timeout_seconds = timeout_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self._prompt = None
+
+    def register(self, name, fn, description, parameters=None, required=(), scoped=False):
+        """`parameters`: {arg: {"type": ..., "description": ...}} (JSON Schema properties)."""
+        self.tools[name] = {"fn": fn, "scoped": scoped, "schema": {
+            "type": "function",
+            "function": {"name": name, "description": description,
+                         "parameters": {"type": "object", "properties": parameters or {},
+                                        "required": list(required)}}}}
+        self._prompt = None
+
+    def schemas(self):
+        return [tool["schema"] for tool in self.tools.values()]
+
+    def prompt(self):
+        """Tool block for the system prompt. Stable text, so PromptBuilder keeps its token IDs cached."""
+        if self._prompt is None:
+            tools = "\n".join(json.dumps(schema, ensure_ascii=False) for schema in self.schemas())
+            self._prompt = Prompts.TOOLS_INSTRUCTION.format(tools=tools)
+        return self._prompt
+
+    def _arguments(self, name, arguments):
+        """Checks the call against the tool's schema (required, type, enum); unknown arguments are dropped."""
+        tool = self.tools.get(name)
+        if tool is None:
+            raise ValueError(f"unknown tool '{name}'")
+        schema = tool["schema"]["function"]["parameters"]
+        missing = [arg for arg in schema["required"] if arg not in arguments]
+        if missing:
+            raise ValueError(f"missing argument(s): {', '.join(missing)}")
+        kwargs = {}
+        for arg, spec in schema["properties"].items():
+            if arg not in arguments:
+                continue
+            value = arguments[arg]
+            if spec.get("type") == "integer" and isinstance(value, str) and value.strip().lstrip("-").isdigit():
+                value = int(value)
+            if not isinstance(value, JSON_TYPES.get(spec.get("type"), object)) or \
+                    (spec.get("type") in ("integer", "number") and isinstance(value, bool)):
+                raise ValueError(f"argument '{arg}' must be of type {spec['type']}")
+            if "enum" in spec and value not in spec["enum"]:
+                raise ValueError(f"argument '{arg}' must be one of: {', '.join(map(str, spec['enum']))}")
+            kwargs[arg] = value
+        return tool, kwargs
+
+    def _run(self, name, arguments, store_id):
+        started = time.perf_counter()
+        try:
+            tool, kwargs = self._arguments(name, arguments)
+            if tool["scoped"]:
+                if store_id is None:
+                    raise ValueError("no store selected; ask the user which store")
+                kwargs["store_id"] = store_id
+            with metrics.stage(f"tool.{name}"):
+                result = {"result": tool["fn"](**kwargs)}
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}" if not isinstance(e, ValueError) else str(e)}
+        result["ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return result
+
+    def execute(self, calls, store_id=None):
+        """Runs `calls` (from parse_tool_calls); returns [{"name", "arguments", "result" | "error", "ms"}] in order."""
+        keys = [json.dumps([call["name"], call["arguments"]], sort_keys=True, ensure_ascii=False) for call in calls]
+        unique = dict(zip(keys, calls))
+        # Always on the pool, a single call too, so the timeout holds (copy_context: tool stages land in
+        # the request's trace)
+        futures = {key: self._pool.submit(contextvars.copy_context().run, self._run,
+                                          call["name"], call["arguments"], store_id)
+                   for key, call in unique.items()}
+        deadline = time.monotonic() + self.timeout_seconds
+        results = {}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                results[key] = {"error": f"timed out after {self.timeout_seconds:g} s"}
+        return [{"name": call["name"], "arguments": call["arguments"], **results[key]} for key, call in zip(keys, calls)]
+
+    @staticmethod
+    def responses(results):
+        """The follow-up user turn: one <tool_response> per call, in call order."""
+        blocks = []
+        for r in results:
+            payload = {"name": r["name"], **({"error": r["error"]} if "error" in r else {"result": r["result"]})}
+            blocks.append(f"<tool_response>\n{json.dumps(payload, ensure_ascii=False, default=str)}\n</tool_response>")
+        return "\n".join(blocks)
+
+
+def retail_registry(saas, **settings):
+    """The RetailTools and SaasAPI functions as tools. Store-level lookups are scoped to the caller's store."""
+    registry = ToolRegistry(**settings)
+    registry.register("get_sales_report", saas.get_sales_report,
+                      "Doanh thu và số đơn của cửa hàng trong một kỳ ('today' hoặc 'yesterday').",
+                      {"period": {"type": "string", "enum": ["today", "yesterday"], "description": "Kỳ báo cáo"}}, scoped=True)
+    registry.register("check_inventory", saas.check_inventory,
+                      "Tồn kho của một sản phẩm (tìm gần đúng, có thể gõ không dấu).",
+                      {"product_name": {"type": "string", "description": "Tên sản phẩm"}},
+                      required=["product_name"], scoped=True)
+    registry.register("get_low_stock", saas.get_low_stock,
+                      "Các sản phẩm đang ở hoặc dưới ngưỡng sắp hết hàng, ít hàng nhất trước.",
+                      {"limit": {"type": "integer", "description": "Số sản phẩm tối đa (mặc định 20)"}}, scoped=True)
+    registry.register("get_customer_info", saas.get_customer_info,
+                      "Thông tin khách hàng (hạng, lần mua cuối, tổng chi tiêu) theo số điện thoại hoặc tên.",
+                      {"phone_or_name": {"type": "string", "description": "Số điện thoại hoặc tên khách"}},
+                      required=["phone_or_name"], scoped=True)
+    registry.register("health_check", lambda store_id: RetailTools.health_check(saas, store_id),
+                      "Kiểm tra nhanh cửa hàng: cảnh báo doanh thu và hàng sắp hết.", scoped=True)
+    registry.register("calculate", RetailTools.calculate,
+                      "Tính một biểu thức số học (+ - * / // % **, ngoặc, abs, round, min, max, sqrt). "
+                      "Viết số không có dấu phân cách hàng nghìn.",
+                      {"expression": {"type": "string", "description": "Ví dụ: (1500000 - 1200000) / 1200000 * 100"}},
+                      required=["expression"])
+    registry.register("get_lunar_date", RetailTools.get_lunar_date, "Ngày âm lịch hôm nay.")
+    return registry
@@ -1,21 +1,68 @@
+import ast
 import math
+import operator
 import datetime
-from lunardate import LunarDate
+from src.core.lunar_calendar import default_calendar
+
+OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+             ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod, ast.Pow: operator.pow,
+             ast.USub: operator.neg, ast.UAdd: operator.pos}
+FUNCTIONS = {"abs": abs, "round": round, "min": min, "max": max, "sqrt": math.sqrt}
+
+
+def safe_eval(expression: str, max_power=100, max_length=200, max_bits=1024):
+    """
+    Arithmetic only, by walking the AST: numbers, + - * / // % **, parentheses and a
+    few functions (abs, round, min, max, sqrt). Anything else raises ValueError, as
+    does an integer * or ** whose result would exceed `max_bits` (checked before it
+    is computed: 1024 bits is about the float range, ~1.8e308).
+    """
+    if len(expression) > max_length:
+        raise ValueError("expression too long")
+
+    def walk(node):
+        if isinstance(node, ast.Expression):
+            return walk(node.body)
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            return node.value
+        if isinstance(node, ast.BinOp) and type(node.op) in OPERATORS:
+            left, right = walk(node.left), walk(node.right)
+            if isinstance(node.op, ast.Pow) and abs(right) > max_power:
+                raise ValueError("exponent too large")
+            if isinstance(left, int) and isinstance(right, int):
+                if isinstance(node.op, ast.Pow) and right > 0:
+                    bits = (abs(left).bit_length() - 1) * right + 1  # Lower bound: 2**(bit_length - 1) <= |left|
+                elif isinstance(node.op, ast.Mult):
+                    bits = abs(left).bit_length() + abs(right).bit_length() - 1
+                else:
+                    bits = 0
+                if bits > max_bits:
+                    raise ValueError("result too large")
+            return OPERATORS[type(node.op)](left, right)
+        if isinstance(node, ast.UnaryOp) and type(node.op) in OPERATORS:
+            return OPERATORS[type(node.op)](walk(node.operand))
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS \
+                and not node.keywords:
+            return FUNCTIONS[node.func.id](*(walk(arg) for arg in node.args))
+        raise ValueError(f"unsupported expression: {type(node).__name__}")
+
+    return walk(ast.parse(expression.strip(), mode="eval"))
+
 
 class RetailTools:
     @staticmethod
     def calculate(expression: str):
         try:
-            allowed = set("0123456789.+-*/() ")
-            if not all(c in allowed for c in expression): return "Error"
-            return str(eval(expression, {"__builtins__": None}, {}))
-        except: return "Error"
+            result = safe_eval(expression)
+            return str(int(result) if isinstance(result, float) and result.is_integer() else result)
+        except (ValueError, SyntaxError, TypeError, ZeroDivisionError, OverflowError):
+            return "Error"
 
     @staticmethod
     def get_lunar_date():
         today = datetime.date.today()
-        lunar = LunarDate.fromSolarDate(today.year, today.month, today.day)
-        return f"{lunar.day}/{lunar.month}/{lunar.year} (Lunar)"
+        year, month, day, _ = default_calendar().lunar(today)
+        return f"{day}/{month}/{year} (Lunar)"
 
     @staticmethod
     def health_check(saas_api, store_id):
@@ -30,9 +77,9 @@ class RetailTools:
         if sales['revenue'] == 0:
             alerts.append("⚠️ Chưa có doanh thu hôm nay.")
         
-        # 2. Check Inventory (Mock check for 'Critical' items)
-        # In real app, this would query DB for stock < threshold
-        critical_items = ["Áo Khoác Gió"] # Mock result
+        # 2. Check Inventory (stock at or below each item's threshold)
+        # The server serves these from the background HealthScheduler instead.
+        critical_items = [item["name"] for item in saas_api.get_low_stock(store_id)]
         if critical_items:
             alerts.append(f"📦 Sắp hết hàng: {', '.join(critical_items)}")
             
@@ -0,0 +1,271 @@
+import asyncio
+import contextlib
+import hashlib
+import os
+import time
+import uuid
+
+from python_multipart.exceptions import FormParserError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from src.core.metrics import log_status
+
+# Magic numbers of the formats Florence/PIL can take. Anything else is rejected
+# before it reaches the decoder.
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": "jpg",
+    b"\x89PNG\r\n\x1a\n": "png",
+    b"GIF87a": "gif",
+    b"GIF89a": "gif",
+    b"BM": "bmp",
+}
+SNIFF_BYTES = 12          # Enough for every signature above and RIFF....WEBP
+MULTIPART_OVERHEAD = 64 * 1024   # Boundaries, part headers and small form fields around the file
+
+
+def sniff(head):
+    """Image format from the first bytes, or None."""
+    ext = next((e for sig, e in IMAGE_SIGNATURES.items() if head.startswith(sig)), None)
+    if ext is None and head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        ext = "webp"
+    return ext
+
+
+class UploadError(Exception):
+    def __init__(self, status_code, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class MultipartFileStream:
+    """
+    The bytes of one file field of a multipart/form-data body, parsed while the body
+    arrives (`request.stream()`), so nothing is buffered or spooled to a temp file
+    before the handler sees it. Other parts are skipped; the whole body is capped at
+    `max_body` bytes. `filename` is set once the file part's headers have been read.
+    """
+    def __init__(self, body, content_type, field="file", max_body=None):
+        _, params = parse_options_header(content_type or "")
+        if not params.get(b"boundary"):
+            raise UploadError(400, "Expected multipart/form-data with a boundary")
+        self.body = body
+        self.field = field.encode()
+        self.max_body = max_body
+        self.filename = None
+        self._found = self._in_file = False
+        self._pending = []
+        self._header, self._value, self._disposition = b"", b"", b""
+        self._parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": lambda data, start, end: self._add_header(data[start:end], b""),
+            "on_header_value": lambda data, start, end: self._add_header(b"", data[start:end]),
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self):
+        self._disposition, self._in_file = b"", False
+
+    def _add_header(self, name, value):
+        self._header += name
+        self._value += value
+
+    def _on_header_end(self):
+        if self._header.lower() == b"content-disposition":
+            self._disposition = self._value
+        self._header, self._value = b"", b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        if not self._found and options.get(b"name") == self.field and b"filename" in options:
+            self._found = self._in_file = True
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+
+    def _on_part_data(self, data, start, end):
+        if self._in_file:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self):
+        self._in_file = False
+
+    async def __aiter__(self):
+        received = 0
+        async for chunk in self.body:
+            received += len(chunk)
+            if self.max_body is not None and received > self.max_body:
+                raise UploadError(413, f"Request body exceeds {self.max_body // (1024 * 1024)} MB")
+            try:
+                self._parser.write(chunk)
+            except FormParserError:
+                raise UploadError(400, "Invalid multipart body")
+            if self._pending:
+                data = b"".join(self._pending)
+                self._pending.clear()
+                yield data
+        self._parser.finalize()
+        if not self._found:
+            raise UploadError(422, f"Missing file field '{self.field.decode()}'")
+
+
+class UploadSpool:
+    """
+    Streams uploads in fixed-size chunks into a content-addressed spool directory.
+
+    - Never holds a whole upload in memory: peak per upload ~= one chunk. Fed from the
+      request body as it arrives (MultipartFileStream), so the size limit bounds what
+      the server accepts; file I/O runs in worker threads, off the event loop.
+    - Files are named by SHA-256 of their content (duplicates are stored once and the
+      digest doubles as the vision cache key); client filenames are never used as paths.
+    - Enforces a per-upload size limit and a concurrency limit.
+    - `collect()` removes files past their TTL or beyond the total size budget;
+      `run_gc()` calls it on a schedule.
+    """
+    def __init__(self, spool_dir, max_bytes=10 * 1024 * 1024, chunk_size=64 * 1024,
+                 max_concurrent=8, acquire_timeout=5.0, ttl_seconds=6 * 3600, max_total_bytes=2 * 1024 ** 3):
+        self.spool_dir = spool_dir
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.acquire_timeout = acquire_timeout
+        self.ttl_seconds = ttl_seconds
+        self.max_total_bytes = max_total_bytes
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self.stats = {"accepted": 0, "deduplicated": 0, "rejected_size": 0, "rejected_busy": 0,
+                      "rejected_type": 0, "gc_removed": 0}
+        os.makedirs(self.spool_dir, exist_ok=True)
+
+    def path_for(self, digest, ext):
+        return os.path.join(self.spool_dir, digest[:2], f"{digest}.{ext}")
+
+    @contextlib.asynccontextmanager
+    async def _slot(self):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.stats["rejected_busy"] += 1
+            raise UploadError(429, "Too many concurrent uploads, retry shortly")
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def check_length(self, content_length):
+        """Rejects a request up front when its declared Content-Length cannot fit the limit."""
+        try:
+            declared = int(content_length)
+        except (TypeError, ValueError):
+            return  # Chunked / missing: the running count in receive() applies
+        if declared > self.max_bytes + MULTIPART_OVERHEAD:
+            self.stats["rejected_size"] += 1
+            raise UploadError(413, f"File exceeds {self.max_bytes // (1024 * 1024)} MB limit")
+
+    async def _chunks(self, source):
+        if hasattr(source, "read"):  # UploadFile-like
+            while True:
+                chunk = await source.read(self.chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        else:
+            async for chunk in source:
+                yield chunk
+
+    def _commit(self, tmp_path, digest, ext):
+        final_path = self.path_for(digest, ext)
+        duplicate = os.path.exists(final_path)
+        if duplicate:
+            os.remove(tmp_path)
+            os.utime(final_path)  # Refresh TTL for hot images
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(tmp_path, final_path)
+        return final_path, duplicate
+
+    async def receive(self, source):
+        """
+        Spools an async iterable of byte chunks (e.g. MultipartFileStream) or an
+        UploadFile-like object (async `read(n)`).
+        Returns {"digest", "path", "size", "format", "duplicate"}.
+        """
+        async with self._slot():
+            tmp_path = os.path.join(self.spool_dir, f".{uuid.uuid4().hex}.part")
+            hasher = hashlib.sha256()
+            size, ext, head = 0, None, b""
+            out = await asyncio.to_thread(open, tmp_path, "wb")
+            try:
+                async for chunk in self._chunks(source):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        self.stats["rejected_size"] += 1
+                        raise UploadError(413, f"File exceeds {self.max_bytes // (1024 * 1024)} MB limit")
+                    if ext is None:
+                        head += chunk
+                        if len(head) < SNIFF_BYTES:
+                            continue
+                        chunk, head, ext = head, b"", self._detect(head)
+                    hasher.update(chunk)
+                    await asyncio.to_thread(out.write, chunk)
+                if size == 0:
+                    raise UploadError(400, "Empty upload")
+                if ext is None:  # Shorter than SNIFF_BYTES
+                    ext = self._detect(head)
+                    hasher.update(head)
+                    await asyncio.to_thread(out.write, head)
+                await asyncio.to_thread(out.close)
+
+                digest = hasher.hexdigest()
+                final_path, duplicate = await asyncio.to_thread(self._commit, tmp_path, digest, ext)
+                if duplicate:
+                    self.stats["deduplicated"] += 1
+                self.stats["accepted"] += 1
+                return {"digest": digest, "path": final_path, "size": size, "format": ext, "duplicate": duplicate}
+            except BaseException:
+                out.close()
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def _detect(self, head):
+        ext = sniff(head)
+        if ext is None:
+            self.stats["rejected_type"] += 1
+            raise UploadError(415, "Unsupported file type (expected JPEG/PNG/WEBP/BMP/GIF)")
+        return ext
+
+    def collect(self, now=None):
+        """Deletes expired spool files, then oldest files until under the size budget."""
+        now = now or time.time()
+        entries, removed = [], 0
+        for root, _, files in os.walk(self.spool_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                # Orphaned .part files (crashed uploads) expire after a minute.
+                ttl = 60 if name.endswith(".part") else self.ttl_seconds
+                if now - st.st_mtime > ttl:
+                    os.remove(path)
+                    removed += 1
+                else:
+                    entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_total_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        self.stats["gc_removed"] += removed
+        return removed
+
+    async def run_gc(self, interval_seconds=600):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            removed = await asyncio.to_thread(self.collect)
+            if removed:
+                log_status(f"🧹 [Spool] Removed {removed} expired upload(s).")
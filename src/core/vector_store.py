@@ -0,0 +1,287 @@
+import json
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from src.core.metrics import log_status
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+class VectorStore:
+    """
+    What KnowledgeBase needs from a vector backend. `query` returns up to `top_k`
+    (document, score, metadata) tuples, best first (higher score = closer).
+    """
+    name = "base"
+
+    def add(self, ids, embeddings, documents, metadatas):
+        raise NotImplementedError
+
+    def has_source(self, source):
+        raise NotImplementedError
+
+    def query(self, embedding, top_k=10):
+        raise NotImplementedError
+
+    def count(self):
+        raise NotImplementedError
+
+
+class ChromaStore(VectorStore):
+    """The original chromadb.PersistentClient collection."""
+    name = "chroma"
+
+    def __init__(self, persist_dir, collection="project_a_docs"):
+        import chromadb
+        os.makedirs(persist_dir, exist_ok=True)
+        self.client = chromadb.PersistentClient(path=persist_dir)
+        self.collection = self.client.get_or_create_collection(name=collection)
+
+    def add(self, ids, embeddings, documents, metadatas):
+        self.collection.add(documents=documents, embeddings=[list(map(float, e)) for e in embeddings],
+                            metadatas=metadatas, ids=ids)
+
+    def has_source(self, source):
+        return bool(self.collection.get(where={"source": source})["ids"])
+
+    def query(self, embedding, top_k=10):
+        results = self.collection.query(query_embeddings=[list(map(float, embedding))],
+                                        n_results=max(1, min(top_k, self.count())))
+        return [(doc, -distance, meta) for doc, distance, meta in
+                zip(results["documents"][0], results["distances"][0], results["metadatas"][0])]
+
+    def count(self):
+        return self.collection.count()
+
+    def export(self, batch=1000):
+        """The whole collection as (ids, embeddings, documents, metadatas) batches."""
+        for offset in range(0, self.count(), batch):
+            got = self.collection.get(include=["embeddings", "documents", "metadatas"], limit=batch, offset=offset)
+            yield got["ids"], got["embeddings"], got["documents"], got["metadatas"]
+
+
+class MemmapStore(VectorStore):
+    """
+    Embedded store with no server and no load step.
+
+    - Vectors (L2-normalized, float16) are appended to `<vector_dir>/<collection>.f16`
+      and read through a read-only memory map, so startup is instant and the pages
+      live in the OS page cache, shared by every process that opens the file.
+    - Chunk text and metadata sit in SQLite (`vector_chunks`, main DB); `row` is the
+      vector's position in the file, and `vector_collections.rows` is the committed
+      length (a partly written append after a crash is simply overwritten), and
+      `build` counts IVF rebuilds, so other processes reload the lists after one.
+    - Exact top-k is a block-wise float32 matmul. From `ivf_min_rows` chunks an IVF
+      index is built (k-means lists, `nprobe` nearest lists scanned per query).
+    """
+    name = "memmap"
+    BLOCK = 65536
+
+    def __init__(self, db_path, vector_dir, collection="project_a_docs", ivf_min_rows=50000, ivf_lists=0, nprobe=8):
+        self.collection = collection
+        self.ivf_min_rows = ivf_min_rows
+        self.ivf_lists = ivf_lists
+        self.nprobe = nprobe
+        os.makedirs(vector_dir, exist_ok=True)
+        self.path = os.path.join(vector_dir, f"{collection}.f16")
+        self.centroids_path = os.path.join(vector_dir, f"{collection}.ivf.npy")
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS vector_collections
+                                 (name TEXT PRIMARY KEY, dim INTEGER, rows INTEGER, ivf_lists INTEGER DEFAULT 0)''')
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(vector_collections)")}
+            if "build" not in columns:
+                self.conn.execute("ALTER TABLE vector_collections ADD COLUMN build INTEGER DEFAULT 0")
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS vector_chunks
+                                 (collection TEXT, row INTEGER, chunk_id TEXT, source TEXT, document TEXT,
+                                  metadata TEXT, list_id INTEGER DEFAULT -1, PRIMARY KEY (collection, row))''')
+            self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_vector_chunks_id ON vector_chunks (collection, chunk_id)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_vector_chunks_source ON vector_chunks (collection, source)")
+            self.conn.commit()
+        self.dim = None
+        self.rows = 0
+        self._version = None
+        self._vectors = None
+        self._centroids = None
+        self._lists = None
+        with self._lock:
+            self._refresh()
+
+    # --- state (caller holds the lock) ---
+    def _refresh(self):
+        """Re-maps the file when another process (or this one) committed new rows or rebuilt the IVF lists."""
+        row = self.conn.execute("SELECT dim, rows, ivf_lists, build FROM vector_collections WHERE name = ?",
+                                (self.collection,)).fetchone()
+        if row is None or row == self._version:
+            return
+        self._version = row
+        self.dim, self.rows, lists, _ = row
+        self._vectors = np.memmap(self.path, dtype=np.float16, mode="r", shape=(self.rows, self.dim)) \
+            if self.rows else None
+        self._centroids, self._lists = (None, None)
+        if lists and os.path.exists(self.centroids_path):
+            self._centroids = np.load(self.centroids_path)
+            assigned = np.array(self.conn.execute('''SELECT list_id, row FROM vector_chunks
+                                                     WHERE collection = ? AND list_id >= 0 ORDER BY list_id, row''',
+                                                  (self.collection,)).fetchall(), dtype=np.int64).reshape(-1, 2)
+            bounds = np.searchsorted(assigned[:, 0], np.arange(1, len(self._centroids)))
+            self._lists = np.split(assigned[:, 1], bounds)
+
+    def _scores(self, q, rows=None):
+        if rows is not None:
+            return np.asarray(self._vectors[rows], dtype=np.float32) @ q
+        out = np.empty(self.rows, dtype=np.float32)
+        for start in range(0, self.rows, self.BLOCK):
+            out[start:start + self.BLOCK] = np.asarray(self._vectors[start:start + self.BLOCK], dtype=np.float32) @ q
+        return out
+
+    def _assign(self, vectors):
+        """Nearest centroid per (normalized) vector."""
+        return np.argmax(np.asarray(vectors, dtype=np.float32) @ self._centroids.T, axis=1)
+
+    # --- writes ---
+    def add(self, ids, embeddings, documents, metadatas):
+        vectors = _normalize(embeddings).astype(np.float16)
+        if not len(vectors):
+            return
+        with self._lock:
+            try:
+                # Write lock first, so the committed length read next cannot move under another process
+                self.conn.execute("BEGIN IMMEDIATE")
+                self._refresh()
+                if self.dim is not None and vectors.shape[1] != self.dim:
+                    raise ValueError(f"embedding dim {vectors.shape[1]} != collection dim {self.dim}")
+                start = self.rows
+                lists = self._assign(vectors) if self._centroids is not None else np.full(len(vectors), -1)
+                self.conn.executemany('''INSERT INTO vector_chunks (collection, row, chunk_id, source, document,
+                                         metadata, list_id) VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                                      [(self.collection, start + i, chunk_id, (meta or {}).get("source"), doc,
+                                        json.dumps(meta or {}, ensure_ascii=False), int(lists[i]))
+                                       for i, (chunk_id, doc, meta) in enumerate(zip(ids, documents, metadatas))])
+                offset = start * vectors.shape[1] * 2
+                with open(self.path, "r+b" if os.path.exists(self.path) else "wb") as f:
+                    f.truncate(offset)
+                    f.seek(offset)
+                    f.write(vectors.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.conn.execute('''INSERT INTO vector_collections (name, dim, rows) VALUES (?, ?, ?)
+                                     ON CONFLICT(name) DO UPDATE SET rows = excluded.rows''',
+                                  (self.collection, vectors.shape[1], start + len(vectors)))
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            self._refresh()
+            build = self._centroids is None and self.rows >= self.ivf_min_rows
+        if build:
+            self.build_index()
+
+    def build_index(self, lists=None, iterations=10, seed=0):
+        """(Re)builds the IVF lists with k-means on a sample of the stored vectors."""
+        with self._lock:
+            self._refresh()
+            if not self.rows:
+                return
+            lists = lists or self.ivf_lists or max(1, int(np.sqrt(self.rows)))
+            rng = np.random.default_rng(seed)
+            sample = np.asarray(self._vectors[np.sort(rng.choice(self.rows, min(self.rows, lists * 64), replace=False))],
+                                dtype=np.float32)
+            centroids = sample[rng.choice(len(sample), lists, replace=False)]
+            for _ in range(iterations):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                for k in range(lists):
+                    members = sample[labels == k]
+                    if len(members):
+                        centroids[k] = members.mean(axis=0)
+                centroids = _normalize(centroids)
+            self._centroids = centroids
+            labels = np.concatenate([self._assign(self._vectors[s:s + self.BLOCK])
+                                     for s in range(0, self.rows, self.BLOCK)])
+            # Replaced atomically: a reader never sees a half-written file
+            with open(self.centroids_path + ".tmp", "wb") as f:
+                np.save(f, centroids)
+            os.replace(self.centroids_path + ".tmp", self.centroids_path)
+            self.conn.executemany("UPDATE vector_chunks SET list_id = ? WHERE collection = ? AND row = ?",
+                                  [(int(label), self.collection, row) for row, label in enumerate(labels)])
+            self.conn.execute("UPDATE vector_collections SET ivf_lists = ?, build = build + 1 WHERE name = ?",
+                              (lists, self.collection))
+            self.conn.commit()
+            self._refresh()
+        log_status(f"   🗂️  [RAG] IVF index: {lists} lists over {self.rows} chunks")
+
+    def import_from(self, source):
+        """Copies every chunk of another store (its `export()` batches); returns how many."""
+        copied = 0
+        for ids, embeddings, documents, metadatas in source.export():
+            self.add(ids, np.asarray(embeddings, dtype=np.float32), documents, metadatas)
+            copied += len(ids)
+        return copied
+
+    # --- reads ---
+    def has_source(self, source):
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM vector_chunks WHERE collection = ? AND source = ? LIMIT 1",
+                                     (self.collection, source)).fetchone() is not None
+
+    def count(self):
+        with self._lock:
+            self._refresh()
+            return self.rows
+
+    def query(self, embedding, top_k=10):
+        q = _normalize(embedding).reshape(-1)
+        with self._lock:
+            self._refresh()
+            if not self.rows:
+                return []
+            rows = None
+            if self._lists is not None:
+                probe = np.argsort(-(self._centroids @ q))[:self.nprobe]
+                rows = np.sort(np.concatenate([self._lists[p] for p in probe]))
+            scores = self._scores(q, rows)
+            k = min(top_k, len(scores))
+            if not k:
+                return []
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+            hits = [(int(rows[i]) if rows is not None else int(i), float(scores[i])) for i in best]
+            placeholders = ",".join("?" * len(hits))
+            found = {row: (doc, json.loads(meta)) for row, doc, meta in self.conn.execute(
+                f"SELECT row, document, metadata FROM vector_chunks WHERE collection = ? AND row IN ({placeholders})",
+                [self.collection] + [row for row, _ in hits])}
+        return [(found[row][0], score, found[row][1]) for row, score in hits if row in found]
+
+
+def make_vector_store(kind, persist_dir, db_path, **settings):
+    """
+    "memmap" (default, embedded) or "chroma" (needs chromadb). An empty memmap store
+    takes over the Chroma collection left in `persist_dir` by the previous default.
+    """
+    if kind == "chroma":
+        return ChromaStore(persist_dir)
+    if kind != "memmap":
+        raise ValueError(f"unknown vector store {kind!r} (memmap | chroma)")
+    store = MemmapStore(db_path, persist_dir, **settings)
+    if not store.count() and os.path.exists(os.path.join(persist_dir, "chroma.sqlite3")):
+        _migrate_chroma(store, persist_dir)
+    return store
+
+
+def _migrate_chroma(store, persist_dir):
+    try:
+        source = ChromaStore(persist_dir, store.collection)
+    except ImportError:
+        log_status(f"   ⚠️  [RAG] {persist_dir} has a Chroma collection but chromadb is not installed: not migrated. "
+                   f"Files in the docs folder are re-indexed; install chromadb to migrate, or set VECTOR_STORE=chroma.")
+        return
+    if source.count():
+        log_status(f"   🔁 [RAG] Migrating {source.count()} chunks from Chroma to the memmap store...")
+        store.import_from(source)
@@ -0,0 +1,130 @@
+import asyncio
+import hashlib
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from src.core import metrics
+
+
+class VisionService:
+    """
+    Front door to VisionAgent for concurrent callers (the API server).
+    - Results are cached by (image content hash, task, mode): the same product
+      photo gets uploaded over and over.
+    - Identical in-flight requests share one future instead of re-running.
+    - Pending requests with the same task/mode are micro-batched into a single
+      `generate` call by a background worker.
+    """
+    def __init__(self, agent, settings=None):
+        self.agent = agent
+        settings = settings or agent.settings
+        self.window = settings["batch_window_ms"] / 1000.0
+        self.max_batch = settings["max_batch_size"]
+        self.cache_size = settings["cache_size"]
+
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "batches": 0, "batched_images": 0}
+
+        self._worker = threading.Thread(target=self._run, name="vision-batcher", daemon=True)
+        self._worker.start()
+
+    @staticmethod
+    def content_hash(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def submit(self, source, task_hint="OCR", mode="quality", digest=None):
+        """
+        Queues an image (bytes, path, file-like or PIL image) and returns a Future.
+        `digest` must be given when `source` is not raw bytes.
+        """
+        future = Future()
+        if not self.agent.model:
+            future.set_result("Vision model not loaded.")
+            return future
+
+        if digest is None:
+            digest = self.content_hash(source)
+        task_prompt = self.agent.task_prompt_for(task_hint)
+        key = (digest, task_prompt, mode)
+
+        with self._lock:
+            self.stats["requests"] += 1
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                future.set_result(self._cache[key])
+                return future
+            if key in self._inflight:
+                self.stats["coalesced"] += 1
+                return self._inflight[key]
+            self._inflight[key] = future
+
+        self._queue.put((key, source, future))
+        return future
+
+    def analyze(self, source, task_hint="OCR", mode="quality", digest=None):
+        return self.submit(source, task_hint, mode, digest).result()
+
+    async def analyze_async(self, source, task_hint="OCR", mode="quality", digest=None):
+        # Request-side time: cache lookup, batching window and the shared generate call
+        with metrics.stage("vision.request", mode=mode):
+            return await asyncio.wrap_future(self.submit(source, task_hint, mode, digest))
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            groups = {}
+            for item in batch:
+                _, task_prompt, mode = item[0]
+                groups.setdefault((task_prompt, mode), []).append(item)
+            for (task_prompt, mode), items in groups.items():
+                self._process(task_prompt, mode, items)
+
+    def _process(self, task_prompt, mode, items):
+        ready, images = [], []
+        for key, source, future in items:
+            try:
+                images.append(self.agent.prepare_image(source))
+                ready.append((key, future))
+            except Exception as e:
+                self._finish(key, future, f"Error opening image: {e}", cache=False)
+
+        if not ready:
+            return
+        try:
+            results = self.agent.run_batch(images, task_prompt, mode)
+        except Exception as e:
+            for key, future in ready:
+                self._finish(key, future, f"Vision inference failed: {e}", cache=False)
+            return
+
+        with self._lock:
+            self.stats["batches"] += 1
+            self.stats["batched_images"] += len(ready)
+        for (key, future), result in zip(ready, results):
+            self._finish(key, future, self.agent.format_result(task_prompt, result), cache=True)
+
+    def _finish(self, key, future, value, cache):
+        with self._lock:
+            self._inflight.pop(key, None)
+            if cache:
+                self._cache[key] = value
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        future.set_result(value)
@@ -0,0 +1,432 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import datetime
+from functools import lru_cache
+
+TEMPLATE_RE = re.compile(r"\{\{(.*?)\}\}", re.DOTALL)
+REF_RE = re.compile(r"^\s*([A-Za-z0-9_]+)((?:\.(?:`[^`]*`|[^.`\s]+))+)\s*$")
+SEGMENT_RE = re.compile(r"\.(?:`([^`]*)`|([^.`\s]+))")
+
+
+@lru_cache(maxsize=4096)
+def compile_template(text):
+    """
+    "Hi {{4.`1`}}!" -> ("Hi ", ("4", ("1",)), "!"). Literal parts are str, references are
+    (node_id, path) tuples; unsupported expressions (Make functions) stay literal text.
+    """
+    parts, pos = [], 0
+    for match in TEMPLATE_RE.finditer(text):
+        if match.start() > pos:
+            parts.append(text[pos:match.start()])
+        expr = match.group(1)
+        ref = REF_RE.match(expr)
+        if ref:
+            parts.append((ref.group(1), tuple(a or b for a, b in SEGMENT_RE.findall(ref.group(2)))))
+        elif expr.strip() == "now":
+            parts.append(("now", ()))
+        else:
+            parts.append(match.group(0))
+        pos = match.end()
+    if pos < len(text):
+        parts.append(text[pos:])
+    return tuple(parts)
+
+
+class Node:
+    def __init__(self, node_id, module, mapper=None, parameters=None, filter=None):
+        self.id = str(node_id)
+        self.module = module
+        self.mapper = mapper or {}
+        self.parameters = parameters or {}
+        self.filter = filter
+        self.parents = []
+
+
+class Workflow:
+    """
+    Normalized DAG. Accepts the `/plan` format ({"nodes": [...], "edges": [...]}) and
+    Make.com blueprints ({"flow": [...]}, modules run in sequence, BasicRouter routes
+    branch off the router).
+    """
+    def __init__(self, name="workflow"):
+        self.name = name
+        self.nodes = {}
+
+    def add(self, node, parents=()):
+        self.nodes[node.id] = node
+        node.parents = [str(p) for p in parents]
+        return node
+
+    @classmethod
+    def from_blueprint(cls, payload):
+        workflow = cls(payload.get("name", "workflow"))
+        if isinstance(payload.get("flow"), list):
+            workflow._add_flow(payload["flow"], parent=None)
+        elif isinstance(payload.get("nodes"), list):
+            parents = {}
+            for edge in payload.get("edges", []):
+                parents.setdefault(str(edge["to"]), []).append(str(edge["from"]))
+            for n in payload["nodes"]:
+                workflow.add(Node(n["id"], n.get("type") or n.get("module"), n.get("config") or n.get("mapper")),
+                             parents.get(str(n["id"]), []))
+        else:
+            raise ValueError("Blueprint has neither 'flow' nor 'nodes'.")
+        workflow.validate()
+        return workflow
+
+    def _add_flow(self, flow, parent):
+        for module in flow:
+            node = self.add(Node(module["id"], module["module"], module.get("mapper"), module.get("parameters"),
+                                 module.get("filter")), [parent] if parent is not None else [])
+            for route in module.get("routes") or []:
+                self._add_flow(route.get("flow", []), node.id)
+            parent = node.id
+
+    def validate(self):
+        for node in self.nodes.values():
+            missing = [p for p in node.parents if p not in self.nodes]
+            if missing:
+                raise ValueError(f"Node {node.id} depends on unknown node(s) {missing}")
+        self.order()  # Raises on cycles
+
+    def order(self):
+        """Topological order (parents before children)."""
+        ordered, state = [], {}
+
+        def visit(node_id):
+            if state.get(node_id) == "done":
+                return
+            if state.get(node_id) == "visiting":
+                raise ValueError(f"Cycle detected at node {node_id}")
+            state[node_id] = "visiting"
+            for parent in self.nodes[node_id].parents:
+                visit(parent)
+            state[node_id] = "done"
+            ordered.append(self.nodes[node_id])
+
+        for node_id in self.nodes:
+            visit(node_id)
+        return ordered
+
+
+class LazyMapper(Mapping):
+    """Read-only view of a node's mapper; `{{n.field}}` references resolve on first access."""
+    def __init__(self, raw, run, overrides=None):
+        self._raw = raw if isinstance(raw, dict) else {}
+        self._run = run
+        self._overrides = overrides
+        self._cache = {}
+
+    def __getitem__(self, key):
+        if key not in self._cache:
+            self._cache[key] = self._run.resolve(self._raw[key], self._overrides)
+        return self._cache[key]
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __len__(self):
+        return len(self._raw)
+
+    def to_dict(self):
+        return {k: v.to_dict() if isinstance(v, LazyMapper) else v for k, v in self.items()}
+
+
+class RunContext:
+    """State of one execution: node outputs, variables, trigger payload, shared services, owning store."""
+    def __init__(self, workflow, trigger=None, services=None, store_id=None):
+        self.workflow = workflow
+        self.store_id = store_id
+        self.trigger = trigger or {}
+        self.services = services if services is not None else {}
+        self.outputs = {}
+        self.variables = {}
+
+    def lookup(self, node_id, path, overrides=None):
+        if node_id == "now":
+            return datetime.now().isoformat(timespec="seconds")
+        value = (overrides or {}).get(node_id, self.outputs.get(node_id))
+        for key in path:
+            if isinstance(value, Mapping):
+                value = value.get(key)
+            elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+                value = value[int(key)]
+            else:
+                return None
+        return value
+
+    def resolve(self, value, overrides=None):
+        if isinstance(value, str):
+            if "{{" not in value:
+                return value
+            parts = compile_template(value)
+            if len(parts) == 1 and isinstance(parts[0], tuple):
+                return self.lookup(*parts[0], overrides)  # Whole value is one reference: keep its type
+            return "".join(p if isinstance(p, str) else ("" if (v := self.lookup(*p, overrides)) is None else str(v))
+                           for p in parts)
+        if isinstance(value, dict):
+            return LazyMapper(value, self, overrides)
+        if isinstance(value, list):
+            return [self.resolve(v, overrides) for v in value]
+        return value
+
+
+# --- Filters ---
+def _compare(op, a, b):
+    ci = op.endswith(":ci")
+    base = op[:-3] if ci else op
+    if base in ("exist", "notexist"):
+        return (a not in (None, "")) == (base == "exist")
+    kind, _, name = base.partition(":")
+    if kind == "number":
+        try:
+            a, b = float(a), float(b)
+        except (TypeError, ValueError):
+            return False
+    elif kind == "date":
+        a, b = str(a or "")[:19], str(b or "")[:19]  # ISO strings compare chronologically
+    else:
+        a, b = "" if a is None else str(a), "" if b is None else str(b)
+        if ci:
+            a, b = a.lower(), b.lower()
+    checks = {
+        "equal": lambda: a == b, "notequal": lambda: a != b,
+        "contain": lambda: b in a, "notcontain": lambda: b not in a,
+        "startwith": lambda: a.startswith(b), "endwith": lambda: a.endswith(b),
+        "greater": lambda: a > b, "less": lambda: a < b,
+        "greaterorequal": lambda: a >= b, "lessorequal": lambda: a <= b,
+    }
+    if name not in checks:
+        raise ValueError(f"Unsupported filter operator '{op}'")
+    return checks[name]()
+
+
+def filter_passes(filter_spec, run):
+    """Make.com semantics: conditions = [[A, B], [C]] means (A and B) or C."""
+    groups = (filter_spec or {}).get("conditions") or []
+    if not groups:
+        return True
+    return any(all(_compare(c.get("o", "text:equal"), run.resolve(c.get("a")), run.resolve(c.get("b")))
+                   for c in group) for group in groups)
+
+
+# --- Local stub connectors ---
+class LocalSheets:
+    """
+    In-memory stand-in for Google Sheets: (spreadsheetId, sheet) -> list of row dicts keyed
+    "0", "1", ..., held separately per store (`run.store_id`) so tenants never see each
+    other's rows. Bounded: LRU of `max_stores` stores, `max_rows` rows per sheet (oldest
+    dropped first). `data` is the partition of runs without a store (benchmarks, tests).
+    """
+    def __init__(self, data=None, latency=0.0, max_stores=256, max_rows=10000):
+        self.latency = latency
+        self.max_stores = max_stores
+        self.max_rows = max_rows
+        self.writes = 0
+        self._stores = OrderedDict()  # store_id -> {(spreadsheetId, sheet): rows}
+        if data:
+            self._stores[None] = data
+
+    @property
+    def data(self):
+        return self.tables(None)
+
+    def tables(self, store_id):
+        tables = self._stores.get(store_id)
+        if tables is None:
+            tables = self._stores[store_id] = {}
+            while len(self._stores) > self.max_stores:
+                self._stores.popitem(last=False)
+        else:
+            self._stores.move_to_end(store_id)
+        return tables
+
+    @staticmethod
+    def key(config):
+        return (str(config.get("spreadsheetId", "")), str(config.get("sheetId") or config.get("sheet") or ""))
+
+    async def __call__(self, node, config, run):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        action = node.module.split(":", 1)[-1]
+        key = self.key(config)
+        data = self.tables(run.store_id)
+        if action in ("getSheetContent", "google_sheet_read", "filterRows"):
+            rows = data.get(key, [])
+            # Single-bundle model: the first row's cells are addressable directly ({{4.`0`}}).
+            return dict(rows[0] if rows else {}, rows=rows, count=len(rows))
+        self.writes += 1
+        if action == "clearValuesFromRange":
+            data[key] = []
+            return {"cleared": True}
+        if action == "updateMultipleRows":
+            rows = (config.get("rows") or [])[-self.max_rows:]
+            data[key] = [dict(r.to_dict() if isinstance(r, LazyMapper) else r) for r in rows]
+            return {"updated": len(rows)}
+        values = config.get("values")
+        values = values.to_dict() if isinstance(values, LazyMapper) else dict(values or {})
+        rows = data.setdefault(key, [])
+        if action == "updateRow":
+            index = min(max(0, int(config.get("rowNumber") or 1) - 1), self.max_rows - 1)
+            while len(rows) <= index:
+                rows.append({})
+            rows[index].update(values)
+        else:  # addRow and friends
+            rows.append(values)
+            del rows[:-self.max_rows]
+        return {"updated": 1}
+
+
+async def webhook_connector(node, config, run):
+    return dict(run.trigger)
+
+
+async def router_connector(node, config, run):
+    return {}
+
+
+async def aggregator_connector(node, config, run):
+    """Resolves the mapper once per row of the feeder module -> {"array": [...]}."""
+    feeder = str(node.parameters.get("feeder", node.parents[0] if node.parents else ""))
+    source = run.outputs.get(feeder) or {}
+    rows = source.get("rows") if isinstance(source, dict) and "rows" in source else [source]
+    raw = node.mapper if isinstance(node.mapper, dict) else {}
+    array = [LazyMapper(raw, run, {feeder: row}).to_dict() if raw else row for row in rows]
+    return {"array": array}
+
+
+async def set_variable_connector(node, config, run):
+    run.variables[config.get("name")] = config.get("value")
+    return {config.get("name"): config.get("value")}
+
+
+async def get_variable_connector(node, config, run):
+    name = config.get("name")
+    return {name: run.variables.get(name)}
+
+
+async def doc_write_connector(node, config, run):
+    docs = run.services.setdefault("docs", {})
+    text = config.get("template") or config.get("text") or ""
+    docs.setdefault(config.get("docId", "doc"), []).append(text)
+    return {"written": len(text)}
+
+
+class StubConnector:
+    """Records the call and returns a placeholder; used for modules without a local implementation."""
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    async def __call__(self, node, config, run):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.calls += 1
+        return {"status": "stubbed", "module": node.module, "result": "", "data": "", "array": []}
+
+
+class WorkflowEngine:
+    """
+    Async DAG executor. Every node waits only for its own parents, so independent
+    branches run concurrently. Connectors are looked up by exact module name, then
+    by app prefix ("google-sheets:"), then fall back to `default`.
+
+    A connector is `async fn(node, config, run) -> dict`; `config` is a LazyMapper over
+    the node's mapper, so references are resolved only for the fields it reads.
+    """
+    def __init__(self, connectors=None, default=None, sheets=None):
+        self.sheets = sheets or LocalSheets()
+        self.connectors = {
+            "gateway:CustomWebHook": webhook_connector,
+            "builtin:BasicRouter": router_connector,
+            "builtin:BasicAggregator": aggregator_connector,
+            "util:SetVariable2": set_variable_connector,
+            "util:GetVariable2": get_variable_connector,
+            "google-sheets:": self.sheets,
+            "google_sheet_read": self.sheets,
+            "google_doc_write": doc_write_connector,
+        }
+        self.connectors.update(connectors or {})
+        self.default = default or StubConnector()
+        self._compiled = OrderedDict()
+        self.max_compiled = 256
+
+    def register(self, module_or_prefix, connector):
+        self.connectors[module_or_prefix] = connector
+
+    def connector_for(self, module):
+        if module in self.connectors:
+            return self.connectors[module]
+        prefix = module.split(":", 1)[0] + ":"
+        return self.connectors.get(prefix, self.default)
+
+    def compile(self, payload, key=None):
+        """Workflow for a blueprint; cached when a key (e.g. the stored content hash) is given."""
+        if key is None:
+            return Workflow.from_blueprint(payload)
+        workflow = self._compiled.get(key)
+        if workflow is None:
+            workflow = self._compiled[key] = Workflow.from_blueprint(payload)
+            while len(self._compiled) > self.max_compiled:
+                self._compiled.popitem(last=False)
+        else:
+            self._compiled.move_to_end(key)
+        return workflow
+
+    async def run(self, workflow, trigger=None, services=None, store_id=None):
+        """Executes one run; `store_id` scopes tenant-held state such as LocalSheets rows."""
+        if not isinstance(workflow, Workflow):
+            workflow = self.compile(workflow)
+        run = RunContext(workflow, trigger, services, store_id)
+        report = {}
+        tasks = {}
+        start = time.perf_counter()
+
+        async def execute(node):
+            parent_states = [await tasks[p] for p in node.parents]
+            info = {"module": node.module, "ms": 0.0}
+            report[node.id] = info
+            if any(state != "ok" for state in parent_states):
+                info["status"] = "skipped"
+                return "skipped"
+            t0 = time.perf_counter()
+            try:
+                if node.filter and not filter_passes(node.filter, run):
+                    info["status"] = "filtered"
+                    return "filtered"
+                config = run.resolve(node.mapper) if isinstance(node.mapper, dict) else LazyMapper({}, run)
+                run.outputs[node.id] = await self.connector_for(node.module)(node, config, run)
+                info["status"] = "ok"
+                return "ok"
+            except Exception as e:
+                info["status"] = "error"
+                info["error"] = f"{type(e).__name__}: {e}"
+                return "error"
+            finally:
+                info["ms"] = round((time.perf_counter() - t0) * 1000, 3)
+
+        for node in workflow.order():
+            tasks[node.id] = asyncio.ensure_future(execute(node))
+        await asyncio.gather(*tasks.values())
+
+        failed = [nid for nid, info in report.items() if info["status"] == "error"]
+        return {
+            "workflow": workflow.name,
+            "status": "error" if failed else "success",
+            "ms": round((time.perf_counter() - start) * 1000, 3),
+            "nodes": {nid: report[nid] for nid in tasks},
+            "outputs": run.outputs,
+        }
+
+    async def run_many(self, jobs, concurrency=256):
+        """jobs: iterable of (workflow, trigger). Runs up to `concurrency` executions at once."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(workflow, trigger):
+            async with semaphore:
+                return await self.run(workflow, trigger)
+
+        return await asyncio.gather(*(one(w, t) for w, t in jobs))
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+
+from src.core.metrics import log_status
+
+try:
+    import zstandard
+except ImportError:  # zlib fallback keeps the store dependency-free
+    zstandard = None
+
+
+class WorkflowCodec:
+    """Compresses canonical blueprint JSON with zstd when available, zlib otherwise."""
+    def __init__(self, level=None):
+        if zstandard is not None:
+            self.name = "zstd"
+            self._compressor = zstandard.ZstdCompressor(level=level or 10)
+        else:
+            self.name = "zlib"
+            self.level = level or 6
+
+    def compress(self, data):
+        if self.name == "zstd":
+            return self._compressor.compress(data)
+        return zlib.compress(data, self.level)
+
+    @staticmethod
+    def decompress(codec, data):
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("Workflow was stored with zstd; install `zstandard` to read it.")
+            return zstandard.ZstdDecompressor().decompress(data)
+        if codec == "zlib":
+            return zlib.decompress(data)
+        return data  # "raw"
+
+
+def canonical_json(payload):
+    """Stable bytes for hashing: sorted keys, no whitespace, UTF-8 (Vietnamese kept as-is)."""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def count_nodes(payload):
+    if isinstance(payload, dict):
+        if isinstance(payload.get("flow"), list):
+            return len(payload["flow"])
+        if isinstance(payload.get("nodes"), list):
+            return len(payload["nodes"])
+    return 0
+
+
+class WorkflowStore:
+    """
+    Workflow persistence.
+
+    - Each blueprint is stored once, compressed, in `workflow_blobs` keyed by the
+      SHA-256 of its canonical JSON; `workflows` rows only reference the hash, so
+      re-saving an identical blueprint costs one small row.
+    - `workflows` also carries size/node_count, so listing never touches the blobs.
+    - The human-readable `.json` export is written by a background thread
+      (write-behind queue); `flush()` waits for pending exports.
+    """
+    def __init__(self, db_path, export_dir, codec=None):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.export_dir = os.path.abspath(export_dir)
+        os.makedirs(self.export_dir, exist_ok=True)
+        self.codec = codec or WorkflowCodec()
+        self._lock = threading.Lock()
+        self._exports = queue.Queue()
+        self.stats = {"saved": 0, "deduplicated": 0, "exported": 0, "export_errors": 0}
+        threading.Thread(target=self._export_worker, daemon=True, name="workflow-export").start()
+
+    # --- Writes ---
+    def save(self, store_id, name, payload, filename=None, status="draft"):
+        """
+        Stores the blueprint and queues its file export (`filename` may contain "{id}").
+        Returns {"id", "hash", "file_path", "deduplicated"}.
+        """
+        raw = canonical_json(payload)
+        digest = hashlib.sha256(raw).hexdigest()
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            with self.conn:
+                exists = self.conn.execute("SELECT 1 FROM workflow_blobs WHERE hash = ?", (digest,)).fetchone()
+                if not exists:
+                    self.conn.execute("INSERT INTO workflow_blobs (hash, codec, raw_size, data) VALUES (?, ?, ?, ?)",
+                                      (digest, self.codec.name, len(raw), self.codec.compress(raw)))
+                wf_id = self.conn.execute('''INSERT INTO workflows (store_id, name, status, created_at, blob_hash,
+                                             size, node_count) VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                                          (store_id, name, status, now, digest, len(raw),
+                                           count_nodes(payload))).lastrowid
+            self.stats["saved"] += 1
+            self.stats["deduplicated"] += bool(exists)
+
+        path = os.path.join(self.export_dir, (filename or "WF_{id}.json").replace("{id}", str(wf_id)))
+        self._exports.put((path, payload))
+        return {"id": wf_id, "hash": digest, "file_path": path, "deduplicated": bool(exists)}
+
+    def _export_worker(self):
+        while True:
+            path, payload = self._exports.get()
+            try:
+                tmp = f"{path}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(payload, f, indent=4, ensure_ascii=False)
+                os.replace(tmp, path)  # Readers never see a half-written file
+                self.stats["exported"] += 1
+            except Exception as e:
+                self.stats["export_errors"] += 1
+                log_status(f"⚠️ [Workflows] Export failed for {path}: {e}")
+            finally:
+                self._exports.task_done()
+
+    def flush(self):
+        """Blocks until every queued export has been written."""
+        self._exports.join()
+
+    # --- Reads ---
+    def list(self, store_id, limit=50):
+        """Metadata only (no blob access)."""
+        with self._lock:
+            rows = self.conn.execute('''SELECT id, name, status, created_at, size, node_count, blob_hash FROM workflows
+                                        WHERE store_id = ? ORDER BY id DESC LIMIT ?''', (store_id, limit)).fetchall()
+        return [{"id": r[0], "name": r[1], "status": r[2], "created_at": r[3], "size": r[4], "node_count": r[5],
+                 "hash": r[6]} for r in rows]
+
+    def get_compressed(self, wf_id, store_id=None):
+        """(codec, bytes) exactly as stored, for clients that can decompress themselves."""
+        scope, params = (" AND w.store_id = ?", (wf_id, store_id)) if store_id is not None else ("", (wf_id,))
+        with self._lock:
+            row = self.conn.execute(f'''SELECT b.codec, b.data, w.json_structure FROM workflows w
+                                        LEFT JOIN workflow_blobs b ON b.hash = w.blob_hash
+                                        WHERE w.id = ?{scope}''', params).fetchone()
+        if row is None:
+            return None
+        if row[0] is None:  # Saved before compressed storage existed
+            return "raw", (row[2] or "null").encode("utf-8")
+        return row[0], row[1]
+
+    def get(self, wf_id, store_id=None):
+        """Decoded blueprint, or None."""
+        stored = self.get_compressed(wf_id, store_id)
+        if stored is None:
+            return None
+        return json.loads(WorkflowCodec.decompress(*stored))
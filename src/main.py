@@ -9,14 +9,19 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(current_dir)
 if project_root not in sys.path: sys.path.insert(0, project_root)
 
+from src.core import metrics
+from src.core.config import get_config
+from src.core.metrics import log_status
 from src.core.engine import ModelEngine
 from src.core.memory import MemoryManager
 from src.core.context import ContextResolver
 from src.core.saas_api import SaasAPI
-from src.core.tools import RetailTools
+from src.core.tool_calling import retail_registry
+from src.core.fast_path import FastPathResponder
 from src.core.integrations import IntegrationManager
 from src.agents.manager import ManagerAgent
 from src.agents.coder import CoderAgent
+from src.agents.designer import AutomationDesigner
 from src.agents.researcher import ResearcherAgent
 from src.agents.vision import VisionAgent
 
@@ -35,20 +40,33 @@ def extract_image_path(text):
     return None
 
 def main():
+    metrics.configure(**get_config().observability)
     print("--- ProjectA: Phase 24 (Visible Storage) ---")
     
-    try: engine = ModelEngine()
-    except: pass 
+    try:
+        engine = ModelEngine()
+    except Exception as e:
+        # Without an engine every agent would fail on first use; stop here with a hint instead.
+        log_status(f"❌ Model engine failed to start ({get_config().llm_backend} backend): {e}")
+        log_status("   No GPU? Use LLM_BACKEND=cpu (smaller model) or LLM_BACKEND=fake (scripted answers).")
+        return
 
     memory = MemoryManager()
     resolver = ContextResolver(memory)
     saas = SaasAPI()
+    tool_settings = dict(memory.config.tools)
+    tools_enabled, max_tool_rounds = tool_settings.pop("enabled"), tool_settings.pop("max_rounds")
+    tools = retail_registry(saas, **tool_settings)
+    fast_path = FastPathResponder(saas, max_words=memory.config.fast_path["max_words"]) \
+        if memory.config.fast_path["enabled"] else None
     integrations = IntegrationManager(memory)
     
     manager = ManagerAgent(engine, memory)
     coder = CoderAgent(engine, memory)
     researcher = ResearcherAgent(engine)
-    vision = VisionAgent()
+    designer = AutomationDesigner(manager, coder, max_steps=memory.config.automation["max_plan_steps"],
+                                  pipelined=memory.config.automation["pipelined"])
+    vision = VisionAgent() if memory.config.vision["enabled"] else None
 
     # LOGIN
     CURRENT_USER_ID = 1 
@@ -75,13 +93,15 @@ def main():
             image_path = extract_image_path(user_input)
             vision_context = ""
             if image_path:
-                print(f"👁️ Detected Image: {image_path}")
-                if os.path.exists(image_path):
-                    print("    [Vision] Analyzing...")
+                log_status(f"👁️ Detected Image: {image_path}")
+                if vision is None:
+                    log_status("⚠️ Vision is off for this hardware profile (set ENABLE_VISION=1 to load Florence)")
+                elif os.path.exists(image_path):
+                    log_status("    [Vision] Analyzing...")
                     vision_result = vision.analyze_image(image_path, task_hint=user_input)
                     vision_context = f"\n[USER IMAGE DATA]:\n{vision_result}\n"
                 else:
-                    print(f"❌ File not found: {image_path}")
+                    log_status(f"❌ File not found: {image_path}")
 
             full_context_input = user_input + vision_context
 
@@ -89,17 +109,22 @@ def main():
             memory.add_message("user", user_input)
             history_str = memory.get_context_string(limit=6)
 
+            # 1b. Simple metric questions: answered from the data, no LLM
+            store_id = resolver.active_store['id'] if resolver.active_store else None
+            fast = fast_path.answer(user_input, store_id) if fast_path and not image_path else None
+            if fast is not None:
+                print("\n" + fast["text"])
+                memory.add_message("assistant", fast["text"])
+                continue
+
             # 2. ANALYZE
             meta = manager.analyze_task(full_context_input, history_str)
             category = meta.get("category", "GENERAL")
             
             if category == "TECHNICAL":
                 print(f"\n🤖 Đã nhận yêu cầu. Hệ thống đang thiết kế quy trình...")
-                print("    [Architect] Designing Logic...")
-                plan = manager.plan(full_context_input, history_str)
-                
-                print("    [Builder] Configuring Nodes...")
-                raw_code = coder.write_code(full_context_input, plan)
+                log_status("    [Architect → Builder] Designing Logic & Configuring Nodes...")
+                plan, raw_code = designer.design(full_context_input, history_str)
                 code = clean_output(raw_code)
                 
                 print("\n" + "-"*40)
@@ -120,21 +145,31 @@ def main():
                         print(f"👉 You can download this file from the 'my_workflows' folder.")
 
             elif category == "MARKETING":
-                print("    [Creative] Drafting...")
+                log_status("    [Creative] Drafting...")
                 content = manager.write_marketing(full_context_input)
                 print("\n" + "="*40)
                 print(clean_output(content))
 
+            elif tools_enabled and category in ("DATA_INTERNAL", "GENERAL"):
+                log_status("    (Đang tra cứu...)")
+                store_id = resolver.active_store['id'] if resolver.active_store else None
+                final, info = manager.answer_with_tools(full_context_input, tools, store_id, history_str,
+                                                        max_rounds=max_tool_rounds)
+                if info["tool_calls"]:
+                    log_status(f"    [Tools] {', '.join(c['name'] for c in info['tool_calls'])} "
+                               f"({info['llm_round_trips']} LLM calls)")
+                print("\n" + clean_output(final))
+
             elif category == "DATA_INTERNAL":
                 store_id = resolver.active_store['id']
                 val = saas.get_sales_report(store_id, "today")
                 res = f"Revenue: {val['revenue']}"
-                print("    (Đang trả lời...)")
+                log_status("    (Đang trả lời...)")
                 final = manager.consult(full_context_input, res, history_str)
                 print("\n" + clean_output(final))
 
             else: 
-                print("    (Đang suy nghĩ...)")
+                log_status("    (Đang suy nghĩ...)")
                 final = manager.consult(full_context_input, "", history_str)
                 print("\n" + clean_output(final))
             
@@ -142,7 +177,7 @@ def main():
             torch.cuda.empty_cache()
 
         except KeyboardInterrupt: break
-        except Exception as e: print(f"❌ Error: {e}")
+        except Exception as e: log_status(f"❌ Error: {e}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
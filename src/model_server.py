@@ -0,0 +1,199 @@
+"""
+Model server: the one process that loads the models (LLM, vision, embedder,
+reranker) and serves them to API workers over a Unix socket.
+
+    MODEL_SERVER_SOCKET=/tmp/project_a_models.sock python src/model_server.py
+    MODEL_SERVER_SOCKET=/tmp/project_a_models.sock API_WORKERS=4 python src/server.py
+
+Requests are length-prefixed JSON frames ({"method", "params"} → {"result"} or
+{"error"}), one thread per worker connection. generate is serialized per shared
+model by the engine lock, exactly as in-process. The socket is created 0600, so
+workers must run as the same user as the model server.
+"""
+import os
+import socketserver
+import sys
+import threading
+from collections import OrderedDict
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+import torch
+from transformers import StoppingCriteriaList
+
+from src.core import metrics
+from src.core.config import get_config
+from src.core.engine import ModelEngine
+from src.core.metrics import log_status
+from src.core.plan_cache import make_embedder
+from src.core.remote_engine import send_message, recv_message
+
+
+class ModelServer:
+    def __init__(self, engine, vision_service=None, max_caches=64):
+        self.engine = engine
+        self.vision_service = vision_service
+        self.max_caches = max_caches
+        self._caches = OrderedDict()   # cache_id -> KV cache of a multi-turn generation (LRU)
+        self._embedders = {}
+        self._reranker = None
+        self._lock = threading.Lock()
+        self.handlers = {
+            "info": self.info, "encode": self.encode, "decode": self.decode, "chat_template": self.chat_template,
+            "generate": self.generate, "cache_crop": self.cache_crop, "cache_release": self.cache_release,
+            "embedder": self.embedder,
+            "embed": self.embed, "rerank": self.rerank, "vision": self.vision,
+        }
+
+    def _tokenizer(self, role):
+        return self.engine.load_model(role)["tokenizer"]
+
+    def info(self):
+        roles = {}
+        for role in self.engine.loaded_models:
+            tok = self._tokenizer(role)
+            roles[role] = {"model": self.engine.config.models[role],
+                           "kv_cache": self.engine.load_model(role)["new_cache"] is not None,
+                           "eos_token_id": tok.eos_token_id,
+                           "eos_token": tok.eos_token, "pad_token": tok.pad_token,
+                           "all_special_ids": list(tok.all_special_ids),
+                           # Where workers can load the same tokenizer locally (None: only this process has it)
+                           "tokenizer": getattr(tok, "name_or_path", None)}
+        vision = self.vision_service.agent.settings if self.vision_service is not None else None
+        return {"backend": self.engine.config.llm_backend, "roles": roles, "vision": vision}
+
+    def encode(self, role, text, add_special_tokens=False):
+        return self._tokenizer(role).encode(text, add_special_tokens=add_special_tokens)
+
+    def decode(self, role, ids, skip_special_tokens=False):
+        return self._tokenizer(role).decode(ids, skip_special_tokens=skip_special_tokens)
+
+    def chat_template(self, role, messages, tokenize=False, add_generation_prompt=False):
+        return self._tokenizer(role).apply_chat_template(messages, tokenize=tokenize,
+                                                         add_generation_prompt=add_generation_prompt)
+
+    def _cache(self, role, cache_id):
+        with self._lock:
+            cache = self._caches.get(cache_id)
+            if cache is None:
+                cache = self._caches[cache_id] = self.engine.new_cache(role)
+                while len(self._caches) > self.max_caches:
+                    self._caches.popitem(last=False)
+            self._caches.move_to_end(cache_id)
+            return cache
+
+    def _stopping(self, role, specs):
+        from src.agents.designer import StepLimit
+        known = {"step_limit": StepLimit}
+        criteria = [known[spec.pop("type")](self._tokenizer(role), **spec) for spec in specs]
+        return StoppingCriteriaList(criteria) if criteria else None
+
+    def generate(self, role, input_ids, attention_mask=None, cache_id=None, stopping=(), kwargs=None):
+        asset = self.engine.load_model(role)
+        kwargs = dict(kwargs or {})
+        if attention_mask is not None:  # Left-padded batch: no cache, all rows returned
+            ids = torch.tensor(input_ids, dtype=torch.long).to(asset["model"].device)
+            mask = torch.tensor(attention_mask, dtype=torch.long).to(asset["model"].device)
+            with asset["lock"]:
+                outputs = asset["model"].generate(input_ids=ids, attention_mask=mask, **kwargs)
+            return {"sequences": outputs.tolist(), "cache_length": 0}
+        ids = torch.tensor([input_ids], dtype=torch.long).to(asset["model"].device)
+        cache = self._cache(role, cache_id) if cache_id else None
+        if cache is not None:
+            kwargs["past_key_values"] = cache
+        criteria = self._stopping(role, list(stopping))
+        if criteria is not None:
+            kwargs["stopping_criteria"] = criteria
+        with asset["lock"]:
+            outputs = asset["model"].generate(input_ids=ids, attention_mask=torch.ones_like(ids),
+                                              return_dict_in_generate=True, **kwargs)
+        return {"sequences": outputs.sequences[0].tolist(),
+                "cache_length": cache.get_seq_length() if cache is not None else 0}
+
+    def cache_crop(self, cache_id, max_length):
+        with self._lock:
+            cache = self._caches.get(cache_id)
+        if cache is None:  # Evicted: the next generate simply prefills everything again
+            return 0
+        cache.crop(max_length)
+        return cache.get_seq_length()
+
+    def cache_release(self, cache_id):
+        with self._lock:
+            return self._caches.pop(cache_id, None) is not None
+
+    def _embedder(self, kind):
+        with self._lock:
+            if kind not in self._embedders:
+                self._embedders[kind] = make_embedder(kind)
+            return self._embedders[kind]
+
+    def embedder(self, kind="auto"):
+        embedder = self._embedder(kind)
+        return {"name": embedder.name, "threshold": embedder.threshold}
+
+    def embed(self, texts, kind="auto"):
+        return self._embedder(kind).encode(texts).tolist()
+
+    def rerank(self, query, documents):
+        with self._lock:
+            if self._reranker is None:
+                from sentence_transformers import CrossEncoder
+                self._reranker = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2', device='cpu')
+        return [float(s) for s in self._reranker.predict([[query, doc] for doc in documents])]
+
+    def vision(self, path, task_hint="OCR", mode="quality", digest=None):
+        if self.vision_service is None:
+            raise RuntimeError("vision is not loaded on the model server (hardware profile, or ENABLE_VISION=0)")
+        return self.vision_service.analyze(path, task_hint=task_hint, mode=mode, digest=digest)
+
+    def handle(self, request):
+        try:
+            return {"result": self.handlers[request["method"]](**request.get("params", {}))}
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+
+    def serve(self, socket_path):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = self
+
+        class Connection(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    request = recv_message(self.request)
+                    if request is None:
+                        return
+                    send_message(self.request, server.handle(request))
+
+        class UnixServer(socketserver.ThreadingUnixStreamServer):
+            daemon_threads = True
+
+        # Created owner-only (0600): anyone who can connect can run the models and read cached KV state
+        umask = os.umask(0o177)
+        try:
+            listener = UnixServer(socket_path, Connection)
+        finally:
+            os.umask(umask)
+        with listener:
+            log_status(f"🧠 Model server listening on {socket_path}")
+            listener.serve_forever()
+
+
+def main():
+    config = get_config()
+    metrics.configure(**config.observability)
+    socket_path = config.model_server["socket"] or "/tmp/project_a_models.sock"
+    engine = ModelEngine()
+    vision_service = None
+    if config.vision["enabled"]:
+        from src.agents.vision import VisionAgent
+        from src.core.vision_service import VisionService
+        vision_service = VisionService(VisionAgent())
+    ModelServer(engine, vision_service, max_caches=config.model_server["max_caches"]).serve(socket_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 import sys
 import os
 import re
+import json
+import time
+import asyncio
 import torch
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Header
+from fastapi import FastAPI, Form, HTTPException, Header, Response, Body, Request
 from pydantic import BaseModel
 from typing import Optional
 
@@ -12,62 +15,151 @@ project_root = os.path.dirname(current_dir)
 if project_root not in sys.path: sys.path.insert(0, project_root)
 
 # Import Core Systems
+from src.core import metrics
+from src.core.config import get_config
 from src.core.engine import ModelEngine
+from src.core.remote_engine import RemoteEngine, RemoteEmbedder, RemoteVision
 from src.core.memory import MemoryManager
-from src.core.context import ContextResolver
+from src.core.context import ContextResolver, StoreContextCache
 from src.core.saas_api import SaasAPI
 from src.core.integrations import IntegrationManager
+from src.core.vision_service import VisionService
+from src.core.upload_spool import UploadSpool, UploadError, MultipartFileStream, MULTIPART_OVERHEAD
+from src.core.scheduler import HealthScheduler
+from src.core.retention import HistoryRetention
+from src.core.seasonality import SeasonalityIndex
+from src.core.workflow_store import WorkflowCodec
+from src.core.workflow_engine import WorkflowEngine
+from src.core.plan_cache import PlanCache
+from src.core.plan_graph import plan_to_graph
+from src.core.tool_calling import retail_registry
+from src.core.fast_path import FastPathResponder
 from src.agents.manager import ManagerAgent
 from src.agents.coder import CoderAgent
+from src.agents.designer import AutomationDesigner
 from src.agents.researcher import ResearcherAgent
 from src.agents.vision import VisionAgent
 
 # --- INITIALIZATION (Load Models Once) ---
-print("🚀 Starting Project A Server...")
+# Metrics/tracing and the log format are set up first so model loading is logged too
+metrics.configure(**get_config().observability)
+metrics.log_status("🚀 Starting Project A Server...")
+# With MODEL_SERVER_SOCKET set, the models live in src/model_server.py and this process stays light,
+# so uvicorn can run several workers; otherwise this process loads them itself.
+MODEL_SERVER_SOCKET = get_config().model_server["socket"]
 try:
-    engine = ModelEngine() # Loads Qwen-14B (Heavy)
+    if MODEL_SERVER_SOCKET:
+        engine = RemoteEngine(MODEL_SERVER_SOCKET, timeout=get_config().model_server["timeout_seconds"])
+    else:
+        engine = ModelEngine() # Loads Qwen-14B (Heavy)
 except Exception as e:
-    print(f"CRITICAL ERROR: {e}")
+    metrics.log_status(f"CRITICAL ERROR: {e}")
     engine = None
 
 memory = MemoryManager()
 resolver = ContextResolver(memory)
+# Resolved store contexts per (user_id, store_id); invalidated on DB writes
+store_contexts = StoreContextCache(memory, **memory.config.context_cache)
 saas = SaasAPI()
+tool_settings = dict(memory.config.tools)
+tools_enabled, max_tool_rounds = tool_settings.pop("enabled"), tool_settings.pop("max_rounds")
+tools = retail_registry(saas, **tool_settings)
+# Simple metric questions ("Hôm nay doanh thu bao nhiêu?") are answered from templates, without the LLM
+fast_path = FastPathResponder(saas, max_words=memory.config.fast_path["max_words"]) \
+    if memory.config.fast_path["enabled"] else None
+health = HealthScheduler(memory, **memory.config.health)
+retention_settings = dict(memory.config.retention)
+retention = HistoryRetention(memory.db_path, retention_settings.pop("archive_dir"), **retention_settings)
+# Lunar-aligned sales comparisons (Tết to Tết) and holiday baselines, held in NumPy
+seasonality = SeasonalityIndex(memory.db_path)
 integrations = IntegrationManager(memory)
+# Executes saved blueprints; external apps are served by local stub connectors for now
+workflow_engine = WorkflowEngine()
+plan_cache_settings = dict(memory.config.plan_cache)
+if isinstance(engine, RemoteEngine) and plan_cache_settings["embedder"] != "hashing":
+    plan_cache_settings["embedder"] = RemoteEmbedder(engine.client, plan_cache_settings["embedder"])
+plan_cache = PlanCache(memory.db_path, **plan_cache_settings)
+metrics.registry.gauge("project_a_plan_cache_hit_ratio", "Share of /plan requests served from the plan cache.",
+                       fn=lambda: plan_cache.stats()["hit_rate"])
+metrics.registry.gauge("project_a_store_context_hit_ratio", "Share of store context lookups served from cache.",
+                       fn=lambda: round(store_contexts.hits / max(1, store_contexts.hits + store_contexts.misses), 4))
 
 # Initialize Agents
 manager = ManagerAgent(engine, memory)
 coder = CoderAgent(engine, memory)
 researcher = ResearcherAgent(engine)
-
-# Vision is OFF by default to avoid slow/fragile loads. Opt-in with ENABLE_VISION=1.
-ENABLE_VISION = os.environ.get("ENABLE_VISION", "0") in ["1", "true", "True"]
-if not ENABLE_VISION:
-    print("⚠️ Vision disabled by default (set ENABLE_VISION=1 to load Florence)")
+designer = AutomationDesigner(manager, coder, max_steps=memory.config.automation["max_plan_steps"],
+                              pipelined=memory.config.automation["pipelined"])
+
+# Vision loads only where the hardware profile leaves GPU room for it; ENABLE_VISION=0/1 overrides.
+ENABLE_VISION = memory.config.vision["enabled"]
+if isinstance(engine, RemoteEngine):
+    # Loaded (or not) by the model server, which batches and caches for all workers
+    vision_enabled = engine.info["vision"] is not None
+    vision = vision_service = RemoteVision(engine.client, engine.info["vision"]) if vision_enabled else None
+elif not ENABLE_VISION:
+    metrics.log_status("⚠️ Vision disabled for this hardware profile (set ENABLE_VISION=1 to load Florence)")
     vision = None
+    vision_service = None
     vision_enabled = False
 else:
     try:
         # Vision model is heavy; make it optional
         vision = VisionAgent()
+        # Hash cache + micro-batching in front of the model for concurrent uploads
+        vision_service = VisionService(vision)
         vision_enabled = True
     except Exception as e:
-        print(f"⚠️ Vision init failed, disabling vision: {e}")
+        metrics.log_status(f"⚠️ Vision init failed, disabling vision: {e}")
         vision = None
+        vision_service = None
         vision_enabled = False
 
+upload_settings = memory.config.uploads
+spool = UploadSpool(
+    memory.config.SPOOL_DIR,
+    max_bytes=upload_settings["max_bytes"],
+    chunk_size=upload_settings["chunk_size"],
+    max_concurrent=upload_settings["max_concurrent"],
+    ttl_seconds=upload_settings["ttl_seconds"],
+    max_total_bytes=upload_settings["max_total_bytes"],
+)
+
 # Shared key to protect /plan endpoint (set AI_SHARED_KEY env in Colab)
 AI_SHARED_KEY = os.environ.get("AI_SHARED_KEY", "")
 
 app = FastAPI(title="Project A API", version="1.0.0")
 
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """One trace per request (id returned in X-Trace-Id) plus request count/latency per route."""
+    if not metrics.registry.enabled:
+        return await call_next(request)
+    start = time.perf_counter()
+    with metrics.trace(request.url.path, request.headers.get("x-trace-id", "")[:64] or None) as current:
+        response = await call_next(request)
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        current.name = f"{request.method} {route}"
+    metrics.REQUESTS.inc(path=route, status=response.status_code)
+    metrics.REQUEST_SECONDS.observe(time.perf_counter() - start, path=route)
+    response.headers["X-Trace-Id"] = current.id
+    return response
+
+
+@app.on_event("startup")
+async def start_background_jobs():
+    asyncio.create_task(spool.run_gc(upload_settings["gc_interval_seconds"]))
+    asyncio.create_task(health.run_forever())
+    asyncio.create_task(retention.run_forever())
+
+
 @app.get("/")
 def root():
     return {
         "status": "online",
         "message": "Project A API",
-        "endpoints": ["/health", "/chat", "/plan", "/upload_image"],
+        "endpoints": ["/health", "/chat", "/plan", "/upload_image", "/alerts", "/seasonality", "/workflows", "/metrics"],
         "vision_enabled": vision_enabled,
     }
 
@@ -90,6 +182,8 @@ class PlanResponse(BaseModel):
     nodes: list
     edges: list
     notes: Optional[str] = None
+    cached: bool = False
+    similarity: Optional[float] = None
 
 # --- ENDPOINTS ---
 
@@ -98,9 +192,29 @@ def health_check():
     return {"status": "online", "gpu": torch.cuda.get_device_name(0) if torch.cuda.is_available() else "cpu"}
 
 
+@app.get("/metrics")
+def metrics_endpoint():
+    """Prometheus text exposition of request, stage, LLM and cache metrics."""
+    if not metrics.registry.enabled:
+        raise HTTPException(status_code=404, detail="metrics disabled (METRICS_ENABLED=0)")
+    return Response(content=metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/traces/{trace_id}")
+def get_trace(trace_id: str):
+    """Stage breakdown of a recent request (id from its X-Trace-Id response header)."""
+    trace = metrics.traces.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="trace not found (unknown or evicted)")
+    return trace
+
+
 @app.post("/plan", response_model=PlanResponse)
 async def plan_endpoint(req: PlanRequest, x_ai_key: Optional[str] = Header(default=None)):
-    """Generate a simple workflow plan from natural language.
+    """Generate a workflow plan (nodes/edges) from natural language.
+
+    Prompts similar to an earlier one (same context) are answered from the plan
+    cache; otherwise the manager plans and `plan_to_graph` converts its answer.
 
     Security: requires header X-AI-Key matching AI_SHARED_KEY env.
     """
@@ -111,34 +225,58 @@ async def plan_endpoint(req: PlanRequest, x_ai_key: Optional[str] = Header(defau
     if not prompt:
         raise HTTPException(status_code=400, detail="prompt required")
 
-    # Minimal deterministic demo plan; swap in agent logic as needed
-    nodes = [
-        {"id": "n1", "type": "google_sheet_read", "config": {"sheetId": "SHEET_ID", "range": "A1:C10"}},
-        {"id": "n2", "type": "google_doc_write", "config": {"docId": "DOC_ID", "template": "Summary: {{n1.data}}"}},
-    ]
-    edges = [{"from": "n1", "to": "n2"}]
-    notes = "demo plan from prompt: " + prompt
+    start = time.perf_counter()
+    hit, vector = await asyncio.to_thread(plan_cache.match, prompt, req.context)
+    if hit:
+        plan_cache.record(True, (time.perf_counter() - start) * 1000)
+        return {**hit["plan"], "cached": True, "similarity": hit["similarity"]}
 
-    return {"nodes": nodes, "edges": edges, "notes": notes}
+    db_context = json.dumps(req.context, ensure_ascii=False) if req.context else None
+    text = await asyncio.to_thread(manager.plan, prompt, "", db_context)
+    try:
+        nodes, edges = plan_to_graph(text)
+    except ValueError:
+        raise HTTPException(status_code=502, detail="planner returned no usable steps")
+    plan = {"nodes": nodes, "edges": edges, "notes": text.strip()}
+    plan_cache.put(prompt, plan, req.context, vector)
+    plan_cache.record(False, (time.perf_counter() - start) * 1000)
+    return plan
+
+
+@app.get("/plan/stats")
+def plan_stats(x_ai_key: Optional[str] = Header(default=None)):
+    """Plan cache hit rate and p50 latency of cache hits vs LLM generation."""
+    if AI_SHARED_KEY and x_ai_key != AI_SHARED_KEY:
+        raise HTTPException(status_code=401, detail="unauthorized")
+    return plan_cache.stats()
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(req: ChatRequest):
+def chat_endpoint(req: ChatRequest):
     """
-    Main conversation endpoint.
+    Main conversation endpoint. A plain `def`: FastAPI runs it in its thread pool, so the
+    blocking agent and database calls never stall the event loop (health checks, retention).
     """
-    print(f"📩 Request from User {req.user_id}: {req.message}")
+    metrics.log_status(f"📩 Request from User {req.user_id}: {req.message}", user_id=req.user_id,
+                       store_id=req.store_id)
     
-    # 1. Context Setup
+    # 1. Context Setup (per request; never stored on the shared agents)
     # In a real app, you might validate the token here
-    if req.store_id:
-        # Fetch store details directly
-        # For prototype, we simulate the resolver logic manually or assume store_id is valid
-        # Let's simple set db context for now
-        manager.db_context = f"Store ID: {req.store_id} (Context Loaded)"
-    
+    ctx = store_contexts.get(req.user_id, req.store_id)
+    if ctx is None:
+        raise HTTPException(status_code=404, detail="store not found for this user")
+
     # 2. History
-    memory.add_message("user", req.message)
-    history_str = memory.get_context_string(limit=6)
+    memory.add_message("user", req.message, req.user_id, ctx.store_id)
+    history_str = memory.get_context_string(limit=6, user_id=req.user_id, store_id=ctx.store_id)
+
+    started = time.perf_counter()
+    if fast_path is not None:
+        fast = fast_path.answer(req.message, ctx.store_id, ctx.store["name"] if ctx.store else None)
+        if fast is not None:
+            fast_path.record(True, (time.perf_counter() - started) * 1000)
+            memory.add_message("assistant", fast["text"], req.user_id, ctx.store_id)
+            return {"response": fast["text"], "action_taken": "fast_path",
+                    "data": {"intent": fast["intent"], **fast["data"]}}
 
     # 3. Analyze (reuse main.py categories)
     analysis = manager.analyze_task(req.message, history_str)
@@ -151,13 +289,12 @@ async def chat_endpoint(req: ChatRequest):
     # 4. Execute Logic (Simplified from main.py)
     if category == "TECHNICAL":
         action_type = "automation_design"
-        plan = manager.plan(req.message, history_str)
-        code = coder.write_code(req.message, plan)
+        plan, code = designer.design(req.message, history_str, db_context=ctx.db_context)
         match = re.search(r"```json\n(.*?)\n```", code, re.DOTALL)
         if match:
             json_payload = match.group(1)
-            if req.store_id:
-                res = integrations.deploy_internal(req.store_id, json_payload, "API Generated Flow")
+            if ctx.store_id:
+                res = integrations.deploy_internal(ctx.store_id, json_payload, "API Generated Flow")
                 meta_data = res
 
         response_text = f"Đã thiết kế xong quy trình.\n\n{code}"
@@ -166,20 +303,31 @@ async def chat_endpoint(req: ChatRequest):
         action_type = "marketing"
         response_text = manager.write_marketing(req.message)
 
+    elif tools_enabled and category in ("DATA_INTERNAL", "GENERAL"):
+        # The model fetches what it needs (sales, stock, customers, ...) via tool calls
+        action_type = "data_lookup" if category == "DATA_INTERNAL" else "chat"
+        response_text, meta_data = manager.answer_with_tools(req.message, tools, ctx.store_id, history_str,
+                                                             db_context=ctx.db_context, max_rounds=max_tool_rounds)
+
     elif category == "DATA_INTERNAL":
         action_type = "data_lookup"
-        val = saas.get_sales_report(req.store_id or 1, "today")
-        context = f"SALES: {val}"
-        response_text = manager.consult(req.message, context, history_str)
+        if ctx.store_id:
+            val = saas.get_sales_report(ctx.store_id, "today")
+            context = f"SALES: {val}"
+        else:
+            context = "SALES: unknown (no store selected; ask the user which store)"
+        response_text = manager.consult(req.message, context, history_str, db_context=ctx.db_context)
 
     else:
         # General Chat
-        response_text = manager.consult(req.message, "", history_str)
+        response_text = manager.consult(req.message, "", history_str, db_context=ctx.db_context)
 
     # 5. Save & Return
     # Clean output
     response_text = re.sub(r"<think>.*?</think>", "", response_text, flags=re.DOTALL).strip()
-    memory.add_message("assistant", response_text)
+    memory.add_message("assistant", response_text, req.user_id, ctx.store_id)
+    if fast_path is not None:
+        fast_path.record(False, (time.perf_counter() - started) * 1000)
     
     return {
         "response": response_text,
@@ -187,23 +335,109 @@ async def chat_endpoint(req: ChatRequest):
         "data": meta_data
     }
 
-@app.post("/upload_image")
-async def upload_image(user_id: int, file: UploadFile = File(...)):
+@app.get("/chat/stats")
+def chat_stats():
+    """Share of /chat requests answered by the fast path, and p50 latency of fast path vs LLM answers."""
+    if fast_path is None:
+        raise HTTPException(status_code=404, detail="fast path disabled (FAST_PATH=0)")
+    return fast_path.stats()
+
+@app.get("/alerts")
+def alerts_endpoint(user_id: int, store_id: Optional[int] = None):
+    """Latest health-check alerts (computed in the background), per store owned by the user."""
+    store_ids = [store_id] if store_id is not None else [s["id"] for s in memory.get_user_stores(user_id)]
+    stores = []
+    for sid in store_ids:
+        ctx = store_contexts.get(user_id, sid)
+        if ctx is None:
+            raise HTTPException(status_code=404, detail="store not found for this user")
+        stores.append({"store_id": sid, "name": ctx.store["name"], "alerts": ctx.alerts})
+    return {"stores": stores, "last_run": health.last_run}
+
+@app.get("/seasonality")
+def seasonality_endpoint(user_id: int, store_id: int, category: Optional[str] = None, days_ahead: int = 60):
+    """Revenue vs the same lunar days last year, plus upcoming holidays with their usual uplift."""
+    if store_contexts.get(user_id, store_id) is None:
+        raise HTTPException(status_code=404, detail="store not found for this user")
+    return {"yoy": seasonality.lunar_yoy(store_id, category),
+            "upcoming": seasonality.upcoming_events(store_id, category, days_ahead=days_ahead),
+            "categories": seasonality.store_categories(store_id)}
+
+@app.get("/workflows")
+def list_workflows(user_id: int, store_id: int):
+    """Saved workflows for a store (metadata only; payloads are not decompressed)."""
+    if store_contexts.get(user_id, store_id) is None:
+        raise HTTPException(status_code=404, detail="store not found for this user")
+    return {"workflows": integrations.workflows.list(store_id)}
+
+@app.get("/workflows/{workflow_id}")
+def get_workflow(workflow_id: int, user_id: int, store_id: int, accept_encoding: Optional[str] = Header(default="")):
+    """Blueprint JSON. Sent still compressed when the client accepts the stored encoding."""
+    if store_contexts.get(user_id, store_id) is None:
+        raise HTTPException(status_code=404, detail="store not found for this user")
+    stored = integrations.workflows.get_compressed(workflow_id, store_id=store_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="workflow not found")
+    codec, data = stored
+    http_encoding = {"zlib": "deflate", "zstd": "zstd"}.get(codec)
+    if http_encoding and http_encoding in (accept_encoding or ""):
+        return Response(content=data, media_type="application/json", headers={"Content-Encoding": http_encoding})
+    return Response(content=WorkflowCodec.decompress(codec, data), media_type="application/json")
+
+@app.post("/workflows/{workflow_id}/run")
+async def run_workflow(workflow_id: int, user_id: int, store_id: int, trigger: Optional[dict] = Body(default=None)):
+    """Executes a saved workflow (trigger = webhook payload). Returns per-node status and timing."""
+    if store_contexts.get(user_id, store_id) is None:
+        raise HTTPException(status_code=404, detail="store not found for this user")
+    blueprint = integrations.workflows.get(workflow_id, store_id=store_id)
+    if blueprint is None:
+        raise HTTPException(status_code=404, detail="workflow not found")
+    try:
+        workflow = workflow_engine.compile(blueprint, key=workflow_id)
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=f"invalid workflow: {e}")
+    result = await workflow_engine.run(workflow, trigger, store_id=store_id)
+    return {"workflow_id": workflow_id, "status": result["status"], "ms": result["ms"], "nodes": result["nodes"]}
+
+# The multipart body is parsed here as it arrives (not by FastAPI's File(...), which receives and
+# spools the whole body before the handler runs), so the spool's size limit bounds what is accepted.
+UPLOAD_BODY_SCHEMA = {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+    "type": "object", "required": ["file"], "properties": {"file": {"type": "string", "format": "binary"}}}}}}}
+
+@app.post("/upload_image", openapi_extra=UPLOAD_BODY_SCHEMA)
+async def upload_image(request: Request, user_id: int, store_id: Optional[int] = None, task_hint: str = "OCR",
+                       mode: str = "quality"):
     """
-    Endpoint to handle image uploads for Vision analysis.
+    Endpoint to handle image uploads for Vision analysis (multipart field `file`).
+    The user must own the store (`store_id` may be omitted when they have exactly one);
+    checked before any of the body is read.
+    `mode`: "fast" (greedy, good for OCR) or "quality" (beam search).
     If vision model failed to load, return a clear error.
     """
-    if not vision_enabled or vision is None:
+    ctx = store_contexts.get(user_id, store_id)
+    if ctx is None or ctx.store is None:
+        raise HTTPException(status_code=404, detail="store not found for this user")
+    if not vision_enabled or vision_service is None:
         raise HTTPException(status_code=503, detail="Vision model not available")
+    if mode not in vision.settings["modes"]:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {list(vision.settings['modes'])}")
 
-    file_location = f"src/data/{file.filename}"
-    with open(file_location, "wb+") as file_object:
-        file_object.write(file.file.read())
-    
-    # Run Vision
-    result = vision.analyze_image(file_location)
-    
-    return {"filename": file.filename, "analysis": result}
+    # Stream into the content-addressed spool (bounded memory, size/concurrency limits).
+    try:
+        spool.check_length(request.headers.get("content-length"))
+        file = MultipartFileStream(request.stream(), request.headers.get("content-type"),
+                                   max_body=spool.max_bytes + MULTIPART_OVERHEAD)
+        spooled = await spool.receive(file)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    # Decoded (and downscaled) straight from the spooled file; repeated images hit the cache by digest.
+    result = await vision_service.analyze_async(spooled["path"], task_hint=task_hint, mode=mode,
+                                                digest=spooled["digest"])
+
+    metrics.log_status(f"🖼️ Upload from User {user_id}: {spooled['size']} bytes ({task_hint}, {mode})",
+                       user_id=user_id, store_id=ctx.store_id)
+    return {"filename": file.filename, "digest": spooled["digest"], "size": spooled["size"], "analysis": result}
 
 
 # --- LOCAL/NOTEBOOK ENTRYPOINT ---
@@ -216,7 +450,7 @@ def maybe_start_ngrok(port: int):
     try:
         from pyngrok import ngrok
     except ImportError:
-        print("⚠️ AUTO_NGROK requested but pyngrok is not installed. Run: pip install pyngrok")
+        metrics.log_status("⚠️ AUTO_NGROK requested but pyngrok is not installed. Run: pip install pyngrok")
         return None
 
     token = os.environ.get("NGROK_AUTHTOKEN")
@@ -224,7 +458,7 @@ def maybe_start_ngrok(port: int):
         ngrok.set_auth_token(token)
 
     tunnel = ngrok.connect(port, bind_tls=True)
-    print(f"🌐 ngrok tunnel started: {tunnel.public_url}")
+    metrics.log_status(f"🌐 ngrok tunnel started: {tunnel.public_url}")
     return tunnel.public_url
 
 
@@ -233,5 +467,12 @@ if __name__ == "__main__":
     maybe_start_ngrok(port)
 
     import uvicorn
-    # Pass app object directly to avoid a second import that re-triggers model loading
-    uvicorn.run(app, host="0.0.0.0", port=port, reload=False)
\ No newline at end of file
+    workers = int(os.environ.get("API_WORKERS", "1"))
+    if workers > 1 and MODEL_SERVER_SOCKET:
+        # Workers import the app themselves; each one is cheap because the models are remote
+        uvicorn.run("src.server:app", host="0.0.0.0", port=port, workers=workers)
+    else:
+        if workers > 1:
+            metrics.log_status("⚠️ API_WORKERS > 1 needs MODEL_SERVER_SOCKET (a model copy per worker); using 1")
+        # Pass app object directly to avoid a second import that re-triggers model loading
+        uvicorn.run(app, host="0.0.0.0", port=port, reload=False)
\ No newline at end of file
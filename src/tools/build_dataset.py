@@ -0,0 +1,60 @@
+"""
+Builds the fine-tuning dataset for the coder persona from training_data.jsonl and
+the Make.com blueprints: near-duplicates dropped, Qwen chat template applied,
+samples packed to --seq-len and written as memory-mapped token arrays
+(see DatasetBuilder / PackedDataset in src/core/dataset.py).
+
+Usage: python src/tools/build_dataset.py [--out datasets/coder] [--seq-len 4096]
+                                         [--tokenizer Qwen/Qwen2.5-Coder-14B-Instruct | fake]
+"""
+import argparse
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path: sys.path.insert(0, project_root)
+
+from src.core.config import get_config
+from src.core.dataset import DatasetBuilder, read_jsonl, read_blueprints
+
+
+def load_tokenizer(name):
+    if name == "fake":  # Offline runs: same ChatML layout, word-level IDs
+        from src.core.fake_llm import FakeTokenizer
+        return FakeTokenizer()
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(name)
+
+
+def main():
+    config = get_config()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jsonl", nargs="*", default=[os.path.join(config.SRC_DATA_DIR, "training_data.jsonl")])
+    parser.add_argument("--blueprints", nargs="*", default=[os.path.join(config.SRC_DATA_DIR, "blueprints")])
+    parser.add_argument("--out", default=os.path.join(config.PROJECT_ROOT, "datasets", "coder"))
+    parser.add_argument("--tokenizer", default=config.models["coder"])
+    parser.add_argument("--seq-len", type=int, default=4096)
+    parser.add_argument("--window", type=int, default=2048, help="samples per packing window")
+    parser.add_argument("--dedupe-threshold", type=float, default=0.85, help="0 disables near-duplicate removal")
+    args = parser.parse_args()
+
+    print(f"📚 Building dataset → {args.out} (seq_len {args.seq_len}, tokenizer {args.tokenizer})")
+    builder = DatasetBuilder(load_tokenizer(args.tokenizer), args.out, seq_len=args.seq_len,
+                             window=args.window, dedupe_threshold=args.dedupe_threshold)
+    sources = [read_jsonl(path) for path in args.jsonl] + [read_blueprints(path) for path in args.blueprints]
+    start = time.perf_counter()
+    meta = builder.build(sources)
+    seconds = time.perf_counter() - start
+
+    print(f"   Read {meta['read']} samples: kept {meta['samples']}, {meta['duplicates']} near-duplicates, "
+          f"{meta['empty']} without answer, {meta['truncated']} truncated")
+    print(f"   {meta['packs']} packs x {meta['seq_len']} tokens | {meta['tokens']} tokens "
+          f"({meta['loss_tokens']} trained) | packing efficiency {meta['packing_efficiency']:.1%}")
+    print(f"✅ Done in {seconds:.2f} s ({meta['read'] / max(seconds, 1e-9):.0f} samples/s, "
+          f"{meta['tokens'] / max(seconds, 1e-9):.0f} tokens/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Tests import the app as `src.*`, like the entry points do
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path: sys.path.insert(0, project_root)
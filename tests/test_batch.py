@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+pytest.importorskip("torch")
+
+from src.batch import load_done, load_requests
+
+
+def write(path, lines):
+    path.write_text("".join(lines), encoding="utf-8")
+
+
+def line(**result):
+    return json.dumps(result, ensure_ascii=False) + "\n"
+
+
+def test_load_requests_defaults_ids_and_skips_bad_lines(tmp_path):
+    path = tmp_path / "jobs.jsonl"
+    write(path, [line(message="Viết bài khuyến mãi"), "not json\n", line(id=7, message="Doanh thu?"),
+                 line(id="x"), "\n"])
+    assert [(r["id"], r["message"]) for r in load_requests(path)] == [("1", "Viết bài khuyến mãi"), ("7", "Doanh thu?")]
+
+
+def test_missing_output_is_empty(tmp_path):
+    assert load_done(str(tmp_path / "results.jsonl")) == set()
+
+
+def test_compacts_failed_and_duplicate_results(tmp_path):
+    path = tmp_path / "results.jsonl"
+    write(path, [line(id="a", response="ok a"), line(id="b", error="OOM"), line(id="c", response="old c"),
+                 line(id="c", response="new c"), line(id="d", response="ok d"), line(id="d", error="timeout"),
+                 '{"id": "e", "resp'])
+    assert load_done(str(path)) == {"a", "c"}
+    assert [json.loads(l) for l in path.read_text(encoding="utf-8").splitlines()] == \
+        [{"id": "a", "response": "ok a"}, {"id": "c", "response": "new c"}]
+
+    # The retry run appends its results: still one final line per id
+    with open(path, "a", encoding="utf-8") as out:
+        out.write(line(id="b", response="ok b") + line(id="d", response="ok d"))
+    assert load_done(str(path)) == {"a", "b", "c", "d"}
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 4
+
+
+def test_clean_file_is_not_rewritten(tmp_path):
+    path = tmp_path / "results.jsonl"
+    write(path, [line(id="a", response="ok"), line(id="b", response="ok")])
+    before = path.stat().st_ino
+    assert load_done(str(path)) == {"a", "b"}
+    assert path.stat().st_ino == before
@@ -0,0 +1,111 @@
+import re
+
+import pytest
+
+from src.core import config as config_module
+from src.core.config import Config
+from src.core.hardware import PROFILES
+
+ENV_VARS = re.findall(r'(?:environ\.get|_flag)\("([A-Z_]+)"', open(config_module.__file__, encoding="utf-8").read())
+
+
+@pytest.fixture
+def make_config(monkeypatch, tmp_path):
+    """Config built from only the given env vars (scratch paths, nothing inherited from the shell)."""
+    def make(**env):
+        for name in ENV_VARS:
+            monkeypatch.delenv(name, raising=False)
+        monkeypatch.setenv("PROJECT_A_DB_PATH", str(tmp_path / "project_a.db"))
+        monkeypatch.setenv("PROJECT_A_WORKFLOW_DIR", str(tmp_path / "workflows"))
+        monkeypatch.setenv("PROJECT_A_SPOOL_DIR", str(tmp_path / "spool"))
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        return Config()
+    return make
+
+
+@pytest.mark.parametrize("profile, quantize", [("cpu-16c-32gb", "bf16"), ("cpu-4c-8gb", "int8")])
+def test_cpu_profiles_pick_the_cpu_backend(make_config, profile, quantize):
+    config = make_config(HARDWARE_PROFILE=profile)
+
+    assert config.llm_backend == "cpu"
+    assert config.cpu["runtime"] == "torch"
+    assert config.cpu["quantize"] == quantize  # bf16 only where the CPU has it natively
+    assert config.cpu["threads"] == config.hardware["cpu_count"] // 2
+    assert config.vision["enabled"] is False
+    assert f"{config.cpu['model_id']} ({config.cpu['threads']} threads)" in config.describe()
+
+
+def test_cpu_settings_env_overrides(make_config):
+    config = make_config(HARDWARE_PROFILE="cpu-4c-8gb", CPU_MODEL_ID="Qwen/Qwen2.5-Coder-0.5B-Instruct",
+                         CPU_RUNTIME="onnx", CPU_QUANTIZE="none", CPU_THREADS="3")
+
+    assert config.cpu["model_id"] == "Qwen/Qwen2.5-Coder-0.5B-Instruct"
+    assert (config.cpu["runtime"], config.cpu["quantize"], config.cpu["threads"]) == ("onnx", "none", 3)
+
+
+def test_explicit_auto_quantize_follows_the_cpu(make_config):
+    assert make_config(HARDWARE_PROFILE="cpu-16c-32gb", CPU_QUANTIZE="auto").cpu["quantize"] == "bf16"
+
+
+def test_cpu_backend_on_a_gpu_machine_uses_the_small_default_model(make_config):
+    config = make_config(HARDWARE_PROFILE="l4-24gb", LLM_BACKEND="cpu")
+
+    assert config.llm_backend == "cpu"
+    assert config.cpu["model_id"] == config_module.DEFAULT_CPU_MODEL_ID
+    assert config.vision["enabled"] is False  # Florence only runs next to the hf backend
+
+
+@pytest.mark.parametrize("profile, quantization", [("a100-80gb", None), ("l4-24gb", {"load_in_8bit": True})])
+def test_gpu_profiles_pick_the_hf_backend(make_config, profile, quantization):
+    config = make_config(HARDWARE_PROFILE=profile)
+
+    assert config.llm_backend == "hf"
+    assert set(config.models.values()) == {config.profile["model_id"]}
+    assert config.quantization == quantization
+    assert config.kv_cache_tokens == config.profile["kv_cache_tokens"]
+    assert config.generation["max_new_tokens"] == config.profile["max_new_tokens"]
+    assert config.batch["batch_size"] == config.profile["batch_size"]
+    assert config.vision["enabled"] is config.profile["vision"]
+    assert config.fake_llm["tokens_per_second"] == PROFILES[profile]["fake_llm"]["tokens_per_second"]
+
+
+def test_4bit_computes_in_the_gpu_dtype(make_config):
+    config = make_config(HARDWARE_PROFILE="t4-16gb")
+
+    assert config.quantization["load_in_4bit"] is True
+    assert config.quantization["bnb_4bit_compute_dtype"] == "float16"  # T4 has no bf16
+
+
+def test_model_settings_env_overrides(make_config):
+    config = make_config(HARDWARE_PROFILE="a100-80gb", LLM_MODEL_ID="Qwen/Qwen2.5-Coder-7B-Instruct",
+                         LLM_QUANTIZATION="4bit", MAX_NEW_TOKENS="512", BATCH_SIZE="3", ENABLE_VISION="0",
+                         FAKE_LLM_TOKENS_PER_SECOND="99")
+
+    assert set(config.models.values()) == {"Qwen/Qwen2.5-Coder-7B-Instruct"}
+    assert config.quantization["load_in_4bit"] is True
+    assert (config.generation["max_new_tokens"], config.batch["batch_size"]) == (512, 3)
+    assert config.vision["enabled"] is False
+    assert config.fake_llm["tokens_per_second"] == 99
+    assert "Qwen/Qwen2.5-Coder-7B-Instruct (4bit)" in config.describe()
+
+
+def test_vision_can_be_forced_on(make_config):
+    assert make_config(HARDWARE_PROFILE="cpu-4c-8gb", ENABLE_VISION="1").vision["enabled"] is True
+
+
+def test_unknown_profile_is_an_error(make_config):
+    with pytest.raises(ValueError, match="Unknown HARDWARE_PROFILE"):
+        make_config(HARDWARE_PROFILE="h100")
+
+
+def test_get_config_is_built_once(make_config, capsys):
+    make_config(HARDWARE_PROFILE="cpu-4c-8gb")
+    config_module.get_config.cache_clear()
+    try:
+        config = config_module.get_config()
+        assert config_module.get_config() is config
+        assert config.hardware["profile"] == "cpu-4c-8gb"
+        assert capsys.readouterr().out.count("🖥️ [Config] profile cpu-4c-8gb") == 1  # Logged once
+    finally:
+        config_module.get_config.cache_clear()
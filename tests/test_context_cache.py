@@ -0,0 +1,98 @@
+from src.core.context import StoreContextCache
+
+STORE = {"id": 7, "name": "Shop Mẹ Bim", "industry": "Mom & Baby", "location": "HCMC"}
+
+
+class Memory:
+    """The MemoryManager calls StoreContextCache makes, with counters and a hook inside resolution."""
+    def __init__(self, stores):
+        self.stores = stores
+        self.alerts = ["Doanh thu hôm nay bằng 0"]
+        self.listeners = []
+        self.during_resolve = None
+        self.resolves = 0
+
+    def add_write_listener(self, callback):
+        self.listeners.append(callback)
+
+    def notify_write(self, table, store_id=None):
+        for callback in self.listeners:
+            callback(table, store_id)
+
+    def get_store(self, user_id, store_id):
+        return next((s for s in self.stores if s["id"] == store_id), None)
+
+    def get_user_stores(self, user_id):
+        return list(self.stores)
+
+    def get_profile(self):
+        return {}
+
+    def get_latest_alerts(self, store_id):
+        self.resolves += 1
+        alerts = list(self.alerts)
+        if self.during_resolve:
+            hook, self.during_resolve = self.during_resolve, None
+            hook()
+        return alerts
+
+
+def test_hit_and_store_invalidation():
+    memory = Memory([STORE])
+    cache = StoreContextCache(memory)
+    assert cache.get(1, 7).alerts == memory.alerts
+    cache.get(1, 7)
+    assert memory.resolves == 1
+    memory.alerts = []
+    memory.notify_write("alerts", 7)
+    assert cache.get(1, 7).alerts == []
+    assert memory.resolves == 2
+
+
+def test_other_store_writes_keep_entry():
+    memory = Memory([STORE])
+    cache = StoreContextCache(memory)
+    cache.get(1, 7)
+    memory.notify_write("alerts", 99)
+    cache.get(1, 7)
+    assert memory.resolves == 1
+
+
+def test_write_during_resolve_is_not_lost():
+    memory = Memory([STORE])
+    cache = StoreContextCache(memory)
+
+    def write():
+        memory.alerts = []
+        memory.notify_write("alerts", 7)
+
+    memory.during_resolve = write
+    assert cache.get(1, 7).alerts  # Resolved before the write landed
+    assert cache.get(1, 7).alerts == []  # Not served from the cache for the TTL
+
+
+def test_storeless_entries_invalidated_by_store_writes():
+    memory = Memory([STORE, dict(STORE, id=8)])
+    cache = StoreContextCache(memory)
+    assert cache.get(1).store is None  # Two stores: ambiguous
+    memory.stores = [STORE]
+    memory.notify_write("stores", 8)
+    assert cache.get(1).store_id == 7
+
+
+def test_global_write_clears_everything_and_ttl_expires():
+    memory = Memory([STORE])
+    cache = StoreContextCache(memory, ttl_seconds=0)
+    cache.get(1, 7)
+    cache.get(1, 7)
+    assert memory.resolves == 2
+    cache.ttl_seconds = 300
+    memory.notify_write("profile")
+    cache.get(1, 7)
+    assert memory.resolves == 3
+
+
+def test_unknown_store_not_cached():
+    cache = StoreContextCache(Memory([STORE]))
+    assert cache.get(1, 99) is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,137 @@
+import sqlite3
+
+import pytest
+
+from src.core.crm import CustomerDirectory, normalize_phone
+from src.core.text import normalize_query
+
+CUSTOMERS = [(1, "Nguyễn Thị Lan", "0912 345 678", "VIP"),
+             (1, "Trần Văn Minh", "+84 987.654.321", "Member"),
+             (2, "Lê Thị Lan", "0912345678", "Member")]
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "crm.db")
+    conn = sqlite3.connect(path)
+    conn.execute('''CREATE TABLE customers (id INTEGER PRIMARY KEY, store_id INTEGER, name TEXT, phone TEXT,
+                    phone_norm TEXT, name_norm TEXT, rank TEXT, last_purchase TEXT, total_spent REAL DEFAULT 0)''')
+    conn.execute("CREATE INDEX idx_customers_store_phone ON customers (store_id, phone_norm)")
+    for row in CUSTOMERS:
+        insert(conn, *row)
+    yield path, conn
+    conn.close()
+
+
+def insert(conn, store_id, name, phone, rank="Member"):
+    conn.execute('''INSERT INTO customers (store_id, name, phone, phone_norm, name_norm, rank)
+                    VALUES (?, ?, ?, ?, ?, ?)''', (store_id, name, phone, normalize_phone(phone),
+                                                   normalize_query(name), rank))
+    conn.commit()
+
+
+def names(rows):
+    return [r["name"] for r in rows]
+
+
+def test_normalize_phone():
+    assert normalize_phone("+84 912.345.678") == "0912345678"
+    assert normalize_phone("84912345678") == "0912345678"
+    assert normalize_phone("(091) 234-5") == "0912345"
+    assert normalize_phone("Chị Lan") is None
+
+
+@pytest.mark.parametrize("hot_after", [10 ** 9, 1])
+def test_lookup_sql_and_hot_paths_agree(db, hot_after):
+    directory = CustomerDirectory(db[0], hot_after=hot_after)
+
+    assert names(directory.lookup("84912345678", store_id=1)) == ["Nguyễn Thị Lan"]
+    assert names(directory.lookup("0987", store_id=1)) == ["Trần Văn Minh"]
+    assert names(directory.lookup("Trần Văn", store_id=1)) == ["Trần Văn Minh"]
+    assert names(directory.lookup("lan", store_id=1)) == ["Nguyễn Thị Lan"]
+    assert names(directory.lookup("lan", store_id=2)) == ["Lê Thị Lan"]
+    assert directory.stats()["hot_stores"] == (2 if hot_after == 1 else 0)
+
+
+def test_lookup_many(db):
+    directory = CustomerDirectory(db[0])
+    found = directory.lookup_many(["0912345678", "+84987654321", "Minh", "0900000000"], store_id=1)
+
+    assert {q: c and c["name"] for q, c in found.items()} == {
+        "0912345678": "Nguyễn Thị Lan", "+84987654321": "Trần Văn Minh", "Minh": "Trần Văn Minh",
+        "0900000000": None}
+
+
+def test_upsert_updates_by_phone_and_invalidates(db):
+    directory = CustomerDirectory(db[0], hot_after=1)
+    assert names(directory.lookup("lan", store_id=1)) == ["Nguyễn Thị Lan"]
+
+    first = directory.upsert(1, "Nguyễn Thị Lan Anh", "0912.345.678", rank="VIP")
+    directory.upsert(1, "Phạm Lan", "0933 111 222")
+
+    assert first == 1
+    assert names(directory.lookup("lan", store_id=1)) == ["Nguyễn Thị Lan Anh", "Phạm Lan"]
+
+
+def test_hot_store_sees_rows_from_other_writers(db):
+    path, conn = db
+    directory = CustomerDirectory(path, hot_after=1, refresh_seconds=0)
+    assert names(directory.lookup("lan", store_id=1)) == ["Nguyễn Thị Lan"]
+
+    insert(conn, 1, "Hoàng Lan", "0977 000 111")  # e.g. the batch CLI or another worker
+    assert names(directory.lookup("lan", store_id=1)) == ["Nguyễn Thị Lan", "Hoàng Lan"]
+
+    conn.execute("DELETE FROM customers WHERE name = 'Hoàng Lan'")
+    conn.commit()
+    assert names(directory.lookup("0977000111", store_id=1)) == []
+
+
+def test_hot_store_watermark_checked_at_most_every_refresh_seconds(db):
+    path, conn = db
+    directory = CustomerDirectory(path, hot_after=1, refresh_seconds=3600)
+    directory.lookup("lan", store_id=1)
+
+    insert(conn, 1, "Hoàng Lan", "0977 000 111")
+    assert names(directory.lookup("lan", store_id=1)) == ["Nguyễn Thị Lan"]
+    directory.invalidate(1)
+    assert names(directory.lookup("lan", store_id=1)) == ["Nguyễn Thị Lan", "Hoàng Lan"]
+
+
+def test_hot_store_reloads_renames_after_reload_seconds(db):
+    path, conn = db
+    directory = CustomerDirectory(path, hot_after=1, refresh_seconds=0, reload_seconds=0)
+    directory.lookup("minh", store_id=1)
+
+    # Same count and max id: only the periodic full reload picks this up.
+    conn.execute("UPDATE customers SET name = 'Trần Văn Tuấn', name_norm = 'tran van tuan' WHERE id = 2")
+    conn.commit()
+    assert names(directory.lookup("tuan", store_id=1)) == ["Trần Văn Tuấn"]
+    assert directory.lookup("minh", store_id=1) == []
+
+
+def test_too_large_store_served_from_sql(db):
+    directory = CustomerDirectory(db[0], hot_after=1, max_hot_rows=1)
+
+    assert names(directory.lookup("lan", store_id=1)) == ["Nguyễn Thị Lan"]
+    assert directory.stats()["hot_stores"] == 0
+
+
+def test_hot_stores_and_lookup_counters_are_bounded(db):
+    directory = CustomerDirectory(db[0], hot_after=2, max_hot_stores=1, max_tracked=3)
+    for store_id in range(100, 110):
+        directory.lookup("lan", store_id=store_id)
+    assert directory.stats()["tracked_stores"] == 3
+
+    for _ in range(2):
+        directory.lookup("lan", store_id=1)
+        directory.lookup("lan", store_id=2)
+    stats = directory.stats()
+    assert stats["hot_stores"] == 1
+    assert stats["tracked_stores"] == 1  # Promoted stores stop being counted
+
+
+def test_get_customer_info_requires_store(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROJECT_A_DB_PATH", str(tmp_path / "project_a.db"))
+    from src.core.saas_api import SaasAPI
+    with pytest.raises(ValueError):
+        SaasAPI().get_customer_info("0912345678", None)
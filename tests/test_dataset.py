@@ -0,0 +1,110 @@
+import json
+import re
+
+import numpy as np
+
+from src.core.dataset import DatasetBuilder, NearDuplicateFilter, PackedDataset, read_blueprints, read_jsonl
+
+
+class ChatMLTokenizer:
+    """Word-level tokenizer with a Qwen-style ChatML template; id 0 is the end-of-text/pad token."""
+    TOKEN_RE = re.compile(r"<\|im_start\|>|<\|im_end\|>|\w+|[^\w\s]|\s+")
+    eos_token_id = 0
+
+    def __init__(self):
+        self.vocab = {"<|endoftext|>": 0}
+
+    def encode(self, text, add_special_tokens=False):
+        return [self.vocab.setdefault(t, len(self.vocab)) for t in self.TOKEN_RE.findall(text)]
+
+    def decode(self, ids):
+        tokens = {i: t for t, i in self.vocab.items()}
+        return "".join(tokens[int(i)] for i in ids)
+
+    def apply_chat_template(self, messages, tokenize=False, add_generation_prompt=False):
+        text = "".join(f"<|im_start|>{m['role']}\n{m['content']}<|im_end|>\n" for m in messages)
+        return text + ("<|im_start|>assistant\n" if add_generation_prompt else "")
+
+
+def chat(request, answer, system=None):
+    messages = [{"role": "system", "content": system}] if system else []
+    return messages + [{"role": "user", "content": request}, {"role": "assistant", "content": answer}]
+
+
+REQUESTS = ["Gửi email cảm ơn khi có đơn hàng mới", "Nhắn Zalo cho quản lý khi tồn kho dưới ngưỡng",
+            "Ghi đơn Shopee vào Google Sheet báo cáo", "Đăng bài Facebook khuyến mãi cuối tuần"]
+
+
+def test_near_duplicates_ignore_numbers_case_and_spacing():
+    dedupe = NearDuplicateFilter(threshold=0.85)
+    text = "Tạo workflow gửi email xác nhận cho đơn hàng số 1234 với tổng tiền 500000 đồng cho khách"
+
+    assert dedupe.is_duplicate(text) is False
+    assert dedupe.is_duplicate(text.upper().replace("1234", "98765").replace(" ", "  ")) is True
+    assert dedupe.is_duplicate("Nhắn Zalo cho quản lý mỗi khi sản phẩm sắp hết hàng trong kho chính") is False
+
+
+def test_filter_grows_past_its_initial_capacity():
+    dedupe = NearDuplicateFilter()
+    # Digits normalize to 0, so distinct samples use distinct (CJK) words instead
+    texts = [" ".join(chr(base + i) for base in (0x4e00, 0x5e00, 0x6e00, 0x7e00)) for i in range(1500)]
+    assert not any(dedupe.is_duplicate(text) for text in texts)
+    assert dedupe.is_duplicate(texts[1400]) is True
+
+
+def test_readers(tmp_path):
+    jsonl = tmp_path / "train.jsonl"
+    jsonl.write_text(json.dumps({"messages": chat("a", "b")}) + "\n\nnot json\n" + json.dumps({"other": 1}) + "\n",
+                     encoding="utf-8")
+    blueprints = tmp_path / "blueprints"
+    blueprints.mkdir()
+    (blueprints / "Đơn mới.blueprint.json").write_text(json.dumps(
+        {"flow": [{"id": 1, "module": "gateway:CustomWebHook", "metadata": {"x": 1}}]}), encoding="utf-8")
+    (blueprints / "broken.json").write_text("{", encoding="utf-8")
+
+    assert list(read_jsonl(str(jsonl))) == [chat("a", "b")]
+    [sample] = list(read_blueprints(str(blueprints)))
+    assert sample[0]["content"] == "Tạo blueprint Make.com cho quy trình: Đơn mới"
+    answer = json.loads(sample[1]["content"].removeprefix("```json\n").removesuffix("\n```"))
+    assert answer == {"name": "Đơn mới", "flow": [{"id": 1, "module": "gateway:CustomWebHook"}]}
+
+
+def test_build_packs_masks_and_reads_back(tmp_path):
+    tokenizer = ChatMLTokenizer()
+    samples = [chat(r, f"```json\n{{\"name\": \"{r}\"}}\n```", system="Bạn là kỹ sư.") for r in REQUESTS]
+    samples.append(chat("Câu hỏi trống", "  "))  # No answer: skipped
+    samples.append(samples[0])                   # Exact duplicate: dropped
+    builder = DatasetBuilder(tokenizer, str(tmp_path / "out"), seq_len=128, window=3, batch_size=2)
+
+    meta = builder.build([iter(samples)])
+
+    assert (meta["read"], meta["samples"], meta["empty"], meta["duplicates"]) == (6, 4, 1, 1)
+    dataset = PackedDataset(str(tmp_path / "out"))
+    assert len(dataset) == meta["packs"] and dataset.tokens.shape == (meta["packs"], 128)
+    assert meta["packing_efficiency"] == round(meta["tokens"] / (meta["packs"] * 128), 4)
+
+    # Every sample is its own template rendering, loss only on the assistant turn, positions restart.
+    seen = []
+    for start, length in dataset.samples:
+        pack, offset = divmod(int(start), 128)
+        item = dataset[pack]
+        text = tokenizer.decode(item["input_ids"][offset:offset + length])
+        target = tokenizer.decode(item["input_ids"][offset:offset + length][item["labels"][offset:offset + length] != -100])
+        assert text.startswith("<|im_start|>system\nBạn là kỹ sư.<|im_end|>\n")
+        assert target.startswith("```json") and target.endswith("```<|im_end|>\n")
+        assert list(item["position_ids"][offset:offset + length]) == list(range(length))
+        seen.append(text)
+    assert sorted(seen) == sorted(tokenizer.apply_chat_template(s) for s in samples[:4])
+
+    # Padding after the last sample of a pack: pad id, no loss.
+    last = dataset[meta["packs"] - 1]
+    used = max(int(s) + int(n) for s, n in dataset.samples) - (meta["packs"] - 1) * 128
+    assert (last["input_ids"][used:] == 0).all() and (last["labels"][used:] == -100).all()
+
+
+def test_long_samples_are_truncated(tmp_path):
+    builder = DatasetBuilder(ChatMLTokenizer(), str(tmp_path / "out"), seq_len=16, dedupe_threshold=0)
+    meta = builder.build([[chat("một hai ba " * 10, "bốn năm sáu " * 10)]])
+
+    assert (meta["truncated"], meta["packs"], meta["tokens"]) == (1, 1, 16)
+    assert np.load(tmp_path / "out" / "samples.npy").tolist() == [[0, 16]]
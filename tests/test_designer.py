@@ -0,0 +1,111 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from src.agents.designer import AutomationDesigner, StepLimit, trim_plan
+from src.core.fake_llm import PLAN_REPLY, FakeCache, FakeTokenizer
+from src.core.prompt_builder import PromptBuilder
+from src.core.prompts import Prompts
+
+
+def steps(n, first=1):
+    return "".join(f"{i}. Bước số {i}\n" for i in range(first, first + n))
+
+
+def test_cuts_at_step_past_max():
+    assert trim_plan(steps(3) + "4. Thừa", 3) == steps(3).rstrip()
+    assert trim_plan(steps(3) + "Bước 4:", 3) == steps(3).rstrip()
+
+
+def test_keeps_paragraphs_inside_earlier_steps():
+    text = ("1. Webhook nhận đơn hàng\n\nModule này lắng nghe đơn hàng mới từ website.\n\n"
+            "2. Ghi vào Google Sheet\n\nMỗi đơn là một dòng mới.")
+    assert trim_plan(text, 8) == text
+
+
+def test_closing_paragraph_after_last_step():
+    plan = steps(3)
+    assert trim_plan(plan + "\nLưu ý: chạy thử trước khi bật.", 3) == plan.rstrip()
+    assert trim_plan(plan + "\nLưu ý: chạy thử trước khi bật.", 8) == (plan + "\nLưu ý: chạy thử trước khi bật.")
+    assert trim_plan(plan + "\n4", 3) == plan + "\n4"  # The next header may still be coming
+    assert trim_plan(plan + "\nBư", 8) == plan + "\nBư"
+
+
+def test_explicit_end_marker_before_max_steps():
+    plan = steps(2)
+    assert trim_plan(plan + "\nChúc cửa hàng buôn bán đắt hàng!", 8) == plan.rstrip()
+    assert trim_plan(plan + "---\nGhi chú thêm", 8) == plan.rstrip()
+    assert trim_plan("Chúc bạn thành công!\n" + plan, 8) == ("Chúc bạn thành công!\n" + plan).rstrip()
+
+
+def test_text_without_steps_is_kept():
+    assert trim_plan("Không có bước nào cả.\n\nChỉ là văn bản.  ", 3) == "Không có bước nào cả.\n\nChỉ là văn bản."
+
+
+class CountingTokenizer(FakeTokenizer):
+    def __init__(self):
+        super().__init__()
+        self.decoded = 0
+
+    def decode(self, ids, skip_special_tokens=False):
+        self.decoded += len(ids)
+        return super().decode(ids, skip_special_tokens)
+
+
+def test_step_limit_decodes_each_token_once():
+    tokenizer = CountingTokenizer()
+    prompt = tokenizer.encode("<|im_start|>user\nLập kế hoạch<|im_end|>\n")
+    reply = tokenizer.encode(PLAN_REPLY)
+    limit = StepLimit(tokenizer, len(prompt), max_steps=8)
+    stopped_at = None
+    for n in range(1, len(reply) + 1):
+        if bool(limit(torch.tensor([prompt + reply[:n]]))[0]):
+            stopped_at = n
+            break
+    assert stopped_at is not None
+    assert tokenizer.decoded == stopped_at
+    assert tokenizer.decode(reply[:stopped_at]).rstrip().endswith("9.")
+    assert trim_plan(limit.text, 8).endswith("8. Tổng hợp doanh thu cuối ngày vào Google Docs")
+
+
+def test_step_limit_waits_for_split_characters():
+    class ByteTokenizer:
+        def decode(self, ids, skip_special_tokens=False):
+            return bytes(ids.tolist() if hasattr(ids, "tolist") else ids).decode("utf-8", errors="replace")
+
+    data = list("1. Bước một\n2. Bước hai\n".encode("utf-8"))
+    limit = StepLimit(ByteTokenizer(), 0, max_steps=1)
+    results = [bool(limit(torch.tensor([data[:n]]))[0]) for n in range(1, len(data) + 1)]
+    assert "�" not in limit.text
+    assert limit.text.startswith("1. Bước một\n2.")
+    assert results[-1]
+
+
+class StubAgent:
+    def __init__(self, role, replies, tokenizer):
+        self.role = role
+        self.replies = replies
+        self.tokenizer = tokenizer
+        self.prompts = []
+
+    def continue_generate(self, input_ids, cache, **kwargs):
+        self.prompts.append(self.tokenizer.decode(input_ids))
+        cache.length = len(input_ids)
+        return self.tokenizer.encode(self.replies.pop(0))
+
+
+def test_builder_turn_runs_under_coder_system_prompt():
+    tokenizer = FakeTokenizer()
+    builder = PromptBuilder(tokenizer)
+    manager = StubAgent("manager", [steps(3) + "4. Thừa"], tokenizer)
+    coder = StubAgent("coder", ['{"flow": []}'], tokenizer)
+    designer = AutomationDesigner(manager, coder, max_steps=3)
+    prompt_ids = builder.build("manager", "MANAGER SYSTEM", [{"role": "user", "content": "Tự động hóa đơn hàng"}])
+
+    plan, code = designer._design(prompt_ids, FakeCache(), tokenizer, builder)
+    assert plan == steps(3).rstrip() and code == '{"flow": []}'
+    builder_prompt = coder.prompts[0]
+    assert builder_prompt.startswith(tokenizer.decode(prompt_ids) + steps(3).rstrip())
+    turn = builder_prompt.rsplit(steps(3).rstrip(), 1)[1]
+    assert f"<|im_start|>system\n{Prompts.CODER_SYSTEM}<|im_end|>" in turn
+    assert turn.index("<|im_start|>system") < turn.index(Prompts.BUILD_TURN_INSTRUCTION)
@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from src.core.fake_llm import PLAN_REPLY, FakeCache, FakeCausalLM, FakeTokenizer, tool_calls_for  # noqa: E402
+from src.core.prompts import Prompts  # noqa: E402
+
+
+@pytest.fixture
+def tokenizer():
+    return FakeTokenizer()
+
+
+@pytest.fixture
+def model(tokenizer):
+    # No simulated latency: the tests only check what is generated.
+    return FakeCausalLM(tokenizer, first_token_ms=0, tokens_per_second=10 ** 9, prefill_tokens_per_second=10 ** 9)
+
+
+def chat(tokenizer, system, user):
+    return tokenizer.apply_chat_template([{"role": "system", "content": system}, {"role": "user", "content": user}],
+                                         add_generation_prompt=True)
+
+
+def test_tokenizer_round_trip_and_specials(tokenizer):
+    text = "<|im_start|>user\nCòn bao nhiêu Sữa Meiji?<|im_end|>"
+    ids = tokenizer.encode(text)
+
+    assert tokenizer.decode(ids) == text
+    assert ids[0] == 1 and ids[-1] == 2
+    assert tokenizer.decode(ids, skip_special_tokens=True) == "user\nCòn bao nhiêu Sữa Meiji?"
+    assert tokenizer.encode("Sữa Meiji") == tokenizer.encode("Sữa Meiji")
+
+
+def test_chat_template_renders_chatml(tokenizer):
+    text = chat(tokenizer, "S", "U")
+    assert text == "<|im_start|>system\nS<|im_end|>\n<|im_start|>user\nU<|im_end|>\n<|im_start|>assistant\n"
+    assert tokenizer.decode(tokenizer.apply_chat_template([{"role": "user", "content": "U"}], tokenize=True)) == \
+        "<|im_start|>user\nU<|im_end|>\n"
+
+
+def test_tool_calls_for_question():
+    calls = tool_calls_for("Doanh thu hôm nay thế nào, còn bao nhiêu Sữa Meiji và khách 0912 345 678 là ai?")
+
+    assert calls == [{"name": "get_sales_report", "arguments": {"period": "today"}},
+                     {"name": "check_inventory", "arguments": {"product_name": "Sữa Meiji"}},
+                     {"name": "get_customer_info", "arguments": {"phone_or_name": "0912 345 678"}}]
+    assert tool_calls_for("tính (1500000 - 1200000) / 1200000 * 100") == [
+        {"name": "calculate", "arguments": {"expression": "(1500000 - 1200000) / 1200000 * 100"}}]
+    assert tool_calls_for("Chào bạn") == []
+
+
+def test_persona_replies(model, tokenizer):
+    assert model.respond(chat(tokenizer, "Planner", Prompts.PLAN_INSTRUCTION)) == PLAN_REPLY
+    blueprint = model.respond(chat(tokenizer, "You are the Lead Engineer.", "Build it"))
+    assert json.loads(blueprint.split("```json\n")[1].split("```")[0])["flow"][0]["module"] == "gateway:CustomWebHook"
+    assert model.respond(chat(tokenizer, "Consultant", "DATA: 2.500.000đ\nTư vấn giúp tôi")).startswith(
+        "Theo số liệu (2.500.000đ), ")
+
+
+def test_tool_turns(model, tokenizer):
+    tools = "<tools>\n...\n</tools>"
+    prompt = chat(tokenizer, tools, "Doanh thu hôm nay và còn bao nhiêu Bỉm Bobby?")
+    calls = [json.loads(block.split("</tool_call>")[0]) for block in model.respond(prompt).split("<tool_call>\n")[1:]]
+    assert [c["name"] for c in calls] == ["get_sales_report", "check_inventory"]
+
+    model.parallel_tool_calls = False
+    assert model.respond(prompt).count("<tool_call>") == 1
+
+    answered = prompt + "<tool_response>\nA\n</tool_response>\n<tool_response>\nB\n</tool_response>"
+    assert model.respond(answered) == "Theo số liệu (A; B), cửa hàng đang hoạt động tốt."
+
+
+def test_generate_appends_reply_and_tracks_cache(model, tokenizer):
+    prompt = tokenizer.encode(chat(tokenizer, "Consultant", "Xin chào"))
+    cache = FakeCache()
+
+    output = model.generate(torch.tensor([prompt]), max_new_tokens=5, past_key_values=cache,
+                            return_dict_in_generate=True)
+
+    sequence = output.sequences[0].tolist()
+    assert sequence[:len(prompt)] == prompt
+    assert len(sequence) == len(prompt) + 5 + 1 and sequence[-1] == tokenizer.eos_token_id
+    assert output.past_key_values is cache and cache.get_seq_length() == len(sequence) - 1
+    cache.crop(3)
+    assert cache.get_seq_length() == 3
+
+
+def test_generate_honours_stopping_criteria(model, tokenizer):
+    prompt = tokenizer.encode(chat(tokenizer, "Consultant", "Xin chào"))
+    stop_after = 4
+
+    def stop(ids, scores):
+        return [ids.shape[1] - len(prompt) >= stop_after]
+
+    sequence = model.generate(torch.tensor([prompt]), stopping_criteria=[stop])[0].tolist()
+
+    assert len(sequence) == len(prompt) + stop_after
+
+
+def test_batch_generate_is_left_padded_and_pads_finished_rows(model, tokenizer):
+    short = tokenizer.encode(chat(tokenizer, "Consultant", "Hi"))
+    long = tokenizer.encode(chat(tokenizer, "Planner", Prompts.PLAN_INSTRUCTION))
+    width = len(long)
+    input_ids = torch.tensor([[0] * (width - len(short)) + short, long])
+    mask = torch.tensor([[0] * (width - len(short)) + [1] * len(short), [1] * width])
+
+    out = model.generate(input_ids, attention_mask=mask, max_new_tokens=10_000, pad_token_id=0).tolist()
+
+    plan = tokenizer.encode(PLAN_REPLY) + [0]
+    assert out[1] == long + plan
+    consult = tokenizer.decode(out[0][width:], skip_special_tokens=True)
+    assert consult.startswith("cửa hàng đang hoạt động tốt") and len(out[0]) == len(out[1])
+    assert model.calls == 1
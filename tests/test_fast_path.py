@@ -0,0 +1,99 @@
+import pytest
+
+from src.core.fast_path import FastPathResponder
+
+
+class StubSaas:
+    def __init__(self, today=(1250000, 5), yesterday=(1000000, 4), low=(), stock=None):
+        self.reports = {"today": today, "yesterday": yesterday}
+        self.low = list(low)
+        self.stock = stock or {}
+        self.calls = []
+
+    def get_sales_report(self, store_id, period):
+        self.calls.append(("sales", store_id, period))
+        revenue, orders = self.reports[period]
+        return {"revenue": revenue, "orders": orders}
+
+    def get_low_stock(self, store_id, limit=20):
+        return self.low[:limit]
+
+    def check_inventory(self, product_name, store_id):
+        self.calls.append(("inventory", store_id, product_name))
+        return self.stock.get(product_name, {"error": "not found"})
+
+
+@pytest.mark.parametrize("message, intent, params", [
+    ("Hôm nay doanh thu bao nhiêu?", "revenue_today", {}),
+    ("doanh thu hom nay the nao", "revenue_today", {}),
+    ("Doanh thu hôm qua thế nào", "revenue_yesterday", {}),
+    ("So sánh doanh thu hôm nay với hôm qua", "revenue_compare", {}),
+    ("Doanh thu hôm nay tăng hay giảm so với hôm qua", "revenue_compare", {}),
+    ("Hôm nay có bao nhiêu đơn hàng?", "orders_today", {}),
+    ("Hàng nào sắp hết?", "low_stock", {}),
+    ("Còn bao nhiêu bỉm Bobby?", "stock", {"product": "bim bobby"}),
+    ("Sữa Meiji còn bao nhiêu hộp vậy", "stock", {"product": "sua meiji"}),
+    ("Tồn kho của sữa Meiji số 9", "stock", {"product": "sua meiji so 9"}),
+])
+def test_simple_questions_match(message, intent, params):
+    assert FastPathResponder(StubSaas()).match(message) == (intent, params)
+
+
+@pytest.mark.parametrize("message", [
+    "Tại sao doanh thu hôm nay giảm?",                          # Open-ended
+    "Doanh thu tháng này bao nhiêu?",                           # Period the templates do not cover
+    "Doanh thu hôm nay của chi nhánh Cầu Giấy bao nhiêu",       # Words left over besides filler
+    "Còn bao nhiêu doanh thu hôm nay",                          # "Product" is a metric
+    "Viết bài quảng cáo cho sữa Meiji",
+    "Làm sao để tăng doanh thu hôm nay",
+    "Doanh thu " + "hôm nay " * 10,                             # Longer than max_words
+    "xin chào",
+    "",
+])
+def test_everything_else_falls_back(message):
+    assert FastPathResponder(StubSaas()).match(message) is None
+
+
+def test_revenue_answer_compares_with_yesterday():
+    reply = FastPathResponder(StubSaas()).answer("Doanh thu hôm nay?", 1, "Mẹ và Bé")
+    assert reply["intent"] == "revenue_today"
+    assert reply["text"] == "Doanh thu hôm nay của Mẹ và Bé: 1.250.000đ từ 5 đơn. Tăng 25% so với hôm qua (1.000.000đ)."
+    assert reply["data"]["today"] == {"revenue": 1250000, "orders": 5}
+
+
+def test_orders_and_empty_days():
+    saas = StubSaas(today=(0, 0), yesterday=(0, 0))
+    fast = FastPathResponder(saas)
+    assert fast.answer("Hôm nay có bao nhiêu đơn?", 1)["text"] == \
+        "Hôm nay có 0 đơn, doanh thu 0đ. Hôm qua không có đơn nào."
+    assert fast.answer("Doanh thu hôm qua", 1)["text"] == "Hôm qua chưa có doanh thu."
+
+
+def test_stock_is_served_only_for_a_confident_product_match():
+    saas = StubSaas(stock={
+        "bim bobby": {"name": "Bỉm Bobby Size M", "stock": 3, "status": "Critical", "match": "prefix"},
+        "sua meiji": {"name": "Sữa Meiji Số 9", "stock": 40, "status": "OK", "match": "fuzzy"},
+    })
+    fast = FastPathResponder(saas)
+    reply = fast.answer("Còn bao nhiêu bỉm Bobby?", 7)
+    assert reply["text"] == "Bỉm Bobby Size M còn 3 sản phẩm trong kho. Sắp hết hàng, nên nhập thêm ngay."
+    assert ("inventory", 7, "bim bobby") in saas.calls  # Scoped to the caller's store
+    assert fast.answer("Sữa Meiji còn bao nhiêu?", 7) is None   # Fuzzy guess: the LLM answers
+    assert fast.answer("Còn bao nhiêu tã Huggies?", 7) is None  # Unknown product
+
+
+def test_low_stock_listing():
+    saas = StubSaas(low=[{"name": "Bỉm Bobby", "stock": 2, "threshold": 10}])
+    assert FastPathResponder(saas).answer("Hàng nào sắp hết?", 1, "Shop A")["text"] == \
+        "Các mặt hàng sắp hết của Shop A:\n- Bỉm Bobby: còn 2 (ngưỡng 10)"
+    assert FastPathResponder(StubSaas()).answer("Hàng nào sắp hết?", 1)["text"] == "Hiện chưa có mặt hàng nào sắp hết."
+
+
+def test_needs_a_store_and_records_stats():
+    saas = StubSaas()
+    fast = FastPathResponder(saas)
+    assert fast.answer("Doanh thu hôm nay?", None) is None and saas.calls == []
+    fast.record(True, 2.0)
+    fast.record(False, 900.0)
+    fast.record(True, 4.0)
+    assert fast.stats() == {"served": 2, "fallbacks": 1, "share": 0.6667, "p50_served_ms": 3.0, "p50_llm_ms": 900.0}
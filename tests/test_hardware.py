@@ -0,0 +1,92 @@
+import pytest
+
+from src.core.hardware import GB, GPU_OVERHEAD_GB, MIN_KV_TOKENS, MODELS, PROFILES, WEIGHT_BYTES, choose, probe
+
+ALL_BACKENDS = {"torch": True, "bitsandbytes": True, "onnxruntime": False, "sentence_transformers": True,
+                "chromadb": False}
+
+
+def machine(profile, **backends):
+    """A profile's probe() result with the optional backends pinned (not whatever is installed here)."""
+    return {**probe(profile), "backends": {**ALL_BACKENDS, **backends}}
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_probe_simulates_profiles(profile):
+    hardware = probe(profile)
+
+    assert (hardware["profile"], hardware["simulated"]) == (profile, True)
+    assert hardware["cpu_count"] == PROFILES[profile]["cpu_count"]
+    assert hardware["ram_gb"] == hardware["ram_available_gb"] == PROFILES[profile]["ram_gb"]
+    assert [g["name"] for g in hardware["gpus"]] == [g["name"] for g in PROFILES[profile]["gpus"]]
+    if hardware["gpus"]:
+        assert hardware["backends"]["torch"] and hardware["backends"]["bitsandbytes"]
+    assert probe(profile) is hardware  # Probed once per process
+
+
+def test_probe_rejects_unknown_profiles():
+    with pytest.raises(ValueError, match="Unknown HARDWARE_PROFILE 'h100'"):
+        probe("h100")
+
+
+def test_probe_detects_this_machine():
+    hardware = probe()
+
+    assert (hardware["profile"], hardware["simulated"]) == ("auto", False)
+    assert hardware["cpu_count"] >= 1 and 0 < hardware["ram_available_gb"] <= hardware["ram_gb"]
+
+
+@pytest.mark.parametrize("profile, model, quantization, dtype", [
+    ("a100-80gb", "Qwen/Qwen2.5-Coder-14B-Instruct", "none", "bfloat16"),
+    ("l4-24gb", "Qwen/Qwen2.5-Coder-14B-Instruct", "8bit", "bfloat16"),
+    ("t4-16gb", "Qwen/Qwen2.5-Coder-14B-Instruct", "4bit", "float16"),  # T4 has no bf16
+])
+def test_gpu_profiles_pick_the_largest_model_that_fits(profile, model, quantization, dtype):
+    settings = choose(machine(profile))
+
+    assert (settings["backend"], settings["model_id"], settings["quantization"], settings["compute_dtype"]) == (
+        "hf", model, quantization, dtype)
+    vram = PROFILES[profile]["gpus"][0]["vram_gb"] * 0.92
+    weights = MODELS[model]["params_b"] * 1e9 * WEIGHT_BYTES[quantization] / GB
+    assert MIN_KV_TOKENS <= settings["kv_cache_tokens"]
+    assert settings["kv_cache_tokens"] * MODELS[model]["kv_bytes_per_token"] <= (vram - weights - GPU_OVERHEAD_GB) * GB
+    assert settings["max_new_tokens"] <= min(4096, settings["kv_cache_tokens"] // 2)
+    assert 1 <= settings["batch_size"] <= 32 and 8 <= settings["max_caches"] <= 64
+
+
+def test_gpu_without_bitsandbytes_only_considers_unquantized_models():
+    assert choose(machine("a100-80gb", bitsandbytes=False))["quantization"] == "none"
+    # 24 GB cannot hold the 14B model unquantized: falls back to the CPU backend
+    assert choose(machine("l4-24gb", bitsandbytes=False))["backend"] == "cpu"
+
+
+def test_gpu_without_torch_uses_the_cpu_backend():
+    assert choose(machine("a100-80gb", torch=False))["backend"] == "cpu"
+
+
+@pytest.mark.parametrize("profile, model, batch_size", [
+    ("cpu-16c-32gb", "Qwen/Qwen2.5-Coder-3B-Instruct", 4),
+    ("cpu-4c-8gb", "Qwen/Qwen2.5-Coder-1.5B-Instruct", 1),
+])
+def test_cpu_profiles_size_the_model_by_ram_and_cores(profile, model, batch_size):
+    settings = choose(machine(profile))
+
+    assert (settings["backend"], settings["model_id"], settings["quantization"]) == ("cpu", model, "none")
+    assert (settings["batch_size"], settings["vision"]) == (batch_size, False)
+    assert settings["cpu_threads"] == PROFILES[profile]["cpu_count"] // 2
+    assert 0 < settings["max_new_tokens"] <= min(2048, settings["kv_cache_tokens"] // 2)
+
+
+def test_small_machines_get_the_smallest_model():
+    hardware = {**machine("cpu-4c-8gb"), "cpu_count": 1, "ram_gb": 4}
+    settings = choose(hardware)
+
+    assert settings["model_id"] == "Qwen/Qwen2.5-Coder-0.5B-Instruct"
+    assert (settings["cpu_threads"], settings["tool_workers"], settings["batch_size"]) == (1, 2, 1)
+    assert settings["max_caches"] >= 8
+
+
+def test_reranker_needs_ram_and_sentence_transformers():
+    assert choose(machine("cpu-4c-8gb"))["reranker"] is True
+    assert choose(machine("cpu-4c-8gb", sentence_transformers=False))["reranker"] is False
+    assert choose({**machine("cpu-4c-8gb"), "ram_gb": 4})["reranker"] is False
@@ -0,0 +1,94 @@
+import sqlite3
+
+import pytest
+
+from src.core.inventory import InventoryIndex
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "inventory.db")
+    conn = sqlite3.connect(path)
+    conn.execute('''CREATE TABLE inventory (id INTEGER PRIMARY KEY AUTOINCREMENT, store_id INTEGER, sku TEXT,
+                    name TEXT, stock INTEGER, low_stock_threshold INTEGER, updated_at TEXT)''')
+    conn.executemany("INSERT INTO inventory (store_id, sku, name, stock, low_stock_threshold, updated_at) "
+                     "VALUES (?, ?, ?, ?, ?, ?)",
+                     [(1, "BB-M", "Bỉm Bobby Size M", 40, 10, "2025-01-01 08:00:00"),
+                      (1, "MJ-9", "Sữa Meiji Số 9", 3, 10, "2025-01-01 08:00:00"),
+                      (2, "MJ-9", "Sữa Meiji Số 9", 50, 10, "2025-01-01 08:00:00")])
+    conn.commit()
+    yield path, conn
+    conn.close()
+
+
+def names(rows):
+    return [(r["name"], r["store_id"], r["stock"]) for r in rows]
+
+
+def test_search_prefix_fuzzy_and_store_filter(db):
+    index = InventoryIndex(db[0])
+    assert index.refresh() == 3
+    assert names(index.search("sua mei", store_id=2)) == [("Sữa Meiji Số 9", 2, 50)]
+    fuzzy = index.search("bim boby", store_id=1)
+    assert fuzzy and fuzzy[0]["name"] == "Bỉm Bobby Size M" and fuzzy[0]["match"] == "fuzzy"
+    assert index.search("bim bobby", store_id=2) == []
+    assert names(index.low_stock(1)) == [("Sữa Meiji Số 9", 1, 3)]
+
+
+def test_incremental_refresh_applies_only_newer_rows(db):
+    path, conn = db
+    index = InventoryIndex(path)
+    index.refresh()
+    conn.execute("UPDATE inventory SET stock = 7, updated_at = '2025-01-02 08:00:00' WHERE id = 1")
+    conn.commit()
+    assert index.refresh(full=False) == 1
+    assert index.search("bim bobby", store_id=1)[0]["stock"] == 7
+
+
+def test_reconcile_drops_deleted_rows(db):
+    path, conn = db
+    index = InventoryIndex(path)
+    index.refresh()
+    conn.execute("DELETE FROM inventory WHERE id = 2")
+    conn.commit()
+    index.refresh(full=False)
+    assert index.search("meiji", store_id=1)  # Incremental refresh cannot see deletes
+    index.refresh(full=True)
+    assert index.search("meiji", store_id=1) == []
+    assert index.low_stock(1) == []
+    assert index.stats()["rows"] == 2
+    assert names(index.search("meiji", store_id=2)) == [("Sữa Meiji Số 9", 2, 50)]
+
+
+def test_reconcile_picks_up_rows_behind_the_watermark(db):
+    path, conn = db
+    index = InventoryIndex(path)
+    conn.execute("UPDATE inventory SET updated_at = '2025-01-05 08:00:00' WHERE id = 3")
+    conn.commit()
+    index.refresh()
+    conn.execute("INSERT INTO inventory (store_id, sku, name, stock, low_stock_threshold, updated_at) "
+                 "VALUES (1, 'KU', 'Khăn ướt Mamamy', 12, 5, '2025-01-01 09:00:00')")  # Back-dated import
+    conn.execute("UPDATE inventory SET name = 'Bỉm Bobby Size L', updated_at = '2025-01-01 09:00:00' WHERE id = 1")
+    conn.commit()
+    assert index.refresh(full=False) == 0
+    index.refresh(full=True)
+    assert names(index.search("khan uot", store_id=1)) == [("Khăn ướt Mamamy", 1, 12)]
+    assert index.search("bobby size l", store_id=1)[0]["name"] == "Bỉm Bobby Size L"
+    assert "Bỉm Bobby Size M" not in [r["name"] for r in index.search("bobby size m", store_id=1)]
+
+
+def test_reconcile_runs_on_schedule(db):
+    path, conn = db
+    index = InventoryIndex(path, reconcile_seconds=0)
+    index.refresh()
+    conn.execute("DELETE FROM inventory WHERE id = 1")
+    conn.commit()
+    index.refresh()
+    assert "Bỉm Bobby Size M" not in [r["name"] for r in index.search("bim bobby size m", store_id=1)]
+
+
+def test_check_inventory_requires_store(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROJECT_A_DB_PATH", str(tmp_path / "project_a.db"))
+    from src.core.saas_api import SaasAPI
+    with pytest.raises(ValueError):
+        SaasAPI().check_inventory("Sữa Meiji", None)
@@ -0,0 +1,69 @@
+import datetime
+import sqlite3
+
+import pytest
+
+from src.core.lunar_calendar import LunarCalendar
+
+
+@pytest.fixture(scope="module")
+def calendar():
+    return LunarCalendar(2022, 2026)
+
+
+@pytest.mark.parametrize("solar, lunar", [
+    ("2023-01-22", (2023, 1, 1, False)),   # Tết Quý Mão
+    ("2024-02-10", (2024, 1, 1, False)),   # Tết Giáp Thìn
+    ("2025-01-29", (2025, 1, 1, False)),   # Tết Ất Tỵ
+    ("2025-01-28", (2024, 12, 29, False)),  # Giao thừa: the lunar year ends on a 29-day month
+    ("2024-09-17", (2024, 8, 15, False)),  # Trung Thu
+    ("2023-03-22", (2023, 2, 1, True)),    # First day of the leap 2nd month
+    ("2025-07-25", (2025, 6, 1, True)),    # First day of the leap 6th month
+])
+def test_solar_to_lunar(calendar, solar, lunar):
+    assert calendar.lunar(datetime.date.fromisoformat(solar)) == lunar
+
+
+def test_lunar_to_solar_round_trips(calendar):
+    for offset in range(0, len(calendar), 97):
+        year, month, day, leap = calendar.lunar(calendar.date(offset))
+        assert calendar.solar_offset(year, month, day, leap) == offset
+
+
+def test_lunar_to_solar_edges(calendar):
+    # Month 1 of 2024 has 29 days: day 30 maps to its last day
+    assert calendar.date(calendar.solar_offset(2024, 1, 30)) == datetime.date(2024, 3, 9)
+    assert calendar.solar_offset(2024, 2, 1, leap=True) is None  # 2024 has no leap 2nd month
+    assert calendar.solar_offset(2030, 1, 1) is None             # Outside the table
+
+
+def test_dates_outside_the_table_still_convert(calendar):
+    assert calendar.offset("2030-02-03") is None
+    assert calendar.lunar(datetime.date(2030, 2, 3)) == (2030, 1, 1, False)
+
+
+def test_events(calendar):
+    tet = [calendar.date(o).isoformat() for o in calendar.occurrences("tet")]
+    assert tet[1:4] == ["2023-01-22", "2024-02-10", "2025-01-29"]
+    assert calendar.date(calendar.occurrences("ong_tao")[2]) == datetime.date(2025, 1, 22)
+    assert calendar.date(calendar.occurrences("singles_day")[0]) == datetime.date(2022, 11, 11)
+
+    offsets = [e[4] for e in calendar.events]
+    assert offsets == sorted(offsets)
+    assert calendar.event_at[calendar.offset("2024-02-10")] == "Tết Nguyên Đán"
+
+
+def test_sql_mirror(calendar):
+    conn = sqlite3.connect(":memory:")
+
+    assert calendar.ensure_table(conn) is True
+    assert calendar.ensure_table(conn) is False  # Same range: left alone
+    assert conn.execute("SELECT COUNT(*) FROM lunar_calendar").fetchone()[0] == len(calendar)
+    assert conn.execute("SELECT lunar_year, lunar_month, lunar_day, leap, event FROM lunar_calendar "
+                        "WHERE solar_date = '2024-02-10'").fetchone() == (2024, 1, 1, 0, "Tết Nguyên Đán")
+    assert conn.execute("SELECT solar_date FROM lunar_events WHERE event = 'trung_thu' AND year = 2024"
+                        ).fetchone() == ("2024-09-17",)
+
+    assert LunarCalendar(2024, 2024).ensure_table(conn) is True  # Different range: rebuilt
+    assert conn.execute("SELECT MIN(solar_date), MAX(solar_date) FROM lunar_calendar").fetchone() == (
+        "2024-01-01", "2024-12-31")
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import logging
+
+import pytest
+
+from src.core import metrics
+from src.core.metrics import Registry
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    """Metrics on for one test, with a fresh trace log; restored afterwards."""
+    monkeypatch.setattr(metrics.registry, "enabled", True)
+    monkeypatch.setattr(metrics, "traces", metrics.TraceLog(max_traces=2))
+
+
+@pytest.fixture
+def json_records(monkeypatch):
+    """Switches log_status to structured output and collects the emitted records."""
+    records = []
+
+    class Collect(logging.Handler):
+        def emit(self, record):
+            records.append(json.loads(record.getMessage()))
+
+    handler = Collect()
+    level = metrics._logger.level
+    monkeypatch.setattr(metrics, "_structured", True)
+    metrics._logger.addHandler(handler)
+    metrics._logger.setLevel(logging.INFO)
+    yield records
+    metrics._logger.removeHandler(handler)
+    metrics._logger.setLevel(level)
+
+
+def test_counter_and_gauge_render():
+    registry = Registry()
+    registry.enabled = True
+    requests = registry.counter("req_total", "Requests.", ("path", "status"))
+    requests.inc(path="/chat", status=200)
+    requests.inc(2, path="/chat", status=200)
+    requests.inc(path='/a"b', status=500)
+    registry.gauge("queue_depth", "Depth.", fn=lambda: 7)
+
+    assert registry.render().splitlines() == [
+        "# HELP req_total Requests.", "# TYPE req_total counter",
+        'req_total{path="/a\\"b",status="500"} 1',
+        'req_total{path="/chat",status="200"} 3',
+        "# HELP queue_depth Depth.", "# TYPE queue_depth gauge",
+        "queue_depth 7",
+    ]
+    assert registry.counter("req_total", "ignored") is requests
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    registry.enabled = True
+    latency = registry.histogram("lat", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+
+    assert registry.render().splitlines()[2:] == [
+        'lat_bucket{le="0.1"} 2', 'lat_bucket{le="1.0"} 3', 'lat_bucket{le="+Inf"} 4',
+        "lat_sum 3.65", "lat_count 4"]
+
+
+def test_disabled_registry_records_nothing():
+    registry = Registry()
+    registry.counter("c", "C.").inc()
+    registry.histogram("h", "H.").observe(1.0)
+
+    assert registry.render() == "# HELP c C.\n# TYPE c counter\n# HELP h H.\n# TYPE h histogram\n"
+    assert metrics.stage("anything") is metrics._NULL_STAGE
+
+
+def test_stages_land_in_the_trace_and_histogram(enabled):
+    @metrics.timed("unit.work")
+    def work():
+        return 42
+
+    with metrics.trace("/chat", trace_id="t1"):
+        with metrics.stage("rag.search", docs=3) as info:
+            info["hits"] = 2
+        assert work() == 42
+    assert metrics.current_trace() is None
+
+    stored = metrics.traces.get("t1")
+    assert stored["name"] == "/chat" and stored["total_ms"] >= 0
+    assert [(s["stage"], s.get("docs"), s.get("hits")) for s in stored["stages"]] == [
+        ("rag.search", 3, 2), ("unit.work", None, None)]
+    assert 'project_a_stage_seconds_count{stage="unit.work"}' in metrics.registry.render()
+
+
+def test_trace_is_inherited_by_tasks_and_threads(enabled):
+    async def handler():
+        async def child():
+            with metrics.stage("child.task"):
+                await asyncio.sleep(0)
+
+        def blocking():
+            with metrics.stage("child.thread"):
+                pass
+
+        with metrics.trace("/plan", trace_id="t2"):
+            await asyncio.gather(child(), asyncio.to_thread(blocking))
+
+    asyncio.run(handler())
+
+    assert sorted(s["stage"] for s in metrics.traces.get("t2")["stages"]) == ["child.task", "child.thread"]
+
+
+def test_trace_log_keeps_the_most_recent(enabled):
+    for trace_id in ("a", "b", "c"):
+        with metrics.trace("/chat", trace_id=trace_id):
+            pass
+
+    assert metrics.traces.get("a") is None
+    assert metrics.traces.get("c")["trace_id"] == "c"
+
+
+def test_log_status_prints_by_default(capsys):
+    metrics.log_status("    [Architect] Designing Logic...")
+    assert capsys.readouterr().out == "    [Architect] Designing Logic...\n"
+
+
+def test_log_status_json_records(enabled, json_records):
+    metrics.log_status("⚠️ [Engine] Slow decode", user_id=1)
+    with metrics.trace("/chat", trace_id="t3"):
+        metrics.log_status("    [Architect] Designing Logic...")
+    metrics.log_status("Florence failed to load", level="error")
+
+    warning, info, trace_record, error = json_records
+    assert (warning["level"], warning["msg"], warning["user_id"]) == ("warning", "⚠️ [Engine] Slow decode", 1)
+    assert "trace_id" not in warning
+    assert (info["level"], info["msg"], info["trace_id"]) == ("info", "[Architect] Designing Logic...", "t3")
+    assert (trace_record["msg"], trace_record["trace_id"]) == ("trace", "t3")
+    assert error["level"] == "error"
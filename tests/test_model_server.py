@@ -0,0 +1,191 @@
+import os
+import shutil
+import socket
+import stat
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from src.core.fake_llm import FakeCache, FakeCausalLM, FakeTokenizer  # noqa: E402
+from src.core.remote_engine import (ModelClient, RemoteEngine, RemoteError, recv_message,  # noqa: E402
+                                    send_message)
+from src.model_server import ModelServer  # noqa: E402
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to ~100 bytes, so not under pytest's tmp_path
+    directory = tempfile.mkdtemp(prefix="ms_", dir="/tmp")
+    yield os.path.join(directory, "models.sock")
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def serve_raw(path, handler):
+    """Minimal frame server: handler(request) -> reply, or None to close the connection."""
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen()
+
+    def connection(conn):
+        with conn:
+            try:
+                while (request := recv_message(conn)) is not None:
+                    reply = handler(request)
+                    if reply is None:
+                        return
+                    send_message(conn, reply)
+            except OSError:  # Client dropped the connection with a reply unread
+                return
+
+    def accept():
+        while True:
+            conn, _ = listener.accept()
+            threading.Thread(target=connection, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    return listener
+
+
+class StubEngine:
+    """The ModelEngine surface ModelServer uses, on the fake backend with no simulated latency."""
+    def __init__(self):
+        tokenizer = FakeTokenizer()
+        self.config = SimpleNamespace(models={"architect": "fake-qwen", "designer": "fake-qwen"}, llm_backend="fake")
+        asset = {"model": FakeCausalLM(tokenizer, first_token_ms=0, tokens_per_second=10 ** 9,
+                                       prefill_tokens_per_second=10 ** 9),
+                 "tokenizer": tokenizer, "lock": threading.Lock(), "new_cache": FakeCache}
+        self.loaded_models = {"architect": asset, "designer": asset}
+
+    def load_model(self, role):
+        return self.loaded_models[role]
+
+    def new_cache(self, role):
+        return FakeCache()
+
+
+@pytest.fixture
+def model_server(socket_path):
+    server = ModelServer(StubEngine(), max_caches=2)
+    threading.Thread(target=server.serve, args=(socket_path,), daemon=True).start()
+    for _ in range(200):
+        if os.path.exists(socket_path):
+            break
+        time.sleep(0.01)
+    return server
+
+
+def test_frames_round_trip():
+    a, b = socket.socketpair()
+    payload = {"method": "encode", "params": {"text": "Doanh thu hôm nay " * 100000}}
+    sender = threading.Thread(target=send_message, args=(a, payload))
+    sender.start()
+    assert recv_message(b) == payload
+    sender.join()
+
+    a.close()
+    assert recv_message(b) is None
+    b.close()
+
+
+def test_timed_out_call_does_not_leak_its_reply(socket_path):
+    def handler(request):
+        if request["method"] == "slow":
+            time.sleep(0.3)
+        return {"result": request["method"]}
+
+    serve_raw(socket_path, handler)
+    client = ModelClient(socket_path, timeout=0.1)
+
+    with pytest.raises(TimeoutError):
+        client.call("slow")
+    # Same thread, so the same connection would be reused if it had been kept
+    assert client.call("fast") == "fast"
+    time.sleep(0.3)
+    assert client.call("fast") == "fast"
+
+
+def test_interrupted_call_drops_the_connection(socket_path, monkeypatch):
+    serve_raw(socket_path, lambda request: {"result": request["method"]})
+    client = ModelClient(socket_path)
+    assert client.call("first") == "first"
+    sock = client._local.sock
+
+    def interrupted(sock):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr("src.core.remote_engine.recv_message", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        client.call("second")
+    monkeypatch.undo()
+
+    assert client._local.sock is None and sock.fileno() == -1
+    assert client.call("third") == "third"
+
+
+def test_reconnects_once_when_the_server_closed_the_connection(socket_path):
+    calls = []
+
+    def handler(request):
+        calls.append(request["method"])
+        return None if len(calls) == 2 else {"result": len(calls)}  # Drop the 2nd request, like a restart
+
+    serve_raw(socket_path, handler)
+    client = ModelClient(socket_path)
+
+    assert client.call("a") == 1
+    assert client.call("b") == 3
+    assert calls == ["a", "b", "b"]
+
+
+def test_connection_lost_twice_raises(socket_path):
+    serve_raw(socket_path, lambda request: None)
+    with pytest.raises(RemoteError, match="closed the connection"):
+        ModelClient(socket_path).call("info")
+
+
+def test_socket_is_owner_only(model_server, socket_path):
+    assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+
+
+def test_remote_engine_over_the_model_server(model_server, socket_path):
+    engine = RemoteEngine(socket_path)
+    asset = engine.load_model("designer")
+    assert asset is engine.load_model("architect")  # Same model: one shared asset
+
+    tokenizer = asset["tokenizer"]
+    ids = tokenizer.encode("Xin chào")
+    assert tokenizer.decode(ids) == "Xin chào"
+    assert tokenizer.eos_token_id == 0
+
+    prompt = tokenizer.apply_chat_template([{"role": "user", "content": "Xin chào"}], tokenize=True,
+                                           add_generation_prompt=True)
+    cache = engine.new_cache("architect")
+    output = asset["model"].generate(torch.tensor([prompt]), max_new_tokens=4, past_key_values=cache,
+                                     return_dict_in_generate=True)
+    assert output.sequences.shape[1] == len(prompt) + 5
+    assert cache.get_seq_length() == len(prompt) + 4
+    cache.crop(2)
+    assert cache.get_seq_length() == 2
+    cache.close()
+    assert model_server._caches == {}
+
+
+def test_server_errors_are_raised_by_the_client(model_server, socket_path):
+    client = ModelClient(socket_path)
+    with pytest.raises(RemoteError, match="KeyError"):
+        client.call("encode", role="unknown", text="x")
+    with pytest.raises(RemoteError, match="vision is not loaded"):
+        client.call("vision", path="/tmp/x.png")
+    assert client.call("decode", role="architect", ids=client.call("encode", role="architect", text="ok")) == "ok"
+
+
+def test_server_caches_are_bounded(model_server):
+    for cache_id in ("a", "b", "c"):
+        model_server._cache("architect", cache_id)
+    assert list(model_server._caches) == ["b", "c"]
+    assert model_server.cache_crop("a", 0) == 0
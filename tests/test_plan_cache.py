@@ -0,0 +1,116 @@
+import pytest
+
+from src.core.memory import MemoryManager
+from src.core.plan_cache import HashingEmbedder, PlanCache, key_terms, scope_key
+
+POST_MORNING = "Tự động đăng bài lên Facebook mỗi ngày lúc 8 giờ sáng"
+ORDERS_WEBSITE = "Khi có đơn hàng mới trên website thì ghi vào Google Sheet"
+
+
+def plan(name):
+    return {"name": name, "steps": [name]}
+
+
+def make_cache(**kwargs):
+    return PlanCache(embedder=HashingEmbedder(), **kwargs)
+
+
+def test_exact_repeat_skips_embedding():
+    cache = make_cache()
+    cache.put(POST_MORNING, plan("post"))
+
+    hit, vector = cache.match("  tu dong dang bai len facebook moi ngay luc 8 gio sang ")
+
+    assert hit == {"plan": plan("post"), "prompt": POST_MORNING, "similarity": 1.0}
+    assert vector is None
+
+
+@pytest.mark.parametrize("prompt", [
+    "Hãy tự động đăng bài lên Facebook mỗi ngày lúc 8 giờ sáng",
+    "Tự động đăng bài lên Facebook mỗi ngày vào lúc 8 giờ sáng nhé",
+])
+def test_rephrased_prompt_reuses_plan(prompt):
+    cache = make_cache()
+    cache.put(POST_MORNING, plan("post"))
+
+    hit, _ = cache.match(prompt)
+
+    assert hit is not None and hit["plan"] == plan("post")
+    assert cache.threshold <= hit["similarity"] < 1.0
+
+
+@pytest.mark.parametrize("cached, prompt", [
+    (POST_MORNING, "Tự động đăng bài lên Facebook mỗi ngày lúc 8 giờ tối"),       # cosine 0.93
+    (POST_MORNING, "Tự động đăng bài lên Facebook mỗi ngày lúc 9 giờ sáng"),      # cosine 0.95
+    (POST_MORNING, "Tự động đăng bài lên Zalo mỗi ngày lúc 8 giờ sáng"),
+    (ORDERS_WEBSITE, "Khi có đơn hàng mới trên Shopee thì ghi vào Google Sheet"),  # cosine 0.90
+])
+def test_similar_prompt_with_different_details_misses(cached, prompt):
+    cache = make_cache()
+    cache.put(cached, plan("cached"))
+
+    hit, vector = cache.match(prompt)
+
+    assert hit is None
+    assert vector is not None
+
+
+def test_best_hit_with_matching_details_wins():
+    cache = make_cache(threshold=0.5)
+    cache.put("Tự động đăng bài lên Facebook mỗi ngày lúc 8 giờ tối", plan("evening"))
+    cache.put("Đăng bài lên Facebook lúc 8 giờ sáng mỗi ngày", plan("morning"))
+
+    hit, _ = cache.match(POST_MORNING)
+
+    assert hit["plan"] == plan("morning")
+
+
+def test_key_terms():
+    assert key_terms(POST_MORNING) == {"8", "facebook", "ngay", "sang"}
+    assert key_terms("Nhắc lúc 8h30 tối") == {"8h30", "toi"}
+    assert key_terms(ORDERS_WEBSITE) == {"website", "sheet"}
+
+
+def test_hits_are_scoped_to_the_context():
+    cache = make_cache()
+    cache.put(POST_MORNING, plan("shop a"), context={"store": "A"})
+
+    assert cache.match(POST_MORNING, context={"store": "B"})[0] is None
+    assert cache.match(POST_MORNING, context={"store": "A"})[0]["plan"] == plan("shop a")
+    assert scope_key(None) == scope_key({}) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = make_cache(max_entries=2)
+    cache.put("Gửi email cảm ơn khách VIP", plan("email"))
+    cache.put("Nhắn Zalo cho khách khi có hàng mới", plan("zalo"))
+    cache.match("Gửi email cảm ơn khách VIP")
+    cache.put(POST_MORNING, plan("post"))
+
+    assert cache.match("Nhắn Zalo cho khách khi có hàng mới")[0] is None
+    assert cache.match("Gửi email cảm ơn khách VIP")[0]["plan"] == plan("email")
+    assert cache.stats()["entries"] == 2
+
+
+def test_entries_persist_across_restarts(tmp_path):
+    memory = MemoryManager(db_path=str(tmp_path / "plans.db"))
+    first = make_cache(db_path=memory.db_path)
+    first.put(POST_MORNING, plan("post"))
+
+    second = make_cache(db_path=memory.db_path)
+
+    assert second.match("Hãy tự động đăng bài lên Facebook mỗi ngày lúc 8 giờ sáng")[0]["plan"] == plan("post")
+    memory.conn.close()
+
+
+def test_stats():
+    cache = make_cache()
+    cache.record(True, 2.0)
+    cache.record(False, 900.0)
+    cache.record(False, 1100.0)
+
+    stats = cache.stats()
+
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 2, 0.3333)
+    assert (stats["p50_hit_ms"], stats["p50_generation_ms"]) == (2.0, 1000.0)
+    assert stats["embedder"] == "hashing-512" and stats["threshold"] == 0.90
@@ -0,0 +1,81 @@
+import re
+import threading
+
+from src.core.prompt_builder import PromptBuilder
+
+
+class ChatMLTokenizer:
+    """Word-level tokenizer with a Qwen-style ChatML template; counts encode calls and their length."""
+    TOKEN_RE = re.compile(r"<\|im_start\|>|<\|im_end\|>|\w+|[^\w\s]|\s+")
+
+    def __init__(self):
+        self.vocab = {}
+        self.encoded_chars = 0
+        self._lock = threading.Lock()
+
+    def encode(self, text, add_special_tokens=False):
+        self.encoded_chars += len(text)
+        with self._lock:
+            return [self.vocab.setdefault(t, len(self.vocab)) for t in self.TOKEN_RE.findall(text)]
+
+    def apply_chat_template(self, messages, tokenize=False, add_generation_prompt=False):
+        text = "".join(f"<|im_start|>{m['role']}\n{m['content']}<|im_end|>\n" for m in messages)
+        return text + ("<|im_start|>assistant\n" if add_generation_prompt else "")
+
+
+def full_ids(tokenizer, system, messages, add_generation_prompt=True):
+    return tokenizer.encode(tokenizer.apply_chat_template(
+        [{"role": "system", "content": system}] + messages, add_generation_prompt=add_generation_prompt))
+
+
+def test_build_matches_encoding_the_whole_template():
+    tokenizer = ChatMLTokenizer()
+    builder = PromptBuilder(tokenizer)
+    messages = [{"role": "user", "content": "Doanh thu hôm nay?"}, {"role": "assistant", "content": "10 triệu"},
+                {"role": "user", "content": "Còn hôm qua?"}]
+    assert builder.build("manager", "Bạn là quản lý cửa hàng.", messages) == \
+        full_ids(tokenizer, "Bạn là quản lý cửa hàng.", messages)
+
+
+def test_static_system_block_is_tokenized_once_per_persona_and_content():
+    tokenizer = ChatMLTokenizer()
+    builder = PromptBuilder(tokenizer)
+    system = "Bạn là quản lý cửa hàng. " * 50
+    builder.build("manager", system, [{"role": "user", "content": "a"}])
+    first = tokenizer.encoded_chars
+    builder.build("manager", system, [{"role": "user", "content": "b"}])
+    assert tokenizer.encoded_chars - first < len(system) / 2  # Only the new turn is encoded
+    builder.build("coder", system, [{"role": "user", "content": "b"}])
+    builder.build("manager", system + "!", [{"role": "user", "content": "b"}])
+    assert builder.stats() == {"entries": 3, "hits": 1, "misses": 3}
+
+
+def test_cache_is_bounded_and_invalidated_per_persona():
+    builder = PromptBuilder(ChatMLTokenizer(), max_entries=2)
+    for i in range(3):
+        builder.build("manager", f"system {i}", [])
+    assert builder.stats()["entries"] == 2
+    builder.build("coder", "system", [])
+    builder.invalidate("manager")
+    assert builder.stats()["entries"] == 1
+    builder.invalidate()
+    assert builder.stats()["entries"] == 0
+
+
+def test_continuation_appends_a_turn_to_an_open_reply():
+    tokenizer = ChatMLTokenizer()
+    builder = PromptBuilder(tokenizer)
+    first = builder.build("manager", "sys", [{"role": "user", "content": "Hỏi"}])
+    reply = tokenizer.encode("Trả lời")
+    turn = builder.continuation([{"role": "user", "content": "Tiếp"}])
+    assert first + reply + turn == full_ids(tokenizer, "sys", [
+        {"role": "user", "content": "Hỏi"}, {"role": "assistant", "content": "Trả lời"},
+        {"role": "user", "content": "Tiếp"}])
+
+
+def test_count_tokens_and_build_text():
+    tokenizer = ChatMLTokenizer()
+    builder = PromptBuilder(tokenizer)
+    messages = [{"role": "user", "content": "Xin chào"}]
+    assert builder.count_tokens("manager", "sys", messages) == len(full_ids(tokenizer, "sys", messages))
+    assert builder.build_text("sys", messages).endswith("<|im_start|>assistant\n")
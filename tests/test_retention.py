@@ -0,0 +1,98 @@
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.core.memory import MemoryManager
+from src.core.retention import HistoryRetention, summarize_turns
+
+NOW = datetime(2025, 6, 15, 12, 0, 0)
+
+
+@pytest.fixture
+def memory(tmp_path):
+    return MemoryManager(str(tmp_path / "project_a.db"))
+
+
+@pytest.fixture
+def retention(memory, tmp_path):
+    return HistoryRetention(memory.db_path, str(tmp_path / "archive"), hot_days=30, keep_turns=100, batch_rows=7)
+
+
+def add_turns(memory, user_id, store_id, days_ago, questions):
+    for i, question in enumerate(questions):
+        at = (NOW - timedelta(days=days_ago, minutes=len(questions) - i)).isoformat()
+        memory.conn.executemany("INSERT INTO history (role, content, timestamp, user_id, store_id) VALUES (?, ?, ?, ?, ?)",
+                                [("user", question, at, user_id, store_id), ("assistant", "Dạ.", at, user_id, store_id)])
+    memory.conn.commit()
+
+
+def hot(memory, user_id, store_id):
+    return [r[0] for r in memory.conn.execute("SELECT content FROM history WHERE user_id = ? AND store_id = ? "
+                                              "AND role = 'user' ORDER BY id", (user_id, store_id))]
+
+
+def archived(retention, month):
+    with gzip.open(os.path.join(retention.archive_dir, f"{month}.jsonl.gz"), "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_summarize_turns_merges_distinct_questions():
+    rows = [("user", "Doanh thu  hôm nay?", ""), ("assistant", "10tr", ""), ("user", "Doanh thu hôm nay?", "")]
+    assert summarize_turns(rows, ["Tồn kho bỉm?"]) == ["Tồn kho bỉm?", "Doanh thu hôm nay?"]
+    assert len(summarize_turns([("user", f"q{i}", "") for i in range(20)], max_topics=8)) == 8
+
+
+def test_old_turns_are_summarized_archived_and_deleted(memory, retention):
+    add_turns(memory, 1, 1, 90, ["Doanh thu tháng 3?", "Tồn kho sữa?"])   # 2025-03
+    add_turns(memory, 1, 1, 60, ["Khách VIP là ai?"] * 6)                 # 2025-04, 12 rows > batch_rows
+    add_turns(memory, 1, 1, 2, ["Hôm nay bán được bao nhiêu?"])
+
+    result = retention.run_once(NOW)
+    assert result["compacted"] == 16 and result["archived"] == 16 and result["hot_rows"] == 2
+    assert hot(memory, 1, 1) == ["Hôm nay bán được bao nhiêu?"]
+    summaries = {s["month"]: s for s in memory.get_summaries(1, 1)}
+    assert set(summaries) == {"2025-03", "2025-04"}
+    assert summaries["2025-04"]["turns"] == 12
+    assert "Khách VIP là ai?" in summaries["2025-04"]["summary"]
+    assert [r["content"] for r in archived(retention, "2025-03") if r["role"] == "user"] == \
+        ["Doanh thu tháng 3?", "Tồn kho sữa?"]
+    assert len(archived(retention, "2025-04")) == 12  # Two batches, two gzip members
+
+    assert retention.run_once(NOW)["compacted"] == 0
+
+
+def test_keep_turns_and_repeated_compaction_merge_into_one_summary(memory, retention):
+    retention.set_policy(2, 0, keep_turns=4, archive=False)
+    add_turns(memory, 2, 0, 1, ["Câu 1", "Câu 2", "Câu 3"])
+    retention.run_once(NOW)
+    assert hot(memory, 2, 0) == ["Câu 2", "Câu 3"]
+
+    add_turns(memory, 2, 0, 0, ["Câu 4"])
+    retention.run_once(NOW)
+    assert hot(memory, 2, 0) == ["Câu 3", "Câu 4"]
+    [summary] = memory.get_summaries(2, 0)
+    assert summary["turns"] == 4 and "Câu 1; Câu 2" in summary["summary"]
+    assert not os.path.exists(retention.archive_dir)  # Policy: no archive for this tenant
+
+
+def test_policies_are_per_tenant(memory, retention):
+    retention.set_policy(1, 1, hot_days=365)
+    add_turns(memory, 1, 1, 90, ["Giữ lại"])
+    add_turns(memory, 1, 2, 90, ["Dọn đi"])
+    add_turns(memory, 3, 0, 90, ["Dọn đi"])
+    retention.run_once(NOW)
+    assert hot(memory, 1, 1) == ["Giữ lại"]
+    assert hot(memory, 1, 2) == [] and hot(memory, 3, 0) == []
+    assert retention.policy(1, 1) == {"hot_days": 365, "keep_turns": 100, "archive": True}
+
+
+def test_expired_archives_are_removed(memory, tmp_path):
+    retention = HistoryRetention(memory.db_path, str(tmp_path / "archive"), archive_months=2)
+    add_turns(memory, 1, 1, 120, ["Rất cũ"])   # 2025-02
+    add_turns(memory, 1, 1, 45, ["Cũ"])        # 2025-05
+    retention.run_once(NOW)
+    assert retention.last_run["expired_archives"] == 1
+    assert sorted(os.listdir(retention.archive_dir)) == ["2025-05.jsonl.gz"]
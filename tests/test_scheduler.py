@@ -0,0 +1,85 @@
+import pytest
+
+from src.core.memory import MemoryManager
+from src.core.scheduler import HealthScheduler
+
+TODAY = "2025-03-01"
+
+
+@pytest.fixture
+def memory(tmp_path):
+    # Seeded with store 1 (sales today, two low-stock items) and store 2 (no sales, no stock rows).
+    memory = MemoryManager(db_path=str(tmp_path / "health.db"))
+    memory.conn.execute("UPDATE sales SET date = ?", (TODAY,))
+    memory.conn.commit()
+    yield memory
+    memory.conn.close()
+
+
+@pytest.fixture
+def notified(memory):
+    writes = []
+    memory.add_write_listener(lambda table, store_id: writes.append((table, store_id)))
+    return writes
+
+
+def stored_alerts(memory):
+    rows = memory.conn.execute("SELECT store_id, message FROM alerts ORDER BY store_id, id").fetchall()
+    return [tuple(r) for r in rows]
+
+
+def test_compute_batches_revenue_and_low_stock(memory):
+    alerts = HealthScheduler(memory).compute(TODAY)
+
+    assert alerts == {1: ["📦 Sắp hết hàng: Áo Khoác Gió, Sữa Meiji Số 9"],
+                      2: [HealthScheduler.NO_REVENUE]}
+
+
+def test_low_stock_list_is_capped(memory):
+    memory.conn.executemany("INSERT INTO inventory (store_id, sku, name, stock, low_stock_threshold) "
+                            "VALUES (2, ?, ?, ?, 10)", [(f"SKU-{i}", f"Item {i}", i) for i in range(4)])
+    memory.conn.commit()
+
+    alerts = HealthScheduler(memory, max_items=2).compute(TODAY)
+
+    assert alerts[2][1] == "📦 Sắp hết hàng: Item 0, Item 1 (+2)"
+
+
+def test_run_once_rewrites_only_changed_stores(memory, notified):
+    scheduler = HealthScheduler(memory)
+
+    first = scheduler.run_once(TODAY)
+    assert (first["stores"], first["stores_with_alerts"], first["changed_stores"]) == (2, 2, 2)
+    assert sorted(notified) == [("alerts", 1), ("alerts", 2)]
+    assert stored_alerts(memory) == [(1, "📦 Sắp hết hàng: Áo Khoác Gió, Sữa Meiji Số 9"),
+                                     (2, HealthScheduler.NO_REVENUE)]
+
+    notified.clear()
+    assert scheduler.run_once(TODAY)["changed_stores"] == 0
+    assert notified == []
+
+    # Restocking clears store 1's alert; store 2 is left untouched.
+    memory.conn.execute("UPDATE inventory SET stock = 100 WHERE store_id = 1")
+    memory.conn.commit()
+    assert scheduler.run_once(TODAY)["changed_stores"] == 1
+    assert notified == [("alerts", 1)]
+    assert stored_alerts(memory) == [(2, HealthScheduler.NO_REVENUE)]
+
+
+def test_recent_runs_newest_first(memory):
+    scheduler = HealthScheduler(memory)
+    scheduler.run_once(TODAY)
+    scheduler.run_once(TODAY)
+
+    runs = scheduler.recent_runs()
+
+    assert [r["changed_stores"] for r in runs] == [0, 2]
+    assert all(r["stores"] == 2 and r["alerts"] == 2 for r in runs)
+    assert len(scheduler.recent_runs(limit=1)) == 1
+
+
+def test_slow_run_is_reported(memory, capsys):
+    scheduler = HealthScheduler(memory, window_seconds=-1)
+    scheduler.run_once(TODAY)
+
+    assert "[Health] Run took" in capsys.readouterr().out
@@ -0,0 +1,132 @@
+import asyncio
+import time
+
+from src.core.search import LocalSearchProvider, SearchCache, SearchProvider, WebResearch
+
+
+class CountingProvider(SearchProvider):
+    """Returns canned results per query and records every call and how many overlap."""
+    name = "counting"
+
+    def __init__(self, results=None, fail=(), delay=0.02):
+        self.results = results or {}
+        self.fail = set(fail)
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def search(self, query, max_results=4):
+        self.calls.append(query)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if query in self.fail:
+                raise RuntimeError("rate limited")
+            return self.results.get(query, [])[:max_results]
+        finally:
+            self.in_flight -= 1
+
+
+def _doc(title, url, snippet="..."):
+    return {"title": title, "url": url, "snippet": snippet}
+
+
+def test_reformulate_adds_plain_and_market_scoped_variants():
+    assert WebResearch.reformulate("Xu hướng cà phê") == [
+        "Xu hướng cà phê", "xu huong ca phe", "Xu hướng cà phê bán lẻ Việt Nam"]
+    # Already tone-free and already scoped to Vietnam: nothing to add.
+    assert WebResearch.reformulate("gia ca phe viet nam") == ["gia ca phe viet nam"]
+
+
+def test_gather_fans_out_in_parallel_and_dedupes():
+    query = "Xu hướng cà phê"
+    variants = WebResearch.reformulate(query)
+    provider = CountingProvider({
+        variants[0]: [_doc("A", "https://www.a.vn/x/"), _doc("B", "https://b.vn/y")],
+        variants[1]: [_doc("A copy", "https://a.vn/x"), _doc("C", "https://c.vn/z")],
+        variants[2]: [_doc("b", "https://other.vn/b"), _doc("D", "https://d.vn/w")],
+    })
+    research = WebResearch(provider, max_snippets=10)
+
+    results = asyncio.run(research.gather(query))
+
+    assert sorted(provider.calls) == sorted(variants)
+    assert provider.max_in_flight == len(variants)
+    # Same URL modulo www./trailing slash and same normalized title are dropped;
+    # the merge is round-robin, so rank-0 "b" wins over rank-1 "B".
+    assert [r["title"] for r in results] == ["A", "b", "C", "D"]
+
+
+def test_gather_caps_snippets_and_survives_provider_errors():
+    query = "Xu hướng cà phê"
+    variants = WebResearch.reformulate(query)
+    provider = CountingProvider({variants[0]: [_doc(f"T{i}", f"https://s.vn/{i}") for i in range(4)]},
+                                fail={variants[1]})
+    research = WebResearch(provider, max_snippets=3)
+
+    results = asyncio.run(research.gather(query))
+
+    assert [r["title"] for r in results] == ["T0", "T1", "T2"]
+
+
+def test_cache_serves_repeat_queries(tmp_path):
+    cache = SearchCache(str(tmp_path / "search.db"))
+    provider = CountingProvider({"gia ca phe viet nam": [_doc("A", "https://a.vn")]})
+    research = WebResearch(provider, cache=cache)
+
+    first = asyncio.run(research.gather("gia ca phe viet nam"))
+    second = asyncio.run(research.gather("gia ca phe viet nam"))
+
+    assert first == second == [_doc("A", "https://a.vn")]
+    assert provider.calls == ["gia ca phe viet nam"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_does_not_store_empty_results(tmp_path):
+    cache = SearchCache(str(tmp_path / "search.db"))
+    provider = CountingProvider()
+    research = WebResearch(provider, cache=cache)
+
+    asyncio.run(research.gather("gia ca phe viet nam"))
+    asyncio.run(research.gather("gia ca phe viet nam"))
+
+    assert len(provider.calls) == 2
+
+
+def test_cache_key_ignores_case_and_spacing():
+    assert SearchCache.key("ddgs", "Giá  Cà phê", 4) == SearchCache.key("ddgs", "giá cà phê ", 4)
+    assert SearchCache.key("ddgs", "giá cà phê", 4) != SearchCache.key("local", "giá cà phê", 4)
+    assert SearchCache.key("ddgs", "giá cà phê", 4) != SearchCache.key("ddgs", "giá cà phê", 8)
+
+
+def test_cache_ttl_and_purge(tmp_path):
+    cache = SearchCache(str(tmp_path / "search.db"), ttl_seconds=60)
+    cache.put("fresh", "local", "q1", [_doc("A", "https://a.vn")])
+    cache.put("stale", "local", "q2", [_doc("B", "https://b.vn")])
+    cache.conn.execute("UPDATE search_cache SET created_at = ? WHERE key = 'stale'", (time.time() - 120,))
+
+    assert cache.get("stale") is None
+    assert cache.get("fresh") == [_doc("A", "https://a.vn")]
+    assert cache.purge_expired() == 1
+    assert cache.conn.execute("SELECT key FROM search_cache").fetchall() == [("fresh",)]
+
+
+def test_local_provider_ranks_by_term_overlap(tmp_path):
+    (tmp_path / "coffee.txt").write_text("ca phe sua da ban chay mua he", encoding="utf-8")
+    (tmp_path / "tea.txt").write_text("tra sua tran chau", encoding="utf-8")
+    provider = LocalSearchProvider.from_directory(str(tmp_path))
+
+    results = asyncio.run(provider.search("Cà phê sữa", max_results=4))
+
+    assert [r["title"] for r in results] == ["coffee.txt #1", "tea.txt #1"]
+    assert asyncio.run(provider.search("bánh mì")) == []
+
+
+def test_compact_numbers_and_truncates():
+    research = WebResearch(CountingProvider(), snippet_chars=20)
+    text = research.compact([_doc("Title ", "https://www.shop.vn/p", "one two   three four five six seven")])
+
+    assert text == "[1] Title (shop.vn)\none two three four…"
+    assert research.compact([]) == "Search returned no results."
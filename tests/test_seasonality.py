@@ -0,0 +1,105 @@
+import datetime
+import sqlite3
+
+import pytest
+
+from src.core.lunar_calendar import LunarCalendar
+from src.core.seasonality import SeasonalityIndex
+
+TODAY = datetime.date(2025, 1, 15)
+
+
+@pytest.fixture(scope="module")
+def calendar():
+    return LunarCalendar(2021, 2026)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "sales.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE sales (id INTEGER PRIMARY KEY, store_id INTEGER, date TEXT, amount REAL, category TEXT)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def add_sales(db_path, rows):
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO sales (store_id, date, amount, category) VALUES (?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def days(start, end):
+    day = datetime.date.fromisoformat(start)
+    while day <= datetime.date.fromisoformat(end):
+        yield day.isoformat()
+        day += datetime.timedelta(days=1)
+
+
+def test_daily_series_per_store_and_category(db_path, calendar):
+    add_sales(db_path, [(1, "2025-01-15", 100, "Milk"), (1, "2025-01-15 18:30:00", 50, "Diapers"),
+                        (2, "2025-01-15", 999, "Milk"), (1, "1980-01-01", 7, "Milk")])  # Last one: off the table
+    index = SeasonalityIndex(db_path, calendar=calendar)
+    day = calendar.offset(TODAY)
+
+    assert index.daily(1)[day] == 150
+    assert index.daily(1, "Milk")[day] == 100
+    assert index.daily(1, "Unknown").sum() == 0
+    assert index.store_categories(1) == ["Diapers", "Milk"]
+    assert index.daily(3).sum() == 0
+
+
+def test_refresh_is_incremental_and_throttled(db_path, calendar):
+    add_sales(db_path, [(1, "2025-01-15", 100, "Milk")])
+    index = SeasonalityIndex(db_path, calendar=calendar, refresh_seconds=3600)
+    assert index.refresh(force=True) == 1
+
+    add_sales(db_path, [(1, "2025-01-15", 20, "Milk")])
+    assert index.daily(1)[calendar.offset(TODAY)] == 100  # Within refresh_seconds: not reloaded yet
+    assert index.refresh(force=True) == 1                  # Only the new row
+    assert index.daily(1)[calendar.offset(TODAY)] == 120
+
+
+def test_lunar_yoy_aligns_on_the_lunar_date(db_path, calendar):
+    # 2025-02-05 is 8/1 Ất Tỵ; 8/1 Giáp Thìn was 2024-02-17, while 2024-02-05 was still before Tết
+    add_sales(db_path, [(1, d, 100, "Milk") for d in days("2025-01-30", "2025-02-05")] +
+                       [(1, d, 50, "Milk") for d in days("2024-02-11", "2024-02-17")] +
+                       [(1, d, 10, "Milk") for d in days("2024-01-30", "2024-02-05")])
+    index = SeasonalityIndex(db_path, calendar=calendar)
+
+    result = index.lunar_yoy(1, today=datetime.date(2025, 2, 5))
+
+    assert result["lunar_date"] == "8/1/2025"
+    assert result["lunar_aligned_date"] == "2024-02-17"
+    assert (result["current"], result["lunar_last_year"], result["solar_last_year"]) == (700, 350, 70)
+    assert (result["lunar_change_pct"], result["solar_change_pct"]) == (100.0, 900.0)
+
+
+def test_yoy_without_history_has_no_change(db_path, calendar):
+    add_sales(db_path, [(1, "2025-01-15", 100, "Milk")])
+    result = SeasonalityIndex(db_path, calendar=calendar).lunar_yoy(1, today=TODAY)
+
+    assert result["lunar_last_year"] == 0 and result["lunar_change_pct"] is None
+
+
+def test_upcoming_events_use_past_uplift(db_path, calendar):
+    # A flat 100/day, tripled over the 7 days up to each past Tết
+    tet = {calendar.date(o).isoformat() for o in calendar.occurrences("tet")}
+    rush = {d for t in tet for d in days((datetime.date.fromisoformat(t) - datetime.timedelta(days=6)).isoformat(), t)}
+    add_sales(db_path, [(1, d, 300 if d in rush else 100, "Milk") for d in days("2021-01-01", TODAY.isoformat())])
+    index = SeasonalityIndex(db_path, calendar=calendar)
+
+    events = {e["event"]: e for e in index.upcoming_events(1, today=TODAY, days_ahead=20)}
+
+    assert set(events) == {"ong_tao", "tet"}
+    tet = events["tet"]
+    assert (tet["date"], tet["days_until"], tet["kind"]) == ("2025-01-29", 14, "lunar")
+    assert (tet["uplift"], tet["years_used"], tet["expected_revenue"]) == (3.0, 3, 2100)
+    assert tet["last_year_revenue"] == 2100
+
+
+def test_today_outside_the_calendar_is_rejected(db_path, calendar):
+    with pytest.raises(ValueError, match="outside the lunar calendar"):
+        SeasonalityIndex(db_path, calendar=calendar).lunar_yoy(1, today=datetime.date(2030, 1, 1))
@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+from src.core.tool_calling import ToolRegistry, parse_tool_calls
+
+
+@pytest.fixture
+def registry():
+    registry = ToolRegistry(max_workers=4, timeout_seconds=0.2)
+    registry.register("get_sales_report", lambda store_id, period="today": {"store": store_id, "period": period},
+                      "Doanh thu", {"period": {"type": "string", "enum": ["today", "yesterday"]}}, scoped=True)
+    registry.register("get_low_stock", lambda store_id, limit=20: list(range(limit)), "Sắp hết hàng",
+                      {"limit": {"type": "integer"}}, scoped=True)
+    registry.register("echo", lambda text: text, "Echo", {"text": {"type": "string"}}, required=["text"])
+    return registry
+
+
+def test_parse_tool_calls():
+    text = ('Để mình xem.\n<tool_call>\n{"name": "get_sales_report", "arguments": {"period": "today"}}\n</tool_call>\n'
+            '<tool_call>{"name": "echo", "arguments": "{\\"text\\": \\"hi\\"}"}</tool_call>'
+            '<tool_call>{"name": "echo", "argu')
+    calls, rest = parse_tool_calls(text)
+    assert calls == [{"name": "get_sales_report", "arguments": {"period": "today"}},
+                     {"name": "echo", "arguments": {"text": "hi"}}]
+    assert rest == "Để mình xem."
+
+
+def test_arguments_are_checked_and_store_is_injected(registry):
+    results = registry.execute([
+        {"name": "get_sales_report", "arguments": {"period": "yesterday", "store_id": 99}},
+        {"name": "get_sales_report", "arguments": {"period": "last_year"}},
+        {"name": "get_low_stock", "arguments": {"limit": "3"}},
+        {"name": "get_low_stock", "arguments": {"limit": True}},
+        {"name": "echo", "arguments": {}},
+        {"name": "drop_table", "arguments": {}},
+    ], store_id=1)
+    assert results[0]["result"] == {"store": 1, "period": "yesterday"}  # The model cannot pick the store
+    assert results[1]["error"] == "argument 'period' must be one of: today, yesterday"
+    assert results[2]["result"] == [0, 1, 2]
+    assert results[3]["error"] == "argument 'limit' must be of type integer"
+    assert results[4]["error"] == "missing argument(s): text"
+    assert results[5]["error"] == "unknown tool 'drop_table'"
+
+
+def test_scoped_tool_needs_a_store(registry):
+    [result] = registry.execute([{"name": "get_low_stock", "arguments": {}}], store_id=None)
+    assert "no store selected" in result["error"]
+
+
+def test_identical_calls_run_once_and_in_parallel(registry):
+    calls, lock = [], threading.Lock()
+
+    def slow(text):
+        with lock:
+            calls.append(text)
+        time.sleep(0.1)
+        return text
+
+    registry.register("slow", slow, "Slow", {"text": {"type": "string"}})
+    started = time.perf_counter()
+    results = registry.execute([{"name": "slow", "arguments": {"text": t}} for t in ("a", "b", "a", "c")])
+    assert [r["result"] for r in results] == ["a", "b", "a", "c"]
+    assert sorted(calls) == ["a", "b", "c"]
+    assert time.perf_counter() - started < 0.19
+
+
+def test_single_call_times_out(registry):
+    registry.register("hang", lambda: time.sleep(1), "Hang")
+    started = time.perf_counter()
+    [result] = registry.execute([{"name": "hang", "arguments": {}}])
+    assert result["error"] == "timed out after 0.2 s"
+    assert time.perf_counter() - started < 0.5
+
+
+def test_tool_errors_come_back_as_text(registry):
+    registry.register("boom", lambda: 1 / 0, "Boom")
+    [result] = registry.execute([{"name": "boom", "arguments": {}}])
+    assert result["error"] == "ZeroDivisionError: division by zero"
+    assert '"error": "ZeroDivisionError' in ToolRegistry.responses([dict(result, name="boom")])
+
+
+def test_answer_with_tools_needs_a_round():
+    pytest.importorskip("torch")
+    from src.agents.manager import ManagerAgent
+
+    with pytest.raises(ValueError, match="max_rounds"):
+        ManagerAgent(engine=None, memory=None).answer_with_tools("Doanh thu?", ToolRegistry(), 1, max_rounds=0)
@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+from src.core.tools import RetailTools, safe_eval
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("(1500000 - 1200000) / 1200000 * 100", 25.0),
+    ("2 ** 10 + 7 // 2 - 5 % 3", 1025),
+    ("round(sqrt(16) * 1.5, 1)", 6.0),
+    ("max(3, abs(-7), min(9, 8))", 8),
+    ("2 ** -2", 0.25),
+    ("10 ** 100 * 10 ** 100", 10 ** 200),
+])
+def test_arithmetic(expression, expected):
+    assert safe_eval(expression) == expected
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os').system('id')", "x + 1", "[1, 2]", "'a' * 3", "True + 1", "round(2.5, ndigits=1)",
+    "2 ** 101", "1" * 201,
+])
+def test_rejects_everything_else(expression):
+    with pytest.raises((ValueError, SyntaxError)):
+        safe_eval(expression)
+
+
+@pytest.mark.parametrize("expression", [
+    "(((9**99)**99)**99)**20",    # Each exponent is small; the result is not
+    "(9**99)**99",
+    "9**99 * 9**99 * 9**99 * 9**99",
+    "(2**100)**11",
+])
+def test_rejects_oversized_results_before_computing_them(expression):
+    started = time.perf_counter()
+    with pytest.raises(ValueError, match="too large"):
+        safe_eval(expression)
+    assert time.perf_counter() - started < 0.1
+
+
+def test_size_limit_is_configurable():
+    assert safe_eval("(2**100)**11", max_bits=2048) == 2 ** 1100
+    with pytest.raises(ValueError):
+        safe_eval("2**60 * 2**60", max_bits=100)
+
+
+def test_calculate_formats_and_hides_errors():
+    assert RetailTools.calculate("150000 * 12") == "1800000"
+    assert RetailTools.calculate("10 / 4") == "2.5"
+    assert RetailTools.calculate("1 / 0") == "Error"
+    assert RetailTools.calculate("(9**99)**99") == "Error"
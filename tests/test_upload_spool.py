@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from src.core.upload_spool import MultipartFileStream, UploadError, UploadSpool
+
+JPEG = b"\xff\xd8\xff" + b"\x10" * 5000
+BOUNDARY = "XyZboundary"
+
+
+def multipart(payload, field="file", filename="a.jpg"):
+    return (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"note\"\r\n\r\nhello\r\n"
+            f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: image/jpeg\r\n\r\n").encode() + payload + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+class Body:
+    """request.stream() stand-in; records how much of the body was consumed."""
+    def __init__(self, data, chunk=1000):
+        self.data, self.chunk, self.sent = data, chunk, 0
+
+    async def __aiter__(self):
+        while self.sent < len(self.data):
+            piece = self.data[self.sent:self.sent + self.chunk]
+            self.sent += len(piece)
+            yield piece
+
+
+def stream(body, **kwargs):
+    return MultipartFileStream(body, f"multipart/form-data; boundary={BOUNDARY}", **kwargs)
+
+
+def test_streams_file_part_into_spool(tmp_path):
+    spool = UploadSpool(str(tmp_path), max_bytes=10_000)
+    file = stream(Body(multipart(JPEG)))
+    result = asyncio.run(spool.receive(file))
+    assert file.filename == "a.jpg"
+    assert result["size"] == len(JPEG) and result["format"] == "jpg"
+    with open(result["path"], "rb") as f:
+        assert f.read() == JPEG
+
+
+def test_oversized_upload_stops_reading_the_body(tmp_path):
+    spool = UploadSpool(str(tmp_path), max_bytes=2_000)
+    body = Body(multipart(b"\xff\xd8\xff" + b"\x00" * 50_000))
+    with pytest.raises(UploadError) as e:
+        asyncio.run(spool.receive(stream(body)))
+    assert e.value.status_code == 413
+    assert body.sent < 5_000
+    assert not [p for p in tmp_path.rglob("*") if p.is_file()]  # .part removed
+
+
+def test_content_length_rejected_up_front(tmp_path):
+    spool = UploadSpool(str(tmp_path), max_bytes=2_000)
+    spool.check_length(None)
+    spool.check_length("1000")
+    with pytest.raises(UploadError) as e:
+        spool.check_length(str(10 * 1024 * 1024))
+    assert e.value.status_code == 413
+
+
+def test_body_cap_applies_to_non_file_parts(tmp_path):
+    spool = UploadSpool(str(tmp_path), max_bytes=2_000)
+    body = Body(multipart(JPEG[:100]).replace(b"hello", b"x" * 20_000))
+    with pytest.raises(UploadError) as e:
+        asyncio.run(spool.receive(stream(body, max_body=10_000)))
+    assert e.value.status_code == 413
+
+
+@pytest.mark.parametrize("data, field, status", [
+    (b"GIF", "file", 415),          # Too short for any signature
+    (b"%PDF-1.7" + b"\x00" * 100, "file", 415),
+    (JPEG, "image", 422),           # Wrong field name
+])
+def test_rejections(tmp_path, data, field, status):
+    spool = UploadSpool(str(tmp_path), max_bytes=10_000)
+    with pytest.raises(UploadError) as e:
+        asyncio.run(spool.receive(stream(Body(multipart(data, field=field)))))
+    assert e.value.status_code == status
+
+
+def test_duplicates_stored_once(tmp_path):
+    spool = UploadSpool(str(tmp_path), max_bytes=10_000)
+    first = asyncio.run(spool.receive(stream(Body(multipart(JPEG)))))
+    second = asyncio.run(spool.receive(stream(Body(multipart(JPEG), chunk=7))))
+    assert second["duplicate"] and second["path"] == first["path"]
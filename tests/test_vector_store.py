@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from src.core import vector_store
+from src.core.vector_store import MemmapStore, make_vector_store
+
+
+def vectors(n, dim=16, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def fill(store, n, seed=0):
+    store.add([f"c{i}" for i in range(n)], vectors(n, seed=seed), [f"doc {i}" for i in range(n)],
+              [{"source": f"file{i % 3}.txt"} for i in range(n)])
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "project_a.db"), str(tmp_path / "vector_db")
+
+
+def test_exact_query_and_sources(paths):
+    store = MemmapStore(*paths, ivf_min_rows=10_000)
+    fill(store, 200)
+    hits = store.query(vectors(200)[17], top_k=3)
+    assert hits[0][0] == "doc 17" and hits[0][1] == pytest.approx(1.0, abs=1e-2)
+    assert hits[0][2] == {"source": "file2.txt"}
+    assert store.has_source("file1.txt") and not store.has_source("other.txt")
+    assert MemmapStore(*paths).count() == 200  # Committed rows are visible to a fresh instance
+
+
+def test_other_process_sees_appends_and_rebuilds_with_same_list_count(paths):
+    writer = MemmapStore(*paths, ivf_min_rows=10_000)
+    reader = MemmapStore(*paths, ivf_min_rows=10_000)
+    fill(writer, 400)
+    writer.build_index(lists=8, seed=0)
+    reader.query(vectors(1)[0])
+    assert np.array_equal(reader._centroids, writer._centroids)
+
+    writer.build_index(lists=8, seed=1)
+    reader.query(vectors(1)[0])
+    assert np.array_equal(reader._centroids, writer._centroids)
+    assert all(np.array_equal(a, b) for a, b in zip(reader._lists, writer._lists))
+
+    writer.add(["extra"], vectors(1, seed=9), ["extra doc"], [{"source": "extra.txt"}])
+    assert reader.query(vectors(1, seed=9)[0], top_k=1)[0][0] == "extra doc"
+
+
+class StubChroma:
+    """ChromaStore stand-in: exports the same batches ChromaStore.export yields."""
+    name = "chroma"
+
+    def __init__(self, persist_dir, collection="project_a_docs"):
+        self.ids = [f"c{i}" for i in range(5)]
+        self.vectors = vectors(5)
+
+    def count(self):
+        return len(self.ids)
+
+    def export(self, batch=2):
+        for start in range(0, len(self.ids), batch):
+            ids = self.ids[start:start + batch]
+            yield ids, self.vectors[start:start + batch].tolist(), [f"doc {i}" for i in ids], \
+                [{"source": "old.pdf"} for _ in ids]
+
+
+def test_empty_memmap_store_takes_over_chroma_collection(paths, monkeypatch):
+    db_path, vector_dir = paths
+    store = make_vector_store("memmap", vector_dir, db_path)
+    assert store.count() == 0  # No Chroma data: nothing to migrate
+
+    open(f"{vector_dir}/chroma.sqlite3", "wb").close()
+    monkeypatch.setattr(vector_store, "ChromaStore", StubChroma)
+    other = str(paths[0]) + ".2"
+    migrated = make_vector_store("memmap", vector_dir, other)
+    assert migrated.count() == 5 and migrated.has_source("old.pdf")
+    assert migrated.query(vectors(5)[3], top_k=1)[0][0] == "doc c3"
+    assert make_vector_store("memmap", vector_dir, other).count() == 5  # Only once
+
+
+def test_chroma_data_without_chromadb_is_left_alone(paths, monkeypatch):
+    db_path, vector_dir = paths
+    MemmapStore(db_path, vector_dir)
+    open(f"{vector_dir}/chroma.sqlite3", "wb").close()
+
+    def missing(*args, **kwargs):
+        raise ImportError("No module named 'chromadb'")
+
+    monkeypatch.setattr(vector_store, "ChromaStore", missing)
+    assert make_vector_store("memmap", vector_dir, db_path).count() == 0
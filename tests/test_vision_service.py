@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+
+from src.core.vision_service import VisionService
+
+SETTINGS = {"batch_window_ms": 30, "max_batch_size": 4, "cache_size": 2}
+
+
+class StubVisionAgent:
+    """prepare/run/format like VisionAgent; records every batch run_batch receives."""
+    model = True
+    settings = SETTINGS
+
+    def __init__(self, delay=0.0, fail=False):
+        self.batches = []
+        self.delay = delay
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def task_prompt_for(self, task_hint):
+        return "<OCR>" if task_hint == "OCR" else "<CAPTION>"
+
+    def prepare_image(self, source):
+        if source == b"broken":
+            raise ValueError("not an image")
+        return source
+
+    def run_batch(self, images, task_prompt, mode):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("CUDA OOM")
+        with self._lock:
+            self.batches.append((task_prompt, mode, list(images)))
+        return [image.decode() for image in images]
+
+    def format_result(self, task_prompt, result):
+        return f"{task_prompt}{result}"
+
+
+def test_concurrent_requests_are_batched_and_grouped_by_task():
+    agent = StubVisionAgent()
+    service = VisionService(agent)
+    futures = [service.submit(b"a"), service.submit(b"b"), service.submit(b"c", task_hint="caption"),
+               service.submit(b"d", mode="fast")]
+    assert [f.result(timeout=2) for f in futures] == ["<OCR>a", "<OCR>b", "<CAPTION>c", "<OCR>d"]
+    assert sorted((p, m, len(i)) for p, m, i in agent.batches) == \
+        [("<CAPTION>", "quality", 1), ("<OCR>", "fast", 1), ("<OCR>", "quality", 2)]
+    assert service.stats["batches"] == 3 and service.stats["batched_images"] == 4
+
+
+def test_cache_hits_and_in_flight_coalescing():
+    agent = StubVisionAgent(delay=0.05)
+    service = VisionService(agent)
+    first, second = service.submit(b"same"), service.submit(b"same")
+    assert first is second
+    assert first.result(timeout=2) == "<OCR>same"
+    assert service.analyze(b"same") == "<OCR>same"
+    assert service.stats == {"requests": 3, "cache_hits": 1, "coalesced": 1, "batches": 1, "batched_images": 1}
+
+
+def test_cache_is_bounded():
+    service = VisionService(StubVisionAgent())
+    for image in (b"1", b"2", b"3"):
+        service.analyze(image)
+    assert len(service._cache) == SETTINGS["cache_size"]
+    service.analyze(b"1")
+    assert service.stats["cache_hits"] == 0
+
+
+def test_failures_are_reported_and_not_cached():
+    agent = StubVisionAgent(fail=True)
+    service = VisionService(agent)
+    assert service.analyze(b"x") == "Vision inference failed: CUDA OOM"
+    assert service.analyze(b"broken") == "Error opening image: not an image"
+    agent.fail = False
+    assert service.analyze(b"x") == "<OCR>x"
+
+
+def test_async_path_and_model_not_loaded():
+    service = VisionService(StubVisionAgent())
+    assert asyncio.run(service.analyze_async(b"z")) == "<OCR>z"
+    agent = StubVisionAgent()
+    agent.model = None
+    assert VisionService(agent).analyze(b"z") == "Vision model not loaded."
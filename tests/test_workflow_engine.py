@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from src.core.workflow_engine import LocalSheets, RunContext, Workflow, WorkflowEngine, compile_template, filter_passes
+
+
+def blueprint(*flow):
+    return {"name": "test", "flow": list(flow)}
+
+
+def condition(a, o, b=None):
+    return {"a": a, "o": o, "b": b}
+
+
+def run_ctx(outputs):
+    run = RunContext(Workflow())
+    run.outputs.update(outputs)
+    return run
+
+
+def test_compile_template_and_resolve_keeps_types():
+    assert compile_template("Hi {{4.`1`}}!") == ("Hi ", ("4", ("1",)), "!")
+    assert compile_template("{{formatDate(now)}}") == ("{{formatDate(now)}}",)
+    run = run_ctx({"1": {"qty": 3, "rows": [{"name": "Bỉm"}]}})
+    assert run.resolve("{{1.qty}}") == 3
+    assert run.resolve("{{1.rows.0.name}} x{{1.qty}}") == "Bỉm x3"
+    assert run.resolve("{{1.missing.deep}}") is None
+
+
+@pytest.mark.parametrize("cond, expected", [
+    (condition("{{1.stock}}", "number:less", "10"), True),
+    (condition("{{1.stock}}", "number:greaterorequal", 10), False),
+    (condition("{{1.stock}}", "number:less", "abc"), False),
+    (condition("{{1.name}}", "text:contain:ci", "MEIJI"), True),
+    (condition("{{1.name}}", "text:contain", "MEIJI"), False),
+    (condition("{{1.name}}", "text:startwith", "Sữa"), True),
+    (condition("{{1.note}}", "exist"), False),
+    (condition("{{1.note}}", "notexist"), True),
+    (condition("{{1.date}}", "date:greater", "2025-01-01T00:00:00"), True),
+])
+def test_filter_operators(cond, expected):
+    run = run_ctx({"1": {"stock": 4, "name": "Sữa Meiji", "note": "", "date": "2025-02-01T08:00:00Z"}})
+    assert filter_passes({"conditions": [[cond]]}, run) is expected
+
+
+def test_filter_groups_are_or_of_ands():
+    run = run_ctx({"1": {"stock": 4, "name": "Sữa Meiji"}})
+    low, named, other = (condition("{{1.stock}}", "number:less", 10),
+                         condition("{{1.name}}", "text:equal", "Sữa Meiji"),
+                         condition("{{1.name}}", "text:equal", "Bỉm"))
+    assert filter_passes({"conditions": [[low, other], [named]]}, run)
+    assert not filter_passes({"conditions": [[low, other], [other]]}, run)
+    assert filter_passes(None, run) and filter_passes({"conditions": []}, run)
+    with pytest.raises(ValueError):
+        filter_passes({"conditions": [[condition("{{1.stock}}", "number:between", 1)]]}, run)
+
+
+def test_filtered_node_skips_its_descendants_only():
+    engine = WorkflowEngine()
+    payload = blueprint(
+        {"id": 1, "module": "gateway:CustomWebHook"},
+        {"id": 2, "module": "builtin:BasicRouter", "routes": [
+            {"flow": [{"id": 3, "module": "slack:post", "filter": {"conditions": [[
+                condition("{{1.stock}}", "number:less", 10)]]}},
+                      {"id": 4, "module": "email:send"}]},
+            {"flow": [{"id": 5, "module": "google-sheets:addRow", "mapper": {
+                "spreadsheetId": "s", "sheetId": "log", "values": {"0": "{{1.sku}}", "1": "{{1.stock}}"}}}]},
+        ]},
+    )
+    result = asyncio.run(engine.run(payload, {"sku": "MJ-9", "stock": 40}))
+    status = {nid: info["status"] for nid, info in result["nodes"].items()}
+    assert status == {"1": "ok", "2": "ok", "3": "filtered", "4": "skipped", "5": "ok"}
+    assert result["status"] == "success"
+    assert engine.sheets.data[("s", "log")] == [{"0": "MJ-9", "1": 40}]
+    assert engine.default.calls == 0
+
+    result = asyncio.run(engine.run(payload, {"sku": "MJ-9", "stock": 3}))
+    assert {nid: info["status"] for nid, info in result["nodes"].items()}["4"] == "ok"
+    assert engine.default.calls == 2
+
+
+def test_error_skips_children_and_fails_the_run():
+    async def broken(node, config, run):
+        raise RuntimeError("quota exceeded")
+
+    engine = WorkflowEngine(connectors={"openai:": broken})
+    payload = {"nodes": [{"id": "a", "type": "gateway:CustomWebHook"}, {"id": "b", "type": "openai:chat"},
+                         {"id": "c", "type": "email:send"}, {"id": "d", "type": "slack:post"}],
+               "edges": [{"from": "a", "to": "b"}, {"from": "b", "to": "c"}, {"from": "a", "to": "d"}]}
+    result = asyncio.run(engine.run(payload))
+    status = {nid: info["status"] for nid, info in result["nodes"].items()}
+    assert status == {"a": "ok", "b": "error", "c": "skipped", "d": "ok"}
+    assert result["status"] == "error"
+    assert result["nodes"]["b"]["error"] == "RuntimeError: quota exceeded"
+
+
+def test_independent_branches_run_concurrently():
+    async def slow(node, config, run):
+        await asyncio.sleep(0.05)
+        return {}
+
+    engine = WorkflowEngine(default=slow)
+    payload = {"nodes": [{"id": "t", "type": "gateway:CustomWebHook"}]
+               + [{"id": f"n{i}", "type": "slack:post"} for i in range(10)],
+               "edges": [{"from": "t", "to": f"n{i}"} for i in range(10)]}
+    result = asyncio.run(engine.run(payload))
+    assert result["status"] == "success"
+    assert result["ms"] < 300
+
+
+def test_aggregator_resolves_mapper_per_row():
+    sheets = LocalSheets({("s", "stock"): [{"0": "Bỉm", "1": "4"}, {"0": "Sữa", "1": "12"}]})
+    engine = WorkflowEngine(sheets=sheets)
+    payload = blueprint(
+        {"id": 1, "module": "google-sheets:getSheetContent", "mapper": {"spreadsheetId": "s", "sheetId": "stock"}},
+        {"id": 2, "module": "builtin:BasicAggregator", "parameters": {"feeder": 1},
+         "mapper": {"line": "{{1.`0`}}: {{1.`1`}}"}},
+    )
+    result = asyncio.run(engine.run(payload))
+    assert result["outputs"]["2"]["array"] == [{"line": "Bỉm: 4"}, {"line": "Sữa: 12"}]
+
+
+def test_invalid_graphs_are_rejected():
+    with pytest.raises(ValueError, match="unknown"):
+        Workflow.from_blueprint({"nodes": [{"id": 1, "type": "x"}], "edges": [{"from": 9, "to": 1}]})
+    with pytest.raises(ValueError, match="Cycle"):
+        Workflow.from_blueprint({"nodes": [{"id": 1, "type": "x"}, {"id": 2, "type": "x"}],
+                                 "edges": [{"from": 1, "to": 2}, {"from": 2, "to": 1}]})
+    with pytest.raises(ValueError):
+        Workflow.from_blueprint({"name": "empty"})
+
+
+SHEET_LOG = blueprint(
+    {"id": 1, "module": "gateway:CustomWebHook"},
+    {"id": 2, "module": "google-sheets:addRow", "mapper": {"spreadsheetId": "s", "sheetId": "log",
+                                                          "values": {"0": "{{1.order}}"}}},
+    {"id": 3, "module": "google-sheets:getSheetContent", "mapper": {"spreadsheetId": "s", "sheetId": "log"}},
+)
+
+
+def test_sheets_are_isolated_per_store():
+    engine = WorkflowEngine()
+    asyncio.run(engine.run(SHEET_LOG, {"order": "A-1"}, store_id=1))
+    result = asyncio.run(engine.run(SHEET_LOG, {"order": "B-1"}, store_id=2))
+
+    assert result["outputs"]["3"]["rows"] == [{"0": "B-1"}]
+    assert engine.sheets.tables(1)[("s", "log")] == [{"0": "A-1"}]
+    assert ("s", "log") not in engine.sheets.data
+
+
+def test_sheets_are_bounded():
+    engine = WorkflowEngine(sheets=LocalSheets(max_stores=2, max_rows=3))
+    for store_id in (1, 2, 3):
+        for i in range(5):
+            asyncio.run(engine.run(SHEET_LOG, {"order": f"{store_id}-{i}"}, store_id=store_id))
+
+    assert engine.sheets.tables(3)[("s", "log")] == [{"0": "3-2"}, {"0": "3-3"}, {"0": "3-4"}]
+    assert engine.sheets.tables(1) == {}  # Least recently used store was dropped
@@ -0,0 +1,101 @@
+import json
+import os
+import zlib
+
+import pytest
+
+from src.core import workflow_store
+from src.core.memory import MemoryManager
+from src.core.workflow_store import WorkflowCodec, WorkflowStore, canonical_json, count_nodes
+
+BLUEPRINT = {"name": "Chào khách mới", "flow": [{"id": "1", "type": "trigger"}, {"id": "2", "type": "zalo"}]}
+
+
+@pytest.fixture
+def memory(tmp_path):
+    memory = MemoryManager(db_path=str(tmp_path / "workflows.db"))
+    yield memory
+    memory.conn.close()
+
+
+@pytest.fixture
+def store(memory, tmp_path):
+    return WorkflowStore(memory.db_path, str(tmp_path / "exports"))
+
+
+def test_canonical_json_is_key_order_independent():
+    a = canonical_json({"b": 1, "a": "Tết"})
+    assert a == canonical_json({"a": "Tết", "b": 1}) == '{"a":"Tết","b":1}'.encode("utf-8")
+
+
+def test_count_nodes():
+    assert count_nodes(BLUEPRINT) == 2
+    assert count_nodes({"nodes": [{}, {}, {}]}) == 3
+    assert count_nodes(["not", "a", "blueprint"]) == 0
+
+
+def test_zlib_fallback_round_trip(monkeypatch):
+    monkeypatch.setattr(workflow_store, "zstandard", None)
+    codec = WorkflowCodec()
+    raw = canonical_json(BLUEPRINT)
+
+    assert codec.name == "zlib"
+    assert zlib.decompress(codec.compress(raw)) == raw
+    assert WorkflowCodec.decompress("zlib", codec.compress(raw)) == raw
+    assert WorkflowCodec.decompress("raw", raw) == raw
+    with pytest.raises(RuntimeError, match="zstandard"):
+        WorkflowCodec.decompress("zstd", b"")
+
+
+def test_save_dedupes_identical_blueprints(store):
+    first = store.save(1, "A", BLUEPRINT)
+    second = store.save(2, "B", dict(reversed(list(BLUEPRINT.items()))))
+
+    assert first["hash"] == second["hash"]
+    assert (first["deduplicated"], second["deduplicated"]) == (False, True)
+    assert store.conn.execute("SELECT count(*) FROM workflow_blobs").fetchone()[0] == 1
+    assert store.get(second["id"]) == BLUEPRINT
+    assert store.stats["saved"] == 2 and store.stats["deduplicated"] == 1
+
+
+def test_reads_are_scoped_to_the_store(store):
+    saved = store.save(1, "A", BLUEPRINT)
+
+    assert store.get(saved["id"], store_id=2) is None
+    assert store.get(saved["id"], store_id=1) == BLUEPRINT
+    assert store.list(2) == []
+    [row] = store.list(1)
+    assert (row["name"], row["node_count"], row["size"]) == ("A", 2, len(canonical_json(BLUEPRINT)))
+
+
+def test_get_compressed_returns_stored_bytes(store):
+    saved = store.save(1, "A", BLUEPRINT)
+    codec, data = store.get_compressed(saved["id"])
+
+    assert codec == store.codec.name
+    assert json.loads(WorkflowCodec.decompress(codec, data)) == BLUEPRINT
+
+
+def test_legacy_rows_are_read_raw(memory, store):
+    wf_id = memory.save_workflow(1, "Legacy", BLUEPRINT)
+
+    assert store.get_compressed(wf_id) == ("raw", json.dumps(BLUEPRINT).encode("utf-8"))
+    assert store.get(wf_id) == BLUEPRINT
+
+
+def test_export_is_written_behind(store):
+    saved = store.save(1, "A", BLUEPRINT, filename="WF_{id}_promo.json")
+    store.flush()
+
+    assert os.path.basename(saved["file_path"]) == f"WF_{saved['id']}_promo.json"
+    with open(saved["file_path"], encoding="utf-8") as f:
+        assert json.load(f) == BLUEPRINT
+    assert store.stats["exported"] == 1
+
+
+def test_export_failure_is_counted(store, capsys):
+    store.save(1, "A", BLUEPRINT, filename="missing_dir/WF_{id}.json")
+    store.flush()
+
+    assert store.stats["export_errors"] == 1
+    assert "[Workflows] Export failed" in capsys.readouterr().out
@@ -21,7 +21,7 @@ def check_rag_learning():
     kb = KnowledgeBase()
     
     # 2. Check Collection Count
-    count = kb.collection.count()
+    count = kb.store.count()
     print(f"📄 Total Document Chunks Indexed: {count}")
     
     if count == 0: